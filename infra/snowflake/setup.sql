@@ -49,7 +49,22 @@ CREATE PIPE IF NOT EXISTS events_pipe
 AUTO_INGEST = TRUE
 AS
 COPY INTO raw_events
-FROM @s3_events_stage
+FROM (
+    -- data/metadata are written as JSON strings by the Arrow writer
+    SELECT
+        $1:learner_id::STRING,
+        $1:event_type::STRING,
+        $1:event_id::STRING,
+        $1:session_id::STRING,
+        $1:timestamp::TIMESTAMP_NTZ,
+        PARSE_JSON($1:data::STRING),
+        PARSE_JSON($1:metadata::STRING),
+        $1:version::STRING,
+        $1:processed_at::TIMESTAMP_NTZ,
+        $1:partition_date::DATE,
+        COALESCE($1:s3_path::STRING, METADATA$FILENAME)
+    FROM @s3_events_stage
+)
 PATTERN = '.*events_.*\.parquet'
 FILE_FORMAT = (FORMAT_NAME = 'parquet_format');
 
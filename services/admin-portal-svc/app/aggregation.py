@@ -0,0 +1,166 @@
+"""
+Concurrent dashboard aggregation with stale-while-revalidate caching.
+
+Every dashboard section is fetched from its downstream service in parallel,
+each under its own deadline, so the page is as slow as the slowest section
+that makes its deadline rather than the sum of all of them. A section that
+misses its deadline or fails is reported as missing and filled from its
+fallback; its fetch keeps running in the background, so the result still
+lands in the cache for the next request.
+
+Sections are cached as ``{"data": ..., "fetched_at": ...}`` envelopes kept for
+``fresh_ttl + stale_ttl`` seconds:
+
+- younger than ``fresh_ttl``: served as fresh;
+- older: served as stale, and a background refresh is started (at most one
+  per tenant and section);
+- absent: fetched inline under the section's deadline.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from .cache_service import CacheService
+from .config import get_settings
+from .schemas import SectionStatus
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Section:
+    """One downstream call that feeds part of a dashboard page."""
+
+    name: str
+    fetch: Callable[[], Awaitable[Any]]
+    fallback: Any = field(default_factory=dict)
+    deadline: float | None = None
+
+
+@dataclass
+class SectionResult:
+    """Data for one section and how fresh it is."""
+
+    name: str
+    data: Any
+    status: SectionStatus
+    age_seconds: float | None = None
+    error: str | None = None
+
+
+class AggregationEngine:
+    """Fans out section fetches with deadlines; serves cached sections stale-while-revalidate."""
+
+    def __init__(
+        self,
+        cache: CacheService,
+        *,
+        errors: tuple[type[BaseException], ...] = (Exception,),
+        deadline: float | None = None,
+        fresh_ttl: int | None = None,
+        stale_ttl: int | None = None,
+    ) -> None:
+        """Initialize; ``errors`` are the fetch failures reported as a missing section."""
+        settings = get_settings()
+        self.cache = cache
+        self.errors = errors
+        self.deadline = deadline if deadline is not None else settings.aggregation_deadline
+        self.fresh_ttl = fresh_ttl if fresh_ttl is not None else settings.cache_ttl
+        self.stale_ttl = stale_ttl if stale_ttl is not None else settings.cache_stale_ttl
+        self.section_deadlines = settings.aggregation_section_deadlines
+        self._inflight: dict[tuple[str, str], asyncio.Task[Any]] = {}
+
+    async def gather(self, tenant_id: str, sections: list[Section]) -> dict[str, SectionResult]:
+        """Resolve every section concurrently."""
+        results = await asyncio.gather(*(self.resolve(tenant_id, s) for s in sections))
+        return {result.name: result for result in results}
+
+    async def resolve(self, tenant_id: str, section: Section) -> SectionResult:
+        """Serve one section from cache, revalidating if stale, or fetch it under its deadline."""
+        entry = await self._cached(tenant_id, section.name)
+        if entry is not None:
+            age = max(0.0, time.time() - entry["fetched_at"])
+            if age < self.fresh_ttl:
+                return SectionResult(section.name, entry["data"], SectionStatus.FRESH, age)
+            self._refresh(tenant_id, section)
+            return SectionResult(section.name, entry["data"], SectionStatus.STALE, age)
+
+        deadline = section.deadline
+        if deadline is None:
+            deadline = self.section_deadlines.get(section.name, self.deadline)
+        try:
+            # Shielded so a fetch that misses its deadline still fills the cache
+            data = await asyncio.wait_for(
+                asyncio.shield(self._refresh(tenant_id, section)), deadline
+            )
+        except TimeoutError:
+            logger.warning(
+                "Section %s for tenant %s missed its %.1fs deadline",
+                section.name,
+                tenant_id,
+                deadline,
+            )
+            return SectionResult(
+                section.name, section.fallback, SectionStatus.MISSING, error="deadline exceeded"
+            )
+        except self.errors as e:
+            logger.error("Failed to fetch %s for tenant %s: %s", section.name, tenant_id, e)
+            return SectionResult(
+                section.name, section.fallback, SectionStatus.MISSING, error=str(e)
+            )
+        return SectionResult(section.name, data, SectionStatus.FRESH, 0.0)
+
+    async def _cached(self, tenant_id: str, name: str) -> dict[str, Any] | None:
+        """Cached envelope for a section, ignoring cache failures."""
+        try:
+            entry = await self.cache.get(tenant_id, name)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning("Cache unavailable for %s: %s", name, e)
+            return None
+        if isinstance(entry, dict) and "fetched_at" in entry:
+            return entry
+        return None
+
+    def _refresh(self, tenant_id: str, section: Section) -> asyncio.Task[Any]:
+        """Start (or join) the fetch-and-store task for a section."""
+        key = (tenant_id, section.name)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_store(tenant_id, section))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._settle(key, t))
+        return task
+
+    def _settle(self, key: tuple[str, str], task: asyncio.Task[Any]) -> None:
+        """Forget a finished fetch and log failures nobody awaited."""
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(
+                "Refresh of %s for tenant %s failed: %s", key[1], key[0], task.exception()
+            )
+
+    async def _fetch_and_store(self, tenant_id: str, section: Section) -> Any:
+        """Fetch a section and cache it with its fetch time."""
+        data = await section.fetch()
+        entry = {"data": data, "fetched_at": time.time()}
+        try:
+            await self.cache.set(tenant_id, section.name, entry, self.fresh_ttl + self.stale_ttl)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning("Failed to cache %s: %s", section.name, e)
+        return data
+
+    async def wait_idle(self) -> None:
+        """Wait for in-flight background refreshes to finish."""
+        while self._inflight:
+            await asyncio.gather(*list(self._inflight.values()), return_exceptions=True)
+
+    async def close(self) -> None:
+        """Cancel in-flight background refreshes."""
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -49,6 +49,10 @@ class CacheService:
         """Generate cache key with tenant isolation."""
         return f"admin_portal:{tenant_id}:{endpoint}"
 
+    def _get_tag_key(self, tenant_id: str) -> str:
+        """Key of the set tracking every cache key written for a tenant."""
+        return f"admin_portal:tags:{tenant_id}"
+
     async def get(self, tenant_id: str, endpoint: str) -> Any | None:
         """Get cached data for tenant and endpoint."""
         if not self.enabled or not self.redis_client:
@@ -79,7 +83,19 @@ class CacheService:
             ttl = ttl or self.settings.cache_ttl
 
             serialized_data = json.dumps(data, default=str)
-            await self.redis_client.setex(key, ttl, serialized_data)
+            tag_key = self._get_tag_key(tenant_id)
+            tag_ttl = max(ttl, self.settings.cache_ttl + self.settings.cache_stale_ttl)
+
+            # Record the key in the tenant's tag set so invalidation never scans.
+            # The set must outlive every key in it: give a new set a TTL (NX) and
+            # only ever extend it (GT), so a short-lived write cannot expire a set
+            # that still tracks longer-lived keys.
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.set(key, serialized_data, ex=ttl)
+                pipe.sadd(tag_key, key)
+                pipe.expire(tag_key, tag_ttl, nx=True)
+                pipe.expire(tag_key, tag_ttl, gt=True)
+                await pipe.execute()
 
             logger.debug(f"Cache set for {key} with TTL {ttl}s")
             return True
@@ -95,7 +111,10 @@ class CacheService:
 
         try:
             key = self._get_key(tenant_id, endpoint)
-            result = await self.redis_client.delete(key)
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.delete(key)
+                pipe.srem(self._get_tag_key(tenant_id), key)
+                result, _ = await pipe.execute()
 
             logger.debug(f"Cache delete for {key}: {'success' if result else 'not found'}")
             return bool(result)
@@ -110,15 +129,16 @@ class CacheService:
             return 0
 
         try:
-            pattern = f"admin_portal:{tenant_id}:*"
-            keys = await self.redis_client.keys(pattern)
+            tag_key = self._get_tag_key(tenant_id)
+            keys = await self.redis_client.smembers(tag_key)
 
+            deleted = 0
             if keys:
                 deleted = await self.redis_client.delete(*keys)
+                await self.redis_client.srem(tag_key, *keys)
                 logger.info(f"Cleared {deleted} cache entries for tenant {tenant_id}")
-                return deleted
 
-            return 0
+            return deleted
 
         except Exception as e:
             logger.error(f"Cache clear error for tenant {tenant_id}: {e}")
@@ -38,6 +38,17 @@ class Settings(BaseSettings):
     redis_url: str = Field(default="redis://localhost:6379", description="Redis URL for caching")
     cache_ttl: int = Field(default=30, description="Cache TTL in seconds")
     cache_enabled: bool = Field(default=True, description="Enable caching")
+    cache_stale_ttl: int = Field(
+        default=300, description="Seconds a section may be served stale while it is refreshed"
+    )
+
+    # Aggregation settings
+    aggregation_deadline: float = Field(
+        default=2.0, description="Default per-section deadline for dashboard fan-out in seconds"
+    )
+    aggregation_section_deadlines: dict[str, float] = Field(
+        default_factory=dict, description="Per-section deadline overrides in seconds"
+    )
 
     # Circuit breaker settings
     circuit_breaker_failure_threshold: int = Field(
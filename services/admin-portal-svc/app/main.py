@@ -53,6 +53,7 @@ async def lifespan(app: FastAPI):
     yield
 
     # Cleanup
+    await service_aggregator.engine.close()
     await cache_service.close()
     await http_client.close()
     logger.info("Admin Portal Aggregator Service stopped")
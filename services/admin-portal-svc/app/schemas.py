@@ -28,6 +28,14 @@ class SubscriptionTier(str, Enum):
     ENTERPRISE = "enterprise"
 
 
+class SectionStatus(str, Enum):
+    """Freshness of one aggregated dashboard section."""
+
+    FRESH = "fresh"
+    STALE = "stale"
+    MISSING = "missing"
+
+
 class UsageMetric(BaseModel):
     """Usage metric model."""
 
@@ -53,6 +61,10 @@ class SummaryResponse(BaseModel):
     usage_alerts: int = Field(default=0, description="Number of usage alerts")
     last_activity: datetime | None = Field(None, description="Last activity timestamp")
     health_score: float = Field(..., ge=0, le=100, description="Overall health score")
+    partial: bool = Field(default=False, description="Whether any section is stale or missing")
+    sections: dict[str, SectionStatus] = Field(
+        default_factory=dict, description="Freshness of each downstream section"
+    )
 
 
 class SubscriptionDetails(BaseModel):
@@ -9,12 +9,14 @@ from typing import Any
 
 import httpx
 
+from .aggregation import AggregationEngine, Section
 from .cache_service import cache_service
 from .config import get_settings
 from .http_client import CircuitBreakerError, http_client
 from .schemas import (
     BillingHistoryResponse,
     NamespacesResponse,
+    SectionStatus,
     SubscriptionDetails,
     SummaryResponse,
     TeamResponse,
@@ -23,6 +25,8 @@ from .schemas import (
 
 logger = logging.getLogger(__name__)
 
+FETCH_ERRORS = (httpx.HTTPError, CircuitBreakerError, ValueError, TypeError)
+
 
 class ServiceAggregator:
     """Aggregates data from downstream services for admin dashboard."""
@@ -30,35 +34,20 @@ class ServiceAggregator:
     def __init__(self) -> None:
         """Initialize service aggregator."""
         self.settings = get_settings()
+        self.engine = AggregationEngine(cache_service, errors=FETCH_ERRORS)
 
     async def _get_cached_or_fetch(
         self,
         tenant_id: str,
         endpoint: str,
         fetch_func: Callable[[], Awaitable[Any]],
-        ttl: int | None = None,
     ) -> Any:
-        """Get data from cache or fetch from service."""
-        # Try cache first
-        cached_data = await cache_service.get(tenant_id, endpoint)
-        if cached_data is not None:
-            return cached_data
-
-        # Fetch from service
-        try:
-            data = await fetch_func()
-            # Cache the result
-            await cache_service.set(tenant_id, endpoint, data, ttl)
-            return data
-        except (
-            httpx.HTTPError,
-            CircuitBreakerError,
-            ValueError,
-            TypeError,
-        ) as e:
-            logger.error("Failed to fetch data for %s: %s", endpoint, e)
-            # Return empty/default data structure
-            return self._get_fallback_data(endpoint, tenant_id)
+        """Get data from cache (revalidating in the background if stale) or fetch it."""
+        result = await self.engine.resolve(
+            tenant_id,
+            Section(endpoint, fetch_func, fallback=self._get_fallback_data(endpoint, tenant_id)),
+        )
+        return result.data
 
     def _get_fallback_data(self, endpoint: str, tenant_id: str = "unknown") -> dict[str, Any]:
         """Get fallback data when services are unavailable."""
@@ -127,51 +116,61 @@ class ServiceAggregator:
 
     async def get_summary(self, tenant_id: str) -> SummaryResponse:
         """Get dashboard summary data."""
-
-        async def fetch_summary() -> dict[str, Any]:
-            # Fetch data from multiple services concurrently
-            tasks = {
-                "tenant": self._get_tenant_info(tenant_id),
-                "users": self._get_user_stats(tenant_id),
-                "documents": self._get_document_stats(tenant_id),
-                "approvals": self._get_approval_stats(tenant_id),
-                "billing": self._get_billing_summary(tenant_id),
-                "usage": self._get_usage_alerts(tenant_id),
-            }
-
-            results = {}
-            for key, task in tasks.items():
-                try:
-                    results[key] = await task
-                except (httpx.HTTPError, CircuitBreakerError) as e:
-                    logger.warning("Failed to fetch %s for summary: %s", key, e)
-                    results[key] = {}
-
-            # Aggregate into summary response
-            tenant_info = results.get("tenant", {})
-            user_stats = results.get("users", {})
-            doc_stats = results.get("documents", {})
-            approval_stats = results.get("approvals", {})
-            billing_info = results.get("billing", {})
-            usage_alerts = results.get("usage", {})
-
-            return {
-                "tenant_id": tenant_id,
-                "tenant_name": tenant_info.get("name", "Unknown"),
-                "status": tenant_info.get("status", "suspended"),
-                "subscription_tier": tenant_info.get("subscription_tier", "free"),
-                "total_users": user_stats.get("total", 0),
-                "active_users_30d": user_stats.get("active_30d", 0),
-                "total_documents": doc_stats.get("total", 0),
-                "pending_approvals": approval_stats.get("pending", 0),
-                "monthly_spend": billing_info.get("current_month_spend", "0.00"),
-                "usage_alerts": usage_alerts.get("count", 0),
-                "last_activity": user_stats.get("last_activity"),
-                "health_score": self._calculate_health_score(results),
-            }
-
-        data = await self._get_cached_or_fetch(tenant_id, "summary", fetch_summary)
-        return SummaryResponse(**data)
+        # Fetch data from multiple services concurrently, each under its own deadline
+        sections = await self.engine.gather(
+            tenant_id,
+            [
+                Section("summary:tenant", lambda: self._get_tenant_info(tenant_id)),
+                Section("summary:users", lambda: self._get_user_stats(tenant_id)),
+                Section(
+                    "summary:documents",
+                    lambda: self._get_document_stats(tenant_id),
+                    fallback={"total": 0},
+                ),
+                Section(
+                    "summary:approvals",
+                    lambda: self._get_approval_stats(tenant_id),
+                    fallback={"pending": 0},
+                ),
+                Section(
+                    "summary:billing",
+                    lambda: self._get_billing_summary(tenant_id),
+                    fallback={"current_month_spend": "0.00"},
+                ),
+                Section(
+                    "summary:usage",
+                    lambda: self._get_usage_alerts(tenant_id),
+                    fallback={"count": 0},
+                ),
+            ],
+        )
+        results = {name.split(":", 1)[1]: section.data for name, section in sections.items()}
+        statuses = {name.split(":", 1)[1]: section.status for name, section in sections.items()}
+
+        # Aggregate into summary response
+        tenant_info = results.get("tenant", {})
+        user_stats = results.get("users", {})
+        doc_stats = results.get("documents", {})
+        approval_stats = results.get("approvals", {})
+        billing_info = results.get("billing", {})
+        usage_alerts = results.get("usage", {})
+
+        return SummaryResponse(
+            tenant_id=tenant_id,
+            tenant_name=tenant_info.get("name", "Unknown"),
+            status=tenant_info.get("status", "suspended"),
+            subscription_tier=tenant_info.get("subscription_tier", "free"),
+            total_users=user_stats.get("total", 0),
+            active_users_30d=user_stats.get("active_30d", 0),
+            total_documents=doc_stats.get("total", 0),
+            pending_approvals=approval_stats.get("pending", 0),
+            monthly_spend=billing_info.get("current_month_spend", "0.00"),
+            usage_alerts=usage_alerts.get("count", 0),
+            last_activity=user_stats.get("last_activity"),
+            health_score=self._calculate_health_score(results, statuses),
+            partial=any(status != SectionStatus.FRESH for status in statuses.values()),
+            sections=statuses,
+        )
 
     async def get_subscription(self, tenant_id: str) -> SubscriptionDetails:
         """Get subscription details."""
@@ -378,50 +377,40 @@ class ServiceAggregator:
 
     async def _get_document_stats(self, tenant_id: str) -> dict[str, Any]:
         """Get document statistics."""
-        try:
-            return await http_client.get(
-                "fm_orchestrator",
-                f"{self.settings.fm_orchestrator_url}/tenants/" f"{tenant_id}/documents/stats",
-            )
-        except (httpx.HTTPError, CircuitBreakerError):
-            return {"total": 0}
+        return await http_client.get(
+            "fm_orchestrator",
+            f"{self.settings.fm_orchestrator_url}/tenants/" f"{tenant_id}/documents/stats",
+        )
 
     async def _get_approval_stats(self, tenant_id: str) -> dict[str, Any]:
         """Get approval statistics."""
-        try:
-            return await http_client.get(
-                "approval_service",
-                f"{self.settings.approval_service_url}/approvals/" f"stats?tenant_id={tenant_id}",
-            )
-        except (httpx.HTTPError, CircuitBreakerError):
-            return {"pending": 0}
+        return await http_client.get(
+            "approval_service",
+            f"{self.settings.approval_service_url}/approvals/" f"stats?tenant_id={tenant_id}",
+        )
 
     async def _get_billing_summary(self, tenant_id: str) -> dict[str, Any]:
         """Get billing summary."""
-        try:
-            return await http_client.get(
-                "payment_service",
-                f"{self.settings.payment_service_url}/billing/" f"{tenant_id}/summary",
-            )
-        except (httpx.HTTPError, CircuitBreakerError):
-            return {"current_month_spend": "0.00"}
+        return await http_client.get(
+            "payment_service",
+            f"{self.settings.payment_service_url}/billing/" f"{tenant_id}/summary",
+        )
 
     async def _get_usage_alerts(self, tenant_id: str) -> dict[str, Any]:
         """Get usage alerts."""
-        try:
-            return await http_client.get(
-                "tenant_service",
-                f"{self.settings.tenant_service_url}/tenants/" f"{tenant_id}/alerts",
-            )
-        except (httpx.HTTPError, CircuitBreakerError):
-            return {"count": 0}
+        return await http_client.get(
+            "tenant_service",
+            f"{self.settings.tenant_service_url}/tenants/" f"{tenant_id}/alerts",
+        )
 
-    def _calculate_health_score(self, data: dict[str, Any]) -> float:
+    def _calculate_health_score(
+        self, data: dict[str, Any], statuses: dict[str, SectionStatus]
+    ) -> float:
         """Calculate overall tenant health score."""
         score = 100.0
 
         # Deduct for service availability issues
-        failed_services = sum(1 for service_data in data.values() if not service_data)
+        failed_services = sum(1 for status in statuses.values() if status == SectionStatus.MISSING)
         score -= failed_services * 10
 
         # Deduct for usage alerts
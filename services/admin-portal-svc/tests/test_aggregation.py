@@ -0,0 +1,198 @@
+"""
+Tests for concurrent dashboard aggregation and tag-based cache invalidation.
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+from app.aggregation import AggregationEngine, Section
+from app.cache_service import CacheService
+from app.schemas import SectionStatus
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of redis.asyncio the cache uses (no KEYS/SCAN)."""
+
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+        return True
+
+    async def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(members)
+        return len(members)
+
+    async def srem(self, key, *members):
+        self.sets.get(key, set()).difference_update(members)
+        return len(members)
+
+    async def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    async def expire(self, key, ttl):
+        return True
+
+    async def delete(self, *keys):
+        return sum(1 for key in keys if self.values.pop(key, None) is not None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((getattr(self.redis, name), args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        return [await func(*args, **kwargs) for func, args, kwargs in self.calls]
+
+
+class FakeDownstream:
+    """Downstream service with injected latency and failures."""
+
+    def __init__(self, data, latency=0.0, error=None):
+        self.data = data
+        self.latency = latency
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.error:
+            raise self.error
+        return dict(self.data)
+
+
+@pytest.fixture
+def cache():
+    cache = CacheService()
+    cache.enabled = True
+    cache.redis_client = FakeRedis()
+    return cache
+
+
+def _engine(cache, **kwargs):
+    kwargs.setdefault("deadline", 0.5)
+    kwargs.setdefault("fresh_ttl", 30)
+    kwargs.setdefault("stale_ttl", 300)
+    return AggregationEngine(cache, errors=(httpx.HTTPError, ValueError), **kwargs)
+
+
+async def test_sections_are_fetched_in_parallel(cache):
+    """Six 100ms downstream calls take ~100ms, not ~600ms."""
+    engine = _engine(cache)
+    services = {f"s{i}": FakeDownstream({"value": i}, latency=0.1) for i in range(6)}
+
+    started = time.perf_counter()
+    results = await engine.gather("t1", [Section(name, fetch) for name, fetch in services.items()])
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.3
+    assert {name: r.data["value"] for name, r in results.items()} == {
+        f"s{i}": i for i in range(6)
+    }
+    assert all(r.status == SectionStatus.FRESH for r in results.values())
+
+
+async def test_slow_and_failing_sections_are_flagged_missing(cache):
+    """A slow or failing service doesn't hold up the page and is filled from its fallback."""
+    engine = _engine(cache, deadline=0.1)
+    slow = FakeDownstream({"pending": 7}, latency=0.3)
+    broken = FakeDownstream({}, error=httpx.ConnectError("refused"))
+
+    started = time.perf_counter()
+    results = await engine.gather(
+        "t1",
+        [
+            Section("tenant", FakeDownstream({"name": "Lincoln"}, latency=0.02)),
+            Section("approvals", slow, fallback={"pending": 0}),
+            Section("billing", broken, fallback={"current_month_spend": "0.00"}),
+        ],
+    )
+    assert time.perf_counter() - started < 0.25
+
+    assert results["tenant"].status == SectionStatus.FRESH
+    assert results["approvals"].status == SectionStatus.MISSING
+    assert results["approvals"].data == {"pending": 0}
+    assert results["approvals"].error == "deadline exceeded"
+    assert results["billing"].status == SectionStatus.MISSING
+    assert results["billing"].data == {"current_month_spend": "0.00"}
+
+    # The slow fetch finishes in the background and is served from cache next time
+    await engine.wait_idle()
+    result = await engine.resolve("t1", Section("approvals", slow, fallback={"pending": 0}))
+    assert result.status == SectionStatus.FRESH
+    assert result.data == {"pending": 7}
+    assert slow.calls == 1
+
+
+async def test_stale_sections_are_served_and_revalidated_once(cache):
+    """Stale entries are returned immediately while a single background refresh runs."""
+    engine = _engine(cache, fresh_ttl=0)
+    service = FakeDownstream({"total": 10}, latency=0.05)
+    section = Section("users", service)
+
+    assert (await engine.resolve("t1", section)).data == {"total": 10}
+    service.data = {"total": 11}
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(engine.resolve("t1", section) for _ in range(5)))
+    assert time.perf_counter() - started < 0.04
+    assert all(r.status == SectionStatus.STALE and r.data == {"total": 10} for r in results)
+
+    await engine.wait_idle()
+    assert service.calls == 2
+    assert (await engine.resolve("t1", section)).data == {"total": 11}
+
+
+async def test_stale_section_survives_downstream_outage(cache):
+    """A failing refresh keeps serving the last good data."""
+    engine = _engine(cache, fresh_ttl=0)
+    service = FakeDownstream({"count": 2})
+    section = Section("usage", service, fallback={"count": 0})
+    await engine.resolve("t1", section)
+
+    service.error = httpx.ReadTimeout("timed out")
+    result = await engine.resolve("t1", section)
+    await engine.wait_idle()
+
+    assert result.status == SectionStatus.STALE
+    assert result.data == {"count": 2}
+    assert (await engine.resolve("t1", section)).data == {"count": 2}
+
+
+async def test_clear_tenant_uses_tag_set(cache):
+    """Invalidation deletes the tenant's tagged keys without scanning the keyspace."""
+    await cache.set("t1", "summary:tenant", {"name": "A"})
+    await cache.set("t1", "team", {"members": []})
+    await cache.set("t2", "team", {"members": []})
+
+    assert await cache.clear_tenant("t1") == 2
+    assert await cache.get("t1", "team") is None
+    assert await cache.get("t2", "team") == {"members": []}
+    assert json.loads(cache.redis_client.values["admin_portal:t2:team"]) == {"members": []}
+    assert await cache.clear_tenant("t1") == 0
@@ -166,6 +166,39 @@ class TestCacheService:
                 "admin_portal:tenant_123:summary", "admin_portal:tenant_123:usage"
             )
 
+    @pytest.mark.asyncio
+    async def test_tag_set_ttl_is_never_shortened(self):
+        """Writes only set or extend the tag set TTL, and deletes untrack their key."""
+        calls = []
+
+        class RecordingPipeline:
+            def __getattr__(self, name):
+                return lambda *args, **kwargs: calls.append((name, args, kwargs))
+
+            async def execute(self):
+                return [1, 1]
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc_info):
+                return False
+
+        mock_redis = Mock()
+        mock_redis.pipeline = Mock(return_value=RecordingPipeline())
+
+        cache = CacheService()
+        cache.enabled = True
+
+        with patch.object(cache, "redis_client", mock_redis):
+            await cache.set("tenant_123", "summary", {"test": "data"}, ttl=30)
+            expires = [kwargs for name, _, kwargs in calls if name == "expire"]
+            assert expires == [{"nx": True}, {"gt": True}]
+
+            calls.clear()
+            assert await cache.delete("tenant_123", "summary") is True
+            assert ("srem", ("admin_portal:tags:tenant_123", "admin_portal:tenant_123:summary"), {}) in calls
+
 
 class TestCacheIntegrationPatterns:
     """Test cache integration patterns."""
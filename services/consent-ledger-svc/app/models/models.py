@@ -247,7 +247,7 @@ class DataExportRequest(Base):
     # Request details
     request_type = Column(String(50), default="full_export")  # full_export, specific_data
     data_categories = Column(JSON)  # Specific data types requested
-    format_preference = Column(String(20), default="json")  # json, csv, xml
+    format_preference = Column(String(20), default="json")  # json, zip, tar
 
     # Status tracking
     status = Column(Enum(RequestStatus), default=RequestStatus.PENDING)
@@ -314,6 +314,7 @@ class DeletionRequest(Base):
     mongodb_deleted = Column(Boolean, default=False)
     s3_deleted = Column(Boolean, default=False)
     snowflake_deleted = Column(Boolean, default=False)
+    deletion_checkpoint = Column(JSON)  # Resumable progress (finished S3 prefixes, stats)
 
     # Deletion details
     records_deleted_count = Column(Integer, default=0)
@@ -2,10 +2,19 @@
 Cascaded delete service for GDPR compliance.
 
 Orchestrates data deletion across PostgreSQL, MongoDB, S3, and Snowflake.
+
+All stores are deleted from concurrently. Blocking clients (boto3, pymongo,
+snowflake) run in worker threads so they never stall the event loop. Progress
+is checkpointed on each deletion request per store and per S3 bucket/prefix,
+so a retry resumes where the previous attempt stopped instead of restarting.
+District-wide deletions go through ``execute_bulk_deletion`` as one batched job.
 """
 
 import asyncio
 import logging
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from typing import Any
 
@@ -22,6 +31,52 @@ from app.models.models import (
 
 logger = logging.getLogger(__name__)
 
+# Tables that contain user data
+POSTGRES_USER_TABLES = [
+    "consent_records",
+    "parental_rights",
+    "preference_settings",
+    "data_export_requests",
+    "audit_logs",
+    # Add other user data tables
+    "user_profiles",
+    "user_activities",
+    "user_preferences",
+    "chat_messages",
+    "media_uploads",
+]
+
+# Collections that contain user data
+MONGODB_USER_COLLECTIONS = [
+    "user_activities",
+    "chat_sessions",
+    "media_metadata",
+    "behavioral_data",
+    "analytics_events",
+    "user_generated_content",
+]
+
+# S3 buckets that contain user data
+S3_USER_BUCKETS = [
+    "user-uploads",
+    "profile-images",
+    "chat-media",
+    "exported-data",
+    "backup-data",
+]
+
+# Snowflake tables that contain user data
+SNOWFLAKE_USER_TABLES = [
+    "analytics.user_events",
+    "analytics.user_sessions",
+    "analytics.user_behavior",
+    "reporting.user_metrics",
+    "data_lake.user_interactions",
+]
+
+S3_DELETE_BATCH_SIZE = 1000  # S3 DeleteObjects limit
+S3_DELETES_IN_FLIGHT = 4  # DeleteObjects calls per prefix while listing continues
+
 
 def is_deletion_complete(deletion_statuses: dict[str, bool]) -> bool:
     """Helper function to check if all deletions are complete."""
@@ -40,6 +95,57 @@ def should_retry_deletion(retry_count: int, max_retries: int = 3) -> bool:
     return retry_count < max_retries
 
 
+@dataclass
+class DeletionStats:
+    """Counts for one deletion request, carried across retries in its checkpoint."""
+
+    postgres_records: int = 0
+    mongodb_documents: int = 0
+    s3_objects: int = 0
+    snowflake_rows: int = 0
+    total_bytes_freed: int = 0
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint: dict[str, Any]) -> "DeletionStats":
+        """Restore stats saved by a previous attempt."""
+        return cls(**checkpoint.get("stats", {}))
+
+    @classmethod
+    def total(cls, stats: Iterable["DeletionStats"]) -> "DeletionStats":
+        """Sum of several requests' stats, for a batch summary."""
+        total = cls()
+        for item in stats:
+            for name, value in item.as_dict().items():
+                setattr(total, name, getattr(total, name) + value)
+        return total
+
+    def as_dict(self) -> dict[str, int]:
+        """Stats as a plain dictionary."""
+        return asdict(self)
+
+
+def _user_ids(deletion_requests: list[DeletionRequest]) -> list[str]:
+    """Distinct user IDs of some requests, in order."""
+    return list(dict.fromkeys(request.user_id for request in deletion_requests))
+
+
+def _raise_if_failed(what: str, failures: dict[str, str]) -> None:
+    """Fail a store whose tables or collections were not all deleted, so it stays pending."""
+    if failures:
+        name, error = next(iter(failures.items()))
+        raise RuntimeError(f"{len(failures)} {what} failed ({name}: {error})")
+
+
+def _add_counts(stats: dict[str, DeletionStats], deleted: Counter[str], field_name: str) -> None:
+    """Add per-user deleted counts to each user's stats."""
+    for user_id, count in deleted.items():
+        user_stats = stats.get(user_id)
+        if user_stats is None:
+            logger.warning(f"Deleted {count} {field_name} for unexpected user {user_id}")
+            continue
+        setattr(user_stats, field_name, getattr(user_stats, field_name) + count)
+
+
 class CascadeDeleteService:
     """
     Service for coordinating data deletion across all storage systems.
@@ -53,20 +159,18 @@ class CascadeDeleteService:
         s3_client: boto3.client | None = None,
         mongo_client: pymongo.MongoClient | None = None,
         snowflake_config: dict[str, Any] | None = None,
+        s3_concurrency: int = 8,
+        bulk_chunk_size: int = 500,
     ):
         self.db_session = db_session
         self.s3_client = s3_client
         self.mongo_client = mongo_client
         self.snowflake_config = snowflake_config or {}
+        self.s3_concurrency = s3_concurrency
+        self.bulk_chunk_size = bulk_chunk_size
 
-        # Deletion statistics
-        self.deletion_stats = {
-            "postgres_records": 0,
-            "mongodb_documents": 0,
-            "s3_objects": 0,
-            "snowflake_rows": 0,
-            "total_bytes_freed": 0,
-        }
+        # The session is shared by Postgres deletion and checkpoint writes
+        self._session_lock = asyncio.Lock()
 
     async def execute_cascaded_deletion(
         self,
@@ -77,323 +181,466 @@ class CascadeDeleteService:
 
         Returns deletion summary with statistics.
         """
-        user_id = deletion_request.user_id
-        logger.info(f"Starting cascaded deletion for user {user_id}")
+        result = await self.execute_bulk_deletion([deletion_request])
+
+        if not result["success"]:
+            return {
+                "success": False,
+                "user_id": deletion_request.user_id,
+                "error": result["error"],
+                "failed_stores": result["failed_stores"],
+                "retry_count": deletion_request.retry_count,
+            }
+
+        return {
+            "success": True,
+            "user_id": deletion_request.user_id,
+            "deletion_stats": result["deletion_stats"],
+            "completed_at": result["completed_at"],
+        }
+
+    async def execute_bulk_deletion(
+        self,
+        deletion_requests: list[DeletionRequest],
+    ) -> dict[str, Any]:
+        """
+        Delete many users' data in one batched job (e.g. a district-wide deletion).
+
+        Each store is processed once for all users, with chunked ``IN``/``ANY``
+        deletes instead of one round trip per user. Every request keeps its own
+        checkpoint, store flags and counts, so retrying the same set resumes the
+        job and each request's audit counts cover only its own user.
+        """
+        user_ids = [request.user_id for request in deletion_requests]
+        logger.info(f"Starting cascaded deletion for {len(user_ids)} user(s)")
+
+        stats = {
+            request.user_id: DeletionStats.from_checkpoint(request.deletion_checkpoint or {})
+            for request in deletion_requests
+        }
 
         try:
             # Update request status
-            deletion_request.status = RequestStatus.IN_PROGRESS
-            deletion_request.started_at = datetime.utcnow()
-            await self.db_session.commit()
+            for request in deletion_requests:
+                request.status = RequestStatus.IN_PROGRESS
+                request.started_at = request.started_at or datetime.utcnow()
+            async with self._session_lock:
+                await self.db_session.commit()
+
+            # Each store only handles the requests a previous attempt has not finished
+            store_requests: dict[str, list[DeletionRequest]] = {
+                store: [
+                    request
+                    for request in deletion_requests
+                    if not getattr(request, f"{store}_deleted")
+                ]
+                for store in ("postgres", "mongodb", "s3", "snowflake")
+            }
+            store_tasks: dict[str, Any] = {}
 
-            # Execute deletions in parallel where possible
-            deletion_tasks = []
+            if store_requests["postgres"]:
+                store_tasks["postgres"] = self._delete_from_postgres(
+                    _user_ids(store_requests["postgres"]), stats
+                )
 
-            # PostgreSQL deletion (run first due to foreign key constraints)
-            await self._delete_from_postgres(user_id, deletion_request)
+            if self.mongo_client and store_requests["mongodb"]:
+                store_tasks["mongodb"] = self._delete_from_mongodb(
+                    _user_ids(store_requests["mongodb"]), stats
+                )
 
-            # Parallel deletion from other systems
-            if self.mongo_client:
-                deletion_tasks.append(self._delete_from_mongodb(user_id, deletion_request))
+            if self.s3_client and store_requests["s3"]:
+                store_tasks["s3"] = self._delete_from_s3(store_requests["s3"], stats)
 
-            if self.s3_client:
-                deletion_tasks.append(self._delete_from_s3(user_id, deletion_request))
+            if self.snowflake_config and store_requests["snowflake"]:
+                store_tasks["snowflake"] = self._delete_from_snowflake(
+                    _user_ids(store_requests["snowflake"]), stats
+                )
 
-            if self.snowflake_config:
-                deletion_tasks.append(self._delete_from_snowflake(user_id, deletion_request))
+            results = await asyncio.gather(*store_tasks.values(), return_exceptions=True)
 
-            # Wait for all deletions to complete
-            if deletion_tasks:
-                await asyncio.gather(*deletion_tasks, return_exceptions=True)
+            failed_stores: dict[str, str] = {}
+            for store, result in zip(store_tasks, results):
+                if isinstance(result, Exception):
+                    logger.error(f"{store} deletion failed: {str(result)}")
+                    failed_stores[store] = str(result)
+                    continue
+                for request in store_requests[store]:
+                    setattr(request, f"{store}_deleted", True)
 
-            # Update final status
-            deletion_request.status = RequestStatus.COMPLETED
-            deletion_request.completed_at = datetime.utcnow()
-            deletion_request.records_deleted_count = sum(
-                [
-                    self.deletion_stats["postgres_records"],
-                    self.deletion_stats["mongodb_documents"],
-                    self.deletion_stats["snowflake_rows"],
-                ]
-            )
-            deletion_request.files_deleted_count = self.deletion_stats["s3_objects"]
-            deletion_request.storage_freed_bytes = self.deletion_stats["total_bytes_freed"]
+            for request in deletion_requests:
+                request.deletion_checkpoint = {
+                    **(request.deletion_checkpoint or {}),
+                    "stats": stats[request.user_id].as_dict(),
+                }
 
-            await self.db_session.commit()
+            if failed_stores:
+                raise RuntimeError(
+                    "Deletion incomplete for: " + ", ".join(sorted(failed_stores))
+                )
 
-            logger.info(f"Cascaded deletion completed for user {user_id}")
+            # Update final status
+            completed_at = datetime.utcnow()
+            for request in deletion_requests:
+                request_stats = stats[request.user_id]
+                request.status = RequestStatus.COMPLETED
+                request.completed_at = completed_at
+                request.error_message = None
+                request.records_deleted_count = (
+                    request_stats.postgres_records
+                    + request_stats.mongodb_documents
+                    + request_stats.snowflake_rows
+                )
+                request.files_deleted_count = request_stats.s3_objects
+                request.storage_freed_bytes = request_stats.total_bytes_freed
+
+            async with self._session_lock:
+                await self.db_session.commit()
+
+            logger.info(f"Cascaded deletion completed for {len(user_ids)} user(s)")
 
             return {
                 "success": True,
-                "user_id": user_id,
-                "deletion_stats": self.deletion_stats,
-                "completed_at": deletion_request.completed_at.isoformat(),
+                "user_ids": user_ids,
+                "deletion_stats": DeletionStats.total(stats.values()).as_dict(),
+                "completed_at": completed_at.isoformat(),
             }
 
         except Exception as e:
-            logger.error(f"Cascaded deletion failed for user {user_id}: {str(e)}")
+            logger.error(f"Cascaded deletion failed for {len(user_ids)} user(s): {str(e)}")
 
-            deletion_request.status = RequestStatus.FAILED
-            deletion_request.error_message = str(e)
-            deletion_request.retry_count += 1
-            await self.db_session.commit()
+            for request in deletion_requests:
+                request.status = RequestStatus.FAILED
+                request.error_message = str(e)
+                request.retry_count = (request.retry_count or 0) + 1
+            async with self._session_lock:
+                await self.db_session.commit()
 
             return {
                 "success": False,
-                "user_id": user_id,
+                "user_ids": user_ids,
                 "error": str(e),
-                "retry_count": deletion_request.retry_count,
+                "failed_stores": sorted(
+                    store
+                    for store in ("postgres", "mongodb", "s3", "snowflake")
+                    if not all(getattr(request, f"{store}_deleted") for request in deletion_requests)
+                ),
+                "deletion_stats": DeletionStats.total(stats.values()).as_dict(),
             }
 
+    def _chunks(self, user_ids: list[str]) -> list[list[str]]:
+        """Split user IDs into bulk-delete sized chunks."""
+        size = self.bulk_chunk_size
+        return [user_ids[i : i + size] for i in range(0, len(user_ids), size)]
+
     async def _delete_from_postgres(
         self,
-        user_id: str,
-        deletion_request: DeletionRequest,
+        user_ids: list[str],
+        stats: dict[str, DeletionStats],
     ) -> None:
         """Delete user data from PostgreSQL database."""
-        try:
-            logger.info(f"Deleting PostgreSQL data for user {user_id}")
-
-            # Get tables that contain user data
-            user_data_tables = [
-                "consent_records",
-                "parental_rights",
-                "preference_settings",
-                "data_export_requests",
-                "audit_logs",
-                # Add other user data tables
-                "user_profiles",
-                "user_activities",
-                "user_preferences",
-                "chat_messages",
-                "media_uploads",
-            ]
-
-            total_deleted = 0
-
-            for table in user_data_tables:
-                try:
-                    # Check if table exists
-                    check_query = text(
-                        "SELECT EXISTS (SELECT 1 FROM information_schema.tables "
-                        "WHERE table_name = :table_name)"
-                    )
-                    result = await self.db_session.execute(check_query, {"table_name": table})
-                    table_exists = result.scalar()
-
-                    if not table_exists:
-                        continue
+        logger.info(f"Deleting PostgreSQL data for {len(user_ids)} user(s)")
 
-                    # Delete records for this user
-                    delete_query = text(f"DELETE FROM {table} WHERE user_id = :user_id")
-                    result = await self.db_session.execute(delete_query, {"user_id": user_id})
-                    deleted_count = result.rowcount
-                    total_deleted += deleted_count
+        async with self._session_lock:
+            # Resolve which tables exist in one round trip
+            check_query = text(
+                "SELECT table_name FROM information_schema.tables "
+                "WHERE table_name = ANY(:table_names)"
+            )
+            result = await self.db_session.execute(
+                check_query, {"table_names": POSTGRES_USER_TABLES}
+            )
+            existing_tables = {row[0] for row in result.fetchall()}
 
-                    logger.info(f"Deleted {deleted_count} records from {table}")
+            # RETURNING attributes deleted rows to their user in the same round trip
+            deleted: Counter[str] = Counter()
+            failed_tables: dict[str, str] = {}
 
-                except Exception as e:
-                    logger.warning(f"Failed to delete from table {table}: {str(e)}")
+            for table in POSTGRES_USER_TABLES:
+                if table not in existing_tables:
                     continue
 
-            await self.db_session.commit()
+                # A savepoint per table, so one failing table does not abort the others
+                table_deleted: Counter[str] = Counter()
+                try:
+                    async with self.db_session.begin_nested():
+                        delete_query = text(
+                            f"DELETE FROM {table} WHERE user_id = ANY(:user_ids) RETURNING user_id"
+                        )
+                        for chunk in self._chunks(user_ids):
+                            result = await self.db_session.execute(
+                                delete_query, {"user_ids": chunk}
+                            )
+                            table_deleted.update(str(row[0]) for row in result)
 
-            self.deletion_stats["postgres_records"] = total_deleted
-            deletion_request.postgres_deleted = True
+                    deleted.update(table_deleted)
+                    logger.info(f"Deleted records from {table}")
 
-            logger.info(f"PostgreSQL deletion completed: {total_deleted} records")
+                except Exception as e:
+                    logger.error(f"Failed to delete from table {table}: {str(e)}")
+                    failed_tables[table] = str(e)
 
-        except Exception as e:
-            logger.error(f"PostgreSQL deletion failed: {str(e)}")
-            deletion_request.postgres_deleted = False
-            raise
+            await self.db_session.commit()
+
+        _add_counts(stats, deleted, "postgres_records")
+        _raise_if_failed("PostgreSQL tables", failed_tables)
+        logger.info(f"PostgreSQL deletion completed: {sum(deleted.values())} records")
 
     async def _delete_from_mongodb(
         self,
-        user_id: str,
-        deletion_request: DeletionRequest,
+        user_ids: list[str],
+        stats: dict[str, DeletionStats],
     ) -> None:
         """Delete user data from MongoDB collections."""
-        try:
-            logger.info(f"Deleting MongoDB data for user {user_id}")
-
-            if not self.mongo_client:
-                logger.warning("MongoDB client not configured")
-                return
-
-            # Get database
-            db = self.mongo_client.get_default_database()
-
-            # Collections that contain user data
-            user_data_collections = [
-                "user_activities",
-                "chat_sessions",
-                "media_metadata",
-                "behavioral_data",
-                "analytics_events",
-                "user_generated_content",
-            ]
-
-            total_deleted = 0
+        logger.info(f"Deleting MongoDB data for {len(user_ids)} user(s)")
+
+        db = self.mongo_client.get_default_database()
+
+        def delete_collection(collection_name: str) -> Counter[str]:
+            collection = db[collection_name]
+            deleted: Counter[str] = Counter()
+            for chunk in self._chunks(user_ids):
+                # delete_many only reports a total, so count per user first
+                counts = list(
+                    collection.aggregate(
+                        [
+                            {"$match": {"user_id": {"$in": chunk}}},
+                            {"$group": {"_id": "$user_id", "count": {"$sum": 1}}},
+                        ]
+                    )
+                )
+                collection.delete_many({"user_id": {"$in": chunk}})
+                deleted.update({str(row["_id"]): row["count"] for row in counts})
+            return deleted
+
+        results = await asyncio.gather(
+            *(
+                asyncio.to_thread(delete_collection, collection_name)
+                for collection_name in MONGODB_USER_COLLECTIONS
+            ),
+            return_exceptions=True,
+        )
+
+        total_deleted = 0
+        failed_collections: dict[str, str] = {}
+        for collection_name, result in zip(MONGODB_USER_COLLECTIONS, results):
+            if isinstance(result, Exception):
+                logger.error(
+                    f"Failed to delete from collection {collection_name}: {str(result)}"
+                )
+                failed_collections[collection_name] = str(result)
+                continue
+            _add_counts(stats, result, "mongodb_documents")
+            total_deleted += sum(result.values())
+            logger.info(f"Deleted {sum(result.values())} documents from {collection_name}")
+
+        _raise_if_failed("MongoDB collections", failed_collections)
+        logger.info(f"MongoDB deletion completed: {total_deleted} documents")
 
-            for collection_name in user_data_collections:
-                try:
-                    collection = db[collection_name]
+    async def _delete_from_s3(
+        self,
+        deletion_requests: list[DeletionRequest],
+        stats: dict[str, DeletionStats],
+    ) -> None:
+        """
+        Delete user files from S3 storage.
 
-                    # Delete documents for this user
-                    result = collection.delete_many({"user_id": user_id})
-                    deleted_count = result.deleted_count
-                    total_deleted += deleted_count
+        Every (bucket, user prefix) pair is a unit of work; units run
+        concurrently up to ``s3_concurrency`` and each finished unit is
+        checkpointed on its request so a retry skips it.
+        """
+        units = [
+            (request, bucket_name)
+            for request in deletion_requests
+            for bucket_name in S3_USER_BUCKETS
+            if f"{bucket_name}:users/{request.user_id}/"
+            not in (request.deletion_checkpoint or {}).get("s3_done", [])
+        ]
+
+        logger.info(
+            f"Deleting S3 data for {len(deletion_requests)} user(s): "
+            f"{len(units)} prefixes remaining"
+        )
+
+        semaphore = asyncio.Semaphore(self.s3_concurrency)
+
+        async def run_unit(request: DeletionRequest, bucket_name: str) -> None:
+            prefix = f"users/{request.user_id}/"
+            async with semaphore:
+                deleted, bytes_freed = await self._delete_s3_prefix(bucket_name, prefix)
+
+            request_stats = stats[request.user_id]
+            request_stats.s3_objects += deleted
+            request_stats.total_bytes_freed += bytes_freed
+
+            checkpoint = request.deletion_checkpoint or {}
+            done = {*checkpoint.get("s3_done", []), f"{bucket_name}:{prefix}"}
+            await self._save_checkpoint(
+                request,
+                {**checkpoint, "s3_done": sorted(done), "stats": request_stats.as_dict()},
+            )
 
-                    logger.info(f"Deleted {deleted_count} documents from {collection_name}")
+        results = await asyncio.gather(
+            *(run_unit(request, bucket_name) for request, bucket_name in units),
+            return_exceptions=True,
+        )
 
-                except Exception as e:
-                    logger.warning(f"Failed to delete from collection {collection_name}: {str(e)}")
-                    continue
+        failures = [result for result in results if isinstance(result, Exception)]
+        if failures:
+            raise RuntimeError(
+                f"{len(failures)} of {len(units)} S3 prefixes failed: {failures[0]}"
+            )
 
-            self.deletion_stats["mongodb_documents"] = total_deleted
-            deletion_request.mongodb_deleted = True
+        logger.info(f"S3 deletion completed for {len(deletion_requests)} user(s)")
 
-            logger.info(f"MongoDB deletion completed: {total_deleted} documents")
+    async def _delete_s3_prefix(self, bucket_name: str, prefix: str) -> tuple[int, int]:
+        """
+        Delete every object under a prefix, following continuation tokens.
 
-        except Exception as e:
-            logger.error(f"MongoDB deletion failed: {str(e)}")
-            deletion_request.mongodb_deleted = False
-            raise
+        Listing continues while up to ``S3_DELETES_IN_FLIGHT`` earlier pages'
+        ``delete_objects`` calls are still running. Returns (objects deleted,
+        bytes freed).
+        """
+        in_flight: set[asyncio.Task[int]] = set()
+        total_deleted = 0
+        total_bytes = 0
+        continuation_token = None
 
-    async def _delete_from_s3(
-        self,
-        user_id: str,
-        deletion_request: DeletionRequest,
-    ) -> None:
-        """Delete user files from S3 storage."""
         try:
-            logger.info(f"Deleting S3 data for user {user_id}")
-
-            if not self.s3_client:
-                logger.warning("S3 client not configured")
-                return
-
-            # S3 buckets that contain user data
-            user_data_buckets = [
-                "user-uploads",
-                "profile-images",
-                "chat-media",
-                "exported-data",
-                "backup-data",
-            ]
-
-            total_deleted = 0
-            total_bytes_freed = 0
+            while True:
+                list_kwargs = {
+                    "Bucket": bucket_name,
+                    "Prefix": prefix,
+                    "MaxKeys": S3_DELETE_BATCH_SIZE,
+                }
+                if continuation_token:
+                    list_kwargs["ContinuationToken"] = continuation_token
 
-            for bucket_name in user_data_buckets:
                 try:
-                    # List objects with user_id prefix
-                    response = self.s3_client.list_objects_v2(
-                        Bucket=bucket_name,
-                        Prefix=f"users/{user_id}/",
+                    response = await asyncio.to_thread(
+                        self.s3_client.list_objects_v2, **list_kwargs
                     )
+                except Exception as e:
+                    error_code = getattr(e, "response", {}).get("Error", {}).get("Code")
+                    if error_code == "NoSuchBucket" and not continuation_token:
+                        logger.warning(f"S3 bucket {bucket_name} does not exist, skipping")
+                        return 0, 0
+                    raise
+
+                contents = response.get("Contents", [])
+                if contents:
+                    if len(in_flight) >= S3_DELETES_IN_FLIGHT:
+                        done, in_flight = await asyncio.wait(
+                            in_flight, return_when=asyncio.FIRST_COMPLETED
+                        )
+                        total_deleted += sum(task.result() for task in done)
 
-                    if "Contents" not in response:
-                        continue
-
-                    # Delete objects in batches
-                    objects_to_delete = []
-                    for obj in response["Contents"]:
-                        objects_to_delete.append({"Key": obj["Key"]})
-                        total_bytes_freed += obj["Size"]
-
-                        # Delete in batches of 1000 (S3 limit)
-                        if len(objects_to_delete) >= 1000:
-                            self.s3_client.delete_objects(
-                                Bucket=bucket_name,
-                                Delete={"Objects": objects_to_delete},
+                    total_bytes += sum(obj["Size"] for obj in contents)
+                    in_flight.add(
+                        asyncio.create_task(
+                            self._delete_s3_batch(
+                                bucket_name, [{"Key": obj["Key"]} for obj in contents]
                             )
-                            total_deleted += len(objects_to_delete)
-                            objects_to_delete = []
-
-                    # Delete remaining objects
-                    if objects_to_delete:
-                        self.s3_client.delete_objects(
-                            Bucket=bucket_name,
-                            Delete={"Objects": objects_to_delete},
                         )
-                        total_deleted += len(objects_to_delete)
-
-                    logger.info(f"Deleted objects from S3 bucket {bucket_name}")
-
-                except Exception as e:
-                    logger.warning(f"Failed to delete from S3 bucket {bucket_name}: {str(e)}")
-                    continue
-
-            self.deletion_stats["s3_objects"] = total_deleted
-            self.deletion_stats["total_bytes_freed"] += total_bytes_freed
-            deletion_request.s3_deleted = True
+                    )
 
-            logger.info(
-                f"S3 deletion completed: {total_deleted} objects, {total_bytes_freed} bytes freed"
+                if not response.get("IsTruncated"):
+                    break
+                continuation_token = response["NextContinuationToken"]
+
+            deleted_counts = await asyncio.gather(*in_flight)
+            in_flight = set()
+            total_deleted += sum(deleted_counts)
+
+        finally:
+            # A failed listing or delete must not leave batches running unobserved
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+        if total_deleted:
+            logger.info(f"Deleted {total_deleted} objects from s3://{bucket_name}/{prefix}")
+
+        return total_deleted, total_bytes
+
+    async def _delete_s3_batch(self, bucket_name: str, objects: list[dict[str, str]]) -> int:
+        """Issue one DeleteObjects call, failing if any key was not deleted."""
+        response = await asyncio.to_thread(
+            self.s3_client.delete_objects,
+            Bucket=bucket_name,
+            Delete={"Objects": objects, "Quiet": True},
+        )
+
+        errors = response.get("Errors", [])
+        if errors:
+            raise RuntimeError(
+                f"{len(errors)} objects in {bucket_name} could not be deleted: "
+                f"{errors[0].get('Code')} {errors[0].get('Key')}"
             )
 
-        except Exception as e:
-            logger.error(f"S3 deletion failed: {str(e)}")
-            deletion_request.s3_deleted = False
-            raise
+        return len(objects)
 
     async def _delete_from_snowflake(
         self,
-        user_id: str,
-        deletion_request: DeletionRequest,
+        user_ids: list[str],
+        stats: dict[str, DeletionStats],
     ) -> None:
         """Delete user data from Snowflake data warehouse."""
-        try:
-            logger.info(f"Deleting Snowflake data for user {user_id}")
-
-            if not self.snowflake_config:
-                logger.warning("Snowflake configuration not provided")
-                return
+        logger.info(f"Deleting Snowflake data for {len(user_ids)} user(s)")
 
-            # Connect to Snowflake
+        def delete_rows() -> tuple[Counter[str], dict[str, str]]:
             conn = snowflake.connector.connect(**self.snowflake_config)
             cursor = conn.cursor()
+            deleted: Counter[str] = Counter()
+            failed_tables: dict[str, str] = {}
 
-            # Tables that contain user data
-            user_data_tables = [
-                "analytics.user_events",
-                "analytics.user_sessions",
-                "analytics.user_behavior",
-                "reporting.user_metrics",
-                "data_lake.user_interactions",
-            ]
-
-            total_deleted = 0
+            try:
+                for table in SNOWFLAKE_USER_TABLES:
+                    try:
+                        for chunk in self._chunks(user_ids):
+                            placeholders = ", ".join(["%s"] * len(chunk))
+                            # DELETE only reports a total, so count per user first
+                            cursor.execute(
+                                f"SELECT user_id, COUNT(*) FROM {table} "
+                                f"WHERE user_id IN ({placeholders}) GROUP BY user_id",
+                                chunk,
+                            )
+                            counts = cursor.fetchall()
+                            cursor.execute(
+                                f"DELETE FROM {table} WHERE user_id IN ({placeholders})",
+                                chunk,
+                            )
+                            # Chunks already deleted stay deleted, so count them even
+                            # if a later chunk of this table fails
+                            deleted.update({str(user_id): count for user_id, count in counts})
 
-            for table in user_data_tables:
-                try:
-                    # Delete records for this user
-                    delete_query = f"DELETE FROM {table} WHERE user_id = %s"
-                    cursor.execute(delete_query, (user_id,))
-                    deleted_count = cursor.rowcount
-                    total_deleted += deleted_count
+                        logger.info(f"Deleted rows from {table}")
 
-                    logger.info(f"Deleted {deleted_count} rows from {table}")
+                    except Exception as e:
+                        logger.error(f"Failed to delete from Snowflake table {table}: {str(e)}")
+                        failed_tables[table] = str(e)
 
-                except Exception as e:
-                    logger.warning(f"Failed to delete from Snowflake table {table}: {str(e)}")
-                    continue
+                conn.commit()
+            finally:
+                cursor.close()
+                conn.close()
 
-            conn.commit()
-            cursor.close()
-            conn.close()
+            return deleted, failed_tables
 
-            self.deletion_stats["snowflake_rows"] = total_deleted
-            deletion_request.snowflake_deleted = True
+        deleted, failed_tables = await asyncio.to_thread(delete_rows)
 
-            logger.info(f"Snowflake deletion completed: {total_deleted} rows")
+        _add_counts(stats, deleted, "snowflake_rows")
+        _raise_if_failed("Snowflake tables", failed_tables)
+        logger.info(f"Snowflake deletion completed: {sum(deleted.values())} rows")
 
-        except Exception as e:
-            logger.error(f"Snowflake deletion failed: {str(e)}")
-            deletion_request.snowflake_deleted = False
-            raise
+    async def _save_checkpoint(
+        self,
+        deletion_request: DeletionRequest,
+        checkpoint: dict[str, Any],
+    ) -> None:
+        """Persist a request's progress so a retry can resume."""
+        async with self._session_lock:
+            deletion_request.deletion_checkpoint = checkpoint
+            await self.db_session.commit()
 
     async def verify_deletion_completion(
         self,
@@ -2,17 +2,21 @@
 Data export service for GDPR Article 20 compliance.
 
 Handles data portability requests with 10 days completion requirement.
+
+Sources are collected concurrently and streamed into the export archive part
+by part (see ``export_archive``), so exports of learners with years of data
+run in bounded memory and tar exports resume after a failure.
 """
 
+import asyncio
 import json
 import logging
-import zipfile
+from collections.abc import AsyncIterator
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
 from uuid import UUID
 
-import boto3
 import pymongo
 import snowflake.connector
 from sqlalchemy import select, text
@@ -23,9 +27,54 @@ from app.models.models import (
     DataExportRequest,
     RequestStatus,
 )
+from app.services.export_archive import (
+    ExportCheckpoint,
+    FileEntry,
+    RecordPart,
+    StreamingArchiveWriter,
+    UnitDone,
+    checkpoint_path_for,
+)
 
 logger = logging.getLogger(__name__)
 
+# Tables to export
+POSTGRES_EXPORT_TABLES = [
+    "consent_records",
+    "preference_settings",
+    "parental_rights",
+    "audit_logs",
+    # Add other user data tables
+    "user_profiles",
+    "user_activities",
+    "chat_messages",
+]
+
+# Collections to export
+MONGODB_EXPORT_COLLECTIONS = [
+    "user_activities",
+    "chat_sessions",
+    "media_metadata",
+    "behavioral_data",
+    "analytics_events",
+]
+
+# S3 buckets with user data
+S3_EXPORT_BUCKETS = [
+    "user-uploads",
+    "profile-images",
+    "chat-media",
+    "exported-data",
+]
+
+# Snowflake tables to export
+SNOWFLAKE_EXPORT_TABLES = [
+    "analytics.user_events",
+    "analytics.user_sessions",
+    "reporting.user_metrics",
+    "data_lake.user_interactions",
+]
+
 
 def is_export_overdue(requested_at: datetime, max_days: int = 10) -> bool:
     """Helper function to check if export request is overdue."""
@@ -39,6 +88,29 @@ def calculate_days_remaining(requested_at: datetime, max_days: int = 10) -> int:
     return max(0, remaining.days)
 
 
+def archive_format_for(format_preference: str) -> str:
+    """
+    Map a requested export format to the archive container.
+
+    JSON exports are delivered as JSON Lines entries inside a zip bundle, since
+    a single JSON document cannot be streamed from concurrent sources.
+    """
+    if format_preference in ("json", "zip"):
+        return "zip"
+    if format_preference == "tar":
+        return "tar"
+    raise ValueError(f"Unsupported export format: {format_preference}")
+
+
+def _serialize_value(value: Any) -> Any:
+    """Convert non-JSON types from database rows."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "__dict__"):  # Enum or custom objects
+        return str(value)
+    return value
+
+
 def format_export_filename(user_id: str, request_id: UUID, format_type: str) -> str:
     """Helper function to generate standardized export filename."""
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
@@ -56,15 +128,21 @@ class DataExportService:
         self,
         db_session: AsyncSession,
         export_storage_path: Path,
-        s3_client: boto3.client | None = None,
+        s3_client: Any | None = None,
         mongo_client: pymongo.MongoClient | None = None,
         snowflake_config: dict[str, Any] | None = None,
+        part_size: int = 1000,
+        queue_size: int = 8,
+        include_s3_objects: bool = True,
     ):
         self.db_session = db_session
         self.export_storage_path = export_storage_path
         self.s3_client = s3_client
         self.mongo_client = mongo_client
         self.snowflake_config = snowflake_config or {}
+        self.part_size = part_size
+        self.queue_size = queue_size
+        self.include_s3_objects = include_s3_objects
 
         # Ensure export directory exists
         self.export_storage_path.mkdir(parents=True, exist_ok=True)
@@ -148,7 +226,8 @@ class DataExportService:
         if not export_request:
             raise ValueError(f"Export request {request_id} not found")
 
-        if export_request.status != RequestStatus.PENDING:
+        # Failed requests are retried, resuming from their checkpoint
+        if export_request.status not in (RequestStatus.PENDING, RequestStatus.FAILED):
             raise ValueError(f"Export request {request_id} is not pending")
 
         user_id = export_request.user_id
@@ -167,12 +246,9 @@ class DataExportService:
             export_request.started_at = datetime.utcnow()
             await self.db_session.commit()
 
-            # Collect data from all systems
-            export_data = await self._collect_user_data(user_id, export_request)
-
-            # Generate export file
-            export_file_path = await self._generate_export_file(
-                user_id, request_id, export_data, export_request.format_preference
+            # Collect data from all systems straight into the archive
+            export_file_path, source_status = await self._stream_user_data(
+                user_id, request_id, export_request
             )
 
             # Update export request with file details
@@ -187,10 +263,10 @@ class DataExportService:
             export_request.download_expires_at = datetime.utcnow() + timedelta(days=30)
 
             # Mark data sources as exported
-            export_request.postgres_exported = True
-            export_request.mongodb_exported = bool(self.mongo_client)
-            export_request.s3_exported = bool(self.s3_client)
-            export_request.snowflake_exported = bool(self.snowflake_config)
+            export_request.postgres_exported = source_status.get("postgresql", False)
+            export_request.mongodb_exported = source_status.get("mongodb", False)
+            export_request.s3_exported = source_status.get("s3", False)
+            export_request.snowflake_exported = source_status.get("snowflake", False)
 
             await self.db_session.commit()
 
@@ -233,81 +309,125 @@ class DataExportService:
 
             raise
 
-    async def _collect_user_data(
+    async def _stream_user_data(
         self,
         user_id: str,
+        request_id: UUID,
         export_request: DataExportRequest,
-    ) -> dict[str, Any]:
-        """Collect user data from all configured systems."""
-        export_data = {
-            "user_id": user_id,
-            "export_timestamp": datetime.utcnow().isoformat(),
+    ) -> tuple[Path, dict[str, bool]]:
+        """
+        Run all collectors concurrently and stream their output into the archive.
+
+        Returns the finished archive path and which sources exported cleanly.
+        """
+        archive_format = archive_format_for(export_request.format_preference)
+        partial_path = self.export_storage_path / (
+            f"data_export_{user_id}_{request_id}.{archive_format}.partial"
+        )
+
+        checkpoint = (
+            ExportCheckpoint.load(checkpoint_path_for(partial_path))
+            if archive_format == "tar"
+            else ExportCheckpoint()
+        )
+        writer = StreamingArchiveWriter(partial_path, archive_format, checkpoint)
+        await asyncio.to_thread(writer.open)
+
+        collectors: dict[str, AsyncIterator[Any]] = {
+            "postgresql": self._collect_postgres_data(user_id, writer.checkpoint),
+        }
+        if self.mongo_client:
+            collectors["mongodb"] = self._collect_mongodb_data(user_id, writer.checkpoint)
+        if self.s3_client:
+            collectors["s3"] = self._collect_s3_data(user_id, writer.checkpoint)
+        if self.snowflake_config:
+            collectors["snowflake"] = self._collect_snowflake_data(user_id, writer.checkpoint)
+
+        # Bounded queue: collectors wait while the writer catches up
+        queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=self.queue_size)
+
+        async def run_collector(source: str, collector: AsyncIterator[Any]) -> None:
+            try:
+                async for item in collector:
+                    await queue.put(item)
+                logger.info(f"Collected {source} data for user {user_id}")
+            except Exception as e:
+                logger.warning(f"Failed to collect {source} data: {str(e)}")
+                await queue.put(UnitDone(unit=source, error=str(e)))
+
+        async def produce() -> None:
+            await asyncio.gather(
+                *(run_collector(source, collector) for source, collector in collectors.items())
+            )
+            await queue.put(None)
+
+        produce_task = asyncio.create_task(produce())
+        drain_task = asyncio.create_task(writer.drain(queue))
+        try:
+            # If the writer fails nothing reads the queue any more, so collectors
+            # blocked on put() must be cancelled rather than awaited
+            await asyncio.wait({produce_task, drain_task}, return_when=asyncio.FIRST_EXCEPTION)
+            for task in (drain_task, produce_task):
+                if task.done() and task.exception():
+                    raise task.exception()
+        except BaseException:
+            for task in (produce_task, drain_task):
+                task.cancel()
+            await asyncio.gather(produce_task, drain_task, return_exceptions=True)
+            await asyncio.to_thread(writer.abort)
+            raise
+
+        source_status = {
+            source: not any(
+                state.get("error")
+                for unit, state in writer.checkpoint.units.items()
+                if unit == source or unit.startswith(f"{source}/")
+            )
+            for source in collectors
+        }
+
+        metadata = {
+            "export_info": {
+                "user_id": user_id,
+                "request_id": str(request_id),
+                "generated_at": datetime.utcnow().isoformat(),
+                "format": export_request.format_preference,
+                "archive_format": archive_format,
+                "entry_format": "jsonl",
+                "gdpr_article": "Article 20 - Right to data portability",
+            },
             "request_details": {
                 "request_type": export_request.request_type,
                 "data_categories": export_request.data_categories,
-                "format": export_request.format_preference,
             },
-            "data_sources": {},
+            "units": writer.checkpoint.units,
         }
+        await asyncio.to_thread(
+            writer.write_bytes,
+            "export_metadata.json",
+            json.dumps(metadata, indent=2, default=str).encode("utf-8"),
+        )
+        await asyncio.to_thread(writer.close)
 
-        # Collect from PostgreSQL
-        try:
-            postgres_data = await self._collect_postgres_data(user_id)
-            export_data["data_sources"]["postgresql"] = postgres_data
-            logger.info(f"Collected PostgreSQL data for user {user_id}")
-        except Exception as e:
-            logger.warning(f"Failed to collect PostgreSQL data: {str(e)}")
-            export_data["data_sources"]["postgresql"] = {"error": str(e)}
+        export_file_path = self.export_storage_path / format_export_filename(
+            user_id, request_id, archive_format
+        )
+        partial_path.rename(export_file_path)
 
-        # Collect from MongoDB
-        if self.mongo_client:
-            try:
-                mongodb_data = await self._collect_mongodb_data(user_id)
-                export_data["data_sources"]["mongodb"] = mongodb_data
-                logger.info(f"Collected MongoDB data for user {user_id}")
-            except Exception as e:
-                logger.warning(f"Failed to collect MongoDB data: {str(e)}")
-                export_data["data_sources"]["mongodb"] = {"error": str(e)}
+        logger.info(f"Generated export file: {export_file_path}")
+        return export_file_path, source_status
 
-        # Collect from S3
-        if self.s3_client:
-            try:
-                s3_data = await self._collect_s3_data(user_id)
-                export_data["data_sources"]["s3"] = s3_data
-                logger.info(f"Collected S3 data for user {user_id}")
-            except Exception as e:
-                logger.warning(f"Failed to collect S3 data: {str(e)}")
-                export_data["data_sources"]["s3"] = {"error": str(e)}
+    async def _collect_postgres_data(
+        self,
+        user_id: str,
+        checkpoint: ExportCheckpoint,
+    ) -> AsyncIterator[Any]:
+        """Page user rows out of PostgreSQL, one table unit at a time."""
+        for table in POSTGRES_EXPORT_TABLES:
+            unit = f"postgresql/{table}"
+            if checkpoint.is_done(unit):
+                continue
 
-        # Collect from Snowflake
-        if self.snowflake_config:
-            try:
-                snowflake_data = await self._collect_snowflake_data(user_id)
-                export_data["data_sources"]["snowflake"] = snowflake_data
-                logger.info(f"Collected Snowflake data for user {user_id}")
-            except Exception as e:
-                logger.warning(f"Failed to collect Snowflake data: {str(e)}")
-                export_data["data_sources"]["snowflake"] = {"error": str(e)}
-
-        return export_data
-
-    async def _collect_postgres_data(self, user_id: str) -> dict[str, Any]:
-        """Collect user data from PostgreSQL database."""
-        postgres_data = {}
-
-        # Tables to export
-        user_tables = [
-            "consent_records",
-            "preference_settings",
-            "parental_rights",
-            "audit_logs",
-            # Add other user data tables
-            "user_profiles",
-            "user_activities",
-            "chat_messages",
-        ]
-
-        for table in user_tables:
             try:
                 # Check if table exists and has user_id column
                 check_query = text(
@@ -315,227 +435,228 @@ class DataExportService:
                     "WHERE table_name = :table_name AND column_name = 'user_id'"
                 )
                 result = await self.db_session.execute(check_query, {"table_name": table})
-                has_user_id = result.scalar() is not None
-
-                if not has_user_id:
+                if result.scalar() is None:
+                    yield UnitDone(unit=unit)
                     continue
 
-                # Export user data from table
-                export_query = text(f"SELECT * FROM {table} WHERE user_id = :user_id")
-                result = await self.db_session.execute(export_query, {"user_id": user_id})
-
-                rows = []
-                for row in result:
-                    row_dict = {}
-                    for key, value in row._mapping.items():
-                        # Convert non-serializable types
-                        if isinstance(value, datetime):
-                            row_dict[key] = value.isoformat()
-                        elif hasattr(value, "__dict__"):  # Enum or custom objects
-                            row_dict[key] = str(value)
-                        else:
-                            row_dict[key] = value
-                    rows.append(row_dict)
-
-                postgres_data[table] = {
-                    "record_count": len(rows),
-                    "records": rows,
-                }
+                # Stable ordering so a resumed export skips exactly the written pages
+                export_query = text(
+                    f"SELECT * FROM {table} WHERE user_id = :user_id "
+                    "ORDER BY 1 LIMIT :limit OFFSET :offset"
+                )
+                part = checkpoint.unit(unit).get("parts", 0)
+
+                while True:
+                    result = await self.db_session.execute(
+                        export_query,
+                        {"user_id": user_id, "limit": self.part_size, "offset": part * self.part_size},
+                    )
+                    rows = [
+                        {key: _serialize_value(value) for key, value in row._mapping.items()}
+                        for row in result
+                    ]
+                    if not rows:
+                        break
+
+                    part += 1
+                    yield RecordPart(
+                        unit=unit,
+                        entry_name=f"{unit}/part-{part:05d}.jsonl",
+                        records=rows,
+                        cursor={"parts": part},
+                    )
+                    if len(rows) < self.part_size:
+                        break
+
+                yield UnitDone(unit=unit)
 
             except Exception as e:
                 logger.warning(f"Failed to export table {table}: {str(e)}")
-                postgres_data[table] = {"error": str(e)}
-
-        return postgres_data
-
-    async def _collect_mongodb_data(self, user_id: str) -> dict[str, Any]:
-        """Collect user data from MongoDB collections."""
-        mongodb_data = {}
-
-        if not self.mongo_client:
-            return {"error": "MongoDB client not configured"}
+                yield UnitDone(unit=unit, error=str(e))
 
+    async def _collect_mongodb_data(
+        self,
+        user_id: str,
+        checkpoint: ExportCheckpoint,
+    ) -> AsyncIterator[Any]:
+        """Page user documents out of MongoDB collections."""
         db = self.mongo_client.get_default_database()
 
-        # Collections to export
-        user_collections = [
-            "user_activities",
-            "chat_sessions",
-            "media_metadata",
-            "behavioral_data",
-            "analytics_events",
-        ]
+        def fetch_page(collection_name: str, skip: int) -> list[dict[str, Any]]:
+            cursor = (
+                db[collection_name]
+                .find({"user_id": user_id})
+                .sort("_id", 1)
+                .skip(skip)
+                .limit(self.part_size)
+            )
+            documents = []
+            for doc in cursor:
+                # Convert ObjectIds and datetimes to strings
+                if "_id" in doc:
+                    doc["_id"] = str(doc["_id"])
+                documents.append({key: _serialize_value(value) for key, value in doc.items()})
+            return documents
+
+        for collection_name in MONGODB_EXPORT_COLLECTIONS:
+            unit = f"mongodb/{collection_name}"
+            if checkpoint.is_done(unit):
+                continue
 
-        for collection_name in user_collections:
             try:
-                collection = db[collection_name]
-
-                # Find documents for this user
-                documents = list(collection.find({"user_id": user_id}))
-
-                # Convert ObjectIds to strings
-                for doc in documents:
-                    if "_id" in doc:
-                        doc["_id"] = str(doc["_id"])
-                    # Convert datetime objects
-                    for key, value in doc.items():
-                        if isinstance(value, datetime):
-                            doc[key] = value.isoformat()
-
-                mongodb_data[collection_name] = {
-                    "document_count": len(documents),
-                    "documents": documents,
-                }
+                part = checkpoint.unit(unit).get("parts", 0)
+                while True:
+                    documents = await asyncio.to_thread(
+                        fetch_page, collection_name, part * self.part_size
+                    )
+                    if not documents:
+                        break
+
+                    part += 1
+                    yield RecordPart(
+                        unit=unit,
+                        entry_name=f"{unit}/part-{part:05d}.jsonl",
+                        records=documents,
+                        cursor={"parts": part},
+                    )
+                    if len(documents) < self.part_size:
+                        break
+
+                yield UnitDone(unit=unit)
 
             except Exception as e:
                 logger.warning(f"Failed to export collection {collection_name}: {str(e)}")
-                mongodb_data[collection_name] = {"error": str(e)}
+                yield UnitDone(unit=unit, error=str(e))
 
-        return mongodb_data
-
-    async def _collect_s3_data(self, user_id: str) -> dict[str, Any]:
-        """Collect user files from S3 storage."""
-        s3_data = {"files": [], "total_size_bytes": 0}
-
-        if not self.s3_client:
-            return {"error": "S3 client not configured"}
-
-        # S3 buckets with user data
-        user_buckets = [
-            "user-uploads",
-            "profile-images",
-            "chat-media",
-            "exported-data",
-        ]
+    async def _collect_s3_data(
+        self,
+        user_id: str,
+        checkpoint: ExportCheckpoint,
+    ) -> AsyncIterator[Any]:
+        """List user files page by page and stream each object into the archive."""
+        for bucket_name in S3_EXPORT_BUCKETS:
+            unit = f"s3/{bucket_name}"
+            if checkpoint.is_done(unit):
+                continue
 
-        for bucket_name in user_buckets:
             try:
-                # List objects with user_id prefix
-                response = self.s3_client.list_objects_v2(
-                    Bucket=bucket_name,
-                    Prefix=f"users/{user_id}/",
-                )
-
-                if "Contents" in response:
-                    for obj in response["Contents"]:
-                        file_info = {
-                            "bucket": bucket_name,
-                            "key": obj["Key"],
-                            "size": obj["Size"],
-                            "last_modified": obj["LastModified"].isoformat(),
-                            "download_url": f"s3://{bucket_name}/{obj['Key']}",
-                        }
-                        s3_data["files"].append(file_info)
-                        s3_data["total_size_bytes"] += obj["Size"]
+                state = checkpoint.unit(unit)
+                part = state.get("parts", 0)
+                # Keys up to listed_through are already in a manifest part
+                listed_through = state.get("listed_through")
+                list_kwargs: dict[str, Any] = {
+                    "Bucket": bucket_name,
+                    "Prefix": f"users/{user_id}/",
+                    "MaxKeys": self.part_size,
+                }
+                start_after = state.get("last_key") if self.include_s3_objects else listed_through
+                if start_after:
+                    list_kwargs["StartAfter"] = start_after
+
+                while True:
+                    response = await asyncio.to_thread(self.s3_client.list_objects_v2, **list_kwargs)
+                    contents = response.get("Contents", [])
+                    unlisted = [
+                        obj
+                        for obj in contents
+                        if listed_through is None or obj["Key"] > listed_through
+                    ]
+
+                    if unlisted:
+                        part += 1
+                        listed_through = unlisted[-1]["Key"]
+                        yield RecordPart(
+                            unit=unit,
+                            entry_name=f"{unit}/manifest-{part:05d}.jsonl",
+                            records=[
+                                {
+                                    "bucket": bucket_name,
+                                    "key": obj["Key"],
+                                    "size": obj["Size"],
+                                    "last_modified": obj["LastModified"].isoformat(),
+                                }
+                                for obj in unlisted
+                            ],
+                            cursor={"parts": part, "listed_through": listed_through},
+                        )
+
+                    for obj in contents:
+                        if self.include_s3_objects:
+                            yield FileEntry(
+                                unit=unit,
+                                entry_name=f"{unit}/{obj['Key']}",
+                                size=obj["Size"],
+                                open_stream=(
+                                    lambda key=obj["Key"], bucket=bucket_name: self.s3_client.get_object(
+                                        Bucket=bucket, Key=key
+                                    )["Body"]
+                                ),
+                                cursor={"last_key": obj["Key"]},
+                            )
+
+                    if not response.get("IsTruncated"):
+                        break
+                    list_kwargs.pop("StartAfter", None)
+                    list_kwargs["ContinuationToken"] = response["NextContinuationToken"]
+
+                yield UnitDone(unit=unit)
 
             except Exception as e:
-                logger.warning(f"Failed to list S3 bucket {bucket_name}: {str(e)}")
-                s3_data[f"bucket_{bucket_name}_error"] = str(e)
+                logger.warning(f"Failed to export S3 bucket {bucket_name}: {str(e)}")
+                yield UnitDone(unit=unit, error=str(e))
 
-        return s3_data
-
-    async def _collect_snowflake_data(self, user_id: str) -> dict[str, Any]:
-        """Collect user data from Snowflake data warehouse."""
-        snowflake_data = {}
-
-        if not self.snowflake_config:
-            return {"error": "Snowflake configuration not provided"}
+    async def _collect_snowflake_data(
+        self,
+        user_id: str,
+        checkpoint: ExportCheckpoint,
+    ) -> AsyncIterator[Any]:
+        """Page user rows out of Snowflake tables."""
+        conn = await asyncio.to_thread(snowflake.connector.connect, **self.snowflake_config)
+        cursor = conn.cursor()
+
+        def fetch_page(table: str, offset: int) -> list[dict[str, Any]]:
+            cursor.execute(
+                f"SELECT * FROM {table} WHERE user_id = %s ORDER BY 1 LIMIT %s OFFSET %s",
+                (user_id, self.part_size, offset),
+            )
+            columns = [desc[0] for desc in cursor.description]
+            return [
+                {columns[i]: _serialize_value(value) for i, value in enumerate(row)}
+                for row in cursor.fetchall()
+            ]
 
         try:
-            # Connect to Snowflake
-            conn = snowflake.connector.connect(**self.snowflake_config)
-            cursor = conn.cursor()
-
-            # Tables to export
-            user_tables = [
-                "analytics.user_events",
-                "analytics.user_sessions",
-                "reporting.user_metrics",
-                "data_lake.user_interactions",
-            ]
+            for table in SNOWFLAKE_EXPORT_TABLES:
+                unit = f"snowflake/{table}"
+                if checkpoint.is_done(unit):
+                    continue
 
-            for table in user_tables:
                 try:
-                    # Export user data
-                    query = f"SELECT * FROM {table} WHERE user_id = %s"
-                    cursor.execute(query, (user_id,))
-
-                    # Get column names
-                    columns = [desc[0] for desc in cursor.description]
-
-                    # Fetch all rows
-                    rows = cursor.fetchall()
-
-                    # Convert to list of dictionaries
-                    records = []
-                    for row in rows:
-                        record = {}
-                        for i, value in enumerate(row):
-                            if isinstance(value, datetime):
-                                record[columns[i]] = value.isoformat()
-                            else:
-                                record[columns[i]] = value
-                        records.append(record)
-
-                    snowflake_data[table] = {
-                        "record_count": len(records),
-                        "records": records,
-                    }
+                    part = checkpoint.unit(unit).get("parts", 0)
+                    while True:
+                        records = await asyncio.to_thread(fetch_page, table, part * self.part_size)
+                        if not records:
+                            break
+
+                        part += 1
+                        yield RecordPart(
+                            unit=unit,
+                            entry_name=f"{unit}/part-{part:05d}.jsonl",
+                            records=records,
+                            cursor={"parts": part},
+                        )
+                        if len(records) < self.part_size:
+                            break
+
+                    yield UnitDone(unit=unit)
 
                 except Exception as e:
                     logger.warning(f"Failed to export Snowflake table {table}: {str(e)}")
-                    snowflake_data[table] = {"error": str(e)}
-
+                    yield UnitDone(unit=unit, error=str(e))
+        finally:
             cursor.close()
             conn.close()
 
-        except Exception as e:
-            logger.error(f"Failed to connect to Snowflake: {str(e)}")
-            return {"error": str(e)}
-
-        return snowflake_data
-
-    async def _generate_export_file(
-        self,
-        user_id: str,
-        request_id: UUID,
-        export_data: dict[str, Any],
-        format_preference: str,
-    ) -> Path:
-        """Generate export file in requested format."""
-        filename = format_export_filename(user_id, request_id, format_preference)
-        export_file_path = self.export_storage_path / filename
-
-        if format_preference == "json":
-            with open(export_file_path, "w", encoding="utf-8") as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False)
-
-        elif format_preference == "zip":
-            # Create ZIP file with JSON data and metadata
-            with zipfile.ZipFile(export_file_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-                # Add main data file
-                data_json = json.dumps(export_data, indent=2, ensure_ascii=False)
-                zipf.writestr("user_data.json", data_json)
-
-                # Add metadata file
-                metadata = {
-                    "export_info": {
-                        "user_id": user_id,
-                        "request_id": str(request_id),
-                        "generated_at": datetime.utcnow().isoformat(),
-                        "format": format_preference,
-                        "gdpr_article": "Article 20 - Right to data portability",
-                    }
-                }
-                metadata_json = json.dumps(metadata, indent=2)
-                zipf.writestr("export_metadata.json", metadata_json)
-
-        else:
-            raise ValueError(f"Unsupported export format: {format_preference}")
-
-        logger.info(f"Generated export file: {export_file_path}")
-        return export_file_path
-
     def _generate_download_url(self, export_file_path: Path) -> str:
         """Generate secure download URL for export file."""
         # In production, this would generate a signed URL or secure token
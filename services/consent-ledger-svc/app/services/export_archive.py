@@ -0,0 +1,274 @@
+"""
+Streaming export archive writer.
+
+Data export collectors push bounded parts (a page of records, or one file) onto
+a queue; the writer appends each part to a zip or tar archive as its own entry,
+so memory stays bounded by queue size times part size regardless of how much
+data a user has.
+
+Tar archives are resumable: after every entry the writer checkpoints the
+archive offset and each collector unit's cursor to a sidecar file. A retry
+truncates the archive back to the last checkpoint and collectors continue from
+their cursors. Zip archives cannot be appended to without a central directory,
+so a retried zip export starts over.
+"""
+
+import asyncio
+import gzip
+import io
+import json
+import logging
+import os
+import tarfile
+import time
+import zipfile
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMATS = ("zip", "tar")
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class RecordPart:
+    """A page of records written as one JSON Lines entry."""
+
+    unit: str
+    entry_name: str
+    records: list[dict[str, Any]]
+    cursor: dict[str, Any]
+
+
+@dataclass
+class FileEntry:
+    """A file streamed into the archive from its source."""
+
+    unit: str
+    entry_name: str
+    size: int
+    open_stream: Callable[[], BinaryIO]
+    cursor: dict[str, Any]
+
+
+@dataclass
+class UnitDone:
+    """Marks a collector unit (table, collection, bucket) as fully exported."""
+
+    unit: str
+    error: str | None = None
+
+
+@dataclass
+class ExportCheckpoint:
+    """Archive offset plus per-unit cursors, persisted next to a tar archive."""
+
+    offset: int = 0
+    units: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> "ExportCheckpoint":
+        """Load a checkpoint, or return an empty one if none exists."""
+        if not path.exists():
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(offset=data["offset"], units=data["units"])
+
+    def save(self, path: Path) -> None:
+        """Atomically persist the checkpoint."""
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"offset": self.offset, "units": self.units}, f)
+        os.replace(tmp_path, path)
+
+    def unit(self, unit: str) -> dict[str, Any]:
+        """Cursor state for a unit (empty if it has not started)."""
+        return self.units.get(unit, {})
+
+    def is_done(self, unit: str) -> bool:
+        """Whether a unit finished in a previous attempt."""
+        return bool(self.unit(unit).get("done"))
+
+
+def checkpoint_path_for(archive_path: Path) -> Path:
+    """Sidecar checkpoint file for an archive."""
+    return archive_path.with_name(archive_path.name + ".checkpoint.json")
+
+
+def _jsonl_bytes(records: list[dict[str, Any]]) -> bytes:
+    """Serialize records as JSON Lines."""
+    return "".join(
+        json.dumps(record, default=str, ensure_ascii=False) + "\n" for record in records
+    ).encode("utf-8")
+
+
+class StreamingArchiveWriter:
+    """Appends export parts to a zip or tar archive one entry at a time."""
+
+    def __init__(
+        self,
+        archive_path: Path,
+        archive_format: str,
+        checkpoint: ExportCheckpoint | None = None,
+    ):
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unsupported archive format: {archive_format}")
+
+        self.archive_path = archive_path
+        self.archive_format = archive_format
+        self.checkpoint = checkpoint or ExportCheckpoint()
+        self.checkpoint_path = checkpoint_path_for(archive_path)
+
+        self._file: BinaryIO | None = None
+        self._tar: tarfile.TarFile | None = None
+        self._zip: zipfile.ZipFile | None = None
+
+    @property
+    def resumable(self) -> bool:
+        """Whether progress survives a restart."""
+        return self.archive_format == "tar"
+
+    def open(self) -> None:
+        """Open the archive, truncating a tar back to its last checkpoint."""
+        if self.archive_format == "tar":
+            mode = "r+b" if self.archive_path.exists() and self.checkpoint.offset else "wb"
+            self._file = open(self.archive_path, mode)
+            self._file.truncate(self.checkpoint.offset)
+            self._file.seek(self.checkpoint.offset)
+            self._tar = tarfile.open(fileobj=self._file, mode="w", format=tarfile.PAX_FORMAT)
+            if self.checkpoint.offset:
+                logger.info(
+                    f"Resuming export archive {self.archive_path} at byte {self.checkpoint.offset}"
+                )
+        else:
+            self.checkpoint = ExportCheckpoint()
+            self._zip = zipfile.ZipFile(
+                self.archive_path, "w", zipfile.ZIP_DEFLATED, allowZip64=True
+            )
+
+    def close(self) -> None:
+        """Finish the archive, with entries for failed units, and drop the checkpoint.
+
+        Error entries are only written here: a unit that fails in one attempt
+        and succeeds when the export resumes must not leave a stale entry
+        behind in the append-only tar.
+        """
+        for unit, state in self.checkpoint.units.items():
+            if state.get("error") and not state.get("done"):
+                self.write_bytes(
+                    f"errors/{unit}.json",
+                    json.dumps({"error": state["error"]}, indent=2).encode("utf-8"),
+                )
+        if self._tar is not None:
+            self._tar.close()
+            self._tar = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+        self.checkpoint_path.unlink(missing_ok=True)
+
+    def abort(self) -> None:
+        """Release file handles, keeping a tar archive and checkpoint for resume."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._tar = None
+        if self._zip is not None:
+            try:
+                self._zip.close()
+            except Exception:
+                pass
+            self._zip = None
+            self.archive_path.unlink(missing_ok=True)
+
+    def write_bytes(self, entry_name: str, data: bytes) -> None:
+        """Write an in-memory entry (small metadata only)."""
+        if self._tar is not None:
+            info = tarfile.TarInfo(entry_name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            self._tar.addfile(info, io.BytesIO(data))
+        else:
+            self._zip.writestr(entry_name, data)
+
+    def write_records(self, part: RecordPart) -> None:
+        """Write a page of records as a JSON Lines entry."""
+        data = _jsonl_bytes(part.records)
+        if self._tar is not None:
+            # Tar entries are not compressed by the container, so gzip each part
+            self.write_bytes(part.entry_name + ".gz", gzip.compress(data))
+        else:
+            self.write_bytes(part.entry_name, data)
+        self._advance(part.unit, part.cursor)
+
+    def write_file(self, entry: FileEntry) -> None:
+        """Stream a file into the archive in fixed-size chunks."""
+        stream = entry.open_stream()
+        try:
+            if self._tar is not None:
+                info = tarfile.TarInfo(entry.entry_name)
+                info.size = entry.size
+                info.mtime = int(time.time())
+                self._tar.addfile(info, stream)
+            else:
+                with self._zip.open(entry.entry_name, "w", force_zip64=True) as dest:
+                    while chunk := stream.read(STREAM_CHUNK_SIZE):
+                        dest.write(chunk)
+        finally:
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+        self._advance(entry.unit, entry.cursor)
+
+    def finish_unit(self, done: UnitDone) -> None:
+        """Record that a unit has been fully exported, or that it failed.
+
+        A failed unit is not marked done, so a resumed export retries it. Its
+        error entry is written when the archive is closed.
+        """
+        state = dict(self.checkpoint.unit(done.unit))
+        if done.error:
+            state["error"] = done.error
+        else:
+            state["done"] = True
+            state.pop("error", None)
+        self.checkpoint.units[done.unit] = state
+        self._save_checkpoint()
+
+    def _advance(self, unit: str, cursor: dict[str, Any]) -> None:
+        """Move a unit's cursor forward after an entry is fully written."""
+        state = dict(self.checkpoint.unit(unit))
+        state.update(cursor)
+        self.checkpoint.units[unit] = state
+        self._save_checkpoint()
+
+    def _save_checkpoint(self) -> None:
+        """Persist the checkpoint at the current entry boundary (tar only)."""
+        if self._tar is None:
+            return
+        self._file.flush()
+        self.checkpoint.offset = self._tar.offset
+        self.checkpoint.save(self.checkpoint_path)
+
+    async def drain(self, queue: "asyncio.Queue[Any]") -> None:
+        """Write queued parts until a ``None`` sentinel is received."""
+        while True:
+            item = await queue.get()
+            try:
+                if item is None:
+                    return
+                if isinstance(item, RecordPart):
+                    await asyncio.to_thread(self.write_records, item)
+                elif isinstance(item, FileEntry):
+                    await asyncio.to_thread(self.write_file, item)
+                elif isinstance(item, UnitDone):
+                    await asyncio.to_thread(self.finish_unit, item)
+            finally:
+                queue.task_done()
@@ -49,6 +49,7 @@ celery_app.conf.update(
 celery_app.conf.task_routes = {
     "app.tasks.process_data_export": {"queue": "exports"},
     "app.tasks.process_data_deletion": {"queue": "deletions"},
+    "app.tasks.process_bulk_data_deletion": {"queue": "deletions"},
     "app.tasks.cleanup_expired_exports": {"queue": "maintenance"},
     "app.tasks.verify_deletion_completion": {"queue": "verification"},
 }
@@ -87,6 +88,9 @@ def process_data_export(self, request_id: str) -> dict[str, Any]:
                 export_service = DataExportService(
                     db_session=session,
                     export_storage_path=Path(settings.EXPORT_STORAGE_PATH),
+                    part_size=settings.EXPORT_PART_SIZE,
+                    queue_size=settings.EXPORT_QUEUE_SIZE,
+                    include_s3_objects=settings.EXPORT_INCLUDE_S3_OBJECTS,
                     # Add other clients based on configuration
                 )
 
@@ -166,11 +170,15 @@ def process_data_deletion(self, request_id: str) -> dict[str, Any]:
                 # Initialize cascade delete service
                 cascade_service = CascadeDeleteService(
                     db_session=session,
+                    s3_concurrency=settings.DELETION_S3_CONCURRENCY,
+                    bulk_chunk_size=settings.DELETION_BULK_CHUNK_SIZE,
                     # Add clients based on configuration
                 )
 
-                # Execute cascaded deletion
+                # Execute cascaded deletion (resumes from the request's checkpoint)
                 result = await cascade_service.execute_cascaded_deletion(deletion_request)
+                if not result["success"]:
+                    raise RuntimeError(result["error"])
                 return result
 
         result = run_async_task(_process_deletion())
@@ -211,6 +219,64 @@ def process_data_deletion(self, request_id: str) -> dict[str, Any]:
         }
 
 
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=600)
+def process_bulk_data_deletion(self, request_ids: list[str]) -> dict[str, Any]:
+    """
+    Process many deletion requests as one batched cascaded delete.
+
+    Used for district-wide deletions covering thousands of learners.
+    """
+    try:
+        logger.info(f"Processing bulk data deletion for {len(request_ids)} requests")
+
+        async def _process_bulk_deletion():
+            async with get_async_session() as session:
+                from sqlalchemy import select
+
+                stmt = select(DeletionRequest).where(
+                    DeletionRequest.id.in_([UUID(request_id) for request_id in request_ids])
+                )
+                result = await session.execute(stmt)
+                deletion_requests = [
+                    request
+                    for request in result.scalars().all()
+                    if request.status != RequestStatus.COMPLETED
+                ]
+
+                if not deletion_requests:
+                    return {"success": True, "user_ids": [], "skipped": len(request_ids)}
+
+                cascade_service = CascadeDeleteService(
+                    db_session=session,
+                    s3_concurrency=settings.DELETION_S3_CONCURRENCY,
+                    bulk_chunk_size=settings.DELETION_BULK_CHUNK_SIZE,
+                    # Add clients based on configuration
+                )
+
+                result = await cascade_service.execute_bulk_deletion(deletion_requests)
+                if not result["success"]:
+                    raise RuntimeError(result["error"])
+                return result
+
+        result = run_async_task(_process_bulk_deletion())
+        logger.info(f"Bulk data deletion of {len(request_ids)} requests completed")
+        return result
+
+    except Exception as exc:
+        logger.error(f"Bulk data deletion failed: {str(exc)}")
+
+        # Retries resume from the shared checkpoint
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=exc, countdown=60 * (2**self.request.retries))
+
+        return {
+            "success": False,
+            "request_ids": request_ids,
+            "error": str(exc),
+            "retries": self.request.retries,
+        }
+
+
 @celery_app.task
 def cleanup_expired_exports() -> dict[str, Any]:
     """
@@ -56,11 +56,16 @@ class Settings(BaseSettings):
     EXPORT_MAX_FILE_SIZE_MB: int = 500
     EXPORT_RETENTION_DAYS: int = 30
     EXPORT_DEADLINE_DAYS: int = 10  # GDPR requirement
+    EXPORT_PART_SIZE: int = 1000  # Records per archive entry
+    EXPORT_QUEUE_SIZE: int = 8  # Parts buffered between collectors and writer
+    EXPORT_INCLUDE_S3_OBJECTS: bool = True
 
     # Data Deletion
     DELETION_VERIFICATION_DELAY_HOURS: int = 24
     DELETION_RETRY_MAX_ATTEMPTS: int = 3
     DELETION_RETENTION_YEARS: int = 7  # Legal requirement
+    DELETION_S3_CONCURRENCY: int = 8
+    DELETION_BULK_CHUNK_SIZE: int = 500
 
     # Audit
     AUDIT_LOG_RETENTION_YEARS: int = 7
@@ -179,6 +184,7 @@ class CeleryConfig:
             "task_routes": {
                 "app.tasks.process_data_export": {"queue": "exports"},
                 "app.tasks.process_data_deletion": {"queue": "deletions"},
+                "app.tasks.process_bulk_data_deletion": {"queue": "deletions"},
                 "app.tasks.cleanup_expired_exports": {"queue": "maintenance"},
                 "app.tasks.verify_deletion_completion": {"queue": "verification"},
             },
@@ -0,0 +1,149 @@
+"""Tests for resuming and retrying streamed data exports."""
+
+import tarfile
+from datetime import datetime
+from typing import Any
+
+import pytest
+
+from app.services import data_export
+from app.services.data_export import DataExportService
+from app.services.export_archive import (
+    ExportCheckpoint,
+    FileEntry,
+    RecordPart,
+    StreamingArchiveWriter,
+    UnitDone,
+    checkpoint_path_for,
+)
+
+USER_ID = "user-1"
+BUCKET = "user-uploads"
+UNIT = f"s3/{BUCKET}"
+
+
+def _writer(archive_path) -> StreamingArchiveWriter:
+    checkpoint = ExportCheckpoint.load(checkpoint_path_for(archive_path))
+    writer = StreamingArchiveWriter(archive_path, "tar", checkpoint)
+    writer.open()
+    return writer
+
+
+def _entries(archive_path) -> list[str]:
+    with tarfile.open(archive_path) as tar:
+        return tar.getnames()
+
+
+def test_retried_unit_leaves_no_error_entry(tmp_path):
+    archive_path = tmp_path / "export.tar.partial"
+
+    writer = _writer(archive_path)
+    writer.write_records(RecordPart("postgresql/consent_records", "a.jsonl", [{"id": 1}], {}))
+    writer.finish_unit(UnitDone("mongodb/user_activities", error="connection reset"))
+    writer.abort()
+
+    writer = _writer(archive_path)
+    assert not writer.checkpoint.is_done("mongodb/user_activities")
+    writer.finish_unit(UnitDone("mongodb/user_activities"))
+    writer.close()
+
+    assert _entries(archive_path) == ["a.jsonl.gz"]
+
+
+def test_unit_still_failing_gets_error_entry(tmp_path):
+    archive_path = tmp_path / "export.tar.partial"
+
+    writer = _writer(archive_path)
+    writer.finish_unit(UnitDone("mongodb/user_activities", error="connection reset"))
+    writer.abort()
+
+    writer = _writer(archive_path)
+    writer.finish_unit(UnitDone("mongodb/user_activities", error="still down"))
+    writer.close()
+
+    assert _entries(archive_path) == ["errors/mongodb/user_activities.json"]
+
+
+class FakeS3:
+    """Lists keys in order, page by page, the way list_objects_v2 does."""
+
+    def __init__(self, keys: list[str]) -> None:
+        self.keys = sorted(keys)
+
+    def list_objects_v2(
+        self,
+        Bucket: str,
+        Prefix: str,
+        MaxKeys: int,
+        StartAfter: str | None = None,
+        ContinuationToken: str | None = None,
+    ) -> dict[str, Any]:
+        keys = [key for key in self.keys if key.startswith(Prefix)]
+        if ContinuationToken is not None:
+            start = int(ContinuationToken)
+        else:
+            start = sum(1 for key in keys if StartAfter is not None and key <= StartAfter)
+        page = keys[start : start + MaxKeys]
+        end = start + len(page)
+        response: dict[str, Any] = {
+            "Contents": [
+                {"Key": key, "Size": 1, "LastModified": datetime(2024, 1, 1)} for key in page
+            ],
+            "IsTruncated": end < len(keys),
+        }
+        if end < len(keys):
+            response["NextContinuationToken"] = str(end)
+        return response
+
+
+async def _collect(service: DataExportService, checkpoint: ExportCheckpoint, limit: int | None):
+    """Collect S3 parts, applying cursors like the writer, stopping after ``limit`` items."""
+    items = []
+    collector = service._collect_s3_data(USER_ID, checkpoint)
+    async for item in collector:
+        if isinstance(item, (RecordPart, FileEntry)):
+            checkpoint.units.setdefault(item.unit, {}).update(item.cursor)
+        items.append(item)
+        if limit is not None and len(items) == limit:
+            await collector.aclose()
+            break
+    return items
+
+
+def _manifest_keys(items) -> list[str]:
+    return [
+        record["key"]
+        for item in items
+        if isinstance(item, RecordPart)
+        for record in item.records
+    ]
+
+
+@pytest.fixture
+def s3_keys(monkeypatch) -> list[str]:
+    monkeypatch.setattr(data_export, "S3_EXPORT_BUCKETS", [BUCKET])
+    return [f"users/{USER_ID}/file-{i}" for i in range(5)]
+
+
+@pytest.mark.parametrize("include_s3_objects", [True, False])
+async def test_resumed_s3_export_lists_each_key_once(tmp_path, s3_keys, include_s3_objects):
+    service = DataExportService(
+        None,
+        tmp_path,
+        s3_client=FakeS3(s3_keys),
+        part_size=2,
+        include_s3_objects=include_s3_objects,
+    )
+    checkpoint = ExportCheckpoint()
+
+    # Interrupted after the first manifest part (and its first file, if any)
+    first = await _collect(service, checkpoint, limit=2 if include_s3_objects else 1)
+    second = await _collect(service, checkpoint, limit=None)
+
+    assert _manifest_keys(first) + _manifest_keys(second) == s3_keys
+    if include_s3_objects:
+        files = [item.entry_name for item in first + second if isinstance(item, FileEntry)]
+        assert files == [f"{UNIT}/{key}" for key in s3_keys]
+    manifests = [item.entry_name for item in first + second if isinstance(item, RecordPart)]
+    assert manifests == [f"{UNIT}/manifest-{part:05d}.jsonl" for part in (1, 2, 3)]
+    assert isinstance(second[-1], UnitDone) and second[-1].error is None
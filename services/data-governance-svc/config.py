@@ -29,6 +29,8 @@ class Settings(BaseSettings):
     EXPORT_STORAGE_PATH: str = "/tmp/dsr_exports"
     EXPORT_MAX_SIZE_MB: int = 100
     EXPORT_TTL_HOURS: int = 72  # How long export files are kept
+    EXPORT_PART_SIZE: int = 1000  # Records per bundle entry
+    EXPORT_QUEUE_SIZE: int = 16  # Parts buffered between collectors and writer
 
     # Background job configuration
     CLEANUP_INTERVAL_MINUTES: int = 60
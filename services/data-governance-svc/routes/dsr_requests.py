@@ -235,12 +235,11 @@ async def bulk_export_request(
         tenant_id=tenant_id
     )
 
-    # Start background processing for all requests
-    for req in requests:
-        background_tasks.add_task(
-            service.process_export_request,
-            req.id
-        )
+    # Process all requests as one batch sharing a scan per source
+    background_tasks.add_task(
+        service.process_bulk_export_requests,
+        [req.id for req in requests]
+    )
 
     return {
         "message": f"Created {len(requests)} export requests",
@@ -15,6 +15,7 @@ from ..models import (
     EntityType, LegalHoldStatus
 )
 from ..config import settings
+from .legal_hold_index import legal_hold_index
 
 logger = structlog.get_logger()
 
@@ -155,8 +156,21 @@ class CleanupService:
         result = await db.execute(query)
         items_to_delete = result.scalars().all()
 
+        # has_legal_hold is only set when a hold is created, so items added
+        # afterwards are not flagged; consult the active holds as well
+        await legal_hold_index.ensure_fresh(db)
+
         deleted_count = 0
         for item in items_to_delete:
+            if legal_hold_index.is_held(item.entity_type, item.entity_id, item.tenant_id):
+                logger.info(
+                    "Skipping deletion of data item under legal hold",
+                    item_id=item.id,
+                    entity_type=item.entity_type,
+                    entity_id=item.entity_id
+                )
+                continue
+
             try:
                 # Perform the actual deletion (this would call external services)
                 await self._perform_physical_deletion(item)
@@ -2,22 +2,24 @@
 DSR (Data Subject Rights) Service - Business logic for export/delete requests
 """
 
+import asyncio
 import os
 import json
-import zipfile
 import structlog
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func, or_
+from sqlalchemy import select, and_, func
 from uuid import uuid4
 
-from ..models import DSRRequest, DSRType, DSRStatus, EntityType, LegalHold, LegalHoldStatus
+from ..models import DSRRequest, DSRType, DSRStatus, EntityType, LegalHold
 from ..schemas.dsr import (
     DSRRequestCreate, DSRRequestResponse, DSRStatusResponse,
     DSRExportResponse, DSRStatistics
 )
 from ..config import settings
+from .export_bundle import StreamingBundleExporter
+from .legal_hold_index import legal_hold_index
 
 logger = structlog.get_logger()
 
@@ -25,8 +27,13 @@ logger = structlog.get_logger()
 class DSRService:
     """Service for managing Data Subject Rights requests."""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, exporter: Optional[StreamingBundleExporter] = None):
         self.db = db
+        self.exporter = exporter or StreamingBundleExporter(
+            settings.EXPORT_STORAGE_PATH,
+            part_size=settings.EXPORT_PART_SIZE,
+            queue_size=settings.EXPORT_QUEUE_SIZE,
+        )
 
     async def create_request(self, request_data: DSRRequestCreate) -> DSRRequestResponse:
         """Create a new DSR request."""
@@ -179,75 +186,121 @@ class DSRService:
 
     async def process_export_request(self, request_id: str) -> None:
         """Process export request in background."""
-        logger.info("Starting export processing", request_id=request_id)
+        await self.process_bulk_export_requests([request_id])
 
-        try:
-            # Get request
-            query = select(DSRRequest).where(DSRRequest.id == request_id)
-            result = await self.db.execute(query)
-            request = result.scalar_one_or_none()
+    async def process_bulk_export_requests(self, request_ids: List[str]) -> None:
+        """
+        Process export requests together, scanning each source once for all subjects.
 
-            if not request or request.status != DSRStatus.PENDING:
-                logger.warning("Request not found or not in pending status", request_id=request_id)
-                return
+        Requests are grouped by subject type and tenant. Each source's records
+        are streamed into per-subject bundles as they arrive. Completed requests
+        are skipped, so re-running a partially failed batch only redoes the rest.
+        """
+        logger.info("Starting export processing", request_count=len(request_ids))
 
-            # Update status to processing
-            request.status = DSRStatus.PROCESSING
-            request.started_at = datetime.utcnow()
-            request.progress_percentage = 0
-            await self.db.commit()
-
-            # Create export directory
-            export_dir = os.path.join(settings.EXPORT_STORAGE_PATH, request_id)
-            os.makedirs(export_dir, exist_ok=True)
-
-            # Collect data from various sources
-            export_data = await self._collect_subject_data(
-                request.subject_id,
-                request.subject_type,
-                request.tenant_id
-            )
+        query = select(DSRRequest).where(DSRRequest.id.in_(request_ids))
+        result = await self.db.execute(query)
+        requests = [
+            request for request in result.scalars().all()
+            if request.status in (DSRStatus.PENDING, DSRStatus.FAILED)
+        ]
+
+        if not requests:
+            logger.warning("No pending export requests to process", request_ids=request_ids)
+            return
+
+        groups: Dict[Tuple[EntityType, Optional[str]], List[DSRRequest]] = {}
+        for request in requests:
+            groups.setdefault((request.subject_type, request.tenant_id), []).append(request)
+
+        for (subject_type, tenant_id), group in groups.items():
+            for batch in self._unique_subject_batches(group):
+                await self._export_group(batch, EntityType(subject_type), tenant_id)
+
+    @staticmethod
+    def _unique_subject_batches(requests: List[DSRRequest]) -> List[List[DSRRequest]]:
+        """
+        Split requests into batches with at most one request per subject.
+
+        The exporter writes one bundle per subject, so a second request for the
+        same subject goes into a later batch instead of sharing the first one's bundle.
+        """
+        batches: List[List[DSRRequest]] = []
+        batch_subjects: List[set] = []
+        for request in requests:
+            for batch, subjects in zip(batches, batch_subjects):
+                if request.subject_id not in subjects:
+                    batch.append(request)
+                    subjects.add(request.subject_id)
+                    break
+            else:
+                batches.append([request])
+                batch_subjects.append({request.subject_id})
+        return batches
+
+    async def _export_group(
+        self,
+        requests: List[DSRRequest],
+        subject_type: EntityType,
+        tenant_id: Optional[str]
+    ) -> None:
+        """Export one subject type/tenant group of requests in a single pass."""
+        request_ids = [request.id for request in requests]
 
-            # Update progress
-            request.progress_percentage = 60
+        try:
+            # Update status to processing
+            for request in requests:
+                request.status = DSRStatus.PROCESSING
+                request.started_at = datetime.utcnow()
+                request.progress_percentage = 0
+                request.error_details = None
             await self.db.commit()
 
-            # Generate export bundle
-            export_file_path = await self._generate_export_bundle(
-                export_dir,
-                request.subject_id,
-                export_data
+            source_count = len(self.exporter.collectors)
+            # Collectors finish concurrently and share one session, which allows
+            # only one operation at a time
+            progress_lock = asyncio.Lock()
+
+            async def on_source_complete(source: str, finished: int) -> None:
+                # Collection is 90% of the work; bundling finishes the rest
+                progress = int(90 * finished / source_count)
+                async with progress_lock:
+                    for request in requests:
+                        request.progress_percentage = max(request.progress_percentage or 0, progress)
+                    await self.db.commit()
+
+            bundle_paths = await self.exporter.export(
+                {request.subject_id: request.id for request in requests},
+                subject_type,
+                tenant_id,
+                on_source_complete=on_source_complete,
             )
 
-            # Update progress
-            request.progress_percentage = 90
-            await self.db.commit()
-
-            # Generate download URL (in production, this would be a signed URL)
-            download_url = f"/api/dsr/requests/{request_id}/download"
             expires_at = datetime.utcnow() + timedelta(hours=settings.EXPORT_TTL_HOURS)
 
-            # Complete request
-            request.status = DSRStatus.COMPLETED
-            request.progress_percentage = 100
-            request.export_file_path = export_file_path
-            request.export_download_url = download_url
-            request.export_expires_at = expires_at
-            request.completed_at = datetime.utcnow()
-            request.completion_certificate = self._generate_completion_certificate(request)
+            # Complete requests
+            for request in requests:
+                request.status = DSRStatus.COMPLETED
+                request.progress_percentage = 100
+                request.export_file_path = bundle_paths[request.subject_id]
+                # Generate download URL (in production, this would be a signed URL)
+                request.export_download_url = f"/api/dsr/requests/{request.id}/download"
+                request.export_expires_at = expires_at
+                request.completed_at = datetime.utcnow()
+                request.completion_certificate = self._generate_completion_certificate(request)
 
             await self.db.commit()
 
-            logger.info("Export processing completed", request_id=request_id)
+            logger.info("Export processing completed", request_ids=request_ids)
 
         except Exception as e:
-            logger.error("Export processing failed", request_id=request_id, error=str(e))
+            logger.error("Export processing failed", request_ids=request_ids, error=str(e))
 
-            # Update request with error
-            if request:
+            # Update requests with error
+            for request in requests:
                 request.status = DSRStatus.FAILED
                 request.error_details = str(e)
-                await self.db.commit()
+            await self.db.commit()
 
     async def process_delete_request(self, request_id: str) -> None:
         """Process delete request in background."""
@@ -444,95 +497,17 @@ class DSRService:
         tenant_id: Optional[str]
     ) -> List[LegalHold]:
         """Check if subject is under any active legal holds."""
-        query = select(LegalHold).where(
-            LegalHold.status == LegalHoldStatus.ACTIVE,
-            or_(
-                LegalHold.expiry_date.is_(None),
-                LegalHold.expiry_date > datetime.utcnow()
-            )
-        )
-
-        if tenant_id:
-            query = query.where(
-                or_(
-                    LegalHold.tenant_id == tenant_id,
-                    LegalHold.tenant_id.is_(None)
-                )
-            )
-
-        result = await self.db.execute(query)
-        holds = result.scalars().all()
-
-        blocking_holds = []
-        for hold in holds:
-            # Check if hold applies to this subject
-            if subject_type.value in hold.entity_types:
-                if not hold.subject_ids or subject_id in hold.subject_ids:
-                    blocking_holds.append(hold)
-
-        return blocking_holds
-
-    async def _collect_subject_data(
-        self,
-        subject_id: str,
-        subject_type: EntityType,
-        tenant_id: Optional[str]
-    ) -> Dict[str, Any]:
-        """Collect all data for a subject across systems."""
-        # This is a simplified implementation
-        # In production, this would query multiple databases/services
-
-        export_data = {
-            "subject_id": subject_id,
-            "subject_type": subject_type.value,
-            "tenant_id": tenant_id,
-            "export_timestamp": datetime.utcnow().isoformat(),
-            "data_sources": {
-                "user_profile": {"name": "John Doe", "email": f"{subject_id}@example.com"},
-                "activity_logs": [{"action": "login", "timestamp": "2024-01-01T00:00:00Z"}],
-                "documents": [],
-                "preferences": {"newsletter": True, "notifications": False}
-            }
-        }
-
-        return export_data
-
-    async def _generate_export_bundle(
-        self,
-        export_dir: str,
-        subject_id: str,
-        export_data: Dict[str, Any]
-    ) -> str:
-        """Generate ZIP bundle with exported data."""
-        # Create data file
-        data_file = os.path.join(export_dir, f"{subject_id}_data.json")
-        with open(data_file, 'w') as f:
-            json.dump(export_data, f, indent=2)
-
-        # Create metadata file
-        metadata = {
-            "export_id": str(uuid4()),
-            "subject_id": subject_id,
-            "export_date": datetime.utcnow().isoformat(),
-            "format_version": "1.0",
-            "data_sources": list(export_data.get("data_sources", {}).keys())
-        }
-
-        metadata_file = os.path.join(export_dir, "metadata.json")
-        with open(metadata_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
-
-        # Create ZIP bundle
-        zip_path = os.path.join(export_dir, f"{subject_id}_export.zip")
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            zipf.write(data_file, os.path.basename(data_file))
-            zipf.write(metadata_file, os.path.basename(metadata_file))
+        await legal_hold_index.ensure_fresh(self.db)
 
-        # Clean up temporary files
-        os.remove(data_file)
-        os.remove(metadata_file)
+        # The index answers the common no-hold case without loading any holds
+        hold_ids = [
+            hold.id for hold in legal_hold_index.holds_for(subject_type, subject_id, tenant_id)
+        ]
+        if not hold_ids:
+            return []
 
-        return zip_path
+        result = await self.db.execute(select(LegalHold).where(LegalHold.id.in_(hold_ids)))
+        return list(result.scalars().all())
 
     async def _perform_cascade_deletion(
         self,
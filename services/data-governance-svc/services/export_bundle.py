@@ -0,0 +1,251 @@
+"""
+Streaming DSR export bundles.
+
+Each data source is a collector that scans once for a set of subjects and
+yields ``(subject_id, record)`` pairs. Collectors run concurrently; records are
+grouped into bounded JSON Lines parts and written into each subject's zip
+bundle entry by entry, so memory stays bounded no matter how much data a
+subject has. Bulk exports share one scan per source across all subjects.
+"""
+
+import asyncio
+import json
+import os
+import zipfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+import structlog
+
+from ..models import EntityType
+
+logger = structlog.get_logger()
+
+
+class DataSourceCollector(ABC):
+    """A source of subject data scanned once for many subjects."""
+
+    name: str = ""
+
+    @abstractmethod
+    def scan(
+        self,
+        subject_ids: List[str],
+        subject_type: EntityType,
+        tenant_id: Optional[str]
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (subject_id, record) for every record of the given subjects."""
+
+
+class UserProfileCollector(DataSourceCollector):
+    """User profile records."""
+
+    name = "user_profile"
+
+    async def scan(self, subject_ids, subject_type, tenant_id):
+        # This is a simplified implementation
+        # In production, this would query the user database in batches
+        for subject_id in subject_ids:
+            yield subject_id, {"name": "John Doe", "email": f"{subject_id}@example.com"}
+
+
+class ActivityLogCollector(DataSourceCollector):
+    """Activity log records."""
+
+    name = "activity_logs"
+
+    async def scan(self, subject_ids, subject_type, tenant_id):
+        for subject_id in subject_ids:
+            yield subject_id, {"action": "login", "timestamp": "2024-01-01T00:00:00Z"}
+
+
+class DocumentCollector(DataSourceCollector):
+    """Stored documents."""
+
+    name = "documents"
+
+    async def scan(self, subject_ids, subject_type, tenant_id):
+        return
+        yield
+
+
+class PreferencesCollector(DataSourceCollector):
+    """Notification and communication preferences."""
+
+    name = "preferences"
+
+    async def scan(self, subject_ids, subject_type, tenant_id):
+        for subject_id in subject_ids:
+            yield subject_id, {"newsletter": True, "notifications": False}
+
+
+def default_collectors() -> List[DataSourceCollector]:
+    """Collectors used when none are configured."""
+    return [
+        UserProfileCollector(),
+        ActivityLogCollector(),
+        DocumentCollector(),
+        PreferencesCollector(),
+    ]
+
+
+@dataclass
+class _Part:
+    """A page of one subject's records from one source."""
+
+    subject_id: str
+    source: str
+    records: List[Dict[str, Any]]
+
+
+@dataclass
+class SubjectBundle:
+    """An in-progress zip bundle for one subject."""
+
+    subject_id: str
+    path: str
+    zip_file: zipfile.ZipFile
+    parts: Dict[str, int] = field(default_factory=dict)
+    record_counts: Dict[str, int] = field(default_factory=dict)
+
+    def write_part(self, part: _Part) -> None:
+        """Append a JSON Lines entry for a page of records."""
+        index = self.parts.get(part.source, 0) + 1
+        self.parts[part.source] = index
+        self.record_counts[part.source] = self.record_counts.get(part.source, 0) + len(part.records)
+
+        data = "".join(json.dumps(record, default=str) + "\n" for record in part.records)
+        self.zip_file.writestr(f"data/{part.source}/part-{index:05d}.jsonl", data)
+
+
+ProgressCallback = Callable[[str, int], Awaitable[None]]
+
+
+class StreamingBundleExporter:
+    """Runs collectors concurrently and streams their records into per-subject bundles."""
+
+    def __init__(
+        self,
+        export_root: str,
+        collectors: Optional[List[DataSourceCollector]] = None,
+        part_size: int = 1000,
+        queue_size: int = 16,
+    ):
+        self.export_root = export_root
+        self.collectors = collectors or default_collectors()
+        self.part_size = part_size
+        self.queue_size = queue_size
+
+    async def export(
+        self,
+        subjects: Dict[str, str],
+        subject_type: EntityType,
+        tenant_id: Optional[str],
+        on_source_complete: Optional[ProgressCallback] = None,
+    ) -> Dict[str, str]:
+        """
+        Export bundles for ``subjects`` (subject_id -> request_id).
+
+        Returns subject_id -> bundle path. ``on_source_complete`` is called with
+        each finished source name and the number of sources finished so far.
+        """
+        bundles = await asyncio.to_thread(self._open_bundles, subjects)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        finished_sources = 0
+        subject_ids = list(subjects)
+
+        async def run_collector(collector: DataSourceCollector) -> None:
+            nonlocal finished_sources
+            buffers: Dict[str, List[Dict[str, Any]]] = {}
+
+            async for subject_id, record in collector.scan(subject_ids, subject_type, tenant_id):
+                buffer = buffers.setdefault(subject_id, [])
+                buffer.append(record)
+                if len(buffer) >= self.part_size:
+                    await queue.put(_Part(subject_id, collector.name, buffer))
+                    buffers[subject_id] = []
+
+            for subject_id, buffer in buffers.items():
+                if buffer:
+                    await queue.put(_Part(subject_id, collector.name, buffer))
+
+            finished_sources += 1
+            logger.info("Export source collected", source=collector.name, subjects=len(subject_ids))
+            if on_source_complete:
+                await on_source_complete(collector.name, finished_sources)
+
+        async def drain() -> None:
+            while True:
+                part = await queue.get()
+                if part is None:
+                    return
+                await asyncio.to_thread(bundles[part.subject_id].write_part, part)
+
+        async def produce() -> None:
+            await asyncio.gather(*(run_collector(collector) for collector in self.collectors))
+            await queue.put(None)
+
+        produce_task = asyncio.create_task(produce())
+        drain_task = asyncio.create_task(drain())
+        try:
+            # If writing fails nothing reads the queue any more, so collectors
+            # blocked on put() must be cancelled rather than awaited
+            await asyncio.wait({produce_task, drain_task}, return_when=asyncio.FIRST_EXCEPTION)
+            for task in (drain_task, produce_task):
+                if task.done() and task.exception():
+                    raise task.exception()
+        except BaseException:
+            for task in (produce_task, drain_task):
+                task.cancel()
+            await asyncio.gather(produce_task, drain_task, return_exceptions=True)
+            await asyncio.to_thread(self._discard_bundles, bundles)
+            raise
+
+        return await asyncio.to_thread(self._finish_bundles, bundles, subjects)
+
+    def _open_bundles(self, subjects: Dict[str, str]) -> Dict[str, SubjectBundle]:
+        """Create a partial zip for every subject."""
+        bundles = {}
+        for subject_id, request_id in subjects.items():
+            export_dir = os.path.join(self.export_root, request_id)
+            os.makedirs(export_dir, exist_ok=True)
+            path = os.path.join(export_dir, f"{subject_id}_export.zip")
+            zip_file = zipfile.ZipFile(path + ".partial", "w", zipfile.ZIP_DEFLATED, allowZip64=True)
+            bundles[subject_id] = SubjectBundle(subject_id=subject_id, path=path, zip_file=zip_file)
+        return bundles
+
+    def _finish_bundles(
+        self,
+        bundles: Dict[str, SubjectBundle],
+        subjects: Dict[str, str]
+    ) -> Dict[str, str]:
+        """Write metadata, close each zip and move it into place."""
+        paths = {}
+        for subject_id, bundle in bundles.items():
+            metadata = {
+                "export_id": str(uuid4()),
+                "request_id": subjects[subject_id],
+                "subject_id": subject_id,
+                "export_date": datetime.utcnow().isoformat(),
+                "format_version": "2.0",
+                "entry_format": "jsonl",
+                "data_sources": [collector.name for collector in self.collectors],
+                "record_counts": bundle.record_counts,
+            }
+            bundle.zip_file.writestr("metadata.json", json.dumps(metadata, indent=2))
+            bundle.zip_file.close()
+            os.replace(bundle.path + ".partial", bundle.path)
+            paths[subject_id] = bundle.path
+        return paths
+
+    def _discard_bundles(self, bundles: Dict[str, SubjectBundle]) -> None:
+        """Remove partial bundles after a failure."""
+        for bundle in bundles.values():
+            try:
+                bundle.zip_file.close()
+            finally:
+                if os.path.exists(bundle.path + ".partial"):
+                    os.remove(bundle.path + ".partial")
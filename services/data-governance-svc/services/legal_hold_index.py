@@ -0,0 +1,197 @@
+"""
+Legal Hold Index - In-memory inverted index of active legal holds
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+import structlog
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import EntityType, LegalHold, LegalHoldStatus
+
+logger = structlog.get_logger()
+
+
+def _utcnow_for(value: datetime) -> datetime:
+    """Current time comparable with ``value`` (naive or aware)."""
+    if value.tzinfo is not None:
+        return datetime.now(timezone.utc)
+    return datetime.utcnow()
+
+
+@dataclass(frozen=True)
+class IndexedHold:
+    """Immutable snapshot of the fields needed for conflict checks."""
+
+    id: str
+    name: str
+    case_number: Optional[str]
+    tenant_id: Optional[str]
+    entity_types: FrozenSet[str]
+    subject_ids: Optional[FrozenSet[str]]
+    effective_date: Optional[datetime]
+    expiry_date: Optional[datetime]
+
+    @classmethod
+    def from_model(cls, hold: LegalHold) -> "IndexedHold":
+        """Snapshot a LegalHold row."""
+        return cls(
+            id=hold.id,
+            name=hold.name,
+            case_number=hold.case_number,
+            tenant_id=hold.tenant_id,
+            entity_types=frozenset(hold.entity_types or ()),
+            subject_ids=frozenset(hold.subject_ids) if hold.subject_ids else None,
+            effective_date=hold.effective_date,
+            expiry_date=hold.expiry_date,
+        )
+
+    def is_in_effect(self) -> bool:
+        """Active holds stop applying once their expiry date passes."""
+        return self.expiry_date is None or self.expiry_date > _utcnow_for(self.expiry_date)
+
+    def applies_to_tenant(self, tenant_id: Optional[str]) -> bool:
+        """Global holds apply to every tenant; no tenant filter matches every hold."""
+        return tenant_id is None or self.tenant_id is None or self.tenant_id == tenant_id
+
+    def as_conflict(self) -> Dict[str, Any]:
+        """Conflict payload used by LegalHoldConflict."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "case_number": self.case_number,
+            "effective_date": self.effective_date.isoformat() if self.effective_date else None,
+            "expiry_date": self.expiry_date.isoformat() if self.expiry_date else None
+        }
+
+
+class LegalHoldIndex:
+    """
+    Inverted index from (entity_type, subject_id) to active holds.
+
+    Holds without a subject list apply to every subject of their entity types
+    and are kept in a per-entity-type wildcard set. Lookups are a dict probe
+    plus a set union, so checking N subjects is O(N) regardless of how many
+    holds exist.
+
+    The index is updated incrementally by LegalHoldService on create, update,
+    release and extend. Before each use it compares a cheap fingerprint of the
+    legal_holds table (row count and latest update) and rebuilds if another
+    replica has changed holds since. Our own writes are indexed at once but
+    also reset the fingerprint: ``updated_at`` is the transaction start time,
+    so another replica's concurrent write can carry an earlier timestamp than
+    ours and would not move the fingerprint past it.
+    """
+
+    def __init__(self):
+        self._holds: Dict[str, IndexedHold] = {}
+        self._by_subject: Dict[Tuple[str, str], Set[str]] = {}
+        self._wildcard: Dict[str, Set[str]] = {}
+        self._fingerprint: Optional[Tuple[Any, ...]] = None
+
+    def __len__(self) -> int:
+        return len(self._holds)
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        """Rebuild the index if the legal_holds table changed elsewhere."""
+        result = await db.execute(
+            select(func.count(LegalHold.id), func.max(LegalHold.updated_at))
+        )
+        fingerprint = tuple(result.one())
+
+        if fingerprint != self._fingerprint:
+            await self.rebuild(db)
+            self._fingerprint = fingerprint
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """Load every active hold from the database."""
+        result = await db.execute(
+            select(LegalHold).where(LegalHold.status == LegalHoldStatus.ACTIVE)
+        )
+        self.clear()
+        for hold in result.scalars().all():
+            self._add(IndexedHold.from_model(hold))
+
+        logger.info("Legal hold index rebuilt", active_holds=len(self._holds))
+
+    def clear(self) -> None:
+        """Drop all indexed holds."""
+        self._holds.clear()
+        self._by_subject.clear()
+        self._wildcard.clear()
+        self._fingerprint = None
+
+    def upsert(self, hold: LegalHold) -> None:
+        """Index a hold written by this process (released holds are removed)."""
+        self._unindex(hold.id)
+        if hold.status == LegalHoldStatus.ACTIVE:
+            self._add(IndexedHold.from_model(hold))
+        # Rebuild on next use, picking up writes committed alongside ours
+        self._fingerprint = None
+
+    def remove(self, hold: LegalHold) -> None:
+        """Remove a hold released by this process."""
+        self.upsert(hold)
+
+    def _unindex(self, hold_id: str) -> None:
+        hold = self._holds.pop(hold_id, None)
+        if hold is None:
+            return
+
+        for entity_type in hold.entity_types:
+            if hold.subject_ids is None:
+                self._discard(self._wildcard, entity_type, hold_id)
+            else:
+                for subject_id in hold.subject_ids:
+                    self._discard(self._by_subject, (entity_type, subject_id), hold_id)
+
+    def holds_for(
+        self,
+        entity_type: EntityType,
+        subject_id: str,
+        tenant_id: Optional[str] = None
+    ) -> List[IndexedHold]:
+        """Active, unexpired holds covering one subject."""
+        key = entity_type.value if isinstance(entity_type, EntityType) else entity_type
+        hold_ids = self._wildcard.get(key, set()) | self._by_subject.get((key, subject_id), set())
+
+        holds = []
+        for hold_id in hold_ids:
+            hold = self._holds[hold_id]
+            if hold.applies_to_tenant(tenant_id) and hold.is_in_effect():
+                holds.append(hold)
+        return holds
+
+    def is_held(
+        self,
+        entity_type: EntityType,
+        subject_id: str,
+        tenant_id: Optional[str] = None
+    ) -> bool:
+        """Whether any active hold covers the subject."""
+        return bool(self.holds_for(entity_type, subject_id, tenant_id))
+
+    def _add(self, hold: IndexedHold) -> None:
+        self._holds[hold.id] = hold
+        for entity_type in hold.entity_types:
+            if hold.subject_ids is None:
+                self._wildcard.setdefault(entity_type, set()).add(hold.id)
+            else:
+                for subject_id in hold.subject_ids:
+                    self._by_subject.setdefault((entity_type, subject_id), set()).add(hold.id)
+
+    @staticmethod
+    def _discard(index: Dict[Any, Set[str]], key: Any, hold_id: str) -> None:
+        hold_ids = index.get(key)
+        if hold_ids is None:
+            return
+        hold_ids.discard(hold_id)
+        if not hold_ids:
+            del index[key]
+
+
+# Process-wide index shared by legal hold, DSR and cleanup services
+legal_hold_index = LegalHoldIndex()
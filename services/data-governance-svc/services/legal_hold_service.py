@@ -16,6 +16,7 @@ from ..schemas.legal_holds import (
     LegalHoldCreate, LegalHoldUpdate, LegalHoldResponse,
     LegalHoldImpactResponse, LegalHoldConflict, LegalHoldSummary
 )
+from .legal_hold_index import legal_hold_index
 
 logger = structlog.get_logger()
 
@@ -42,6 +43,7 @@ class LegalHoldService:
         self.db.add(hold)
         await self.db.commit()
         await self.db.refresh(hold)
+        legal_hold_index.upsert(hold)
 
         # Update data inventory to mark affected items
         await self._update_data_inventory_holds(hold)
@@ -135,6 +137,7 @@ class LegalHoldService:
 
         await self.db.commit()
         await self.db.refresh(hold)
+        legal_hold_index.upsert(hold)
 
         # Update data inventory if entity types or subjects changed
         if 'entity_types' in update_dict or 'subject_ids' in update_dict:
@@ -160,6 +163,8 @@ class LegalHoldService:
         hold.released_at = datetime.utcnow()
 
         await self.db.commit()
+        await self.db.refresh(hold)
+        legal_hold_index.remove(hold)
 
         # Update data inventory to remove hold flags
         await self._remove_data_inventory_holds(hold)
@@ -247,6 +252,8 @@ class LegalHoldService:
 
         hold.expiry_date = new_expiry_date
         await self.db.commit()
+        await self.db.refresh(hold)
+        legal_hold_index.upsert(hold)
 
         logger.info(
             "Legal hold extended",
@@ -286,43 +293,15 @@ class LegalHoldService:
         """Check if subjects have active legal holds that would block deletion."""
         conflicts = []
 
-        # Get active legal holds
-        query = select(LegalHold).where(
-            LegalHold.status == LegalHoldStatus.ACTIVE,
-            or_(
-                LegalHold.expiry_date.is_(None),
-                LegalHold.expiry_date > datetime.utcnow()
-            )
-        )
-
-        if tenant_id:
-            query = query.where(
-                or_(
-                    LegalHold.tenant_id == tenant_id,
-                    LegalHold.tenant_id.is_(None)
-                )
-            )
+        await legal_hold_index.ensure_fresh(self.db)
 
-        result = await self.db.execute(query)
-        active_holds = result.scalars().all()
-
-        # Check each subject against active holds
+        # Probe the inverted index per subject instead of scanning every hold
         for subject_id in subject_ids:
             for entity_type in entity_types:
-                conflicting_holds = []
-
-                for hold in active_holds:
-                    # Check if hold applies to this entity type
-                    if entity_type.value in hold.entity_types:
-                        # Check if hold applies to this specific subject
-                        if not hold.subject_ids or subject_id in hold.subject_ids:
-                            conflicting_holds.append({
-                                "id": hold.id,
-                                "name": hold.name,
-                                "case_number": hold.case_number,
-                                "effective_date": hold.effective_date.isoformat(),
-                                "expiry_date": hold.expiry_date.isoformat() if hold.expiry_date else None
-                            })
+                conflicting_holds = [
+                    hold.as_conflict()
+                    for hold in legal_hold_index.holds_for(entity_type, subject_id, tenant_id)
+                ]
 
                 if conflicting_holds:
                     conflicts.append(LegalHoldConflict(
@@ -500,25 +479,12 @@ class LegalHoldService:
         excluding_hold_id: str
     ) -> bool:
         """Check if data item is still under other active legal holds."""
-        query = select(LegalHold).where(
-            LegalHold.id != excluding_hold_id,
-            LegalHold.status == LegalHoldStatus.ACTIVE,
-            or_(
-                LegalHold.expiry_date.is_(None),
-                LegalHold.expiry_date > datetime.utcnow()
-            )
-        )
-
-        result = await self.db.execute(query)
-        other_holds = result.scalars().all()
-
-        for hold in other_holds:
-            if item.entity_type.value in hold.entity_types:
-                if not hold.subject_ids or item.entity_id in hold.subject_ids:
-                    if not hold.tenant_id or hold.tenant_id == item.tenant_id:
-                        return True
+        await legal_hold_index.ensure_fresh(self.db)
 
-        return False
+        return any(
+            hold.id != excluding_hold_id and (not hold.tenant_id or hold.tenant_id == item.tenant_id)
+            for hold in legal_hold_index.holds_for(item.entity_type, item.entity_id)
+        )
 
     async def _unblock_dsr_requests(self, hold: LegalHold) -> None:
         """Unblock DSR requests that were blocked by this hold."""
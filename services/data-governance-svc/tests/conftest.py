@@ -0,0 +1,15 @@
+"""
+Test configuration - expose the service directory as an importable package
+"""
+
+import sys
+import types
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+# The service uses package-relative imports, but its directory name is not a
+# valid module name; register it under one so tests can import its modules
+package = types.ModuleType("data_governance")
+package.__path__ = [str(SERVICE_DIR)]
+sys.modules.setdefault("data_governance", package)
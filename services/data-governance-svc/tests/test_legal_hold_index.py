@@ -0,0 +1,100 @@
+"""
+Tests for the legal hold index and its freshness checks
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from data_governance.models import EntityType, LegalHold, LegalHoldStatus
+from data_governance.services.legal_hold_index import LegalHoldIndex
+
+T0 = datetime(2025, 9, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _hold(hold_id: str, subject_ids: List[str], updated_at: datetime) -> LegalHold:
+    return LegalHold(
+        id=hold_id,
+        name=f"Hold {hold_id}",
+        entity_types=[EntityType.USER.value],
+        subject_ids=subject_ids,
+        status=LegalHoldStatus.ACTIVE,
+        updated_at=updated_at,
+    )
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def one(self):
+        return self._rows[0]
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+class FakeLegalHoldTable:
+    """Shared legal_holds table, answering the two queries the index makes."""
+
+    def __init__(self, holds: List[LegalHold]):
+        self.holds = {hold.id: hold for hold in holds}
+        self.rebuilds = 0
+
+    async def execute(self, statement):
+        if statement.column_descriptions[0]["type"] is LegalHold:
+            self.rebuilds += 1
+            return _Result([h for h in self.holds.values() if h.status == LegalHoldStatus.ACTIVE])
+
+        # count(id), max(updated_at)
+        latest = max((hold.updated_at for hold in self.holds.values()), default=None)
+        return _Result([(len(self.holds), latest)])
+
+
+def test_remote_change_after_local_upsert_is_picked_up():
+    """A concurrent write from another replica with an older timestamp is not missed."""
+    index = LegalHoldIndex()
+    table = FakeLegalHoldTable([_hold("a", ["u1"], T0)])
+    asyncio.run(index.ensure_fresh(table))
+
+    # This replica creates hold b; its transaction started at T0 + 2s
+    local = _hold("b", ["u9"], T0 + timedelta(seconds=2))
+    table.holds["b"] = local
+    index.upsert(local)
+    assert index.is_held(EntityType.USER, "u9")
+
+    # Another replica, whose transaction started at T0 + 1s, extends hold a
+    table.holds["a"] = _hold("a", ["u1", "u2"], T0 + timedelta(seconds=1))
+
+    asyncio.run(index.ensure_fresh(table))
+    assert index.is_held(EntityType.USER, "u2")
+    assert index.is_held(EntityType.USER, "u9")
+
+
+def test_unchanged_table_is_not_rebuilt():
+    """The fingerprint check skips the rebuild when nothing changed."""
+    index = LegalHoldIndex()
+    table = FakeLegalHoldTable([_hold("a", ["u1"], T0)])
+
+    asyncio.run(index.ensure_fresh(table))
+    asyncio.run(index.ensure_fresh(table))
+
+    assert table.rebuilds == 1
+    assert index.is_held(EntityType.USER, "u1")
+
+
+def test_remote_release_is_picked_up():
+    """A hold released elsewhere stops blocking once its update is seen."""
+    index = LegalHoldIndex()
+    table = FakeLegalHoldTable([_hold("a", ["u1"], T0)])
+    asyncio.run(index.ensure_fresh(table))
+
+    released = _hold("a", ["u1"], T0 + timedelta(seconds=5))
+    released.status = LegalHoldStatus.RELEASED
+    table.holds["a"] = released
+
+    asyncio.run(index.ensure_fresh(table))
+    assert not index.is_held(EntityType.USER, "u1")
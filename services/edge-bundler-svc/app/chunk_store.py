@@ -0,0 +1,186 @@
+"""Content-addressed chunk store and bundle archive builder."""
+# flake8: noqa: E501
+
+import hashlib
+import io
+import os
+import tarfile
+import tempfile
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.compression import CompressionSettings, open_compressor
+from app.models import CompressionType
+from app.schemas import BundleManifest
+
+
+class ChunkStore:
+    """Local store of asset contents keyed by their SHA-256 digest.
+
+    Identical assets are stored once, however many bundles contain them.
+    """
+
+    def __init__(self, root: Path) -> None:
+        """Initialize the store under ``root``."""
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.chunks_written = 0
+        self.chunks_reused = 0
+        self.bytes_written = 0
+        self.bytes_reused = 0
+
+    def path(self, digest: str) -> Path:
+        """Location of a chunk."""
+        return self.root / digest[:2] / digest
+
+    def contains(self, digest: str) -> bool:
+        """Whether a chunk is stored."""
+        return self.path(digest).exists()
+
+    def put(self, data: bytes) -> str:
+        """Store content unless already present.
+
+        Returns:
+            SHA-256 hex digest of the content
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if path.exists():
+            self.chunks_reused += 1
+            self.bytes_reused += len(data)
+            return digest
+
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        self.chunks_written += 1
+        self.bytes_written += len(data)
+        return digest
+
+    def read(self, digest: str) -> bytes:
+        """Content of a chunk."""
+        return self.path(digest).read_bytes()
+
+    def get_stats(self) -> dict[str, int]:
+        """Chunks and bytes written and reused since startup."""
+        return {
+            "chunks_written": self.chunks_written,
+            "chunks_reused": self.chunks_reused,
+            "bytes_written": self.bytes_written,
+            "bytes_reused": self.bytes_reused,
+        }
+
+
+@dataclass
+class BundleArchive:
+    """A bundle archive written to disk."""
+
+    path: Path
+    sha256_hash: str
+    size: int
+    chunk_count: int
+    chunk_bytes: int
+
+
+class _HashingWriter(io.RawIOBase):
+    """File wrapper that hashes bytes as they are written."""
+
+    def __init__(self, file: io.BufferedWriter) -> None:
+        super().__init__()
+        self.file = file
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        self.file.write(data)
+        self.sha256.update(data)
+        self.size += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.size
+
+
+class BundleBuilder:
+    """Writes bundle archives from a manifest and the chunk store.
+
+    An archive holds ``manifest.json`` and one ``chunks/<sha256>`` entry per
+    distinct asset content. Devices restore assets by their ``file_path`` and
+    ``sha256`` in the manifest. A delta archive leaves out the chunks of a
+    bundle the device already has. The tar stream goes straight into the
+    compressor. Building is blocking, so callers run it in a worker pool.
+    """
+
+    def __init__(
+        self, chunk_store: ChunkStore, settings: CompressionSettings | None = None
+    ) -> None:
+        """Initialize the builder."""
+        self.chunk_store = chunk_store
+        self.settings = settings or CompressionSettings()
+
+    def write_archive(
+        self,
+        manifest: BundleManifest,
+        output_path: Path,
+        compression: CompressionType,
+        known_digests: Iterable[str] = (),
+    ) -> BundleArchive:
+        """Write a bundle archive.
+
+        Args:
+            manifest: Manifest of the bundle
+            output_path: Archive file to create
+            compression: Archive compression
+            known_digests: Chunks the device already has, left out of the archive
+
+        Returns:
+            The archive, with the checksum computed while writing
+        """
+        known = set(known_digests)
+        digests = sorted({asset.sha256 for asset in manifest.assets} - known)
+        manifest_bytes = manifest.model_dump_json(indent=2).encode("utf-8")
+        mtime = int(manifest.created_at.timestamp())
+
+        chunk_bytes = 0
+        fd, tmp_name = tempfile.mkstemp(dir=output_path.parent, prefix=".tmp-")
+        tmp_path = Path(tmp_name)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                writer = _HashingWriter(f)
+                with open_compressor(writer, compression, self.settings) as stream:
+                    with tarfile.open(fileobj=stream, mode="w|") as tar:
+                        self._add(tar, "manifest.json", manifest_bytes, mtime)
+                        for digest in digests:
+                            data = self.chunk_store.read(digest)
+                            chunk_bytes += len(data)
+                            self._add(tar, f"chunks/{digest}", data, mtime)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        return BundleArchive(
+            path=output_path,
+            sha256_hash=writer.sha256.hexdigest(),
+            size=writer.size,
+            chunk_count=len(digests),
+            chunk_bytes=chunk_bytes,
+        )
+
+    @staticmethod
+    def _add(tar: tarfile.TarFile, name: str, data: bytes, mtime: int) -> None:
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = mtime
+        tar.addfile(info, io.BytesIO(data))
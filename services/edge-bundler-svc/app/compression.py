@@ -0,0 +1,108 @@
+"""Streaming compression for bundle archives."""
+# flake8: noqa: E501
+
+import gzip
+import io
+import os
+from dataclasses import dataclass
+from typing import BinaryIO
+
+import brotli
+import zstandard
+
+from app.models import CompressionType
+
+
+@dataclass(frozen=True)
+class ArchiveFormat:
+    """File suffix and media type of a compressed bundle archive."""
+
+    suffix: str
+    media_type: str
+
+
+ARCHIVE_FORMATS = {
+    CompressionType.GZIP: ArchiveFormat(".tar.gz", "application/gzip"),
+    CompressionType.ZSTD: ArchiveFormat(".tar.zst", "application/zstd"),
+    CompressionType.BROTLI: ArchiveFormat(".tar.br", "application/x-brotli"),
+}
+
+
+@dataclass
+class CompressionSettings:
+    """Compression levels, and an optional zstd dictionary shared with devices."""
+
+    gzip_level: int = 6
+    zstd_level: int = 10
+    brotli_quality: int = 9
+    zstd_dictionary: bytes | None = None
+
+    @classmethod
+    def from_env(cls: type["CompressionSettings"]) -> "CompressionSettings":
+        """Read settings from ``BUNDLE_*`` environment variables."""
+        dictionary_path = os.getenv("BUNDLE_ZSTD_DICTIONARY_PATH")
+        zstd_dictionary = None
+        if dictionary_path:
+            with open(dictionary_path, "rb") as f:
+                zstd_dictionary = f.read()
+
+        return cls(
+            gzip_level=int(os.getenv("BUNDLE_GZIP_LEVEL", "6")),
+            zstd_level=int(os.getenv("BUNDLE_ZSTD_LEVEL", "10")),
+            brotli_quality=int(os.getenv("BUNDLE_BROTLI_QUALITY", "9")),
+            zstd_dictionary=zstd_dictionary,
+        )
+
+
+class _BrotliWriter(io.RawIOBase):
+    """Writable stream that brotli-compresses into another stream."""
+
+    def __init__(self, file: BinaryIO, quality: int) -> None:
+        super().__init__()
+        self.file = file
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        compressed = self.compressor.process(data)
+        if compressed:
+            self.file.write(compressed)
+        return len(data)
+
+    def close(self) -> None:
+        if not self.closed:
+            self.file.write(self.compressor.finish())
+        super().close()
+
+
+def open_compressor(
+    file: BinaryIO, compression: CompressionType, settings: CompressionSettings
+) -> BinaryIO:
+    """Open a stream that compresses into ``file``.
+
+    Closing the stream finishes the compressed data; ``file`` stays open.
+    """
+    if compression == CompressionType.ZSTD:
+        dict_data = (
+            zstandard.ZstdCompressionDict(settings.zstd_dictionary)
+            if settings.zstd_dictionary
+            else None
+        )
+        compressor = zstandard.ZstdCompressor(level=settings.zstd_level, dict_data=dict_data)
+        return compressor.stream_writer(file, closefd=False)
+
+    if compression == CompressionType.BROTLI:
+        return _BrotliWriter(file, settings.brotli_quality)
+
+    return gzip.GzipFile(fileobj=file, mode="wb", compresslevel=settings.gzip_level, mtime=0)
+
+
+def train_zstd_dictionary(samples: list[bytes], dict_size: int = 112_640) -> bytes:
+    """Train a zstd dictionary on typical lesson assets.
+
+    Devices need the same dictionary to decompress, so it is trained offline
+    and shipped to both sides rather than retrained per bundle.
+    """
+    return zstandard.train_dictionary(dict_size, samples).as_bytes()
@@ -18,8 +18,9 @@ from fastapi import (
 from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.compression import ARCHIVE_FORMATS
 from app.database import get_db
-from app.models import BundleStatus
+from app.models import Bundle, BundleStatus, CompressionType
 from app.schemas import (
     BundleListResponse,
     BundleRequest,
@@ -148,8 +149,7 @@ async def delete_bundle(
     if not bundle:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bundle not found")
 
-    # TODO: Implement bundle deletion with file cleanup  # pylint: disable=fixme
-    logger.info("Bundle deletion requested", bundle_id=bundle_id)
+    await bundle_service.delete_bundle(bundle, db)
 
 
 # Bundle download endpoints
@@ -181,9 +181,20 @@ async def initiate_download(
         db=db,
     )
 
+    # Devices holding an earlier bundle only download the chunks they lack
+    size = bundle.actual_size or 0
+    sha256_hash = bundle.sha256_hash or ""
+    query = ""
+    if download_request.base_bundle_id:
+        base_bundle = await _get_delta_base(bundle, download_request.base_bundle_id, db)
+        delta = await bundle_service.get_delta_bundle(bundle, base_bundle)
+        size = delta.size
+        sha256_hash = delta.sha256_hash
+        query = f"?base_bundle_id={base_bundle.bundle_id}"
+
     # Generate download URLs (in production, use signed URLs)
     base_url = f"{request.url.scheme}://{request.url.netloc}"
-    download_url = f"{base_url}/api/v1/bundles/{bundle_id}/files/bundle"
+    download_url = f"{base_url}/api/v1/bundles/{bundle_id}/files/bundle{query}"
     manifest_url = (
         f"{base_url}/api/v1/bundles/{bundle_id}/files/manifest"
         if download_request.include_manifest
@@ -194,8 +205,8 @@ async def initiate_download(
         bundle_id=bundle_id,
         download_url=download_url,
         manifest_url=manifest_url,
-        size=bundle.actual_size or 0,
-        sha256_hash=bundle.sha256_hash or "",
+        size=size,
+        sha256_hash=sha256_hash,
         expires_at=bundle.expires_at or datetime.utcnow(),
         download_id=download.download_id,
     )
@@ -205,8 +216,9 @@ async def initiate_download(
 async def download_bundle_file(
     bundle_id: UUID,
     db: Annotated[AsyncSession, Depends(get_db)],
+    base_bundle_id: Annotated[UUID | None, Query()] = None,
 ) -> FileResponse:
-    """Download the actual bundle file."""
+    """Download the actual bundle file, or its delta against ``base_bundle_id``."""
     bundle = await bundle_service.get_bundle(bundle_id, db)
     if not bundle or not bundle.bundle_path:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bundle file not found")
@@ -216,13 +228,45 @@ async def download_bundle_file(
             status_code=status.HTTP_404_NOT_FOUND, detail="Bundle file not found on disk"
         )
 
+    archive_format = ARCHIVE_FORMATS[CompressionType(bundle.compression_type)]
+
+    if base_bundle_id:
+        base_bundle = await _get_delta_base(bundle, base_bundle_id, db)
+        delta = await bundle_service.get_delta_bundle(bundle, base_bundle)
+        return FileResponse(
+            path=delta.path,
+            filename=f"{bundle.bundle_name}.delta{archive_format.suffix}",
+            media_type=archive_format.media_type,
+        )
+
     return FileResponse(
         path=bundle.bundle_path,
-        filename=f"{bundle.bundle_name}.tar.gz",
-        media_type="application/gzip",
+        filename=f"{bundle.bundle_name}{archive_format.suffix}",
+        media_type=archive_format.media_type,
     )
 
 
+async def _get_delta_base(bundle: Bundle, base_bundle_id: UUID, db: AsyncSession) -> Bundle:
+    """Get the bundle a device holds, to build a delta of ``bundle`` against."""
+    base_bundle = await bundle_service.get_bundle(base_bundle_id, db)
+    if not base_bundle:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Base bundle not found")
+
+    if base_bundle.status != BundleStatus.COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Base bundle is not complete (status: {base_bundle.status})",
+        )
+
+    if base_bundle.learner_id != bundle.learner_id:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Base bundle belongs to a different learner",
+        )
+
+    return base_bundle
+
+
 @router.get("/bundles/{bundle_id}/files/manifest")
 async def download_manifest_file(
     bundle_id: UUID,
@@ -245,6 +289,22 @@ async def download_manifest_file(
     )
 
 
+@router.get("/compression/zstd-dictionary")
+async def download_zstd_dictionary() -> FileResponse:
+    """Download the zstd dictionary that zstd bundles are compressed with."""
+    dictionary_path = os.getenv("BUNDLE_ZSTD_DICTIONARY_PATH")
+    if not dictionary_path or not os.path.exists(dictionary_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="No zstd dictionary configured"
+        )
+
+    return FileResponse(
+        path=dictionary_path,
+        filename="bundles.zdict",
+        media_type="application/octet-stream",
+    )
+
+
 # CRDT synchronization endpoints
 @router.post("/bundles/{bundle_id}/crdt/merge", response_model=CRDTMergeResponse)
 async def merge_crdt_operations(
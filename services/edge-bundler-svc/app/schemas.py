@@ -66,7 +66,9 @@ class BundleAssetInfo(BaseModel):
 
     asset_type: str = Field(..., description="Asset type (lesson, adapter, media)")
     asset_name: str = Field(..., description="Asset name")
+    file_path: str = Field(..., description="Path of the asset in the bundle")
     file_size: int = Field(..., ge=0, description="File size in bytes")
+    sha256: str = Field(..., description="SHA-256 of the content, its chunk key")
     mime_type: str | None = Field(None, description="MIME type")
     content_id: str | None = Field(None, description="Content identifier")
     subject: str | None = Field(None, description="Subject classification")
@@ -142,6 +144,9 @@ class DownloadRequest(BaseModel):
     learner_id: UUID
     client_version: str | None = Field(None, description="Client app version")
     include_manifest: bool = Field(True, description="Include manifest in response")
+    base_bundle_id: UUID | None = Field(
+        None, description="Bundle on the device; download only the chunks it lacks"
+    )
 
 
 class DownloadResponse(BaseModel):
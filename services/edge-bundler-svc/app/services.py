@@ -4,18 +4,21 @@
 # pylint: disable=broad-exception-caught,W0718  # Exception catching is appropriate for robustness
 
 import asyncio
-import hashlib
 import json
 import os
-import tarfile
+import shutil
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from uuid import UUID
 
 import structlog
-from sqlalchemy import and_, select, update
+from sqlalchemy import and_, delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.chunk_store import BundleArchive, BundleBuilder, ChunkStore
+from app.compression import ARCHIVE_FORMATS, CompressionSettings
 from app.models import (
     Bundle,
     BundleAsset,
@@ -25,6 +28,7 @@ from app.models import (
     CompressionType,
 )
 from app.schemas import (
+    BundleAssetInfo,
     BundleManifest,
     BundleRequest,
     CRDTConfig,
@@ -46,6 +50,16 @@ class BundleService:
         self.signing_key_path = os.getenv("BUNDLE_SIGNING_KEY", "/etc/bundler/signing.key")
         self.max_concurrent_builds = int(os.getenv("MAX_CONCURRENT_BUILDS", "5"))
         self._build_semaphore = asyncio.Semaphore(self.max_concurrent_builds)
+        self.chunk_store = ChunkStore(self.storage_path / "chunks")
+        self.builder = BundleBuilder(self.chunk_store, CompressionSettings.from_env())
+        # Archiving is blocking compression work, kept off the event loop
+        self._archive_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("BUNDLE_ARCHIVE_WORKERS", str(self.max_concurrent_builds))),
+            thread_name_prefix="bundle-archive",
+        )
+        # (bundle_id, base_bundle_id) -> delta archive, least recently used first
+        self.max_delta_archives = int(os.getenv("MAX_DELTA_ARCHIVES", "256"))
+        self._delta_archives: OrderedDict[tuple[UUID, UUID], BundleArchive] = OrderedDict()
 
     async def create_bundle(
         self,
@@ -107,8 +121,8 @@ class BundleService:
                 bundle_dir = self.storage_path / str(bundle_id)
                 bundle_dir.mkdir(parents=True, exist_ok=True)
 
-                # Gather lessons and assets
-                assets = await self._gather_content(request, bundle_dir)
+                # Gather lessons and assets into the chunk store
+                assets = await self._gather_content(request)
 
                 # Check size constraints
                 total_size = sum(asset.file_size for asset in assets)
@@ -151,14 +165,15 @@ class BundleService:
                 # Save manifest
                 manifest_path = bundle_dir / "manifest.json"
                 with open(manifest_path, "w", encoding="utf-8") as f:
-                    f.write(manifest.json(indent=2))
-
-                # Create tarball
-                bundle_path = bundle_dir / f"{bundle_id}.tar.gz"
-                await self._create_tarball(bundle_dir, bundle_path, request.compression_type)
+                    f.write(manifest.model_dump_json(indent=2))
 
-                # Calculate checksums
-                sha256_hash = await self._calculate_checksum(bundle_path)
+                # Create archive, checksummed while it is written
+                suffix = ARCHIVE_FORMATS[request.compression_type].suffix
+                archive = await self._write_archive(
+                    manifest, bundle_dir / f"{bundle_id}{suffix}", request.compression_type
+                )
+                bundle_path = archive.path
+                sha256_hash = archive.sha256_hash
 
                 # Sign bundle if signing key exists
                 is_signed = False
@@ -191,6 +206,7 @@ class BundleService:
                     bundle_id=bundle_id,
                     size=total_size,
                     assets=len(assets),
+                    archive_size=archive.size,
                 )
 
             except Exception as e:  # pylint: disable=broad-exception-caught,W0718
@@ -199,57 +215,49 @@ class BundleService:
                     bundle_id, BundleStatus.FAILED, db, error_message=str(e)
                 )
 
-    async def _gather_content(self, request: BundleRequest, bundle_dir: Path) -> list:
-        """Gather lessons and assets for the bundle."""
+    async def _gather_content(self, request: BundleRequest) -> list[BundleAssetInfo]:
+        """Gather lessons and assets for the bundle.
+
+        Each asset is hashed once and stored in the chunk store by digest, so
+        content shared with earlier bundles is not written again.
+        """
         # This would integrate with lesson registry and content services
         # For now, create mock content structure
 
         assets = []
-        content_dir = bundle_dir / "content"
-        content_dir.mkdir(exist_ok=True)
 
         # Mock lesson content for each subject
         for subject in request.subjects:
-            subject_dir = content_dir / subject
-            subject_dir.mkdir(exist_ok=True)
-
             # Create mock lesson files
             for i in range(3):  # 3 lessons per subject
                 lesson_name = f"lesson_{i+1}.json"
-                lesson_path = subject_dir / lesson_name
 
                 lesson_content = {
                     "id": f"{subject}_lesson_{i+1}",
                     "title": f"Lesson {i+1} - {subject.title()}",
                     "content": f"Mock content for {subject} lesson {i+1}",
                     "crdt_version": "1.0.0",
-                    "last_modified": datetime.utcnow().isoformat(),
                 }
-
-                with open(lesson_path, "w", encoding="utf-8") as f:
-                    json.dump(lesson_content, f, indent=2)
+                data = json.dumps(lesson_content, indent=2).encode("utf-8")
 
                 assets.append(
-                    type(
-                        "Asset",
-                        (),
-                        {
-                            "asset_type": "lesson",
-                            "asset_name": lesson_name,
-                            "file_path": str(lesson_path.relative_to(bundle_dir)),
-                            "file_size": lesson_path.stat().st_size,
-                            "content_id": lesson_content["id"],
-                            "subject": subject,
-                            "is_precache": i == 0,  # First lesson is precached
-                            "priority": 10 if i == 0 else 100,
-                        },
-                    )()
+                    BundleAssetInfo(
+                        asset_type="lesson",
+                        asset_name=lesson_name,
+                        file_path=f"content/{subject}/{lesson_name}",
+                        file_size=len(data),
+                        sha256=self.chunk_store.put(data),
+                        mime_type="application/json",
+                        content_id=lesson_content["id"],
+                        subject=subject,
+                        is_precache=i == 0,  # First lesson is precached
+                        priority=10 if i == 0 else 100,
+                    )
                 )
 
             # Add subject adapter if requested
             if request.include_adapters:
                 adapter_name = f"{subject}_adapter.js"
-                adapter_path = subject_dir / adapter_name
 
                 adapter_content = f"""
 // Adapter for {subject} lessons
@@ -272,52 +280,118 @@ class {subject.title()}Adapter {{
 
 export default {subject.title()}Adapter;
 """
-
-                with open(adapter_path, "w", encoding="utf-8") as f:
-                    f.write(adapter_content)
+                data = adapter_content.encode("utf-8")
 
                 assets.append(
-                    type(
-                        "Asset",
-                        (),
-                        {
-                            "asset_type": "adapter",
-                            "asset_name": adapter_name,
-                            "file_path": str(adapter_path.relative_to(bundle_dir)),
-                            "file_size": adapter_path.stat().st_size,
-                            "content_id": f"{subject}_adapter",
-                            "subject": subject,
-                            "is_precache": True,  # Adapters are always precached
-                            "priority": 1,
-                        },
-                    )()
+                    BundleAssetInfo(
+                        asset_type="adapter",
+                        asset_name=adapter_name,
+                        file_path=f"content/{subject}/{adapter_name}",
+                        file_size=len(data),
+                        sha256=self.chunk_store.put(data),
+                        mime_type="text/javascript",
+                        content_id=f"{subject}_adapter",
+                        subject=subject,
+                        is_precache=True,  # Adapters are always precached
+                        priority=1,
+                    )
                 )
 
         return assets
 
-    async def _create_tarball(
-        self, source_dir: Path, output_path: Path, compression: CompressionType
-    ) -> None:
-        """Create compressed tarball of bundle content."""
-        compression_map = {
-            CompressionType.GZIP: "gz",
-            CompressionType.BROTLI: "bz2",  # Using bz2 as fallback for brotli
-            CompressionType.ZSTD: "gz",  # Using gz as fallback for zstd
-        }
-
-        mode = f"w:{compression_map[compression]}"
-
-        with tarfile.open(output_path, mode) as tar:
-            tar.add(source_dir / "content", arcname="content")
-            tar.add(source_dir / "manifest.json", arcname="manifest.json")
-
-    async def _calculate_checksum(self, file_path: Path) -> str:
-        """Calculate SHA256 checksum of bundle file."""
-        sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(chunk)
-        return sha256_hash.hexdigest()
+    async def get_delta_bundle(self, bundle: Bundle, base_bundle: Bundle) -> BundleArchive:
+        """Get an archive of ``bundle`` without the chunks of ``base_bundle``.
+
+        For devices that already hold ``base_bundle``. The archive is built on
+        first request and reused afterwards; the least recently used deltas
+        are removed beyond ``max_delta_archives``.
+        """
+        key = (bundle.bundle_id, base_bundle.bundle_id)
+        archive = self._delta_archives.get(key)
+        if archive is not None and archive.path.exists():
+            self._delta_archives.move_to_end(key)
+            return archive
+
+        manifest = self._load_manifest(bundle.manifest_path)
+        try:
+            base_manifest = self._load_manifest(base_bundle.manifest_path)
+            known_digests = {asset.sha256 for asset in base_manifest.assets}
+        except (OSError, ValueError) as e:
+            # Bundles built before the chunk store have no digests to reuse
+            logger.warning(
+                "Base bundle manifest unusable for delta",
+                bundle_id=bundle.bundle_id,
+                base_bundle_id=base_bundle.bundle_id,
+                error=str(e),
+            )
+            known_digests = set()
+
+        suffix = ARCHIVE_FORMATS[manifest.compression_type].suffix
+        delta_path = Path(bundle.bundle_path).with_name(
+            f"{bundle.bundle_id}.from-{base_bundle.bundle_id}{suffix}"
+        )
+        archive = await self._write_archive(
+            manifest, delta_path, manifest.compression_type, known_digests
+        )
+        self._delta_archives[key] = archive
+        self._delta_archives.move_to_end(key)
+        while len(self._delta_archives) > self.max_delta_archives:
+            _, evicted = self._delta_archives.popitem(last=False)
+            evicted.path.unlink(missing_ok=True)
+
+        logger.info(
+            "Delta bundle created",
+            bundle_id=bundle.bundle_id,
+            base_bundle_id=base_bundle.bundle_id,
+            size=archive.size,
+            chunks=archive.chunk_count,
+        )
+
+        return archive
+
+    async def delete_bundle(self, bundle: Bundle, db: AsyncSession) -> None:
+        """Delete a bundle, its files and every delta built to or from it.
+
+        Chunks stay in the chunk store, as other bundles may share them.
+        """
+        bundle_id = bundle.bundle_id
+        for key in [key for key in self._delta_archives if bundle_id in key]:
+            del self._delta_archives[key]
+
+        # Deltas to this bundle live in its directory, deltas from it in theirs
+        await asyncio.to_thread(shutil.rmtree, self.storage_path / str(bundle_id), True)
+        for delta_path in self.storage_path.glob(f"*/*.from-{bundle_id}.*"):
+            delta_path.unlink(missing_ok=True)
+
+        await db.execute(delete(BundleAsset).where(BundleAsset.bundle_id == bundle_id))
+        await db.delete(bundle)
+        await db.commit()
+
+        logger.info("Bundle deleted", bundle_id=bundle_id)
+
+    async def _write_archive(
+        self,
+        manifest: BundleManifest,
+        output_path: Path,
+        compression: CompressionType,
+        known_digests: set[str] | None = None,
+    ) -> BundleArchive:
+        """Write a bundle archive in the archive worker pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._archive_executor,
+            self.builder.write_archive,
+            manifest,
+            output_path,
+            compression,
+            known_digests or (),
+        )
+
+    @staticmethod
+    def _load_manifest(manifest_path: str) -> BundleManifest:
+        """Read a bundle manifest file."""
+        with open(manifest_path, encoding="utf-8") as f:
+            return BundleManifest.model_validate_json(f.read())
 
     async def _sign_bundle(self, bundle_path: Path) -> str:
         """Sign bundle with private key (mock implementation)."""
@@ -397,8 +471,10 @@ export default {subject.title()}Adapter;
                 asset_name=asset.asset_name,
                 file_path=asset.file_path,
                 file_size=asset.file_size,
+                mime_type=asset.mime_type,
                 content_id=asset.content_id,
                 subject=asset.subject,
+                checksum=asset.sha256,
                 is_precache=asset.is_precache,
                 priority=asset.priority,
             )
@@ -0,0 +1,134 @@
+"""Archive size and build time per compression format on fixture lessons.
+
+Loads the lesson and adapter assets in ``fixtures/lesson_assets.jsonl`` into
+a chunk store and writes two archives with each format and level:
+
+* a full bundle of all assets
+* a delta bundle after one lesson changed, against the full bundle
+
+Zstd is also measured with a dictionary trained on the fixture assets, as
+set with ``BUNDLE_ZSTD_DICTIONARY_PATH``. Small archives such as deltas gain
+the most from it. The dictionary is trained on the same fixtures it is
+measured on, so its gain is an upper bound. Run it from the service root:
+
+    python -m benchmarks.bench_compression --repeat 20
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from uuid import uuid4
+
+from app.chunk_store import BundleBuilder, ChunkStore
+from app.compression import CompressionSettings, train_zstd_dictionary
+from app.models import CompressionType
+from app.schemas import BundleAssetInfo, BundleManifest
+
+FIXTURES = Path(__file__).parent / "fixtures" / "lesson_assets.jsonl"
+
+
+def _load_assets(store: ChunkStore) -> tuple[list[BundleAssetInfo], list[bytes]]:
+    assets = []
+    contents = []
+    with open(FIXTURES, encoding="utf-8") as f:
+        for line in f:
+            item = json.loads(line)
+            data = item["content"].encode("utf-8")
+            contents.append(data)
+            assets.append(
+                BundleAssetInfo(
+                    asset_type="adapter" if item["path"].endswith(".js") else "lesson",
+                    asset_name=Path(item["path"]).name,
+                    file_path=item["path"],
+                    file_size=len(data),
+                    sha256=store.put(data),
+                )
+            )
+    return assets, contents
+
+
+def _manifest(assets: list[BundleAssetInfo], compression: CompressionType) -> BundleManifest:
+    return BundleManifest(
+        bundle_id=uuid4(),
+        version="1.0.0",
+        created_at=datetime.utcnow(),
+        expires_at=None,
+        learner_id=uuid4(),
+        subjects=sorted({asset.file_path.split("/")[1] for asset in assets}),
+        compression_type=compression,
+        total_size=sum(asset.file_size for asset in assets),
+        precache_size=0,
+        assets=assets,
+        checksum="",
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--dict-size", type=int, default=16_384)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        store = ChunkStore(root / "chunks")
+        assets, contents = _load_assets(store)
+
+        # One lesson gets new progress data in the next bundle
+        changed = contents[0].replace(b'"attempts": 0', b'"attempts": 1')
+        next_assets = [
+            assets[0].model_copy(
+                update={"sha256": store.put(changed), "file_size": len(changed)}
+            ),
+            *assets[1:],
+        ]
+        known_digests = {asset.sha256 for asset in assets}
+
+        dictionary = train_zstd_dictionary(contents, dict_size=args.dict_size)
+        configurations = [
+            ("gzip -6", CompressionType.GZIP, CompressionSettings(gzip_level=6)),
+            ("gzip -9", CompressionType.GZIP, CompressionSettings(gzip_level=9)),
+            ("zstd -3", CompressionType.ZSTD, CompressionSettings(zstd_level=3)),
+            ("zstd -10", CompressionType.ZSTD, CompressionSettings(zstd_level=10)),
+            ("zstd -19", CompressionType.ZSTD, CompressionSettings(zstd_level=19)),
+            (
+                "zstd -10 +dict",
+                CompressionType.ZSTD,
+                CompressionSettings(zstd_level=10, zstd_dictionary=dictionary),
+            ),
+            ("brotli -5", CompressionType.BROTLI, CompressionSettings(brotli_quality=5)),
+            ("brotli -9", CompressionType.BROTLI, CompressionSettings(brotli_quality=9)),
+            ("brotli -11", CompressionType.BROTLI, CompressionSettings(brotli_quality=11)),
+        ]
+
+        print(
+            f"{len(assets)} assets, {sum(asset.file_size for asset in assets):,} bytes; "
+            f"zstd dictionary {len(dictionary):,} bytes"
+        )
+        print(f"{'format':>15} {'full':>9} {'ms':>7} {'delta':>9} {'ms':>7}")
+        for label, compression, settings in configurations:
+            builder = BundleBuilder(store, settings)
+            results = []
+            for bundle_assets, known in ((assets, ()), (next_assets, known_digests)):
+                manifest = _manifest(bundle_assets, compression)
+                timings = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    archive = builder.write_archive(
+                        manifest, root / "bundle", compression, known
+                    )
+                    timings.append(time.perf_counter() - started)
+                results.append((archive.size, statistics.median(timings) * 1000))
+
+            (full_size, full_ms), (delta_size, delta_ms) = results
+            print(
+                f"{label:>15} {full_size:>9,} {full_ms:>7.2f} {delta_size:>9,} {delta_ms:>7.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""Tests for content-addressed bundle building."""
+# flake8: noqa: E501
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import io
+import random
+import tarfile
+from datetime import datetime
+from pathlib import Path
+from uuid import uuid4
+
+import brotli
+import pytest
+import zstandard
+from app.chunk_store import BundleBuilder, ChunkStore
+from app.compression import CompressionSettings, train_zstd_dictionary
+from app.models import Bundle, CompressionType
+from app.schemas import BundleAssetInfo, BundleManifest
+from app.services import BundleService
+
+ASSET_SIZE = 64 * 1024
+ASSET_COUNT = 40
+
+
+def _assets(store: ChunkStore, contents: list[bytes]) -> list[BundleAssetInfo]:
+    return [
+        BundleAssetInfo(
+            asset_type="lesson",
+            asset_name=f"lesson_{i}.bin",
+            file_path=f"content/math/lesson_{i}.bin",
+            file_size=len(data),
+            sha256=store.put(data),
+        )
+        for i, data in enumerate(contents)
+    ]
+
+
+def _manifest(assets: list[BundleAssetInfo]) -> BundleManifest:
+    return BundleManifest(
+        bundle_id=uuid4(),
+        version="1.0.0",
+        created_at=datetime.utcnow(),
+        expires_at=None,
+        learner_id=uuid4(),
+        subjects=["math"],
+        compression_type=CompressionType.GZIP,
+        total_size=sum(asset.file_size for asset in assets),
+        precache_size=0,
+        assets=assets,
+        checksum="",
+    )
+
+
+def _chunks(archive_path: Path) -> dict[str, bytes]:
+    with tarfile.open(archive_path) as tar:
+        return {
+            member.name.removeprefix("chunks/"): tar.extractfile(member).read()
+            for member in tar.getmembers()
+            if member.name.startswith("chunks/")
+        }
+
+
+def _stored_bundle(service: BundleService, contents: list[bytes]) -> Bundle:
+    """Write a bundle's manifest and archive the way a build lays them out."""
+    manifest = _manifest(_assets(service.chunk_store, contents))
+    bundle_dir = service.storage_path / str(manifest.bundle_id)
+    bundle_dir.mkdir()
+    manifest_path = bundle_dir / "manifest.json"
+    manifest_path.write_text(manifest.model_dump_json(), encoding="utf-8")
+    archive = service.builder.write_archive(
+        manifest, bundle_dir / f"{manifest.bundle_id}.tar.gz", CompressionType.GZIP
+    )
+    return Bundle(
+        bundle_id=manifest.bundle_id,
+        bundle_path=str(archive.path),
+        manifest_path=str(manifest_path),
+    )
+
+
+class FakeSession:
+    """Records the deletes a bundle deletion issues."""
+
+    def __init__(self) -> None:
+        self.statements: list = []
+        self.deleted: list = []
+        self.committed = False
+
+    async def execute(self, statement: object) -> None:
+        self.statements.append(statement)
+
+    async def delete(self, instance: object) -> None:
+        self.deleted.append(instance)
+
+    async def commit(self) -> None:
+        self.committed = True
+
+
+class TestChunkStore:
+    """Test class for the chunk store and bundle builder."""
+
+    def test_put_deduplicates_content(self: TestChunkStore, tmp_path: Path) -> None:
+        """Identical content is stored once under its digest."""
+        store = ChunkStore(tmp_path / "chunks")
+
+        first = store.put(b"lesson content")
+        second = store.put(b"lesson content")
+
+        assert first == second == hashlib.sha256(b"lesson content").hexdigest()
+        assert store.read(first) == b"lesson content"
+        assert store.get_stats() == {
+            "chunks_written": 1,
+            "chunks_reused": 1,
+            "bytes_written": 14,
+            "bytes_reused": 14,
+        }
+
+    def test_archive_checksum_matches_file(self: TestChunkStore, tmp_path: Path) -> None:
+        """The checksum computed while writing matches the archive on disk."""
+        store = ChunkStore(tmp_path / "chunks")
+        manifest = _manifest(_assets(store, [b"a" * 100, b"b" * 100, b"a" * 100]))
+
+        archive = BundleBuilder(store).write_archive(
+            manifest, tmp_path / "bundle.tar.gz", CompressionType.GZIP
+        )
+
+        data = archive.path.read_bytes()
+        assert archive.sha256_hash == hashlib.sha256(data).hexdigest()
+        assert archive.size == len(data)
+        assert archive.chunk_count == 2  # Duplicate assets share a chunk
+        with tarfile.open(archive.path) as tar:
+            stored = BundleManifest.model_validate_json(tar.extractfile("manifest.json").read())
+        assert stored == manifest
+
+    def test_overlapping_bundles_reuse_chunks(
+        self: TestChunkStore, tmp_path: Path
+    ) -> None:
+        """A second bundle sharing 95% of its content is mostly reused."""
+        rng = random.Random(49)
+        contents = [rng.randbytes(ASSET_SIZE) for _ in range(ASSET_COUNT)]
+        changed = ASSET_COUNT // 20
+        next_contents = [rng.randbytes(ASSET_SIZE) for _ in range(changed)] + contents[changed:]
+
+        store = ChunkStore(tmp_path / "chunks")
+        builder = BundleBuilder(store)
+
+        first = _manifest(_assets(store, contents))
+        first_archive = builder.write_archive(
+            first, tmp_path / "first.tar.gz", CompressionType.GZIP
+        )
+        written_by_first = store.bytes_written
+
+        second = _manifest(_assets(store, next_contents))
+        written_by_second = store.bytes_written - written_by_first
+
+        full = builder.write_archive(second, tmp_path / "second.tar.gz", CompressionType.GZIP)
+        delta = builder.write_archive(
+            second,
+            tmp_path / "second.delta.tar.gz",
+            CompressionType.GZIP,
+            known_digests={asset.sha256 for asset in first.assets},
+        )
+
+        # Only the changed assets are stored again
+        assert written_by_first == ASSET_COUNT * ASSET_SIZE
+        assert written_by_second == changed * ASSET_SIZE
+
+        # The delta carries only the changed chunks
+        assert delta.chunk_count == changed
+        assert delta.chunk_bytes == changed * ASSET_SIZE
+        assert delta.size < full.size * 0.1
+
+        # The device restores the second bundle from its first bundle and the delta
+        available = {**_chunks(first_archive.path), **_chunks(delta.path)}
+        for asset in second.assets:
+            assert hashlib.sha256(available[asset.sha256]).hexdigest() == asset.sha256
+
+    @pytest.mark.parametrize("compression", list(CompressionType))
+    def test_archive_round_trips_each_compression(
+        self: TestChunkStore, tmp_path: Path, compression: CompressionType
+    ) -> None:
+        """Each compression type writes a real archive in that format."""
+        store = ChunkStore(tmp_path / "chunks")
+        lessons = [
+            f'{{"id": "math_lesson_{i}", "title": "Fractions {i}", "steps": ["add", "compare"]}}'.encode()
+            for i in range(200)
+        ]
+        dictionary = train_zstd_dictionary(lessons, dict_size=4096)
+        manifest = _manifest(_assets(store, lessons))
+
+        archive = BundleBuilder(
+            store, CompressionSettings(zstd_dictionary=dictionary)
+        ).write_archive(manifest, tmp_path / "bundle", compression)
+
+        data = archive.path.read_bytes()
+        if compression == CompressionType.ZSTD:
+            decompressor = zstandard.ZstdDecompressor(
+                dict_data=zstandard.ZstdCompressionDict(dictionary)
+            )
+            tar_bytes = decompressor.stream_reader(io.BytesIO(data)).read()
+        elif compression == CompressionType.BROTLI:
+            tar_bytes = brotli.decompress(data)
+        else:
+            tar_bytes = gzip.decompress(data)
+
+        with tarfile.open(fileobj=io.BytesIO(tar_bytes)) as tar:
+            names = tar.getnames()
+        assert names[0] == "manifest.json"
+        assert sorted(names[1:]) == sorted(f"chunks/{asset.sha256}" for asset in manifest.assets)
+
+
+class TestDeltaArchives:
+    """Test class for delta archive caching and cleanup."""
+
+    def test_least_recently_used_deltas_are_removed(
+        self: TestDeltaArchives, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Deltas beyond the limit are dropped from the cache and from disk."""
+        monkeypatch.setenv("BUNDLE_STORAGE_PATH", str(tmp_path))
+        monkeypatch.setenv("MAX_DELTA_ARCHIVES", "2")
+        service = BundleService()
+        rng = random.Random(7)
+        base = _stored_bundle(service, [rng.randbytes(1024) for _ in range(4)])
+        bundles = [
+            _stored_bundle(service, [rng.randbytes(1024) for _ in range(4)]) for _ in range(3)
+        ]
+
+        async def deltas() -> list[Path]:
+            first = await service.get_delta_bundle(bundles[0], base)
+            await service.get_delta_bundle(bundles[1], base)
+            await service.get_delta_bundle(bundles[0], base)  # Now most recently used
+            await service.get_delta_bundle(bundles[2], base)
+            return [first.path] + [
+                archive.path for archive in service._delta_archives.values()
+            ]
+
+        first_path, *cached = asyncio.run(deltas())
+
+        assert list(service._delta_archives) == [
+            (bundles[0].bundle_id, base.bundle_id),
+            (bundles[2].bundle_id, base.bundle_id),
+        ]
+        assert first_path in cached
+        assert all(path.exists() for path in cached)
+        assert not list(tmp_path.glob(f"{bundles[1].bundle_id}/*.from-*"))
+
+    def test_deleting_a_bundle_removes_its_deltas(
+        self: TestDeltaArchives, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Deltas to and from a deleted bundle go with it; others stay."""
+        monkeypatch.setenv("BUNDLE_STORAGE_PATH", str(tmp_path))
+        service = BundleService()
+        rng = random.Random(11)
+        first, second, third = (
+            _stored_bundle(service, [rng.randbytes(1024) for _ in range(4)]) for _ in range(3)
+        )
+
+        async def delete_second() -> tuple[Path, Path, Path]:
+            to_second = await service.get_delta_bundle(second, first)
+            from_second = await service.get_delta_bundle(third, second)
+            unrelated = await service.get_delta_bundle(third, first)
+            await service.delete_bundle(second, session)
+            return to_second.path, from_second.path, unrelated.path
+
+        session = FakeSession()
+        to_second, from_second, unrelated = asyncio.run(delete_second())
+
+        assert not to_second.exists()
+        assert not from_second.exists()
+        assert not (tmp_path / str(second.bundle_id)).exists()
+        assert unrelated.exists()
+        assert list(service._delta_archives) == [(third.bundle_id, first.bundle_id)]
+        assert session.deleted == [second]
+        assert session.committed
@@ -0,0 +1,89 @@
+"""HTTP API for health, metrics and backfill control."""
+
+from typing import TYPE_CHECKING, Any
+
+import structlog
+from fastapi import FastAPI, HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# pylint: disable=import-error,no-name-in-module
+from app.config import settings
+from app.models import BackfillRequest
+
+if TYPE_CHECKING:
+    from app.main import ETLProcessor
+
+logger = structlog.get_logger(__name__)
+
+
+def create_app(processor: "ETLProcessor") -> FastAPI:
+    """Create the FastAPI application for a running processor."""
+    app = FastAPI(
+        title="ETL Jobs Service",
+        description="Redpanda → S3 → Snowflake pipeline",
+        version=settings.version,
+        docs_url="/docs" if settings.debug else None,
+        redoc_url="/redoc" if settings.debug else None,
+    )
+    backfills = processor.etl_scheduler.backfills
+
+    def job_status(job_id: str, include_days: bool = False) -> dict[str, Any]:
+        try:
+            return backfills.status(job_id, include_days=include_days)
+        except KeyError as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Backfill not found"
+            ) from e
+
+    @app.get("/health")
+    async def health() -> JSONResponse:
+        """Overall health of the processor and its components."""
+        health = await processor.health_check()
+        code = status.HTTP_200_OK if health["status"] == "healthy" else 503
+        return JSONResponse(jsonable_encoder(health), status_code=code)
+
+    @app.get("/metrics")
+    async def metrics() -> dict[str, Any]:
+        """Processor and component metrics."""
+        return {
+            "processor": processor.get_metrics(),
+            "kafka_consumer": processor.kafka_consumer.get_metrics(),
+            "s3_writer": processor.s3_writer.get_metrics(),
+            "etl_scheduler": processor.etl_scheduler.get_metrics(),
+            "rollups": processor.rollups.get_metrics(),
+        }
+
+    @app.post("/backfills", status_code=status.HTTP_202_ACCEPTED)
+    async def start_backfill(request: BackfillRequest) -> dict[str, Any]:
+        """Start a backfill; poll its progress with GET /backfills/{job_id}."""
+        job_id = await processor.etl_scheduler.start_backfill(
+            request.start_date, request.end_date
+        )
+        return job_status(job_id)
+
+    @app.get("/backfills")
+    async def list_backfills() -> list[dict[str, Any]]:
+        """Progress of all backfills, newest first."""
+        return backfills.list_jobs()
+
+    @app.get("/backfills/{job_id}")
+    async def get_backfill(job_id: str, include_days: bool = False) -> dict[str, Any]:
+        """Progress of one backfill, optionally with every day's state."""
+        return job_status(job_id, include_days=include_days)
+
+    @app.delete("/backfills/{job_id}")
+    async def cancel_backfill(job_id: str) -> dict[str, Any]:
+        """Cancel a running backfill; days in flight go back to pending."""
+        job_status(job_id)
+        await backfills.cancel(job_id)
+        return job_status(job_id)
+
+    @app.post("/backfills/{job_id}/resume", status_code=status.HTTP_202_ACCEPTED)
+    async def resume_backfill(job_id: str) -> dict[str, Any]:
+        """Run a backfill's unfinished and failed days again."""
+        job_status(job_id)
+        backfills.resume(job_id)
+        return job_status(job_id)
+
+    return app
@@ -18,6 +18,8 @@ class Settings(BaseSettings):
     version: str = "0.1.0"
     debug: bool = Field(default=False, description="Debug mode")
     log_level: str = Field(default="INFO", description="Log level")
+    http_host: str = Field(default="0.0.0.0", description="HTTP API host")
+    http_port: int = Field(default=8080, description="HTTP API port")
 
     # Kafka/Redpanda settings
     kafka_bootstrap_servers: str = Field(
@@ -36,6 +38,22 @@ class Settings(BaseSettings):
         default="earliest",
         description="Auto offset reset policy",
     )
+    kafka_max_batch_retries: int = Field(
+        default=5,
+        description="Failed batch attempts before records are retried one by one",
+    )
+    kafka_retry_backoff_seconds: float = Field(
+        default=1.0,
+        description="Initial pause of a partition after a failed batch (doubles per attempt)",
+    )
+    kafka_retry_max_backoff_seconds: float = Field(
+        default=60.0,
+        description="Upper bound on the partition pause between attempts",
+    )
+    dead_letter_path: str = Field(
+        default="dead_letter",
+        description="Directory of the local dead-letter store",
+    )
 
     # AWS S3 settings
     aws_access_key_id: str = Field(default="", description="AWS access key")
@@ -49,6 +67,10 @@ class Settings(BaseSettings):
         default="events/",
         description="S3 prefix for event files",
     )
+    s3_prefix_rollups: str = Field(
+        default="rollups/",
+        description="S3 prefix for streaming minute/session/mastery rollups",
+    )
 
     # Parquet settings
     parquet_compression: str = Field(
@@ -59,6 +81,22 @@ class Settings(BaseSettings):
         default=100000,
         description="Parquet row group size",
     )
+    parquet_max_file_bytes: int = Field(
+        default=256 * 1024 * 1024,
+        description="Roll a Parquet file once it reaches this size",
+    )
+    parquet_max_file_age_seconds: float = Field(
+        default=300.0,
+        description="Roll a Parquet file once it has been open this long",
+    )
+    parquet_max_open_files: int = Field(
+        default=64,
+        description="Maximum tenant/date partitions with an open file",
+    )
+    s3_multipart_part_bytes: int = Field(
+        default=8 * 1024 * 1024,
+        description="Multipart upload part size (S3 minimum is 5 MiB)",
+    )
     batch_size: int = Field(
         default=10000,
         description="Batch size for processing events",
@@ -98,6 +136,34 @@ class Settings(BaseSettings):
         description="Schema for analytics models",
     )
 
+    # Streaming rollup settings
+    rollup_allowed_lateness_seconds: float = Field(
+        default=300.0,
+        description="How far behind the newest event a late event is still counted",
+    )
+    rollup_session_gap_seconds: float = Field(
+        default=1800.0,
+        description="Inactivity gap that closes a session window",
+    )
+
+    # Backfill settings
+    backfill_concurrency: int = Field(
+        default=8,
+        description="Days of a backfill transformed concurrently",
+    )
+    backfill_max_attempts: int = Field(
+        default=3,
+        description="Attempts per day before it is marked failed",
+    )
+    backfill_retry_backoff_seconds: float = Field(
+        default=30.0,
+        description="Delay before retrying a failed day (doubles per attempt)",
+    )
+    backfill_checkpoint_path: str = Field(
+        default="checkpoints/backfill.sqlite3",
+        description="SQLite file holding per-day backfill state",
+    )
+
     # Data retention settings
     raw_data_retention_months: int = Field(
         default=18,
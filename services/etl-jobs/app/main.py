@@ -7,11 +7,14 @@ from datetime import datetime
 from typing import Any
 
 import structlog
+import uvicorn
 
+from app.api import create_app
 from app.config import settings
 from app.models import RawEvent
 from app.services.etl_scheduler import ETLScheduler
 from app.services.kafka_consumer import KafkaEventConsumer
+from app.services.rollups import StreamingRollups
 from app.services.s3_writer import S3ParquetWriter
 
 logger = structlog.get_logger(__name__)
@@ -23,8 +26,11 @@ class ETLProcessor:
     def __init__(self) -> None:
         """Initialize the ETL processor."""
         self.s3_writer = S3ParquetWriter()
+        self.rollups = StreamingRollups()
         self.kafka_consumer = KafkaEventConsumer(self._process_event_batch)
         self.etl_scheduler = ETLScheduler()
+        self.http_server: uvicorn.Server | None = None
+        self._http_task: asyncio.Task | None = None
         self._running = False
         self._shutdown_event = asyncio.Event()
 
@@ -36,6 +42,8 @@ class ETLProcessor:
             "batches_processed": 0,
             "events_processed": 0,
             "s3_files_written": 0,
+            "rollup_files_written": 0,
+            "rollup_errors": 0,
             "processing_errors": 0,
             "start_time": None,
         }
@@ -67,10 +75,26 @@ class ETLProcessor:
             await self.kafka_consumer.start()
             await self.etl_scheduler.start()
 
-            logger.info("ETL processor started successfully")
+            # Serve health, metrics and backfill endpoints
+            self.http_server = uvicorn.Server(
+                uvicorn.Config(
+                    app=create_app(self),
+                    host=settings.http_host,
+                    port=settings.http_port,
+                    log_level="info" if settings.debug else "warning",
+                    access_log=settings.debug,
+                )
+            )
+            self._http_task = asyncio.create_task(self.http_server.serve())
 
-            # Wait for shutdown signal
-            await self._shutdown_event.wait()
+            logger.info("ETL processor started successfully", http_port=settings.http_port)
+
+            # Wait for shutdown signal (uvicorn also stops on SIGTERM/SIGINT)
+            shutdown_task = asyncio.create_task(self._shutdown_event.wait())
+            await asyncio.wait(
+                [shutdown_task, self._http_task], return_when=asyncio.FIRST_COMPLETED
+            )
+            shutdown_task.cancel()
 
         except Exception as e:
             logger.error("Failed to start ETL processor", error=str(e))
@@ -85,12 +109,21 @@ class ETLProcessor:
         self._running = False
 
         # Stop services
+        if self.http_server and self._http_task:
+            self.http_server.should_exit = True
+            await asyncio.gather(self._http_task, return_exceptions=True)
+
         if self.kafka_consumer:
             await self.kafka_consumer.stop()
 
         if self.etl_scheduler:
             await self.etl_scheduler.stop()
 
+        # Emit windows that are still open; anything lost here is rebuilt
+        # by the nightly warehouse transformation
+        self.rollups.flush_all()
+        await self._write_rollups()
+
         logger.info("ETL processor stopped")
 
     async def _process_event_batch(self, events: list[RawEvent]) -> bool:
@@ -114,18 +147,21 @@ class ETLProcessor:
             )
 
             # Write events to S3 as Parquet
-            s3_key = await self.s3_writer.write_events_to_s3(events)
+            s3_keys = await self.s3_writer.write_events_to_s3(events)
 
-            if s3_key:
+            if s3_keys:
                 # Update metrics
                 self._metrics["batches_processed"] += 1
                 self._metrics["events_processed"] += len(events)
-                self._metrics["s3_files_written"] += 1
+                self._metrics["s3_files_written"] += len(s3_keys)
+
+                # Rollups are best-effort; the raw events are already durable
+                await self._update_rollups(events)
 
                 logger.info(
                     "Successfully processed event batch",
                     event_count=len(events),
-                    s3_key=s3_key,
+                    s3_keys=s3_keys,
                 )
                 return True
 
@@ -142,12 +178,36 @@ class ETLProcessor:
             self._metrics["processing_errors"] += 1
             return False
 
+    async def _update_rollups(self, events: list[RawEvent]) -> None:
+        """Add a batch to the rollups and write finalized windows.
+
+        Failures are logged, not raised: failing the batch would rewrite its
+        raw files and count its events in the rollups twice on retry.
+        """
+        try:
+            self.rollups.process(events)
+            await self._write_rollups()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error(
+                "Error updating rollups",
+                error=str(e),
+                error_type=type(e).__name__,
+                event_count=len(events),
+            )
+            self._metrics["rollup_errors"] += 1
+
+    async def _write_rollups(self) -> None:
+        """Write rollup windows finalized so far."""
+        keys = await self.s3_writer.write_rollups(self.rollups.drain())
+        self._metrics["rollup_files_written"] += len(keys)
+
     async def health_check(self) -> dict[str, Any]:
         """Get health status of the ETL processor."""
         health = {
             "status": "healthy" if self._running else "unhealthy",
             "running": self._running,
             "metrics": self._metrics.copy(),
+            "rollups": self.rollups.get_metrics(),
             "uptime_seconds": (
                 (datetime.now() - self._metrics["start_time"]).total_seconds()
                 if self._metrics["start_time"]
@@ -1,9 +1,9 @@
 """Pydantic models for ETL data structures."""
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class RawEvent(BaseModel):
@@ -144,3 +144,17 @@ class ETLJobStatus(BaseModel):
     # Meta
     created_at: datetime = Field(..., description="Record creation time")
     updated_at: datetime = Field(..., description="Record update time")
+
+
+class BackfillRequest(BaseModel):
+    """Request to backfill the daily transformations for a date range."""
+
+    start_date: date = Field(..., description="First day to backfill")
+    end_date: date = Field(..., description="Last day to backfill (inclusive)")
+
+    @model_validator(mode="after")
+    def check_range(self) -> "BackfillRequest":
+        """Reject ranges that end before they start."""
+        if self.end_date < self.start_date:
+            raise ValueError("end_date must not be before start_date")
+        return self
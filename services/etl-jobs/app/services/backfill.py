@@ -0,0 +1,368 @@
+"""Parallel, checkpointed backfill of the daily transformations.
+
+Each backfill job covers a date range. Its days run concurrently, up to
+``backfill_concurrency`` at a time, and every day's state is checkpointed in
+a local SQLite file. If the process restarts, interrupted jobs resume where
+they stopped: days already done are skipped, and days that were running or
+had failed are run again. A job the user cancels stays cancelled until it
+is explicitly resumed.
+"""
+
+import asyncio
+import json
+import sqlite3
+import uuid
+from collections import deque
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, timedelta
+from enum import Enum
+from pathlib import Path
+from typing import Any, Protocol
+
+import structlog
+
+# pylint: disable=import-error,no-name-in-module
+from app.config import settings
+
+logger = structlog.get_logger(__name__)
+
+
+class DayStatus(str, Enum):
+    """State of one day of a backfill."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class JobStatus(str, Enum):
+    """State of a backfill job."""
+
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class TransformationService(Protocol):
+    """What a backfill needs from the Snowflake ETL service."""
+
+    async def run_daily_transformations(self, target_date: date) -> dict[str, Any]:
+        """Run the transformations for one day."""
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS backfill_jobs (
+    job_id TEXT PRIMARY KEY,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS backfill_days (
+    job_id TEXT NOT NULL REFERENCES backfill_jobs (job_id),
+    day TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    results TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (job_id, day)
+);
+"""
+
+
+def _now() -> str:
+    return datetime.now(UTC).isoformat()
+
+
+class BackfillCheckpoint:
+    """Job and per-day backfill state in a local SQLite file.
+
+    Every update is a single small autocommitted statement, so it runs inline
+    on the event loop.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        """Open (or create) the checkpoint database; defaults to ``backfill_checkpoint_path``."""
+        self.path = path or settings.backfill_checkpoint_path
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def create_job(self, job_id: str, start_date: date, end_date: date) -> None:
+        """Record a new job with every day pending."""
+        now = _now()
+        days = (start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1))
+        with self._db:
+            self._db.execute("BEGIN")
+            self._db.execute(
+                "INSERT INTO backfill_jobs VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, start_date.isoformat(), end_date.isoformat(), JobStatus.RUNNING, now, now),
+            )
+            self._db.executemany(
+                "INSERT INTO backfill_days (job_id, day, status, updated_at) VALUES (?, ?, ?, ?)",
+                ((job_id, day.isoformat(), DayStatus.PENDING, now) for day in days),
+            )
+
+    def set_job(self, job_id: str, status: JobStatus) -> None:
+        """Update a job's status."""
+        self._db.execute(
+            "UPDATE backfill_jobs SET status = ?, updated_at = ? WHERE job_id = ?",
+            (status, _now(), job_id),
+        )
+
+    def set_day(  # pylint: disable=too-many-arguments
+        self,
+        job_id: str,
+        day: date,
+        status: DayStatus,
+        *,
+        attempts: int | None = None,
+        error: str | None = None,
+        results: dict[str, Any] | None = None,
+    ) -> None:
+        """Update one day's state; ``attempts`` is left unchanged when None."""
+        self._db.execute(
+            "UPDATE backfill_days SET status = ?, attempts = COALESCE(?, attempts), error = ?,"
+            " results = ?, updated_at = ? WHERE job_id = ? AND day = ?",
+            (
+                status,
+                attempts,
+                error,
+                json.dumps(results, default=str) if results is not None else None,
+                _now(),
+                job_id,
+                day.isoformat(),
+            ),
+        )
+
+    def requeue(self, job_id: str, statuses: Iterable[DayStatus]) -> None:
+        """Set days in the given states back to pending with a fresh attempt budget."""
+        statuses = list(statuses)
+        self._db.execute(
+            "UPDATE backfill_days SET status = ?, attempts = 0, updated_at = ?"
+            f" WHERE job_id = ? AND status IN ({', '.join('?' * len(statuses))})",
+            (DayStatus.PENDING, _now(), job_id, *statuses),
+        )
+
+    def job(self, job_id: str) -> dict[str, Any] | None:
+        """A job row, or None if unknown."""
+        row = self._db.execute("SELECT * FROM backfill_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def jobs(self, statuses: Iterable[JobStatus] | None = None) -> list[dict[str, Any]]:
+        """Job rows, newest first, optionally filtered by status."""
+        rows = self._db.execute("SELECT * FROM backfill_jobs ORDER BY created_at DESC").fetchall()
+        wanted = set(statuses) if statuses is not None else None
+        return [dict(row) for row in rows if wanted is None or row["status"] in wanted]
+
+    def days(
+        self, job_id: str, statuses: Iterable[DayStatus] | None = None
+    ) -> list[dict[str, Any]]:
+        """Day rows of a job in date order, optionally filtered by status."""
+        rows = self._db.execute(
+            "SELECT * FROM backfill_days WHERE job_id = ? ORDER BY day", (job_id,)
+        ).fetchall()
+        wanted = set(statuses) if statuses is not None else None
+        return [dict(row) for row in rows if wanted is None or row["status"] in wanted]
+
+    def day_counts(self, job_id: str) -> dict[str, int]:
+        """Number of days of a job in each state."""
+        counts = {status.value: 0 for status in DayStatus}
+        for status, count in self._db.execute(
+            "SELECT status, COUNT(*) FROM backfill_days WHERE job_id = ? GROUP BY status",
+            (job_id,),
+        ):
+            counts[status] = count
+        return counts
+
+    def close(self) -> None:
+        """Close the database."""
+        self._db.close()
+
+
+class BackfillOrchestrator:
+    """Runs backfill jobs concurrently per day, with retries and checkpoints."""
+
+    def __init__(
+        self,
+        service: TransformationService,
+        checkpoint: BackfillCheckpoint | None = None,
+        *,
+        concurrency: int | None = None,
+        max_attempts: int | None = None,
+        retry_backoff: float | None = None,
+    ) -> None:
+        """Initialize; limits default to settings."""
+        self.service = service
+        self.checkpoint = checkpoint or BackfillCheckpoint()
+        self.concurrency = concurrency or settings.backfill_concurrency
+        self.max_attempts = max_attempts or settings.backfill_max_attempts
+        self.retry_backoff = (
+            retry_backoff if retry_backoff is not None else settings.backfill_retry_backoff_seconds
+        )
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._cancelled: set[str] = set()
+
+    def start(self, start_date: date, end_date: date) -> str:
+        """Create a job for the date range and start running it; returns the job id."""
+        if end_date < start_date:
+            raise ValueError("end_date must not be before start_date")
+        job_id = uuid.uuid4().hex
+        self.checkpoint.create_job(job_id, start_date, end_date)
+        logger.info(
+            "Starting backfill",
+            job_id=job_id,
+            start_date=start_date.isoformat(),
+            end_date=end_date.isoformat(),
+            concurrency=self.concurrency,
+        )
+        self._launch(job_id)
+        return job_id
+
+    def resume(self, job_id: str) -> None:
+        """Run a job's unfinished and failed days again (also after a cancel)."""
+        if self.checkpoint.job(job_id) is None:
+            raise KeyError(job_id)
+        if job_id in self._tasks:
+            return
+        self.checkpoint.requeue(job_id, (DayStatus.RUNNING, DayStatus.FAILED))
+        self.checkpoint.set_job(job_id, JobStatus.RUNNING)
+        logger.info("Resuming backfill", job_id=job_id, days=self.checkpoint.day_counts(job_id))
+        self._launch(job_id)
+
+    def resume_incomplete(self) -> list[str]:
+        """Resume jobs interrupted by a restart or left with failed days."""
+        job_ids = [
+            job["job_id"]
+            for job in self.checkpoint.jobs((JobStatus.RUNNING, JobStatus.FAILED))
+            if job["job_id"] not in self._tasks
+        ]
+        for job_id in job_ids:
+            self.resume(job_id)
+        return job_ids
+
+    async def cancel(self, job_id: str) -> bool:
+        """Cancel a running job; days in flight go back to pending. False if not running."""
+        task = self._tasks.get(job_id)
+        if task is None:
+            return False
+        self._cancelled.add(job_id)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return True
+
+    async def wait(self, job_id: str) -> dict[str, Any]:
+        """Wait for a job to stop running and return its status."""
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await asyncio.shield(task)
+        return self.status(job_id)
+
+    async def close(self) -> None:
+        """Stop running jobs for shutdown, leaving them to resume on restart."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def status(self, job_id: str, include_days: bool = False) -> dict[str, Any]:
+        """Progress of a job; raises KeyError if unknown."""
+        job = self.checkpoint.job(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        counts = self.checkpoint.day_counts(job_id)
+        total = sum(counts.values())
+        finished = counts[DayStatus.SUCCEEDED] + counts[DayStatus.FAILED]
+        status = {
+            **job,
+            "active": job_id in self._tasks,
+            "total_days": total,
+            "days": counts,
+            "progress": round(finished / total, 4) if total else 1.0,
+            "failed_days": [
+                {"date": day["day"], "attempts": day["attempts"], "error": day["error"]}
+                for day in self.checkpoint.days(job_id, (DayStatus.FAILED,))
+            ],
+        }
+        if include_days:
+            status["results"] = [
+                {
+                    "date": day["day"],
+                    "status": day["status"],
+                    "attempts": day["attempts"],
+                    "error": day["error"],
+                    "results": json.loads(day["results"]) if day["results"] else None,
+                }
+                for day in self.checkpoint.days(job_id)
+            ]
+        return status
+
+    def list_jobs(self) -> list[dict[str, Any]]:
+        """Progress of every job, newest first."""
+        return [self.status(job["job_id"]) for job in self.checkpoint.jobs()]
+
+    def active_jobs(self) -> list[str]:
+        """Ids of jobs currently running in this process."""
+        return list(self._tasks)
+
+    def _launch(self, job_id: str) -> None:
+        self._tasks[job_id] = asyncio.create_task(self._run(job_id), name=f"backfill-{job_id}")
+
+    async def _run(self, job_id: str) -> None:
+        """Run a job's pending days with bounded concurrency."""
+        queue = deque(
+            date.fromisoformat(day["day"])
+            for day in self.checkpoint.days(job_id, (DayStatus.PENDING,))
+        )
+
+        async def worker() -> None:
+            while queue:
+                await self._run_day(job_id, queue.popleft())
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(queue)))))
+        except asyncio.CancelledError:
+            self.checkpoint.requeue(job_id, (DayStatus.RUNNING,))
+            if job_id in self._cancelled:
+                self.checkpoint.set_job(job_id, JobStatus.CANCELLED)
+                logger.info("Backfill cancelled", job_id=job_id)
+            else:
+                logger.info("Backfill interrupted, will resume on restart", job_id=job_id)
+            raise
+        finally:
+            self._tasks.pop(job_id, None)
+            self._cancelled.discard(job_id)
+
+        counts = self.checkpoint.day_counts(job_id)
+        status = JobStatus.FAILED if counts[DayStatus.FAILED] else JobStatus.COMPLETED
+        self.checkpoint.set_job(job_id, status)
+        logger.info("Backfill finished", job_id=job_id, status=status.value, days=counts)
+
+    async def _run_day(self, job_id: str, day: date) -> None:
+        """Run one day, retrying with exponential backoff before marking it failed."""
+        for attempt in range(1, self.max_attempts + 1):
+            self.checkpoint.set_day(job_id, day, DayStatus.RUNNING, attempts=attempt)
+            try:
+                results = await self.service.run_daily_transformations(day)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.warning(
+                    "Backfill day failed",
+                    job_id=job_id,
+                    date=day.isoformat(),
+                    attempt=attempt,
+                    error=str(e),
+                )
+                if attempt == self.max_attempts:
+                    self.checkpoint.set_day(job_id, day, DayStatus.FAILED, error=str(e))
+                    return
+                await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            else:
+                self.checkpoint.set_day(job_id, day, DayStatus.SUCCEEDED, results=results)
+                return
@@ -0,0 +1,96 @@
+"""Local dead-letter store for records the consumer gives up on."""
+
+import asyncio
+import base64
+import json
+import os
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+# pylint: disable=import-error,no-name-in-module
+from app.config import settings
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class DeadLetter:  # pylint: disable=too-many-instance-attributes
+    """A Kafka record that could not be processed, with its original bytes."""
+
+    topic: str
+    partition: int
+    offset: int
+    key: bytes | None
+    value: bytes | None
+    reason: str  # "decode_error" or "handler_failed"
+    error: str
+    record_timestamp: int | None = None  # Kafka timestamp, ms since epoch
+
+
+class DeadLetterStore:
+    """Appends dead letters to one JSON Lines file per day.
+
+    Key and value are stored base64-encoded so records can be replayed byte
+    for byte. Writes are fsynced before returning, because the consumer
+    commits past a dead-lettered record once it is stored.
+    """
+
+    def __init__(self, directory: str | None = None) -> None:
+        """Initialize; the directory defaults to ``dead_letter_path``."""
+        self.directory = Path(directory or settings.dead_letter_path)
+        self._lock = asyncio.Lock()
+        self._metrics = {"records_stored": 0}
+
+    async def put(self, letters: list[DeadLetter]) -> None:
+        """Durably store dead letters."""
+        if not letters:
+            return
+        async with self._lock:
+            await asyncio.to_thread(self._append, letters)
+        self._metrics["records_stored"] += len(letters)
+        logger.warning(
+            "Records moved to dead-letter store",
+            count=len(letters),
+            reasons=sorted({letter.reason for letter in letters}),
+            offsets=[(letter.partition, letter.offset) for letter in letters],
+        )
+
+    def _append(self, letters: list[DeadLetter]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        now = datetime.now(UTC)
+        path = self.directory / f"dead_letters_{now:%Y%m%d}.jsonl"
+        lines = []
+        for letter in letters:
+            entry = asdict(letter)
+            entry["key"] = _b64(letter.key)
+            entry["value"] = _b64(letter.value)
+            entry["dead_lettered_at"] = now.isoformat()
+            lines.append(json.dumps(entry) + "\n")
+        with open(path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read(self) -> Iterator[dict[str, Any]]:
+        """Iterate stored entries, oldest file first, with key/value decoded."""
+        for path in sorted(self.directory.glob("dead_letters_*.jsonl")):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    for name in ("key", "value"):
+                        if entry[name] is not None:
+                            entry[name] = base64.b64decode(entry[name])
+                    yield entry
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Get dead-letter metrics."""
+        return {**self._metrics, "directory": str(self.directory)}
+
+
+def _b64(data: bytes | None) -> str | None:
+    return base64.b64encode(data).decode("ascii") if data is not None else None
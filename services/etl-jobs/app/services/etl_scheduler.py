@@ -7,6 +7,7 @@ from typing import Any
 import structlog
 
 # pylint: disable=import-error,no-name-in-module
+from app.services.backfill import BackfillOrchestrator
 from app.services.snowflake_etl import SnowflakeETLService  # type: ignore
 
 logger = structlog.get_logger(__name__)
@@ -18,6 +19,7 @@ class ETLScheduler:
     def __init__(self) -> None:
         """Initialize ETL scheduler."""
         self.snowflake_service = SnowflakeETLService()
+        self.backfills = BackfillOrchestrator(self.snowflake_service)
         self._running = False
         self._scheduler_task: asyncio.Task | None = None
 
@@ -42,6 +44,11 @@ class ETLScheduler:
             # Start scheduler task
             self._scheduler_task = asyncio.create_task(self._scheduler_loop())
 
+            # Pick up backfills interrupted by the last shutdown
+            resumed = self.backfills.resume_incomplete()
+            if resumed:
+                logger.info("Resumed backfills", job_ids=resumed)
+
             logger.info("ETL scheduler started successfully")
 
         except Exception as e:
@@ -61,6 +68,9 @@ class ETLScheduler:
             except asyncio.CancelledError:
                 pass
 
+        # Running backfills keep their checkpoints and resume on next start
+        await self.backfills.close()
+
         # Disconnect from Snowflake
         await self.snowflake_service.disconnect()
 
@@ -165,51 +175,21 @@ class ETLScheduler:
             logger.error("Manual ETL job failed", target_date=target_date, error=str(e))
             return {"status": "failed", "target_date": target_date.isoformat(), "error": str(e)}
 
-    async def backfill_data(self, start_date: date, end_date: date) -> dict[str, Any]:
-        """Backfill data for a date range."""
-        logger.info("Starting data backfill", start_date=start_date, end_date=end_date)
-
+    async def start_backfill(self, start_date: date, end_date: date) -> str:
+        """Start a backfill in the background; returns its job id."""
         if not self.snowflake_service.is_connected():
             await self.snowflake_service.connect()
 
-        results = []
-        current_date = start_date
-
-        while current_date <= end_date:
-            try:
-                logger.info("Processing backfill date", date=current_date)
-
-                # Run transformations for this date
-                day_results = await self.snowflake_service.run_daily_transformations(current_date)
+        return self.backfills.start(start_date, end_date)
 
-                results.append(
-                    {"date": current_date.isoformat(), "status": "success", "results": day_results}
-                )
-
-                logger.info("Backfill date completed", date=current_date, results=day_results)
-
-            except Exception as e:  # pylint: disable=broad-exception-caught
-                logger.error("Backfill failed for date", date=current_date, error=str(e))
-                results.append(
-                    {"date": current_date.isoformat(), "status": "failed", "error": str(e)}
-                )
+    async def backfill_data(self, start_date: date, end_date: date) -> dict[str, Any]:
+        """Backfill data for a date range and wait for it to finish.
 
-            current_date += timedelta(days=1)
-
-        logger.info(
-            "Data backfill completed",
-            start_date=start_date,
-            end_date=end_date,
-            total_days=len(results),
-            successful_days=len([r for r in results if r["status"] == "success"]),
-        )
-
-        return {
-            "status": "completed",
-            "start_date": start_date.isoformat(),
-            "end_date": end_date.isoformat(),
-            "results": results,
-        }
+        Days run concurrently and are checkpointed; see ``BackfillOrchestrator``.
+        """
+        job_id = await self.start_backfill(start_date, end_date)
+        await self.backfills.wait(job_id)
+        return self.backfills.status(job_id, include_days=True)
 
     async def health_check(self) -> dict[str, Any]:
         """Check scheduler and Snowflake service health."""
@@ -217,6 +197,7 @@ class ETLScheduler:
             "status": "healthy" if self._running else "unhealthy",
             "running": self._running,
             "metrics": self._metrics.copy(),
+            "active_backfills": self.backfills.active_jobs(),
         }
 
         # Check Snowflake service health
@@ -0,0 +1,98 @@
+"""Batch decoding and validation of raw event records.
+
+A poll's record values are joined into one newline-delimited buffer and
+decoded by a typed msgspec decoder in a single call. The decoder checks
+the schema as it parses, so no pydantic model is validated per record.
+If anything in the batch is invalid, the batch is decoded again one
+record at a time to find out which records failed and why.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+# pylint: disable=import-error
+import msgspec
+
+# pylint: disable=import-error,no-name-in-module
+from app.models import RawEvent
+
+
+class _EventRecord(msgspec.Struct):
+    """Wire schema of an event on ``events_raw``; unknown fields are ignored."""
+
+    learner_id: str
+    event_type: str
+    event_id: str
+    timestamp: datetime
+    session_id: str | None = None
+    data: dict[str, Any] = msgspec.field(default_factory=dict)
+    metadata: dict[str, Any] = msgspec.field(default_factory=dict)
+    version: str = "1.0"
+
+
+_decoder = msgspec.json.Decoder(_EventRecord)
+
+
+@dataclass
+class DecodedBatch:
+    """Decoded events with the index of the record each came from, plus failures."""
+
+    events: list[RawEvent] = field(default_factory=list)
+    indexes: list[int] = field(default_factory=list)
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+
+def _to_event(record: _EventRecord, processed_at: datetime) -> RawEvent:
+    # Already validated by the decoder
+    return RawEvent.model_construct(
+        learner_id=record.learner_id,
+        event_type=record.event_type,
+        event_id=record.event_id,
+        session_id=record.session_id,
+        timestamp=record.timestamp,
+        data=record.data,
+        metadata=record.metadata,
+        version=record.version,
+        processed_at=processed_at,
+        partition_date=record.timestamp.strftime("%Y-%m-%d"),
+        s3_path=None,
+    )
+
+
+def decode_events(values: Sequence[bytes | None]) -> DecodedBatch:
+    """Decode record values into events, recording which ones failed.
+
+    Args:
+        values: Raw record values in partition order
+
+    Returns:
+        Events in input order, and ``(index, error)`` for each rejected value
+    """
+    processed_at = datetime.now(UTC)
+    batch = DecodedBatch()
+
+    # One value per line; a value containing a newline can't be split safely
+    if all(value and b"\n" not in value for value in values):
+        try:
+            records = _decoder.decode_lines(b"\n".join(values))
+        except (msgspec.DecodeError, msgspec.ValidationError):
+            records = None
+        if records is not None and len(records) == len(values):
+            batch.events = [_to_event(record, processed_at) for record in records]
+            batch.indexes = list(range(len(values)))
+            return batch
+
+    for index, value in enumerate(values):
+        if not value:
+            batch.errors.append((index, "empty record value"))
+            continue
+        try:
+            record = _decoder.decode(value)
+        except (msgspec.DecodeError, msgspec.ValidationError) as e:
+            batch.errors.append((index, str(e)))
+            continue
+        batch.events.append(_to_event(record, processed_at))
+        batch.indexes.append(index)
+    return batch
@@ -1,40 +1,132 @@
 """Kafka consumer service for ingesting events from Redpanda."""
 
 import asyncio
-import json
-from collections.abc import Awaitable, Callable
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
 from datetime import UTC, datetime
 from typing import Any
 
 import structlog
-from aiokafka import AIOKafkaConsumer, ConsumerRecord, TopicPartition
+from aiokafka import AIOKafkaConsumer, ConsumerRebalanceListener, ConsumerRecord, TopicPartition
 
 # pylint: disable=import-error,no-name-in-module
 from app.config import settings
 from app.models import RawEvent
+from app.services.dead_letter import DeadLetter, DeadLetterStore
+from app.services.event_decoder import decode_events
 
 logger = structlog.get_logger(__name__)
 
 
-class KafkaEventConsumer:
-    """Kafka consumer for processing events from Redpanda."""
+class OffsetTracker:
+    """Commit position of one partition.
+
+    Offsets are tracked in fetch order, not by arithmetic, because compacted
+    and transactional topics have gaps. The position only moves past a
+    record once it and every record fetched before it are done.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with nothing in flight."""
+        self._pending: deque[list[Any]] = deque()  # [offset, done]
+        self._position: int | None = None
+
+    def track(self, offsets: Iterable[int]) -> None:
+        """Register fetched offsets; refetching from an earlier offset replaces the tail."""
+        offsets = list(offsets)
+        if not offsets:
+            return
+        self.rewind(offsets[0])
+        self._pending.extend([offset, False] for offset in offsets)
+
+    def rewind(self, offset: int) -> None:
+        """Forget in-flight offsets at or after ``offset`` (after a seek)."""
+        while self._pending and self._pending[-1][0] >= offset:
+            self._pending.pop()
+
+    def mark_done(self, offsets: Iterable[int]) -> None:
+        """Mark offsets as processed (written or dead-lettered)."""
+        done = set(offsets)
+        for entry in self._pending:
+            if entry[0] in done:
+                entry[1] = True
+
+    def committable(self) -> int | None:
+        """Advance past the leading run of done offsets; new position or None."""
+        advanced = False
+        while self._pending and self._pending[0][1]:
+            self._position = self._pending.popleft()[0] + 1
+            advanced = True
+        return self._position if advanced else None
+
+    @property
+    def position(self) -> int | None:
+        """Last committable position."""
+        return self._position
+
+
+@dataclass
+class _Retry:
+    """Backoff state of a partition whose last batch failed."""
+
+    attempts: int
+    resume_at: float
+    paused: bool = True
+
+
+class _RevokeListener(ConsumerRebalanceListener):
+    """Drops per-partition state when the group takes partitions away."""
+
+    def __init__(self, owner: "KafkaEventConsumer") -> None:
+        self._owner = owner
 
-    def __init__(self, event_handler: Callable[[list[RawEvent]], Awaitable[bool]]) -> None:
+    async def on_partitions_revoked(self, revoked: Iterable[TopicPartition]) -> None:
+        self._owner.forget_partitions(revoked)
+
+    async def on_partitions_assigned(self, assigned: Iterable[TopicPartition]) -> None:
+        pass
+
+
+class KafkaEventConsumer:
+    """Kafka consumer for processing events from Redpanda.
+
+    Each partition's batch is decoded in one pass. Records that fail to
+    decode go to the dead-letter store. If the handler fails, only that
+    partition is paused and rewound. It is retried with exponential backoff
+    while the other partitions keep flowing. After
+    ``kafka_max_batch_retries`` attempts, the batch is retried record by
+    record, and records that still fail are dead-lettered. Offsets are
+    committed only up to the highest contiguous processed position.
+    """
+
+    def __init__(
+        self,
+        event_handler: Callable[[list[RawEvent]], Awaitable[bool]],
+        dead_letters: DeadLetterStore | None = None,
+    ) -> None:
         """Initialize the Kafka consumer.
 
         Args:
             event_handler: Callable that processes batches of events
+            dead_letters: Store for records that can't be processed
         """
         self.consumer: AIOKafkaConsumer | None = None
         self.event_handler = event_handler
+        self.dead_letters = dead_letters or DeadLetterStore()
         self._running = False
         self._consume_task: asyncio.Task | None = None
+        self._offsets: dict[TopicPartition, OffsetTracker] = {}
+        self._retries: dict[TopicPartition, _Retry] = {}
 
         # Metrics
         self._metrics = {
             "messages_consumed": 0,
             "events_processed": 0,
             "processing_errors": 0,
+            "decode_errors": 0,
+            "batch_retries": 0,
+            "dead_lettered": 0,
             "last_processed_time": None,
         }
 
@@ -43,17 +135,19 @@ class KafkaEventConsumer:
         logger.info("Starting Kafka consumer", topic=settings.kafka_topic_events_raw)
 
         try:
+            # Values stay raw bytes: they are decoded per batch, and kept
+            # verbatim for the dead-letter store
             self.consumer = AIOKafkaConsumer(
-                settings.kafka_topic_events_raw,
                 bootstrap_servers=settings.kafka_bootstrap_servers,
                 group_id=settings.kafka_consumer_group,
                 auto_offset_reset=settings.kafka_auto_offset_reset,
                 enable_auto_commit=False,  # Manual commit for reliability
-                value_deserializer=lambda m: json.loads(m.decode("utf-8")),
-                key_deserializer=lambda m: m.decode("utf-8") if m else None,
                 max_poll_records=settings.batch_size,
                 max_poll_interval_ms=30000,  # 30 seconds
             )
+            self.consumer.subscribe(
+                [settings.kafka_topic_events_raw], listener=_RevokeListener(self)
+            )
 
             await self.consumer.start()
             self._running = True
@@ -91,18 +185,7 @@ class KafkaEventConsumer:
 
         while self._running:
             try:
-                # Poll for messages
-                msg_pack = await self.consumer.getmany(
-                    timeout_ms=1000, max_records=settings.batch_size
-                )
-
-                if not msg_pack:
-                    continue
-
-                # Process messages by topic partition
-                for topic_partition, messages in msg_pack.items():
-                    if messages:
-                        await self._process_messages(topic_partition, messages)
+                await self.poll_once()
 
             except Exception as e:  # pylint: disable=broad-exception-caught
                 logger.error("Error in consume loop", error=str(e), error_type=type(e).__name__)
@@ -111,6 +194,19 @@ class KafkaEventConsumer:
                 # Brief pause before retrying
                 await asyncio.sleep(1)
 
+    async def poll_once(self, timeout_ms: int = 1000) -> None:
+        """Resume partitions whose backoff expired, then fetch and process one poll."""
+        self._resume_due()
+
+        msg_pack = await self.consumer.getmany(
+            timeout_ms=timeout_ms, max_records=settings.batch_size
+        )
+
+        # Process messages by topic partition
+        for topic_partition, messages in msg_pack.items():
+            if messages:
+                await self._process_messages(topic_partition, messages)
+
     async def _process_messages(
         self, topic_partition: TopicPartition, messages: list[ConsumerRecord]
     ) -> None:
@@ -121,64 +217,27 @@ class KafkaEventConsumer:
             message_count=len(messages),
         )
 
+        offsets = self._offsets.setdefault(topic_partition, OffsetTracker())
+        offsets.track(message.offset for message in messages)
+
         try:
-            # Convert messages to RawEvent objects
-            events = []
-            valid_messages = []
-
-            for message in messages:
-                try:
-                    # Create RawEvent from message
-                    event_data = message.value
-
-                    # Add ETL metadata
-                    event_data["processed_at"] = datetime.now(UTC)
-                    event_data["partition_date"] = datetime.fromisoformat(
-                        event_data["timestamp"]
-                    ).strftime("%Y-%m-%d")
-
-                    event = RawEvent(**event_data)
-                    events.append(event)
-                    valid_messages.append(message)
-
-                # pylint: disable=broad-exception-caught
-                except Exception as e:
-                    logger.warning(
-                        "Failed to parse event",
-                        error=str(e),
-                        message_offset=message.offset,
-                        partition=topic_partition.partition,
-                    )
-                    continue
-
-            if events:
-                # Process events through handler
-                success = await self.event_handler(events)
-
-                if success:
-                    # Commit offsets for successfully processed messages
-                    if valid_messages:
-                        last_message = valid_messages[-1]
-                        await self.consumer.commit({topic_partition: last_message.offset + 1})
-
-                    # Update metrics
-                    self._metrics["messages_consumed"] += len(valid_messages)
-                    self._metrics["events_processed"] += len(events)
-                    self._metrics["last_processed_time"] = datetime.now(UTC)
-
-                    logger.info(
-                        "Processed message batch successfully",
-                        events_count=len(events),
-                        partition=topic_partition.partition,
-                        last_offset=(valid_messages[-1].offset if valid_messages else None),
-                    )
-                else:
-                    logger.error(
-                        "Failed to process event batch",
-                        events_count=len(events),
-                        partition=topic_partition.partition,
-                    )
-                    self._metrics["processing_errors"] += 1
+            decoded = decode_events([message.value for message in messages])
+            letters = [
+                self._dead_letter(messages[index], "decode_error", error)
+                for index, error in decoded.errors
+            ]
+
+            retry = self._retries.get(topic_partition)
+            if retry and retry.attempts >= settings.kafka_max_batch_retries:
+                letters += await self._process_one_by_one(
+                    [messages[index] for index in decoded.indexes], decoded.events
+                )
+            elif decoded.events and not await self._handle(decoded.events):
+                self._schedule_retry(topic_partition, messages[0].offset)
+                return
+
+            # Stored before the commit moves past them
+            await self.dead_letters.put(letters)
 
         except Exception as e:  # pylint: disable=broad-exception-caught
             logger.error(
@@ -187,11 +246,128 @@ class KafkaEventConsumer:
                 partition=topic_partition.partition,
                 message_count=len(messages),
             )
-            self._metrics["processing_errors"] += 1
+            self._schedule_retry(topic_partition, messages[0].offset)
+            return
+
+        self._retries.pop(topic_partition, None)
+        offsets.mark_done(message.offset for message in messages)
+        position = offsets.committable()
+        if position is not None:
+            await self.consumer.commit({topic_partition: position})
+
+        # Update metrics
+        self._metrics["messages_consumed"] += len(messages)
+        self._metrics["events_processed"] += len(decoded.events)
+        self._metrics["decode_errors"] += len(decoded.errors)
+        self._metrics["dead_lettered"] += len(letters)
+        self._metrics["last_processed_time"] = datetime.now(UTC)
+
+        logger.info(
+            "Processed message batch successfully",
+            events_count=len(decoded.events),
+            dead_lettered=len(letters),
+            partition=topic_partition.partition,
+            committed_offset=position,
+        )
+
+    async def _handle(self, events: list[RawEvent]) -> bool:
+        """Run the handler; an exception counts as a failure."""
+        try:
+            return await self.event_handler(events)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Event handler raised", error=str(e), events_count=len(events))
+            return False
+
+    async def _process_one_by_one(
+        self, messages: list[ConsumerRecord], events: list[RawEvent]
+    ) -> list[DeadLetter]:
+        """Isolate the records of a repeatedly failing batch; return those that still fail."""
+        letters = []
+        for message, event in zip(messages, events):
+            if not await self._handle([event]):
+                letters.append(
+                    self._dead_letter(
+                        message,
+                        "handler_failed",
+                        f"failed after {settings.kafka_max_batch_retries} batch attempts",
+                    )
+                )
+        return letters
+
+    def _schedule_retry(self, topic_partition: TopicPartition, offset: int) -> None:
+        """Pause and rewind one partition so the batch is refetched after a backoff."""
+        retry = self._retries.get(topic_partition)
+        attempts = retry.attempts + 1 if retry else 1
+        delay = min(
+            settings.kafka_retry_backoff_seconds * 2 ** (attempts - 1),
+            settings.kafka_retry_max_backoff_seconds,
+        )
+        self.consumer.pause(topic_partition)
+        self.consumer.seek(topic_partition, offset)
+        self._offsets[topic_partition].rewind(offset)
+        self._retries[topic_partition] = _Retry(
+            attempts, asyncio.get_running_loop().time() + delay
+        )
+
+        self._metrics["processing_errors"] += 1
+        self._metrics["batch_retries"] += 1
+        logger.error(
+            "Failed to process event batch, partition paused",
+            partition=topic_partition.partition,
+            offset=offset,
+            attempt=attempts,
+            retry_in_seconds=delay,
+        )
+
+    def forget_partitions(self, partitions: Iterable[TopicPartition]) -> None:
+        """Drop offset and retry state of partitions this consumer no longer owns.
+
+        Their new owner starts from the last committed offset, and a new
+        assignment starts unpaused.
+        """
+        for topic_partition in partitions:
+            self._offsets.pop(topic_partition, None)
+            if self._retries.pop(topic_partition, None):
+                logger.info(
+                    "Partition revoked during retry backoff",
+                    partition=topic_partition.partition,
+                )
+
+    def _resume_due(self) -> None:
+        """Resume paused partitions whose backoff has elapsed."""
+        # Resuming an unassigned partition raises, which would stall every poll
+        assigned = self.consumer.assignment()
+        self.forget_partitions(
+            [tp for tp in [*self._offsets, *self._retries] if tp not in assigned]
+        )
+
+        now = asyncio.get_running_loop().time()
+        for topic_partition, retry in self._retries.items():
+            if retry.paused and now >= retry.resume_at:
+                self.consumer.resume(topic_partition)
+                retry.paused = False
+
+    @staticmethod
+    def _dead_letter(message: ConsumerRecord, reason: str, error: str) -> DeadLetter:
+        return DeadLetter(
+            topic=message.topic,
+            partition=message.partition,
+            offset=message.offset,
+            key=message.key,
+            value=message.value,
+            reason=reason,
+            error=error,
+            record_timestamp=message.timestamp,
+        )
 
     def get_metrics(self) -> dict[str, Any]:
         """Get consumer metrics."""
-        return self._metrics.copy()
+        return {
+            **self._metrics,
+            "paused_partitions": [
+                tp.partition for tp, retry in self._retries.items() if retry.paused
+            ],
+        }
 
     async def health_check(self) -> dict[str, Any]:
         """Check consumer health."""
@@ -0,0 +1,468 @@
+"""Streaming Parquet writer for raw events and rollups.
+
+Events are appended column by column into row-group builders with a fixed
+Arrow schema, so no DataFrame or per-event dict is ever built. A full row
+group is turned into a ``RecordBatch`` and written straight to the file's
+sink, and the builder is cleared. For S3 the sink is a multipart upload that
+ships each part once it reaches ``s3_multipart_part_bytes``.
+
+Memory is therefore bounded by one row group plus one upload part per open
+file, whatever the batch size. Files are partitioned by tenant and date, and
+rolled when they reach ``parquet_max_file_bytes`` or
+``parquet_max_file_age_seconds``.
+"""
+
+import json
+import os
+import time
+import types
+import uuid
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Protocol, Union, get_args, get_origin
+
+# pylint: disable=import-error
+import pyarrow as pa
+import pyarrow.parquet as pq
+import structlog
+
+# pylint: disable=import-error,no-name-in-module
+from app.config import settings
+from app.models import RawEvent
+from pydantic import BaseModel
+
+logger = structlog.get_logger(__name__)
+
+MIN_PART_BYTES = 5 * 1024 * 1024  # S3 minimum for every part but the last
+
+RAW_EVENT_SCHEMA = pa.schema(
+    [
+        pa.field("learner_id", pa.string(), nullable=False),
+        pa.field("event_type", pa.string(), nullable=False),
+        pa.field("event_id", pa.string(), nullable=False),
+        pa.field("session_id", pa.string()),
+        pa.field("timestamp", pa.timestamp("us", tz="UTC"), nullable=False),
+        pa.field("data", pa.string()),  # JSON, parsed into VARIANT on load
+        pa.field("metadata", pa.string()),  # JSON, parsed into VARIANT on load
+        pa.field("version", pa.string()),
+        pa.field("processed_at", pa.timestamp("us", tz="UTC")),
+        pa.field("partition_date", pa.string(), nullable=False),
+        pa.field("s3_path", pa.string()),
+    ]
+)
+
+
+_ARROW_TYPES = {
+    str: pa.string(),
+    int: pa.int64(),
+    float: pa.float64(),
+    bool: pa.bool_(),
+    datetime: pa.timestamp("us", tz="UTC"),
+}
+
+_dumps = json.JSONEncoder(default=str, separators=(",", ":")).encode
+
+
+def model_schema(model: type[BaseModel]) -> pa.Schema:
+    """Arrow schema for a flat Pydantic model; ``X | None`` fields are nullable."""
+    fields = []
+    for name, info in model.model_fields.items():
+        annotation = info.annotation
+        nullable = False
+        if get_origin(annotation) in (Union, types.UnionType):
+            args = [arg for arg in get_args(annotation) if arg is not type(None)]
+            nullable = len(args) < len(get_args(annotation))
+            annotation = args[0]
+        fields.append(pa.field(name, _ARROW_TYPES[annotation], nullable=nullable))
+    return pa.schema(fields)
+
+
+def model_row(schema: pa.Schema) -> Callable[[BaseModel], tuple[Any, ...]]:
+    """Row function reading a model's attributes in schema order."""
+    names = schema.names
+    return lambda model: tuple(getattr(model, name) for name in names)
+
+
+def event_tenant(event: RawEvent) -> str:
+    """Tenant an event belongs to, from its metadata or payload."""
+    tenant_id = event.metadata.get("tenant_id") or event.data.get("tenant_id")
+    return str(tenant_id or "unknown")
+
+
+def event_partition(event: RawEvent) -> tuple[str, str]:
+    """Tenant and date partition of an event."""
+    partition_date = event.partition_date or event.timestamp.strftime("%Y-%m-%d")
+    return event_tenant(event), partition_date
+
+
+def raw_event_row(event: RawEvent) -> tuple[Any, ...]:
+    """Values of an event in ``RAW_EVENT_SCHEMA`` order."""
+    return (
+        event.learner_id,
+        event.event_type,
+        event.event_id,
+        event.session_id,
+        event.timestamp,
+        _dumps(event.data),
+        _dumps(event.metadata),
+        event.version,
+        event.processed_at,
+        event.partition_date or event.timestamp.strftime("%Y-%m-%d"),
+        event.s3_path,
+    )
+
+
+def partition_key(
+    prefix: str, tenant_id: str, partition_date: str, file_prefix: str = "events"
+) -> str:
+    """Object key for a new file in a tenant/date partition."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return (
+        f"{prefix}"
+        f"tenant={tenant_id}/"
+        f"year={partition_date[:4]}/"
+        f"month={partition_date[5:7]}/"
+        f"day={partition_date[8:10]}/"
+        f"{file_prefix}_{timestamp}_{uuid.uuid4()}.parquet"
+    )
+
+
+class RecordBatchBuilder:
+    """Accumulates row values for one row group."""
+
+    def __init__(self, schema: pa.Schema = RAW_EVENT_SCHEMA) -> None:
+        """Initialize an empty row group for ``schema``."""
+        self.schema = schema
+        self._rows: list[tuple[Any, ...]] = []
+
+    def __len__(self) -> int:
+        """Number of buffered rows."""
+        return len(self._rows)
+
+    def append(self, row: tuple[Any, ...]) -> None:
+        """Append one row's values in schema order."""
+        self._rows.append(row)
+
+    def flush(self) -> pa.RecordBatch:
+        """Build a RecordBatch from the buffered rows and clear the buffer."""
+        columns = zip(*self._rows, strict=True)
+        arrays = [
+            pa.array(column, type=field.type)
+            for column, field in zip(columns, self.schema, strict=True)
+        ]
+        self._rows = []
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+class Sink(Protocol):
+    """Writable destination for one Parquet file."""
+
+    def write(self, data: bytes) -> int:
+        """Write bytes."""
+
+    def tell(self) -> int:
+        """Bytes written so far."""
+
+    def close(self) -> None:
+        """Finish the file."""
+
+    def abort(self) -> None:
+        """Discard the file."""
+
+
+class S3MultipartSink:
+    """File-like sink that streams to an S3 multipart upload."""
+
+    def __init__(
+        self,
+        s3_client: Any,
+        bucket: str,
+        key: str,
+        part_bytes: int | None = None,
+        metadata: dict[str, str] | None = None,
+    ) -> None:
+        """Initialize; the upload is only created once the first part is full."""
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.part_bytes = max(part_bytes or settings.s3_multipart_part_bytes, MIN_PART_BYTES)
+        self.metadata = metadata or {}
+        self.closed = False
+        self._buffer = bytearray()
+        self._position = 0
+        self._upload_id: str | None = None
+        self._parts: list[dict[str, Any]] = []
+
+    def writable(self) -> bool:
+        """File-object protocol."""
+        return True
+
+    def write(self, data: bytes) -> int:
+        """Buffer bytes, uploading a part whenever the buffer is full."""
+        self._buffer += data
+        self._position += len(data)
+        if len(self._buffer) >= self.part_bytes:
+            self._upload_part()
+        return len(data)
+
+    def tell(self) -> int:
+        """Bytes written so far."""
+        return self._position
+
+    def flush(self) -> None:
+        """File-object protocol; parts are uploaded as they fill."""
+
+    def _upload_part(self) -> None:
+        """Upload the buffered bytes as the next part."""
+        if self._upload_id is None:
+            response = self.s3_client.create_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                ContentType="application/octet-stream",
+                Metadata=self.metadata,
+            )
+            self._upload_id = response["UploadId"]
+        number = len(self._parts) + 1
+        response = self.s3_client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=number,
+            Body=bytes(self._buffer),
+        )
+        self._parts.append({"ETag": response["ETag"], "PartNumber": number})
+        self._buffer = bytearray()
+
+    def close(self) -> None:
+        """Upload the remainder and complete the object."""
+        if self.closed:
+            return
+        if self._upload_id is None:
+            # Small file: a single PUT is cheaper than a multipart upload
+            self.s3_client.put_object(
+                Bucket=self.bucket,
+                Key=self.key,
+                Body=bytes(self._buffer),
+                ContentType="application/octet-stream",
+                Metadata={**self.metadata, "size_bytes": str(self._position)},
+            )
+        else:
+            if self._buffer:
+                self._upload_part()
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self._upload_id,
+                MultipartUpload={"Parts": self._parts},
+            )
+        self._buffer = bytearray()
+        self.closed = True
+
+    def abort(self) -> None:
+        """Abort an unfinished upload, or delete the object if it was completed."""
+        if self.closed:
+            self.s3_client.delete_object(Bucket=self.bucket, Key=self.key)
+        elif self._upload_id is not None:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self._upload_id
+            )
+        self._buffer = bytearray()
+        self.closed = True
+
+
+class LocalFileSink:
+    """Sink writing to the local filesystem, for development and benchmarks."""
+
+    def __init__(self, path: str) -> None:
+        """Open ``path`` for writing, creating parent directories."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._file = open(path, "wb")  # pylint: disable=consider-using-with
+
+    @property
+    def closed(self) -> bool:
+        """File-object protocol."""
+        return self._file.closed
+
+    def writable(self) -> bool:
+        """File-object protocol."""
+        return True
+
+    def write(self, data: bytes) -> int:
+        """Write bytes."""
+        return self._file.write(data)
+
+    def tell(self) -> int:
+        """Bytes written so far."""
+        return self._file.tell()
+
+    def flush(self) -> None:
+        """Flush to the OS."""
+        self._file.flush()
+
+    def close(self) -> None:
+        """Close the file."""
+        self._file.close()
+
+    def abort(self) -> None:
+        """Close and remove the file."""
+        self._file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+@dataclass
+class WrittenFile:
+    """A completed Parquet file."""
+
+    key: str
+    tenant_id: str
+    partition_date: str
+    rows: int
+    size_bytes: int
+
+
+@dataclass
+class _OpenFile:
+    key: str
+    tenant_id: str
+    partition_date: str
+    sink: Any
+    writer: pq.ParquetWriter
+    builder: RecordBatchBuilder
+    opened_at: float
+    rows: int = 0
+
+
+class PartitionedParquetWriter:
+    """Writes records into per-tenant, per-date Parquet files with bounded memory.
+
+    Defaults to raw events; other record types pass their own ``schema``,
+    ``partition`` (record -> tenant, date) and ``row`` (record -> values).
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        open_sink: Callable[[str], Sink],
+        *,
+        prefix: str | None = None,
+        schema: pa.Schema = RAW_EVENT_SCHEMA,
+        partition: Callable[[Any], tuple[str, str]] = event_partition,
+        row: Callable[[Any], tuple[Any, ...]] = raw_event_row,
+        file_prefix: str = "events",
+        row_group_size: int | None = None,
+        max_file_bytes: int | None = None,
+        max_file_age: float | None = None,
+        max_open_files: int | None = None,
+        compression: str | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize; limits default to settings. ``open_sink`` maps a key to a sink."""
+        self.open_sink = open_sink
+        self.prefix = prefix if prefix is not None else settings.s3_prefix_events
+        self.schema = schema
+        self.partition = partition
+        self.row = row
+        self.file_prefix = file_prefix
+        self.row_group_size = row_group_size or settings.parquet_row_group_size
+        self.max_file_bytes = max_file_bytes or settings.parquet_max_file_bytes
+        self.max_file_age = max_file_age or settings.parquet_max_file_age_seconds
+        self.max_open_files = max_open_files or settings.parquet_max_open_files
+        self.compression = compression or settings.parquet_compression
+        self.clock = clock
+        self.written: list[WrittenFile] = []
+        self._open: dict[tuple[str, str], _OpenFile] = {}
+        self._completed: list[Sink] = []
+
+    def write(self, records: Iterable[Any]) -> None:
+        """Append records, flushing row groups and rolling files as they fill."""
+        partition, row = self.partition, self.row
+        for record in records:
+            tenant_id, partition_date = partition(record)
+            current = self._open.get((tenant_id, partition_date))
+            if current is None:
+                current = self._open_file(tenant_id, partition_date)
+            current.builder.append(row(record))
+            if len(current.builder) >= self.row_group_size:
+                self._flush_row_group(current)
+                if current.sink.tell() >= self.max_file_bytes:
+                    self._close_file(current)
+        self.roll_expired()
+
+    def roll_expired(self) -> None:
+        """Close files that have been open longer than ``max_file_age``."""
+        now = self.clock()
+        for current in list(self._open.values()):
+            if now - current.opened_at >= self.max_file_age:
+                self._close_file(current)
+
+    def close(self) -> list[WrittenFile]:
+        """Finish every open file and return all files written."""
+        for current in list(self._open.values()):
+            self._close_file(current)
+        return self.written
+
+    def abort(self) -> None:
+        """Discard open files and delete the ones already completed."""
+        pending = [(f.sink, f.key) for f in self._open.values()]
+        pending += [(sink, f.key) for sink, f in zip(self._completed, self.written, strict=True)]
+        for sink, key in pending:
+            try:
+                sink.abort()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.warning("Failed to remove partial output", key=key, error=str(e))
+        self._open.clear()
+        self._completed = []
+        self.written = []
+
+    def _open_file(self, tenant_id: str, partition_date: str) -> _OpenFile:
+        """Start a new file for a partition, closing the oldest if too many are open."""
+        if len(self._open) >= self.max_open_files:
+            oldest = min(self._open.values(), key=lambda f: f.opened_at)
+            self._close_file(oldest)
+        key = partition_key(self.prefix, tenant_id, partition_date, self.file_prefix)
+        sink = self.open_sink(key)
+        writer = pq.ParquetWriter(
+            sink,
+            self.schema,
+            compression=self.compression,
+            use_dictionary=True,
+            write_statistics=True,
+        )
+        current = _OpenFile(
+            key=key,
+            tenant_id=tenant_id,
+            partition_date=partition_date,
+            sink=sink,
+            writer=writer,
+            builder=RecordBatchBuilder(self.schema),
+            opened_at=self.clock(),
+        )
+        self._open[(tenant_id, partition_date)] = current
+        return current
+
+    def _flush_row_group(self, current: _OpenFile) -> None:
+        """Write the buffered rows as one row group."""
+        if len(current.builder):
+            batch = current.builder.flush()
+            current.writer.write_batch(batch)
+            current.rows += batch.num_rows
+
+    def _close_file(self, current: _OpenFile) -> None:
+        """Flush, write the footer and finish the upload."""
+        self._flush_row_group(current)
+        current.writer.close()
+        size = current.sink.tell()
+        current.sink.close()
+        del self._open[(current.tenant_id, current.partition_date)]
+        self._completed.append(current.sink)
+        self.written.append(
+            WrittenFile(
+                key=current.key,
+                tenant_id=current.tenant_id,
+                partition_date=current.partition_date,
+                rows=current.rows,
+                size_bytes=size,
+            )
+        )
@@ -1,26 +1,34 @@
 """S3 service for writing Parquet files."""
 
 import asyncio
-import io
-import uuid
 from datetime import datetime
 from typing import Any
 
 import boto3
-
-# pylint: disable=import-error
-import pandas as pd
-import pyarrow as pa
-import pyarrow.parquet as pq
 import structlog
 
 # pylint: disable=import-error,no-name-in-module
 from app.config import settings
-from app.models import RawEvent
-from botocore.exceptions import ClientError, NoCredentialsError
+from app.models import MasteryDelta, MinuteMetrics, RawEvent, SessionMetrics
+from app.services.parquet_stream import (
+    PartitionedParquetWriter,
+    S3MultipartSink,
+    WrittenFile,
+    model_row,
+    model_schema,
+)
+from app.services.rollups import RollupBatch
+from botocore.exceptions import BotoCoreError, ClientError, NoCredentialsError
 
 logger = structlog.get_logger(__name__)
 
+# Rollup kind -> model; files go under s3_prefix_rollups/<kind>/
+ROLLUP_MODELS = {
+    "minute_metrics": MinuteMetrics,
+    "session_metrics": SessionMetrics,
+    "mastery_deltas": MasteryDelta,
+}
+
 
 class S3ParquetWriter:
     """S3 service for writing events as Parquet files."""
@@ -57,129 +65,137 @@ class S3ParquetWriter:
             logger.error("Failed to initialize S3 client", error=str(e))
             raise
 
-    async def write_events_to_s3(self, events: list[RawEvent]) -> str | None:
-        """Write events to S3 as Parquet file.
+    async def write_events_to_s3(self, events: list[RawEvent]) -> list[str]:
+        """Write events to S3 as Parquet files partitioned by tenant and date.
 
         Args:
             events: List of events to write
 
         Returns:
-            S3 key of written file or None if failed
+            S3 keys of the written files, or an empty list if the write failed
         """
         if not events:
-            return None
+            return []
 
         try:
-            # Generate S3 key with partitioning
-            partition_date = events[0].partition_date or datetime.now().strftime("%Y-%m-%d")
-            batch_id = str(uuid.uuid4())
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-            s3_key = (
-                f"{settings.s3_prefix_events}"
-                f"year={partition_date[:4]}/"
-                f"month={partition_date[5:7]}/"
-                f"day={partition_date[8:10]}/"
-                f"events_{timestamp}_{batch_id}.parquet"
-            )
-
-            # Convert events to DataFrame
-            event_dicts = [event.model_dump() for event in events]
-            df = pd.DataFrame(event_dicts)
-
-            # Optimize data types
-            df = self._optimize_dataframe(df)
-
-            # Convert to Parquet
-            parquet_buffer = io.BytesIO()
-            table = pa.Table.from_pandas(df)
-
-            pq.write_table(
-                table,
-                parquet_buffer,
-                compression=settings.parquet_compression,
-                row_group_size=settings.parquet_row_group_size,
-                use_dictionary=True,
-                write_statistics=True,
-            )
-
-            # Upload to S3
-            parquet_buffer.seek(0)
-            file_size = len(parquet_buffer.getvalue())
-
-            await asyncio.get_event_loop().run_in_executor(
-                None,
-                self._upload_to_s3,
-                settings.s3_bucket_raw_events,
-                s3_key,
-                parquet_buffer.getvalue(),
-                file_size,
+            written = await asyncio.get_event_loop().run_in_executor(
+                None, self._write_partitioned, events
             )
 
             # Update metrics
-            self._metrics["files_written"] += 1
+            size = sum(f.size_bytes for f in written)
+            self._metrics["files_written"] += len(written)
             self._metrics["events_written"] += len(events)
-            self._metrics["bytes_written"] += file_size
+            self._metrics["bytes_written"] += size
             self._metrics["last_write_time"] = datetime.now()
 
             logger.info(
                 "Successfully wrote events to S3",
-                s3_key=s3_key,
+                s3_keys=[f.key for f in written],
                 event_count=len(events),
-                file_size_bytes=file_size,
+                file_size_bytes=size,
                 bucket=settings.s3_bucket_raw_events,
             )
 
-            return s3_key
+            return [f.key for f in written]
 
         # pylint: disable=broad-exception-caught
         except Exception as e:
             logger.error("Failed to write events to S3", error=str(e), event_count=len(events))
             self._metrics["write_errors"] += 1
-            return None
+            return []
+
+    def _write_partitioned(self, events: list[RawEvent]) -> list[WrittenFile]:
+        """Stream events into partitioned Parquet uploads (synchronous).
+
+        Every file is completed before returning, so the caller can commit
+        offsets once this succeeds. On failure, files already written by
+        this call are removed.
+        """
+        writer = PartitionedParquetWriter(self._open_sink)
+        try:
+            writer.write(events)
+            return writer.close()
+        except (ClientError, BotoCoreError) as e:
+            logger.error("S3 upload failed", error=str(e), bucket=settings.s3_bucket_raw_events)
+            writer.abort()
+            raise
+        except Exception:
+            writer.abort()
+            raise
+
+    async def write_rollups(self, batch: RollupBatch) -> list[str]:
+        """Write finalized rollup rows to S3, one Parquet file per kind, tenant and date.
+
+        Returns:
+            S3 keys of the written files, or an empty list if there was
+            nothing to write or the write failed
+        """
+        if not batch:
+            return []
 
-    def _upload_to_s3(self, bucket: str, key: str, data: bytes, size: int) -> None:
-        """Upload data to S3 (synchronous)."""
         try:
-            self.s3_client.put_object(
-                Bucket=bucket,
-                Key=key,
-                Body=data,
-                ContentType="application/octet-stream",
-                Metadata={
-                    "source": "etl-jobs",
-                    "format": "parquet",
-                    "compression": settings.parquet_compression,
-                    "size_bytes": str(size),
-                },
+            written = await asyncio.get_event_loop().run_in_executor(
+                None, self._write_rollups, batch
             )
-        except ClientError as e:
-            logger.error("S3 upload failed", error=str(e), bucket=bucket, key=key, size_bytes=size)
+            self._metrics["files_written"] += len(written)
+            self._metrics["bytes_written"] += sum(f.size_bytes for f in written)
+            logger.info(
+                "Wrote rollups to S3",
+                s3_keys=[f.key for f in written],
+                minute_rows=len(batch.minutes),
+                session_rows=len(batch.sessions),
+                mastery_rows=len(batch.mastery),
+            )
+            return [f.key for f in written]
+
+        # pylint: disable=broad-exception-caught
+        except Exception as e:
+            logger.error("Failed to write rollups to S3", error=str(e), row_count=len(batch))
+            self._metrics["write_errors"] += 1
+            return []
+
+    def _write_rollups(self, batch: RollupBatch) -> list[WrittenFile]:
+        """Write each kind of rollup row (synchronous); all-or-nothing per call."""
+        writers = []
+        try:
+            for kind, rows in (
+                ("minute_metrics", batch.minutes),
+                ("session_metrics", batch.sessions),
+                ("mastery_deltas", batch.mastery),
+            ):
+                if not rows:
+                    continue
+                schema = model_schema(ROLLUP_MODELS[kind])
+                model_values = model_row(schema)
+                writer = PartitionedParquetWriter(
+                    self._open_sink,
+                    prefix=f"{settings.s3_prefix_rollups}{kind}/",
+                    schema=schema,
+                    partition=lambda item: (item[0], item[1].partition_date),
+                    row=lambda item, values=model_values: values(item[1]),
+                    file_prefix=kind,
+                )
+                writers.append(writer)
+                writer.write(rows)
+            return [written for writer in writers for written in writer.close()]
+        except Exception:
+            for writer in writers:
+                writer.abort()
             raise
 
-    def _optimize_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Optimize DataFrame for Parquet storage."""
-        # Convert timestamp columns to proper datetime
-        if "timestamp" in df.columns:
-            df["timestamp"] = pd.to_datetime(df["timestamp"])
-        if "processed_at" in df.columns:
-            df["processed_at"] = pd.to_datetime(df["processed_at"])
-
-        # Convert string columns to category where appropriate
-        categorical_columns = ["event_type", "version", "partition_date"]
-        for col in categorical_columns:
-            if col in df.columns:
-                df[col] = df[col].astype("category")
-
-        # Ensure consistent data types
-        if "learner_id" in df.columns:
-            df["learner_id"] = df["learner_id"].astype("string")
-        if "event_id" in df.columns:
-            df["event_id"] = df["event_id"].astype("string")
-        if "session_id" in df.columns:
-            df["session_id"] = df["session_id"].astype("string")
-
-        return df
+    def _open_sink(self, key: str) -> S3MultipartSink:
+        """Multipart upload sink for one Parquet file."""
+        return S3MultipartSink(
+            self.s3_client,
+            settings.s3_bucket_raw_events,
+            key,
+            metadata={
+                "source": "etl-jobs",
+                "format": "parquet",
+                "compression": settings.parquet_compression,
+            },
+        )
 
     async def health_check(self) -> dict[str, Any]:
         """Check S3 connectivity."""
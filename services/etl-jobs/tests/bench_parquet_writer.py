@@ -0,0 +1,151 @@
+"""Memory and throughput: pandas Parquet path vs the streaming Arrow writer.
+
+Each writer runs in its own subprocess so peak RSS is measured cleanly. The
+pandas path is the previous implementation: model_dump, DataFrame, Arrow
+table, an in-memory Parquet buffer, then one PUT. The streaming path appends
+into row-group builders and uploads multipart parts as they fill. Objects go
+to a moto S3 mock, or to a temp directory with ``--backend local``. Not
+collected by pytest; run it directly:
+
+    python -m tests.bench_parquet_writer --events 500000
+"""
+
+import argparse
+import io
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import UTC, datetime, timedelta
+
+# pylint: disable=import-error,no-name-in-module
+from app.models import RawEvent
+
+
+def _events(count: int):
+    start = datetime(2025, 9, 5, tzinfo=UTC)
+    for i in range(count):
+        timestamp = start + timedelta(milliseconds=100 * i)
+        yield RawEvent(
+            learner_id=f"learner_{i % 5000}",
+            event_type=("page_view", "interaction", "lesson_complete")[i % 3],
+            event_id=f"evt_{i:012d}",
+            session_id=f"session_{i % 800}",
+            timestamp=timestamp,
+            data={"lesson_id": f"lesson_{i % 120}", "element": "next_button", "score": i % 100},
+            metadata={"tenant_id": f"district_{i % 4}", "source": "web_app"},
+            processed_at=timestamp,
+            partition_date=timestamp.strftime("%Y-%m-%d"),
+        )
+
+
+def _pandas_write(events: list[RawEvent], put) -> int:
+    """The previous write path, kept here for comparison."""
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+    import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+
+    df = pd.DataFrame([event.model_dump() for event in events])
+    for col in ["event_type", "version", "partition_date"]:
+        df[col] = df[col].astype("category")
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_pandas(df), buffer, compression="snappy", row_group_size=100000)
+    put("events/pandas.parquet", buffer.getvalue())
+    return 1
+
+
+def _run(mode: str, count: int, backend: str) -> None:
+    """Write ``count`` events with one writer and print a JSON result line."""
+    # pylint: disable=import-outside-toplevel
+    from app.services.parquet_stream import (
+        LocalFileSink,
+        PartitionedParquetWriter,
+        S3MultipartSink,
+    )
+
+    # Events are produced up front, as a Kafka batch would be
+    events = list(_events(count))
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    directory = tempfile.mkdtemp()
+
+    if backend == "moto":
+        import boto3
+        from moto import mock_aws
+
+        mock = mock_aws()
+        mock.start()
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket="bench")
+
+        def put(key: str, data: bytes) -> None:
+            s3.put_object(Bucket="bench", Key=key, Body=data)
+
+        def open_sink(key: str):
+            return S3MultipartSink(s3, "bench", key)
+
+    else:
+
+        def put(key: str, data: bytes) -> None:
+            sink = LocalFileSink(f"{directory}/{key}")
+            sink.write(data)
+            sink.close()
+
+        def open_sink(key: str):
+            return LocalFileSink(f"{directory}/{key}")
+
+    started = time.perf_counter()
+    if mode == "pandas":
+        files = _pandas_write(events, put)
+    else:
+        writer = PartitionedParquetWriter(open_sink, prefix="events/", row_group_size=20_000)
+        writer.write(events)
+        files = len(writer.close())
+    elapsed = time.perf_counter() - started
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(
+        json.dumps(
+            {
+                "mode": mode,
+                "files": files,
+                "seconds": round(elapsed, 2),
+                "events_per_second": round(count / elapsed),
+                "peak_rss_delta_mb": round((peak - baseline) / 1024, 1),
+            }
+        )
+    )
+
+
+def main() -> None:
+    """Parse arguments and run both writers."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=500_000)
+    parser.add_argument("--backend", choices=["moto", "local"], default="moto")
+    parser.add_argument("--mode", choices=["pandas", "arrow"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        _run(args.mode, args.events, args.backend)
+        return
+
+    print(f"events: {args.events}  backend: {args.backend}")
+    for mode in ("pandas", "arrow"):
+        output = subprocess.run(
+            [sys.executable, "-m", "tests.bench_parquet_writer", "--mode", mode]
+            + ["--events", str(args.events), "--backend", args.backend],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{mode:>7}: {result['events_per_second']:>9,} events/s  "
+            f"peak RSS +{result['peak_rss_delta_mb']:>7.1f} MB  "
+            f"({result['files']} files, {result['seconds']}s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
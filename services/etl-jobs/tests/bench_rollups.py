@@ -0,0 +1,85 @@
+"""Throughput of the streaming rollups.
+
+Feeds synthetic events in Kafka-sized batches through ``StreamingRollups``
+and times ``process()`` only; event generation is excluded. Not collected by
+pytest; run it directly:
+
+    python -m tests.bench_rollups --events 2000000
+"""
+
+import argparse
+import time
+from datetime import UTC, datetime, timedelta
+
+# pylint: disable=import-error,no-name-in-module
+from app.models import RawEvent
+from app.services.rollups import StreamingRollups
+
+EVENT_TYPES = (
+    "page_view",
+    "interaction",
+    "interaction",
+    "lesson_start",
+    "assessment_start",
+    "assessment_complete",
+    "lesson_complete",
+)
+
+
+def _batch(offset: int, size: int, learners: int) -> list[RawEvent]:
+    start = datetime(2025, 9, 5, tzinfo=UTC)
+    events = []
+    for i in range(offset, offset + size):
+        event_type = EVENT_TYPES[i % len(EVENT_TYPES)]
+        learner = i % learners
+        data = {"page_id": f"page_{i % 40}"}
+        if event_type == "assessment_complete":
+            data = {"assessment_id": f"assess_{i % 25}", "score": i % 101, "max_score": 100}
+        events.append(
+            RawEvent.model_construct(
+                learner_id=f"learner_{learner}",
+                event_type=event_type,
+                event_id=f"evt_{i}",
+                session_id=f"session_{learner}_{i // (learners * 200)}",
+                # ~50 events/s overall, with some jitter out of order
+                timestamp=start + timedelta(milliseconds=20 * i - 7_000 * (i % 3)),
+                data=data,
+                metadata={"tenant_id": f"district_{learner % 4}"},
+            )
+        )
+    return events
+
+
+def main() -> None:
+    """Run the benchmark and print events per second."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=2_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--learners", type=int, default=500)
+    args = parser.parse_args()
+
+    rollups = StreamingRollups()
+    elapsed = 0.0
+    rows = 0
+    for offset in range(0, args.events, args.batch_size):
+        batch = _batch(offset, min(args.batch_size, args.events - offset), args.learners)
+        started = time.perf_counter()
+        rollups.process(batch)
+        elapsed += time.perf_counter() - started
+        rows += len(rollups.drain())
+
+    started = time.perf_counter()
+    rollups.flush_all()
+    elapsed += time.perf_counter() - started
+    rows += len(rollups.drain())
+
+    metrics = rollups.get_metrics()
+    print(
+        f"{args.events:,} events in {elapsed:.2f}s: "
+        f"{args.events / elapsed:,.0f} events/s, {rows:,} rollup rows, "
+        f"{metrics['late_events_dropped']:,} dropped late"
+    )
+
+
+if __name__ == "__main__":
+    main()
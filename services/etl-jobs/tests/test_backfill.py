@@ -0,0 +1,181 @@
+"""Tests for the checkpointed backfill orchestrator."""
+
+import asyncio
+import time
+from datetime import date, timedelta
+
+import httpx
+import pytest
+
+# pylint: disable=import-error,no-name-in-module
+from app.api import create_app
+from app.services.backfill import (
+    BackfillCheckpoint,
+    BackfillOrchestrator,
+    DayStatus,
+    JobStatus,
+)
+
+START = date(2025, 1, 1)
+
+
+class FakeTransformations:
+    """Transformation service with latency, failures and a concurrency gauge."""
+
+    def __init__(self, latency=0.0, failures=None):
+        self.latency = latency
+        self.failures = dict(failures or {})  # date -> failures left
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def run_daily_transformations(self, target_date):
+        self.calls.append(target_date)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if self.failures.get(target_date, 0) > 0:
+                self.failures[target_date] -= 1
+                raise RuntimeError(f"warehouse error on {target_date}")
+            return {"minute_metrics": 10, "session_metrics": 2}
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def checkpoint_path(tmp_path):
+    return str(tmp_path / "backfill.sqlite3")
+
+
+def _orchestrator(service, path, **kwargs):
+    kwargs.setdefault("concurrency", 5)
+    kwargs.setdefault("max_attempts", 2)
+    kwargs.setdefault("retry_backoff", 0)
+    return BackfillOrchestrator(service, BackfillCheckpoint(path), **kwargs)
+
+
+async def test_days_run_concurrently_up_to_the_limit(checkpoint_path):
+    """Twenty 50ms days at concurrency 5 take ~4 rounds, never exceeding the limit."""
+    service = FakeTransformations(latency=0.05)
+    backfills = _orchestrator(service, checkpoint_path)
+
+    started = time.perf_counter()
+    job_id = backfills.start(START, START + timedelta(days=19))
+    status = await backfills.wait(job_id)
+
+    assert time.perf_counter() - started < 0.5
+    assert service.max_in_flight == 5
+    assert status["status"] == JobStatus.COMPLETED
+    assert status["days"][DayStatus.SUCCEEDED] == 20
+    assert status["progress"] == 1.0
+    assert sorted(service.calls) == [START + timedelta(days=i) for i in range(20)]
+
+
+async def test_failed_days_are_retried_then_resumed_on_restart(checkpoint_path):
+    """A flaky day succeeds on retry; a broken day is failed, then rerun alone after restart."""
+    flaky, broken = START + timedelta(days=1), START + timedelta(days=3)
+    service = FakeTransformations(failures={flaky: 1, broken: 5})
+    backfills = _orchestrator(service, checkpoint_path)
+
+    status = await backfills.wait(backfills.start(START, START + timedelta(days=4)))
+    assert status["status"] == JobStatus.FAILED
+    assert status["failed_days"] == [
+        {"date": broken.isoformat(), "attempts": 2, "error": f"warehouse error on {broken}"}
+    ]
+    assert service.calls.count(flaky) == 2
+
+    # Restart with the warehouse fixed: only the failed day runs again
+    service = FakeTransformations()
+    restarted = _orchestrator(service, checkpoint_path)
+    [job_id] = restarted.resume_incomplete()
+    status = await restarted.wait(job_id)
+
+    assert service.calls == [broken]
+    assert status["status"] == JobStatus.COMPLETED
+    assert not status["failed_days"]
+
+
+async def test_interrupted_backfill_resumes_where_it_stopped(checkpoint_path):
+    """Shutdown mid-run keeps finished days; the restart runs only the rest."""
+    service = FakeTransformations(latency=0.05)
+    backfills = _orchestrator(service, checkpoint_path, concurrency=2)
+    job_id = backfills.start(START, START + timedelta(days=9))
+    await asyncio.sleep(0.12)  # two rounds of two days
+    await backfills.close()
+
+    status = backfills.status(job_id)
+    assert status["status"] == JobStatus.RUNNING
+    assert status["days"][DayStatus.RUNNING] == 0
+    done = status["days"][DayStatus.SUCCEEDED]
+    assert 0 < done < 10
+
+    service = FakeTransformations()
+    restarted = _orchestrator(service, checkpoint_path)
+    assert restarted.resume_incomplete() == [job_id]
+    status = await restarted.wait(job_id)
+    assert len(service.calls) == 10 - done
+    assert status["status"] == JobStatus.COMPLETED
+
+
+async def test_cancelled_backfill_stays_cancelled_until_resumed(checkpoint_path):
+    """Cancel stops the job for good across restarts; an explicit resume finishes it."""
+    service = FakeTransformations(latency=0.05)
+    backfills = _orchestrator(service, checkpoint_path, concurrency=1)
+    job_id = backfills.start(START, START + timedelta(days=5))
+    await asyncio.sleep(0.02)
+
+    assert await backfills.cancel(job_id)
+    assert backfills.status(job_id)["status"] == JobStatus.CANCELLED
+    assert not await backfills.cancel(job_id)
+    assert _orchestrator(service, checkpoint_path).resume_incomplete() == []
+
+    backfills.resume(job_id)
+    status = await backfills.wait(job_id)
+    assert status["status"] == JobStatus.COMPLETED
+    days = backfills.status(job_id, include_days=True)["results"]
+    assert [day["status"] for day in days] == [DayStatus.SUCCEEDED] * 6
+    assert days[0]["results"] == {"minute_metrics": 10, "session_metrics": 2}
+
+
+class StubScheduler:
+    """Just enough of ETLScheduler for the backfill endpoints."""
+
+    def __init__(self, backfills):
+        self.backfills = backfills
+
+    async def start_backfill(self, start_date, end_date):
+        return self.backfills.start(start_date, end_date)
+
+
+class StubProcessor:
+    def __init__(self, backfills):
+        self.etl_scheduler = StubScheduler(backfills)
+
+
+async def test_backfill_api_reports_progress(checkpoint_path):
+    """Backfills are started, polled and cancelled over HTTP."""
+    backfills = _orchestrator(FakeTransformations(latency=0.05), checkpoint_path, concurrency=1)
+    app = create_app(StubProcessor(backfills))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/backfills", json={"start_date": "2025-01-01", "end_date": "2025-01-10"}
+        )
+        assert response.status_code == 202
+        job = response.json()
+        assert job["total_days"] == 10 and job["active"]
+
+        await asyncio.sleep(0.12)
+        progress = (await client.get(f"/backfills/{job['job_id']}")).json()
+        assert 0 < progress["progress"] < 1
+
+        cancelled = (await client.delete(f"/backfills/{job['job_id']}")).json()
+        assert cancelled["status"] == "cancelled" and not cancelled["active"]
+        assert [j["job_id"] for j in (await client.get("/backfills")).json()] == [job["job_id"]]
+
+        assert (await client.get("/backfills/unknown")).status_code == 404
+        response = await client.post(
+            "/backfills", json={"start_date": "2025-01-10", "end_date": "2025-01-01"}
+        )
+        assert response.status_code == 422
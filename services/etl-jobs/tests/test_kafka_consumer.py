@@ -0,0 +1,240 @@
+"""Tests for the Kafka consumer's dead-lettering, retries and offset accounting."""
+
+import json
+
+import pytest
+from aiokafka import ConsumerRecord, TopicPartition
+
+# pylint: disable=import-error,no-name-in-module
+from app.config import settings
+from app.services.dead_letter import DeadLetterStore
+from app.services.event_decoder import decode_events
+from app.services.kafka_consumer import KafkaEventConsumer, OffsetTracker
+
+TOPIC = "events_raw"
+
+
+def _value(event_id, **overrides):
+    event = {
+        "learner_id": "learner_1",
+        "event_type": "interaction",
+        "event_id": event_id,
+        "session_id": "session_1",
+        "timestamp": "2025-09-05T10:00:00+00:00",
+        "data": {"page": "lesson_1"},
+        "metadata": {"tenant_id": "district_a"},
+        **overrides,
+    }
+    return json.dumps(event).encode()
+
+
+class FakeBroker:
+    """In-memory stand-in for the AIOKafkaConsumer calls the consumer makes."""
+
+    def __init__(self, logs):
+        # partition -> [(offset, value)]; offsets may have gaps
+        self.logs = {TopicPartition(TOPIC, p): records for p, records in logs.items()}
+        self.positions = {tp: 0 for tp in self.logs}
+        self.paused = set()
+        self.committed = {}
+        self.commits = []
+
+    async def getmany(self, timeout_ms=0, max_records=None):
+        fetched = {}
+        for tp, log in self.logs.items():
+            if tp in self.paused:
+                continue
+            start = self.positions[tp]
+            records = log[start : start + (max_records or len(log))]
+            if records:
+                fetched[tp] = [
+                    ConsumerRecord(
+                        topic=TOPIC,
+                        partition=tp.partition,
+                        offset=offset,
+                        timestamp=1757066400000,
+                        timestamp_type=0,
+                        key=b"key",
+                        value=value,
+                        checksum=None,
+                        serialized_key_size=3,
+                        serialized_value_size=len(value or b""),
+                        headers=(),
+                    )
+                    for offset, value in records
+                ]
+                self.positions[tp] = start + len(records)
+        return fetched
+
+    def pause(self, *partitions):
+        self.paused.update(partitions)
+
+    def resume(self, *partitions):
+        # aiokafka raises IllegalStateError for partitions it does not own
+        assert set(partitions) <= self.assignment(), "resumed an unassigned partition"
+        self.paused.difference_update(partitions)
+
+    def assignment(self):
+        return set(self.logs)
+
+    def revoke(self, partition):
+        tp = TopicPartition(TOPIC, partition)
+        del self.logs[tp], self.positions[tp]
+        self.paused.discard(tp)
+
+    def seek(self, partition, offset):
+        offsets = [o for o, _ in self.logs[partition]]
+        self.positions[partition] = offsets.index(offset)
+
+    async def commit(self, offsets):
+        for tp, position in offsets.items():
+            assert position >= self.committed.get(tp, 0), "commit went backwards"
+            self.committed[tp] = position
+            self.commits.append((tp.partition, position))
+
+
+class Handler:
+    """Event handler that fails on request."""
+
+    def __init__(self):
+        self.batches = []
+        self.fail_partition_batches = 0
+        self.poison = set()
+
+    async def __call__(self, events):
+        if self.fail_partition_batches:
+            self.fail_partition_batches -= 1
+            return False
+        if any(event.event_id in self.poison for event in events):
+            raise RuntimeError("cannot write poison event")
+        self.batches.append([event.event_id for event in events])
+        return True
+
+
+@pytest.fixture
+def make_consumer(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "kafka_retry_backoff_seconds", 0.0)
+    monkeypatch.setattr(settings, "kafka_max_batch_retries", 2)
+    monkeypatch.setattr(settings, "batch_size", 100)
+
+    def make(logs):
+        handler = Handler()
+        consumer = KafkaEventConsumer(handler, DeadLetterStore(str(tmp_path / "dlq")))
+        consumer.consumer = FakeBroker(logs)
+        return consumer, handler
+
+    return make
+
+
+def test_decode_events_validates_the_batch_and_pinpoints_failures():
+    """Valid batches decode in one pass; bad records are reported by index."""
+    good = [_value(f"evt_{i}") for i in range(3)]
+    decoded = decode_events(good)
+    assert decoded.indexes == [0, 1, 2] and not decoded.errors
+    assert decoded.events[0].partition_date == "2025-09-05"
+    assert decoded.events[0].processed_at is not None
+
+    pretty = json.dumps(json.loads(_value("evt_pretty")), indent=2).encode()
+    decoded = decode_events(
+        [good[0], b"{not json", _value("evt_bad", learner_id=7), pretty, None, good[1]]
+    )
+    assert [event.event_id for event in decoded.events] == ["evt_0", "evt_pretty", "evt_1"]
+    assert decoded.indexes == [0, 3, 5]
+    assert [index for index, _ in decoded.errors] == [1, 2, 4]
+    assert "Expected `str`" in decoded.errors[1][1]
+
+
+async def test_unparseable_records_are_dead_lettered_and_committed(make_consumer):
+    """Bad records keep their original bytes in the store and don't block the commit."""
+    consumer, handler = make_consumer(
+        {0: [(0, _value("evt_0")), (1, b"\xff garbage"), (2, _value("evt_2"))]}
+    )
+
+    await consumer.poll_once()
+
+    assert handler.batches == [["evt_0", "evt_2"]]
+    assert consumer.consumer.committed == {TopicPartition(TOPIC, 0): 3}
+    [entry] = list(consumer.dead_letters.read())
+    assert entry["value"] == b"\xff garbage"
+    assert entry["key"] == b"key"
+    assert (entry["partition"], entry["offset"], entry["reason"]) == (0, 1, "decode_error")
+    assert consumer.get_metrics()["dead_lettered"] == 1
+
+
+async def test_failed_batch_pauses_only_its_partition(make_consumer):
+    """Partition 0 is rewound and retried while partition 1 keeps committing."""
+    consumer, handler = make_consumer(
+        {
+            0: [(0, _value("a0")), (1, _value("a1"))],
+            1: [(10, _value("b10")), (12, _value("b12"))],  # gap after compaction
+        }
+    )
+    handler.fail_partition_batches = 1
+
+    await consumer.poll_once()
+    assert consumer.consumer.paused == {TopicPartition(TOPIC, 0)}
+    assert TopicPartition(TOPIC, 0) not in consumer.consumer.committed
+    assert consumer.consumer.committed[TopicPartition(TOPIC, 1)] == 13
+
+    consumer.consumer.logs[TopicPartition(TOPIC, 1)].append((13, _value("b13")))
+    await consumer.poll_once()
+    assert not consumer.consumer.paused
+    assert consumer.consumer.committed == {
+        TopicPartition(TOPIC, 0): 2,
+        TopicPartition(TOPIC, 1): 14,
+    }
+    assert ["a0", "a1"] in handler.batches
+    assert consumer.get_metrics()["batch_retries"] == 1
+
+
+async def test_revoked_partition_state_is_dropped(make_consumer):
+    """A partition revoked during its backoff is not resumed, and polling carries on."""
+    consumer, handler = make_consumer(
+        {0: [(0, _value("a0"))], 1: [(0, _value("b0"))]}
+    )
+    handler.fail_partition_batches = 1
+
+    await consumer.poll_once()
+    assert consumer.get_metrics()["paused_partitions"] == [0]
+
+    consumer.consumer.revoke(0)
+    consumer.consumer.logs[TopicPartition(TOPIC, 1)].append((1, _value("b1")))
+    await consumer.poll_once()
+
+    assert consumer.get_metrics()["paused_partitions"] == []
+    assert consumer.consumer.committed == {TopicPartition(TOPIC, 1): 2}
+    assert ["a0"] not in handler.batches
+
+
+async def test_repeatedly_failing_record_is_isolated(make_consumer):
+    """After the retry budget, records are retried singly and only the poison one is dropped."""
+    consumer, handler = make_consumer({0: [(i, _value(f"evt_{i}")) for i in range(4)]})
+    handler.poison = {"evt_2"}
+
+    for _ in range(3):
+        await consumer.poll_once()
+
+    assert handler.batches == [["evt_0"], ["evt_1"], ["evt_3"]]
+    assert consumer.consumer.committed == {TopicPartition(TOPIC, 0): 4}
+    [entry] = list(consumer.dead_letters.read())
+    assert (entry["offset"], entry["reason"]) == (2, "handler_failed")
+    assert json.loads(entry["value"])["event_id"] == "evt_2"
+    # Commits never skipped the failed range while it was being retried
+    assert consumer.consumer.commits == [(0, 4)]
+
+
+def test_offset_tracker_commits_contiguous_prefix():
+    """The position stops at the first unfinished offset and follows gaps."""
+    tracker = OffsetTracker()
+    tracker.track([5, 6, 9, 10])
+    tracker.mark_done([6, 9])
+    assert tracker.committable() is None
+
+    tracker.mark_done([5])
+    assert tracker.committable() == 10
+
+    tracker.rewind(10)
+    tracker.track([10, 11])
+    tracker.mark_done([10, 11])
+    assert tracker.committable() == 12
+    assert tracker.position == 12
@@ -0,0 +1,135 @@
+"""Tests for the streaming Parquet writer."""
+
+import json
+from datetime import UTC, datetime, timedelta
+
+import pyarrow.parquet as pq
+
+# pylint: disable=import-error,no-name-in-module
+from app.models import RawEvent
+from app.services import parquet_stream
+from app.services.parquet_stream import (
+    RAW_EVENT_SCHEMA,
+    LocalFileSink,
+    PartitionedParquetWriter,
+    S3MultipartSink,
+)
+
+
+def _events(count, tenants=("district_a",), step=timedelta(minutes=1)):
+    start = datetime(2025, 9, 5, 10, tzinfo=UTC)
+    for i in range(count):
+        timestamp = start + i * step
+        yield RawEvent(
+            learner_id=f"learner_{i % 7}",
+            event_type="interaction",
+            event_id=f"evt_{i}",
+            session_id=f"session_{i % 3}",
+            timestamp=timestamp,
+            data={"page": f"lesson_{i}", "score": i / 10},
+            metadata={"tenant_id": tenants[i % len(tenants)], "source": "web_app"},
+            processed_at=timestamp,
+            partition_date=timestamp.strftime("%Y-%m-%d"),
+        )
+
+
+class FakeS3:
+    """Records S3 calls made by the multipart sink."""
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.calls = []
+
+    def create_multipart_upload(self, Bucket, Key, **_kwargs):
+        self.calls.append("create")
+        self.uploads[Key] = []
+        return {"UploadId": Key}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.calls.append("part")
+        self.uploads[UploadId].append(Body)
+        return {"ETag": f"etag{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.calls.append("complete")
+        assert [p["PartNumber"] for p in MultipartUpload["Parts"]] == list(
+            range(1, len(self.uploads[UploadId]) + 1)
+        )
+        self.objects[Key] = b"".join(self.uploads.pop(UploadId))
+
+    def put_object(self, Bucket, Key, Body, **_kwargs):
+        self.calls.append("put")
+        self.objects[Key] = Body
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId, None)
+
+
+def test_partitions_by_tenant_and_date(tmp_path):
+    """Events land in one file per tenant/date with the fixed schema and JSON payloads."""
+    writer = PartitionedParquetWriter(
+        lambda key: LocalFileSink(str(tmp_path / key)), prefix="events/", row_group_size=100
+    )
+    # 2000 minutes spans two days
+    writer.write(_events(2000, tenants=("district_a", "district_b")))
+    written = writer.close()
+
+    assert sorted((f.tenant_id, f.partition_date) for f in written) == [
+        ("district_a", "2025-09-05"),
+        ("district_a", "2025-09-06"),
+        ("district_b", "2025-09-05"),
+        ("district_b", "2025-09-06"),
+    ]
+    assert sum(f.rows for f in written) == 2000
+    assert all("tenant=" in f.key and "/year=2025/month=09/" in f.key for f in written)
+
+    first = pq.ParquetFile(tmp_path / written[0].key)
+    assert first.schema_arrow == RAW_EVENT_SCHEMA
+    assert first.metadata.num_row_groups > 1
+    row = first.read().slice(0, 1).to_pylist()[0]
+    assert json.loads(row["metadata"])["source"] == "web_app"
+
+
+def test_rolls_files_by_size(tmp_path):
+    """A file is closed and a new one started once it passes max_file_bytes."""
+    writer = PartitionedParquetWriter(
+        lambda key: LocalFileSink(str(tmp_path / key)),
+        prefix="",
+        row_group_size=50,
+        max_file_bytes=4096,
+    )
+    writer.write(_events(1000, step=timedelta(seconds=1)))
+    written = writer.close()
+
+    assert len(written) > 1
+    assert sum(pq.ParquetFile(tmp_path / f.key).metadata.num_rows for f in written) == 1000
+
+
+def test_streams_multipart_upload_and_aborts_on_failure(monkeypatch):
+    """Large files go up in parts; a failed write removes what it already uploaded."""
+    monkeypatch.setattr(parquet_stream, "MIN_PART_BYTES", 64 * 1024)
+    s3 = FakeS3()
+    writer = PartitionedParquetWriter(
+        lambda key: S3MultipartSink(s3, "bucket", key, part_bytes=1),
+        prefix="events/",
+        row_group_size=5_000,
+    )
+    writer.write(_events(30_000, step=timedelta(seconds=1)))
+    [written] = writer.close()
+
+    assert s3.calls.count("part") > 1
+    assert s3.calls[-1] == "complete"
+    assert len(s3.objects[written.key]) == written.size_bytes
+
+    writer = PartitionedParquetWriter(
+        lambda key: S3MultipartSink(s3, "bucket", key), prefix="retry/", max_file_bytes=1
+    )
+    writer.write(_events(10))
+    writer.close()
+    assert any(key.startswith("retry/") for key in s3.objects)
+    writer.abort()
+    assert not any(key.startswith("retry/") for key in s3.objects)
@@ -0,0 +1,296 @@
+"""Tests for the streaming rollups against the warehouse fixtures."""
+
+import csv
+import io
+import json
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import boto3
+import pyarrow.parquet as pq
+
+# pylint: disable=import-error,no-name-in-module
+from app.config import settings
+from app.models import MasteryDelta, MinuteMetrics, RawEvent, SessionMetrics
+from app.services.rollups import StreamingRollups
+from app.services.s3_writer import S3ParquetWriter
+from moto import mock_aws
+
+FIXTURES = Path(__file__).parent.parent / "fixtures"
+
+
+def _load(name, model):
+    with open(FIXTURES / name, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    if model is RawEvent:
+        for row in rows:
+            row["data"] = json.loads(row["data"])
+            row["metadata"] = json.loads(row["metadata"])
+    return [
+        model.model_validate({key: value if value != "" else None for key, value in row.items()})
+        for row in rows
+    ]
+
+
+def _dump(rows):
+    return [model.model_dump() for _, model in rows]
+
+
+def _at(hour, minute):
+    return datetime(2025, 9, 5, hour, minute, tzinfo=UTC)
+
+
+def _session(session_id, learner_id, start, end, close, **counts):
+    """Expected session row; ``close`` is the session end plus the 30 minute gap."""
+    row = {
+        "session_id": session_id,
+        "learner_id": learner_id,
+        "session_start": start,
+        "session_end": end,
+        "duration_seconds": (end - start).total_seconds(),
+        "unique_pages": 0,
+        "total_interactions": 0,
+        "lessons_attempted": 0,
+        "lessons_completed": 0,
+        "assessments_attempted": 0,
+        "assessments_completed": 0,
+        "avg_assessment_score": None,
+        "completion_rate": 0.0,
+        "is_active": False,
+        "last_activity": end,
+        "created_at": close,
+        "updated_at": close,
+        "partition_date": "2025-09-05",
+        **counts,
+    }
+    return SessionMetrics.model_validate(row).model_dump()
+
+
+def _first_mastery(learner_id, content_id, mastery, event_id, session_id, at):
+    """Expected first mastery row for a content item: no previous level, confidence 0.7."""
+    return MasteryDelta.model_validate(
+        {
+            "learner_id": learner_id,
+            "content_id": content_id,
+            "content_type": "assessment",
+            "previous_mastery": None,
+            "current_mastery": mastery,
+            "mastery_delta": mastery,
+            "trigger_event_id": event_id,
+            "trigger_event_type": "assessment_complete",
+            "session_id": session_id,
+            "confidence_score": 0.7,
+            "evidence_count": 1,
+            "timestamp": at,
+            "created_at": at,
+            "partition_date": "2025-09-05",
+        }
+    ).model_dump()
+
+
+def test_matches_warehouse_fixtures():
+    """Rollups of the raw event fixture equal the warehouse views' output.
+
+    Session and mastery rows are worked out by hand from
+    ``test_raw_events.csv`` and the formulas of ``session_metrics_staging``
+    and ``mastery_deltas_staging``.
+    """
+    rollups = StreamingRollups(allowed_lateness=300, session_gap=1800)
+    rollups.process(_load("test_raw_events.csv", RawEvent))
+    rollups.flush_all()
+    batch = rollups.drain()
+
+    assert _dump(batch.minutes) == [
+        m.model_dump() for m in _load("test_minute_metrics.csv", MinuteMetrics)
+    ]
+    assert _dump(sorted(batch.sessions, key=lambda item: item[1].session_id)) == [
+        # lesson_start, interaction (no page_id), assessment_start,
+        # assessment_complete (85), lesson_complete: 2 completed of 2 started
+        _session(
+            "session_001",
+            "learner_001",
+            _at(10, 0),
+            _at(10, 20),
+            _at(10, 50),
+            total_events=5,
+            total_interactions=1,
+            lessons_attempted=1,
+            lessons_completed=1,
+            assessments_attempted=1,
+            assessments_completed=1,
+            avg_assessment_score=85.0,
+            completion_rate=1.0,
+        ),
+        # page_view of "dashboard", lesson_start, error: 0 completed of 1 started
+        _session(
+            "session_002",
+            "learner_002",
+            _at(11, 0),
+            _at(11, 10),
+            _at(11, 40),
+            total_events=3,
+            unique_pages=1,
+            lessons_attempted=1,
+        ),
+        # Two assessment_complete events (92, 78) 30 minutes apart, within
+        # the gap. No assessment_start was recorded, and the view only counts
+        # assessment_start as an attempt, so nothing was started and the
+        # completion rate is 0.0
+        _session(
+            "session_003",
+            "learner_003",
+            _at(12, 0),
+            _at(12, 30),
+            _at(13, 0),
+            total_events=2,
+            assessments_completed=2,
+            avg_assessment_score=85.0,
+        ),
+    ]
+    # score / max_score, each the first result for its learner and content
+    assert _dump(batch.mastery) == [
+        _first_mastery(
+            "learner_001", "assess_math_001", 0.85, "evt_004", "session_001", _at(10, 15)
+        ),
+        _first_mastery(
+            "learner_003", "assess_math_001", 0.92, "evt_009", "session_003", _at(12, 0)
+        ),
+        _first_mastery(
+            "learner_003", "assess_science_001", 0.78, "evt_010", "session_003", _at(12, 30)
+        ),
+    ]
+    assert {tenant for tenant, _ in batch.minutes} == {"unknown"}
+
+
+def _event(event_id, timestamp, event_type="interaction", session_id="s1", **data):
+    return RawEvent(
+        learner_id="learner_1",
+        event_type=event_type,
+        event_id=event_id,
+        session_id=session_id,
+        timestamp=timestamp,
+        data=data,
+        metadata={"tenant_id": "district_a"},
+    )
+
+
+def test_watermark_admits_late_events_then_drops_them():
+    """Late events count until the watermark passes their window, then are dropped."""
+    start = datetime(2025, 9, 5, 10, tzinfo=UTC)
+    rollups = StreamingRollups(allowed_lateness=120, session_gap=600)
+
+    rollups.process([_event("e1", start), _event("e2", start + timedelta(minutes=2))])
+    assert not rollups.drain()
+
+    # Out of order, but within the allowed lateness
+    rollups.process([_event("e3", start + timedelta(seconds=30))])
+    rollups.process([_event("e4", start + timedelta(minutes=5))])
+    batch = rollups.drain()
+    [(tenant, first)] = batch.minutes[:1]
+    assert tenant == "district_a"
+    assert first.minute_timestamp == start
+    assert first.total_events == 2
+    assert first.time_spent_seconds == 30.0
+    assert not batch.sessions
+
+    # The 10:00 window is finalized, so this one is dropped
+    rollups.process([_event("e5", start + timedelta(seconds=45))])
+    assert rollups.get_metrics()["late_events_dropped"] == 1
+
+    # A gap longer than session_gap starts a new session window
+    rollups.process([_event("e6", start + timedelta(minutes=30))])
+    [(_, session)] = rollups.drain().sessions
+    assert session.total_events == 4
+    assert session.session_end == start + timedelta(minutes=5)
+    assert session.created_at == start + timedelta(minutes=15)
+
+
+def test_mastery_is_ordered_by_event_time():
+    """Assessment results arriving out of order yield deltas in timestamp order."""
+    start = datetime(2025, 9, 5, 10, tzinfo=UTC)
+    complete = "assessment_complete"
+    rollups = StreamingRollups(allowed_lateness=600, session_gap=1800)
+    rollups.process(
+        [
+            _event(
+                "b",
+                start + timedelta(minutes=2),
+                complete,
+                assessment_id="a1",
+                score=9,
+                max_score=10,
+            ),
+            _event("a", start, complete, assessment_id="a1", score=60),
+            _event("c", start + timedelta(minutes=3), complete, assessment_id="a1", score=90),
+        ]
+    )
+    rollups.flush_all()
+    mastery = [row for _, row in rollups.drain().mastery]
+
+    # "c" repeats the previous level, so no row is emitted for it
+    assert [row.trigger_event_id for row in mastery] == ["a", "b"]
+    assert mastery[1].previous_mastery == 0.6
+    assert round(mastery[1].mastery_delta, 6) == 0.3
+    assert mastery[1].confidence_score == 0.65
+
+
+def test_non_numeric_scores_are_skipped_and_counted():
+    """A score such as "N/A" is left out of averages and mastery instead of failing."""
+    start = datetime(2025, 9, 5, 10, tzinfo=UTC)
+    complete = "assessment_complete"
+    rollups = StreamingRollups(allowed_lateness=60, session_gap=600)
+
+    rollups.process(
+        [
+            _event("a", start, complete, assessment_id="a1", score="N/A"),
+            _event("b", start + timedelta(minutes=1), complete, assessment_id="a1", score=80),
+            _event(
+                "c",
+                start + timedelta(minutes=2),
+                complete,
+                assessment_id="a2",
+                score=7,
+                max_score="unknown",
+            ),
+        ]
+    )
+    rollups.flush_all()
+    batch = rollups.drain()
+
+    [(_, session)] = batch.sessions
+    assert session.assessments_completed == 3
+    # Raw scores 80 and 7, as in the warehouse view's AVG(score)
+    assert session.avg_assessment_score == 43.5
+    assert [row.trigger_event_id for _, row in batch.mastery] == ["b"]
+    assert rollups.get_metrics()["invalid_scores"] == 2
+
+
+async def test_write_rollups_to_s3(monkeypatch):
+    """Finalized rows are written under the rollup prefix, one file per kind and partition."""
+    monkeypatch.setattr(settings, "s3_bucket_raw_events", "rollup-test")
+    rollups = StreamingRollups()
+    rollups.process(_load("test_raw_events.csv", RawEvent))
+    rollups.flush_all()
+
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket="rollup-test")
+        writer = S3ParquetWriter()
+        writer.s3_client = s3
+        keys = await writer.write_rollups(rollups.drain())
+
+        assert sorted(key.split("/")[1] for key in keys) == [
+            "mastery_deltas",
+            "minute_metrics",
+            "session_metrics",
+        ]
+        [sessions_key] = [key for key in keys if "/session_metrics/" in key]
+        assert sessions_key.startswith("rollups/session_metrics/tenant=unknown/year=2025/")
+        body = s3.get_object(Bucket="rollup-test", Key=sessions_key)["Body"].read()
+        table = pq.read_table(io.BytesIO(body))
+        assert table.column("session_id").to_pylist() == [
+            "session_001",
+            "session_002",
+            "session_003",
+        ]
+        assert await writer.write_rollups(rollups.drain()) == []
@@ -0,0 +1,365 @@
+"""Sparse index of a learner's IEP goals for scoring evidence in batches."""
+
+import math
+from collections import Counter, defaultdict
+from collections.abc import Hashable, Sequence
+from dataclasses import dataclass
+from itertools import repeat
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from ..models import EvidenceExtraction, IEPGoal
+
+# Pairs of terms treated as similar keywords
+EDUCATIONAL_PATTERNS = [
+    ("math", "mathematics"),
+    ("reading", "literacy"),
+    ("writing", "composition"),
+    ("science", "scientific"),
+    ("social", "history"),
+    ("motor", "movement"),
+    ("communication", "speech"),
+    ("behavior", "conduct"),
+]
+
+SUBJECT_RELATIONSHIPS = {
+    "mathematics": ["math", "arithmetic", "algebra", "geometry"],
+    "language_arts": ["reading", "writing", "literacy", "english"],
+    "science": ["biology", "chemistry", "physics", "scientific"],
+    "social_studies": ["history", "geography", "civics", "social"],
+    "motor_skills": ["physical", "movement", "coordination"],
+    "communication": ["speech", "language", "social"],
+    "behavior": ["social", "emotional", "conduct"],
+}
+
+
+def are_related_subjects(subject1: str, subject2: str) -> bool:
+    """Check if two subjects are related."""
+    for main_subject, related in SUBJECT_RELATIONSHIPS.items():
+        if (
+            (main_subject in subject1 or subject1 in main_subject)
+            and any(rel in subject2 for rel in related)
+        ) or (
+            (main_subject in subject2 or subject2 in main_subject)
+            and any(rel in subject1 for rel in related)
+        ):
+            return True
+
+    return False
+
+
+def subject_match_score(extraction_subjects: set[str], goal_subject: str) -> float:
+    """Calculate subject area match score."""
+    if not extraction_subjects:
+        return 0.0
+
+    # Direct match
+    if goal_subject in extraction_subjects:
+        return 1.0
+
+    # Partial match
+    for subject in extraction_subjects:
+        if (
+            subject in goal_subject
+            or goal_subject in subject
+            or are_related_subjects(subject, goal_subject)
+        ):
+            return 0.7
+
+    return 0.0
+
+
+def metadata_context_score(extraction: EvidenceExtraction) -> float:
+    """Contextual score from an extraction's metadata alone."""
+    score = 0.0
+    metadata = extraction.extraction_metadata
+    if not metadata:
+        return score
+
+    # Check confidence scores
+    if metadata.get("confidence_score", 0) > 0.8:
+        score += 0.3
+
+    # Check extraction method quality
+    if metadata.get("extraction_method", "") in ["analyze_document", "verbose_json"]:
+        score += 0.2
+
+    # Check if multiple extraction types agree
+    if metadata.get("multi_method_agreement", False):
+        score += 0.2
+
+    return score
+
+
+@dataclass
+class LinkageScores:
+    """Per-component scores of a batch of extractions against every goal.
+
+    Each matrix has one row per extraction and one column per goal.
+    """
+
+    keyword: np.ndarray
+    text: np.ndarray
+    subject: np.ndarray
+    context: np.ndarray
+
+    def total(self, weights: dict[str, float]) -> np.ndarray:
+        """Weighted linkage strength."""
+        return (
+            self.keyword * weights["keyword_overlap"]
+            + self.text * weights["text_similarity"]
+            + self.subject * weights["subject_match"]
+            + self.context * weights["context_match"]
+        )
+
+
+class GoalIndex:
+    """A learner's goals embedded once for scoring evidence in bulk.
+
+    Goal texts become L2-normalized TF-IDF rows, with IDF taken from the
+    goals. An evidence batch is scored against every goal with one sparse
+    matrix product. Evidence terms missing from the goal vocabulary get the
+    IDF of an unseen term. They only add to the evidence norm, as they would
+    if both were vectorized together.
+
+    Goal keywords are kept as a sparse keyword-by-goal incidence matrix. For
+    each evidence keyword, the index remembers which goals have a similar
+    keyword. The map is filled lazily and reused for every later batch.
+    """
+
+    def __init__(self, goals: Sequence[IEPGoal]) -> None:
+        """Embed goal texts and index goal keywords."""
+        self.goal_ids = [goal.id for goal in goals]
+        self._setup_text(goals)
+        self._setup_keywords(goals)
+
+        # Distinct subject areas, and each goal's position among them
+        self._subjects = sorted({goal.subject_area.lower() for goal in goals})
+        self._goal_subject = np.array(
+            [self._subjects.index(goal.subject_area.lower()) for goal in goals],
+            dtype=np.int64,
+        )
+        self._subject_matches: dict[frozenset[str], np.ndarray] = {}
+        self._goal_categories = [goal.category.lower() for goal in goals]
+
+    @staticmethod
+    def fingerprint(goals: Sequence[IEPGoal]) -> Hashable:
+        """Key that changes whenever a goal's scored fields change."""
+        return tuple(
+            (
+                goal.id,
+                goal.goal_text,
+                tuple(goal.keywords),
+                goal.subject_area,
+                goal.category,
+            )
+            for goal in goals
+        )
+
+    def _setup_text(self, goals: Sequence[IEPGoal]) -> None:
+        vectorizer = TfidfVectorizer(
+            stop_words="english",
+            ngram_range=(1, 2),
+            norm=None,
+        )
+        self._analyzer = vectorizer.build_analyzer()
+        try:
+            goal_matrix = vectorizer.fit_transform([goal.goal_text for goal in goals])
+        except ValueError:  # No goal has any terms
+            self._vocabulary: dict[str, int] = {}
+            self._idf = np.zeros(0)
+            goal_matrix = sparse.csr_matrix((len(goals), 0))
+        else:
+            self._vocabulary = vectorizer.vocabulary_
+            self._idf = vectorizer.idf_
+
+        # Smoothed IDF of a term no goal contains
+        self._unseen_idf = math.log(1 + len(goals)) + 1.0
+        self._goal_text = normalize(goal_matrix).T.tocsr()  # terms x goals
+
+    def _setup_keywords(self, goals: Sequence[IEPGoal]) -> None:
+        self._keyword_goals: dict[str, list[int]] = defaultdict(list)
+        self._goal_keyword_counts = np.zeros(len(goals))
+        for column, goal in enumerate(goals):
+            keywords = {kw.lower() for kw in goal.keywords}
+            self._goal_keyword_counts[column] = len(keywords)
+            for keyword in keywords:
+                self._keyword_goals[keyword].append(column)
+
+        # Candidates for the prefix and pattern rules (keywords of 4+ chars)
+        self._prefixes: dict[str, set[str]] = defaultdict(set)
+        self._patterns: dict[str, set[str]] = defaultdict(set)
+        patterns = {term for pair in EDUCATIONAL_PATTERNS for term in pair}
+        for keyword in self._keyword_goals:
+            if len(keyword) < 4:
+                continue
+            self._prefixes[keyword[:3]].add(keyword)
+            for pattern in patterns:
+                if pattern in keyword:
+                    self._patterns[pattern].add(keyword)
+
+        self._similar_goals: dict[str, np.ndarray] = {}
+
+    def similar_goals(self, keyword: str) -> np.ndarray:
+        """Goals with a keyword equal, contained in or similar to ``keyword``."""
+        goals = self._similar_goals.get(keyword)
+        if goals is not None:
+            return goals
+
+        similar = {
+            goal_keyword
+            for goal_keyword in self._keyword_goals
+            if keyword in goal_keyword or goal_keyword in keyword
+        }
+        if len(keyword) >= 4:
+            # Same first three characters
+            similar.update(self._prefixes.get(keyword[:3], ()))
+            # Common educational term patterns
+            for first, second in EDUCATIONAL_PATTERNS:
+                if first in keyword:
+                    similar.update(self._patterns.get(second, ()))
+                if second in keyword:
+                    similar.update(self._patterns.get(first, ()))
+
+        goals = np.unique(
+            np.fromiter(
+                (column for kw in similar for column in self._keyword_goals[kw]),
+                dtype=np.int64,
+            )
+        )
+        self._similar_goals[keyword] = goals
+        return goals
+
+    def score(self, extractions: Sequence[EvidenceExtraction]) -> LinkageScores:
+        """Score a batch of extractions against every goal."""
+        return LinkageScores(
+            keyword=self._keyword_scores(extractions),
+            text=self._text_scores(extractions),
+            subject=self._subject_scores(extractions),
+            context=self._context_scores(extractions),
+        )
+
+    def _text_scores(self, extractions: Sequence[EvidenceExtraction]) -> np.ndarray:
+        """Cosine similarity of extraction texts and goal texts."""
+        rows: list[np.ndarray] = []
+        columns: list[int] = []
+        counts: list[int] = []
+
+        for row, extraction in enumerate(extractions):
+            terms = Counter(self._analyzer(extraction.extracted_text or ""))
+            columns.extend(map(self._vocabulary.get, terms, repeat(-1)))
+            counts.extend(terms.values())
+            rows.append(np.full(len(terms), row))
+
+        row_index = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        column_index = np.asarray(columns, dtype=np.int64)
+        known = column_index >= 0
+        idf = np.append(self._idf, self._unseen_idf)  # column -1: unseen terms
+        weights = np.asarray(counts, dtype=np.float64) * idf[column_index]
+
+        squared_norms = np.bincount(
+            row_index,
+            weights=weights * weights,
+            minlength=len(extractions),
+        )
+        scale = np.divide(
+            1.0,
+            np.sqrt(squared_norms),
+            out=np.zeros(len(extractions)),
+            where=squared_norms > 0,
+        )
+
+        row_index, column_index = row_index[known], column_index[known]
+        evidence = sparse.csr_matrix(
+            (weights[known] * scale[row_index], (row_index, column_index)),
+            shape=(len(extractions), len(self._vocabulary)),
+        )
+        return np.asarray((evidence @ self._goal_text).todense())
+
+    def _keyword_scores(
+        self,
+        extractions: Sequence[EvidenceExtraction],
+    ) -> np.ndarray:
+        """Jaccard overlap (0.7) plus the share of similar keywords (0.3)."""
+        exact_rows: list[int] = []
+        exact_columns: list[int] = []
+        similar_rows: list[np.ndarray] = []
+        similar_columns: list[np.ndarray] = []
+        extraction_counts = np.zeros(len(extractions))
+
+        for row, extraction in enumerate(extractions):
+            keywords = {kw.lower() for kw in extraction.keywords}
+            extraction_counts[row] = len(keywords)
+            for keyword in keywords:
+                for column in self._keyword_goals.get(keyword, ()):
+                    exact_rows.append(row)
+                    exact_columns.append(column)
+                goals = self.similar_goals(keyword)
+                similar_rows.append(np.full(len(goals), row))
+                similar_columns.append(goals)
+
+        shape = (len(extractions), len(self.goal_ids))
+        intersection = _count_pairs(exact_rows, exact_columns, shape)
+        partial = _count_pairs(
+            np.concatenate(similar_rows) if similar_rows else [],
+            np.concatenate(similar_columns) if similar_columns else [],
+            shape,
+        )
+
+        extraction_counts = extraction_counts[:, None]
+        goal_counts = self._goal_keyword_counts[None, :]
+        union = extraction_counts + goal_counts - intersection
+        largest = np.maximum(extraction_counts, goal_counts)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            jaccard = np.where(union > 0, intersection / union, 0.0)
+            partial_score = np.where(largest > 0, partial / largest, 0.0)
+
+        scores = jaccard * 0.7 + partial_score * 0.3
+        scores[(extraction_counts == 0) | (goal_counts == 0)] = 0.0
+        return scores
+
+    def _subject_scores(
+        self,
+        extractions: Sequence[EvidenceExtraction],
+    ) -> np.ndarray:
+        """Subject match, computed once per distinct set of subject tags."""
+        scores = np.zeros((len(extractions), len(self.goal_ids)))
+        for row, extraction in enumerate(extractions):
+            tags = frozenset(tag.lower() for tag in extraction.subject_tags)
+            tag_scores = self._subject_matches.get(tags)
+            if tag_scores is None:
+                tag_scores = np.array(
+                    [subject_match_score(tags, subject) for subject in self._subjects]
+                )[self._goal_subject]
+                self._subject_matches[tags] = tag_scores
+            scores[row] = tag_scores
+        return scores
+
+    def _context_scores(
+        self,
+        extractions: Sequence[EvidenceExtraction],
+    ) -> np.ndarray:
+        """Metadata context plus goal category alignment."""
+        categories, goal_category = np.unique(
+            self._goal_categories, return_inverse=True
+        )
+        scores = np.zeros((len(extractions), len(categories)))
+        for row, extraction in enumerate(extractions):
+            metadata_score = metadata_context_score(extraction)
+            tags = [tag.lower() for tag in extraction.subject_tags]
+            for column, category in enumerate(categories):
+                aligned = any(tag in str(category) for tag in tags)
+                scores[row, column] = min(metadata_score + 0.3 * aligned, 1.0)
+        return scores[:, goal_category]
+
+
+def _count_pairs(rows, columns, shape: tuple[int, int]) -> np.ndarray:
+    """Dense count of each (row, column) pair."""
+    counts = sparse.coo_matrix(
+        (np.ones(len(rows)), (rows, columns)),
+        shape=shape,
+    )
+    return counts.toarray()
@@ -1,16 +1,18 @@
 """IEP Goal linkage system for connecting evidence to learning objectives."""
 
+import asyncio
 import logging
 import uuid
+from collections import OrderedDict
 from typing import Any
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import numpy as np
 from sqlalchemy import and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models import EvidenceExtraction, IEPGoal, IEPGoalLinkage
 from ..schemas import BulkLinkageRequest
+from .goal_index import GoalIndex
 
 logger = logging.getLogger(__name__)
 
@@ -20,13 +22,6 @@ class IEPGoalLinker:
 
     def __init__(self) -> None:
         """Initialize IEP goal linker."""
-        self.tfidf_vectorizer = TfidfVectorizer(
-            max_features=500,
-            stop_words="english",
-            ngram_range=(1, 2),
-            min_df=1,
-            max_df=0.8,
-        )
         self.min_linkage_strength = 0.3
         self.similarity_weights = {
             "keyword_overlap": 0.4,
@@ -34,6 +29,9 @@ class IEPGoalLinker:
             "subject_match": 0.2,
             "context_match": 0.1,
         }
+        self.batch_size = 1000
+        self.max_cached_goal_indexes = 256
+        self._goal_indexes: OrderedDict[Any, GoalIndex] = OrderedDict()
 
     async def create_automatic_linkages(
         self,
@@ -161,17 +159,19 @@ class IEPGoalLinker:
         goals_result = await db.execute(goals_query)
         iep_goals = goals_result.scalars().all()
 
-        # Process each extraction
+        # Score all extractions against the goals in batches
+        batch_linkage_data = await self._calculate_batch_linkage_strengths(
+            extractions,
+            iep_goals,
+        )
+
         total_linkages = 0
         auto_validated = 0
         results_by_extraction = {}
 
-        for extraction in extractions:
-            linkage_data = await self._calculate_linkage_strengths(
-                extraction,
-                iep_goals,
-            )
-
+        for extraction, linkage_data in zip(
+            extractions, batch_linkage_data, strict=True
+        ):
             extraction_linkages = 0
             for goal_id, strength, matching_keywords, reason in linkage_data:
                 if strength >= request.min_linkage_strength:
@@ -226,175 +226,90 @@ class IEPGoalLinker:
         Returns:
             List of tuples (goal_id, strength, matching_keywords, reason)
         """
-        if not iep_goals:
-            return []
-
-        linkage_results = []
-
-        for goal in iep_goals:
-            # Calculate different similarity metrics
-            keyword_score = self._calculate_keyword_overlap(extraction, goal)
-            text_score = await self._calculate_text_similarity(extraction, goal)
-            subject_score = self._calculate_subject_match(extraction, goal)
-            context_score = self._calculate_context_match(extraction, goal)
-
-            # Weighted combination
-            total_strength = (
-                keyword_score * self.similarity_weights["keyword_overlap"]
-                + text_score * self.similarity_weights["text_similarity"]
-                + subject_score * self.similarity_weights["subject_match"]
-                + context_score * self.similarity_weights["context_match"]
-            )
-
-            # Get matching keywords
-            matching_keywords = self._get_matching_keywords(extraction, goal)
-
-            # Generate reason
-            reason = self._generate_linkage_reason(
-                keyword_score,
-                text_score,
-                subject_score,
-                context_score,
-                matching_keywords,
-            )
-
-            if total_strength >= self.min_linkage_strength:
-                linkage_results.append(
-                    (
-                        goal.id,
-                        total_strength,
-                        matching_keywords,
-                        reason,
-                    )
-                )
-
-        # Sort by strength (descending)
-        linkage_results.sort(key=lambda x: x[1], reverse=True)
-
+        [linkage_results] = await self._calculate_batch_linkage_strengths(
+            [extraction],
+            iep_goals,
+        )
         return linkage_results
 
-    def _calculate_keyword_overlap(
+    async def _calculate_batch_linkage_strengths(
         self,
-        extraction: EvidenceExtraction,
-        goal: IEPGoal,
-    ) -> float:
-        """Calculate keyword overlap score."""
-        extraction_keywords = {kw.lower() for kw in extraction.keywords}
-        goal_keywords = {kw.lower() for kw in goal.keywords}
-
-        if not extraction_keywords or not goal_keywords:
-            return 0.0
-
-        # Calculate Jaccard similarity
-        intersection = extraction_keywords.intersection(goal_keywords)
-        union = extraction_keywords.union(goal_keywords)
-
-        jaccard_score = len(intersection) / len(union) if union else 0.0
-
-        # Also check partial matches
-        partial_matches = 0
-        for ext_kw in extraction_keywords:
-            for goal_kw in goal_keywords:
-                if (
-                    ext_kw in goal_kw
-                    or goal_kw in ext_kw
-                    or self._are_similar_keywords(ext_kw, goal_kw)
-                ):
-                    partial_matches += 1
-                    break
+        extractions: list[EvidenceExtraction],
+        iep_goals: list[IEPGoal],
+    ) -> list[list[tuple[uuid.UUID, float, list[str], str]]]:
+        """Calculate linkage strengths of many extractions against IEP goals.
 
-        partial_score = partial_matches / max(
-            len(extraction_keywords), len(goal_keywords)
-        )
+        Extractions are scored against the cached goal index in batches of
+        ``batch_size``, yielding to the event loop between batches.
 
-        # Combine scores
-        return jaccard_score * 0.7 + partial_score * 0.3
+        Args:
+            extractions: Evidence extractions
+            iep_goals: List of IEP goals
 
-    async def _calculate_text_similarity(
-        self,
-        extraction: EvidenceExtraction,
-        goal: IEPGoal,
-    ) -> float:
-        """Calculate text similarity using TF-IDF."""
-        extraction_text = extraction.extracted_text or ""
-        goal_text = goal.goal_text
+        Returns:
+            Linkage tuples per extraction, in input order
+        """
+        if not iep_goals:
+            return [[] for _ in extractions]
 
-        if not extraction_text.strip() or not goal_text.strip():
-            return 0.0
+        index = self._get_goal_index(iep_goals)
+        results = []
 
-        try:
-            # Create TF-IDF vectors
-            documents = [extraction_text, goal_text]
-            tfidf_matrix = self.tfidf_vectorizer.fit_transform(documents)
+        for offset in range(0, len(extractions), self.batch_size):
+            batch = extractions[offset : offset + self.batch_size]
+            scores = index.score(batch)
+            strengths = scores.total(self.similarity_weights)
 
-            # Calculate cosine similarity
-            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+            for row, extraction in enumerate(batch):
+                linkage_results = []
+                for column in np.flatnonzero(
+                    strengths[row] >= self.min_linkage_strength
+                ):
+                    goal = iep_goals[column]
 
-            return float(similarity)
+                    # Get matching keywords
+                    matching_keywords = self._get_matching_keywords(extraction, goal)
 
-        except Exception as e:
-            logger.error("Text similarity calculation failed: %s", e)
-            return 0.0
+                    # Generate reason
+                    reason = self._generate_linkage_reason(
+                        scores.keyword[row, column],
+                        scores.text[row, column],
+                        scores.subject[row, column],
+                        scores.context[row, column],
+                        matching_keywords,
+                    )
 
-    def _calculate_subject_match(
-        self,
-        extraction: EvidenceExtraction,
-        goal: IEPGoal,
-    ) -> float:
-        """Calculate subject area match score."""
-        extraction_subjects = {tag.lower() for tag in extraction.subject_tags}
-        goal_subject = goal.subject_area.lower()
-
-        if not extraction_subjects:
-            return 0.0
-
-        # Direct match
-        if goal_subject in extraction_subjects:
-            return 1.0
-
-        # Partial match
-        for subject in extraction_subjects:
-            if (
-                subject in goal_subject
-                or goal_subject in subject
-                or self._are_related_subjects(subject, goal_subject)
-            ):
-                return 0.7
-
-        return 0.0
-
-    def _calculate_context_match(
-        self,
-        extraction: EvidenceExtraction,
-        goal: IEPGoal,
-    ) -> float:
-        """Calculate contextual match score."""
-        score = 0.0
+                    linkage_results.append(
+                        (
+                            goal.id,
+                            float(strengths[row, column]),
+                            matching_keywords,
+                            reason,
+                        )
+                    )
 
-        # Check extraction metadata for additional context
-        if extraction.extraction_metadata:
-            metadata = extraction.extraction_metadata
+                # Sort by strength (descending)
+                linkage_results.sort(key=lambda x: x[1], reverse=True)
+                results.append(linkage_results)
 
-            # Check confidence scores
-            confidence = metadata.get("confidence_score", 0)
-            if confidence > 0.8:
-                score += 0.3
+            await asyncio.sleep(0)
 
-            # Check extraction method quality
-            method = metadata.get("extraction_method", "")
-            if method in ["analyze_document", "verbose_json"]:
-                score += 0.2
+        return results
 
-            # Check if multiple extraction types agree
-            if metadata.get("multi_method_agreement", False):
-                score += 0.2
+    def _get_goal_index(self, iep_goals: list[IEPGoal]) -> GoalIndex:
+        """Goal index for a set of goals, rebuilt only when a goal changes."""
+        fingerprint = GoalIndex.fingerprint(iep_goals)
+        index = self._goal_indexes.get(fingerprint)
 
-        # Check goal category alignment
-        goal_category = goal.category.lower()
-        if any(tag.lower() in goal_category for tag in extraction.subject_tags):
-            score += 0.3
+        if index is None:
+            index = GoalIndex(iep_goals)
+            self._goal_indexes[fingerprint] = index
+            if len(self._goal_indexes) > self.max_cached_goal_indexes:
+                self._goal_indexes.popitem(last=False)
+        else:
+            self._goal_indexes.move_to_end(fingerprint)
 
-        return min(score, 1.0)
+        return index
 
     def _get_matching_keywords(
         self,
@@ -452,60 +367,6 @@ class IEPGoalLinker:
 
         return "; ".join(reasons)
 
-    def _are_similar_keywords(self, kw1: str, kw2: str) -> bool:
-        """Check if two keywords are semantically similar."""
-        # Simple similarity checks
-        if len(kw1) < 4 or len(kw2) < 4:
-            return False
-
-        # Check for common stems or roots
-        if kw1[:3] == kw2[:3]:  # Same first 3 characters
-            return True
-
-        # Check for common educational term patterns
-        educational_patterns = [
-            ("math", "mathematics"),
-            ("reading", "literacy"),
-            ("writing", "composition"),
-            ("science", "scientific"),
-            ("social", "history"),
-            ("motor", "movement"),
-            ("communication", "speech"),
-            ("behavior", "conduct"),
-        ]
-
-        for pattern1, pattern2 in educational_patterns:
-            if (pattern1 in kw1 and pattern2 in kw2) or (
-                pattern2 in kw1 and pattern1 in kw2
-            ):
-                return True
-
-        return False
-
-    def _are_related_subjects(self, subject1: str, subject2: str) -> bool:
-        """Check if two subjects are related."""
-        subject_relationships = {
-            "mathematics": ["math", "arithmetic", "algebra", "geometry"],
-            "language_arts": ["reading", "writing", "literacy", "english"],
-            "science": ["biology", "chemistry", "physics", "scientific"],
-            "social_studies": ["history", "geography", "civics", "social"],
-            "motor_skills": ["physical", "movement", "coordination"],
-            "communication": ["speech", "language", "social"],
-            "behavior": ["social", "emotional", "conduct"],
-        }
-
-        for main_subject, related in subject_relationships.items():
-            if (
-                (main_subject in subject1 or subject1 in main_subject)
-                and any(rel in subject2 for rel in related)
-            ) or (
-                (main_subject in subject2 or subject2 in main_subject)
-                and any(rel in subject1 for rel in related)
-            ):
-                return True
-
-        return False
-
     async def validate_linkage(
         self,
         db: AsyncSession,
@@ -65,7 +65,11 @@ async def lifespan(app: FastAPI):
     )
 
     # Initialize processors
-    keyword_extractor = KeywordExtractor()
+    keyword_extractor = KeywordExtractor(
+        model_dir=os.getenv("KEYWORD_MODEL_DIR", "models/keywords"),
+        max_workers=int(os.getenv("KEYWORD_WORKERS", "0")) or None,
+        persist_every=int(os.getenv("KEYWORD_MODEL_PERSIST_EVERY", "50")),
+    )
     iep_goal_linker = IEPGoalLinker()
 
     # Initialize audit chain
@@ -80,6 +84,7 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down Evidence Service")
+    await keyword_extractor.close()
 
 
 # Create FastAPI app
@@ -265,9 +270,8 @@ async def process_evidence_async(upload_id: uuid.UUID, db: AsyncSession):
             return
 
         # Extract keywords
-        keyword_result = await keyword_extractor.extract_keywords_async(
-            text=extracted_text,
-            upload_id=upload.id,
+        keywords, subject_tags, _ = await keyword_extractor.extract_keywords(
+            extracted_text,
         )
 
         # Link to IEP goals
@@ -275,8 +279,8 @@ async def process_evidence_async(upload_id: uuid.UUID, db: AsyncSession):
             db=db,
             upload_id=upload.id,
             extracted_text=extracted_text,
-            keywords=keyword_result.keywords,
-            subject_tags=keyword_result.subject_tags,
+            keywords=keywords,
+            subject_tags=subject_tags,
         )
 
         # Create audit entries for processing
@@ -288,8 +292,8 @@ async def process_evidence_async(upload_id: uuid.UUID, db: AsyncSession):
             action_details={
                 "extraction_method": upload.file_type,
                 "text_length": len(extracted_text),
-                "keywords_count": len(keyword_result.keywords),
-                "subject_tags": keyword_result.subject_tags,
+                "keywords_count": len(keywords),
+                "subject_tags": subject_tags,
                 **extraction_metadata,
             },
             performed_by=upload.uploaded_by,
@@ -316,7 +320,7 @@ async def process_evidence_async(upload_id: uuid.UUID, db: AsyncSession):
         logger.info(
             "Evidence processing completed for upload %s: %d keywords, %d goal links",
             upload_id,
-            len(keyword_result.keywords),
+            len(keywords),
             len(linkage_results),
         )
 
@@ -0,0 +1,169 @@
+"""Per-tenant corpus IDF models for TF-IDF keyword ranking."""
+
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class CorpusIDFModel:
+    """Document frequencies of one tenant's corpus, updated a document at a time.
+
+    IDF uses the same smoothing as scikit-learn (``ln((1 + N) / (1 + df)) + 1``).
+    A first document therefore ranks by term frequency alone, and common
+    terms lose weight as the corpus grows.
+    """
+
+    def __init__(
+        self,
+        documents: int = 0,
+        document_frequencies: dict[str, int] | None = None,
+        max_terms: int = 200_000,
+        max_df: float = 0.95,
+        min_documents_for_max_df: int = 20,
+    ) -> None:
+        """Initialize an empty (or loaded) model."""
+        self.documents = documents
+        self.document_frequencies = Counter(document_frequencies or {})
+        self.max_terms = max_terms
+        self.max_df = max_df
+        self.min_documents_for_max_df = min_documents_for_max_df
+
+    def add_document(self, terms: Iterable[str]) -> None:
+        """Count a document's distinct terms."""
+        self.documents += 1
+        self.document_frequencies.update(set(terms))
+        if len(self.document_frequencies) > self.max_terms:
+            self._prune()
+
+    def idf(self, term: str) -> float:
+        """Smoothed inverse document frequency of a term."""
+        df = self.document_frequencies.get(term, 0)
+        return math.log((1 + self.documents) / (1 + df)) + 1.0
+
+    def top_terms(
+        self,
+        term_counts: dict[str, int],
+        limit: int,
+        min_length: int,
+    ) -> list[str]:
+        """Terms of a document ranked by TF-IDF against the corpus."""
+        max_count = (
+            self.max_df * self.documents
+            if self.documents >= self.min_documents_for_max_df
+            else math.inf
+        )
+        frequencies = self.document_frequencies
+        scored = [
+            (count * self.idf(term), term)
+            for term, count in term_counts.items()
+            if len(term) >= min_length and frequencies.get(term, 0) <= max_count
+        ]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [term for _, term in scored[:limit]]
+
+    def _prune(self) -> None:
+        """Drop the rarest terms once the vocabulary exceeds ``max_terms``."""
+        keep = int(self.max_terms * 0.9)
+        self.document_frequencies = Counter(
+            dict(self.document_frequencies.most_common(keep))
+        )
+        logger.info("Pruned corpus vocabulary to %d terms", keep)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serializable state."""
+        return {
+            "documents": self.documents,
+            "document_frequencies": dict(self.document_frequencies),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], **kwargs: Any) -> "CorpusIDFModel":
+        """Restore a model saved with ``to_dict``."""
+        return cls(data["documents"], data["document_frequencies"], **kwargs)
+
+
+class CorpusModelStore:
+    """Loads, caches and persists one ``CorpusIDFModel`` per tenant.
+
+    Models are JSON files in ``directory``. A model is saved after every
+    ``persist_every`` documents, and by ``save_all`` on shutdown. Writes go
+    through a temporary file and a rename, so a crash leaves the previous
+    version in place.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        persist_every: int = 50,
+        max_terms: int = 200_000,
+    ) -> None:
+        """Initialize the store; nothing is loaded until a tenant is used."""
+        self.directory = Path(directory)
+        self.persist_every = persist_every
+        self.max_terms = max_terms
+        self._models: dict[str, CorpusIDFModel] = {}
+        self._unsaved: Counter[str] = Counter()
+
+    def get(self, tenant_id: str) -> CorpusIDFModel:
+        """Model of a tenant, loaded from disk on first use."""
+        model = self._models.get(tenant_id)
+        if model is None:
+            model = self._load(tenant_id)
+            self._models[tenant_id] = model
+        return model
+
+    def record_document(self, tenant_id: str) -> dict[str, Any] | None:
+        """Note an added document; returns a snapshot to save when one is due."""
+        self._unsaved[tenant_id] += 1
+        if self._unsaved[tenant_id] < self.persist_every:
+            return None
+        self._unsaved[tenant_id] = 0
+        return self._models[tenant_id].to_dict()
+
+    def save(self, tenant_id: str, snapshot: dict[str, Any]) -> None:
+        """Atomically write a tenant's model snapshot (blocking I/O)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(tenant_id)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    def save_all(self) -> None:
+        """Write every model with unsaved documents (blocking I/O)."""
+        for tenant_id, unsaved in list(self._unsaved.items()):
+            if unsaved:
+                self.save(tenant_id, self._models[tenant_id].to_dict())
+                self._unsaved[tenant_id] = 0
+
+    def _path(self, tenant_id: str) -> Path:
+        return self.directory / f"idf_{_SAFE_NAME.sub('_', tenant_id)}.json"
+
+    def _load(self, tenant_id: str) -> CorpusIDFModel:
+        path = self._path(tenant_id)
+        if not path.exists():
+            return CorpusIDFModel(max_terms=self.max_terms)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            model = CorpusIDFModel.from_dict(data, max_terms=self.max_terms)
+        except (OSError, ValueError, KeyError) as e:
+            logger.error("Failed to load corpus model for tenant %s: %s", tenant_id, e)
+            return CorpusIDFModel(max_terms=self.max_terms)
+        logger.info(
+            "Loaded corpus model for tenant %s: %d documents, %d terms",
+            tenant_id,
+            model.documents,
+            len(model.document_frequencies),
+        )
+        return model
@@ -1,19 +1,31 @@
 """Keyword extraction and subject tagging processors."""
 
+import asyncio
 import logging
 import re
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from typing import Any
 
 import nltk
 import spacy
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
 from ..schemas import KeywordExtractionConfig
+from .corpus_model import CorpusModelStore
+from .subject_matcher import SubjectMatcher
 
 logger = logging.getLogger(__name__)
 
+SPACY_MODEL = "en_core_web_sm"
+DEFAULT_TENANT = "default"
+
+# Same tokenization as TfidfVectorizer(stop_words="english", ngram_range=(1, 3))
+_TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+_MAX_NGRAM = 3
+
 # Subject area keyword mappings following PY LINT HYGIENE
 SUBJECT_KEYWORD_MAPPINGS = {
     "mathematics": {
@@ -518,14 +530,118 @@ SUBJECT_KEYWORD_MAPPINGS = {
 }
 
 
+# Extractors below run in worker processes; spaCy loads once per worker
+_worker_nlp: Any = None
+
+
+def _count_terms(text: str) -> dict[str, int]:
+    """Count the 1-3 word n-grams of a text, without stop words."""
+    tokens = [
+        token
+        for token in _TOKEN_PATTERN.findall(text.lower())
+        if token not in ENGLISH_STOP_WORDS
+    ]
+    counts = Counter(tokens)
+    for n in range(2, _MAX_NGRAM + 1):
+        counts.update(
+            " ".join(tokens[i : i + n]) for i in range(len(tokens) - n + 1)
+        )
+    return dict(counts)
+
+
+@lru_cache(maxsize=8)
+def _yake_extractor(top: int) -> Any:
+    import yake
+
+    return yake.KeywordExtractor(
+        lan="en",
+        n=3,  # n-gram size
+        dedupLim=0.7,
+        top=top,
+    )
+
+
+def _yake_keywords(text: str, top: int, min_length: int) -> list[str]:
+    """Extract keywords using YAKE algorithm."""
+    try:
+        kw_extractor = _yake_extractor(top)
+    except ImportError:
+        logger.warning("YAKE not available, skipping YAKE extraction")
+        return []
+
+    # YAKE returns (keyword, score) tuples with lower scores being better
+    return [
+        keyword
+        for keyword, _ in kw_extractor.extract_keywords(text)
+        if len(keyword) >= min_length
+    ]
+
+
+def _spacy_keywords(text: str, limit: int, min_length: int) -> list[str]:
+    """Extract noun phrases, entities and content words using spaCy."""
+    global _worker_nlp
+
+    if _worker_nlp is None:
+        _worker_nlp = spacy.load(SPACY_MODEL)
+
+    doc = _worker_nlp(text)
+    keywords = set()
+
+    # Add noun phrases
+    for chunk in doc.noun_chunks:
+        phrase = chunk.text.strip().lower()
+        if len(phrase) >= min_length:
+            keywords.add(phrase)
+
+    # Add named entities
+    for ent in doc.ents:
+        entity = ent.text.strip().lower()
+        if len(entity) >= min_length:
+            keywords.add(entity)
+
+    # Add important single words (nouns, adjectives)
+    for token in doc:
+        if (
+            token.pos_ in ["NOUN", "ADJ", "PROPN"]
+            and not token.is_stop
+            and not token.is_punct
+            and len(token.text) >= min_length
+        ):
+            keywords.add(token.text.lower())
+
+    return list(keywords)[:limit]
+
+
 class KeywordExtractor:
-    """Extract keywords and subject tags from text."""
+    """Extract keywords and subject tags from text.
+
+    TF-IDF, YAKE and spaCy run concurrently in a process pool. TF-IDF scores
+    against an IDF model of each tenant's corpus, which is updated with every
+    document and persisted under ``model_dir``.
+    """
+
+    def __init__(
+        self,
+        model_dir: str = "models/keywords",
+        max_workers: int | None = None,
+        persist_every: int = 50,
+        max_terms: int = 200_000,
+    ) -> None:
+        """Initialize keyword extractor.
 
-    def __init__(self) -> None:
-        """Initialize keyword extractor."""
+        Args:
+            model_dir: Directory for the per-tenant corpus models
+            max_workers: Extraction processes (default: CPU count)
+            persist_every: Documents between saves of a tenant's model
+            max_terms: Vocabulary size at which rare terms are pruned
+        """
         self._ensure_nltk_data()
-        self._load_spacy_model()
+        self._check_spacy_model()
         self._setup_tfidf()
+        self.max_workers = max_workers
+        self.models = CorpusModelStore(model_dir, persist_every, max_terms)
+        self.subject_matcher = SubjectMatcher(SUBJECT_KEYWORD_MAPPINGS)
+        self._executor: ProcessPoolExecutor | None = None
 
     def _ensure_nltk_data(self) -> None:
         """Ensure required NLTK data is available."""
@@ -547,19 +663,19 @@ class KeywordExtractor:
             logger.info("Downloading NLTK POS tagger")
             nltk.download("averaged_perceptron_tagger", quiet=True)
 
-    def _load_spacy_model(self) -> None:
-        """Load spaCy model."""
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
+    def _check_spacy_model(self) -> None:
+        """Check the spaCy model is installed; workers load it on first use."""
+        self.spacy_available = spacy.util.is_package(SPACY_MODEL)
+        if not self.spacy_available:
             logger.warning(
-                "spaCy model 'en_core_web_sm' not found. "
-                "Install with: python -m spacy download en_core_web_sm",
+                "spaCy model '%s' not found. "
+                "Install with: python -m spacy download %s",
+                SPACY_MODEL,
+                SPACY_MODEL,
             )
-            self.nlp = None
 
     def _setup_tfidf(self) -> None:
-        """Setup TF-IDF vectorizer."""
+        """Setup TF-IDF vectorizer for subject similarities."""
         self.tfidf_vectorizer = TfidfVectorizer(
             max_features=1000,
             stop_words="english",
@@ -568,16 +684,32 @@ class KeywordExtractor:
             max_df=0.95,
         )
 
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """Process pool for the extractors, started on first use."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def close(self) -> None:
+        """Persist corpus models and stop the worker processes."""
+        await asyncio.to_thread(self.models.save_all)
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, cancel_futures=True)
+
     async def extract_keywords(
         self,
         text: str,
         config: KeywordExtractionConfig | None = None,
+        tenant_id: str = DEFAULT_TENANT,
     ) -> tuple[list[str], list[str], dict[str, Any]]:
         """Extract keywords and subject tags from text.
 
         Args:
             text: Input text to process
             config: Extraction configuration
+            tenant_id: Tenant whose corpus model weights TF-IDF keywords
 
         Returns:
             Tuple of (keywords, subject_tags, metadata)
@@ -591,27 +723,52 @@ class KeywordExtractor:
         # Preprocess text
         cleaned_text = self._preprocess_text(text)
 
-        # Extract keywords using multiple methods
-        keywords_methods = {}
+        # Run the extraction methods concurrently in the process pool
+        loop = asyncio.get_running_loop()
+        limit = config.max_keywords * 2  # Get more for combining
+        jobs = {}
 
         if config.use_tfidf:
-            keywords_methods["tfidf"] = await self._extract_tfidf_keywords(
+            jobs["tfidf"] = loop.run_in_executor(
+                self.executor,
+                _count_terms,
                 cleaned_text,
-                config,
             )
 
         if config.use_yake:
-            keywords_methods["yake"] = await self._extract_yake_keywords(
+            jobs["yake"] = loop.run_in_executor(
+                self.executor,
+                _yake_keywords,
                 cleaned_text,
-                config,
+                limit,
+                config.min_keyword_length,
             )
 
-        if config.use_spacy and self.nlp:
-            keywords_methods["spacy"] = await self._extract_spacy_keywords(
+        if config.use_spacy and self.spacy_available:
+            jobs["spacy"] = loop.run_in_executor(
+                self.executor,
+                _spacy_keywords,
                 cleaned_text,
-                config,
+                limit,
+                config.min_keyword_length,
             )
 
+        results = await asyncio.gather(*jobs.values(), return_exceptions=True)
+
+        keywords_methods = {}
+        for method, result in zip(jobs, results, strict=True):
+            if isinstance(result, Exception):
+                logger.error("%s keyword extraction failed: %s", method, result)
+                keywords_methods[method] = []
+            elif method == "tfidf":
+                keywords_methods[method] = self._rank_tfidf_keywords(
+                    result,
+                    tenant_id,
+                    config,
+                )
+            else:
+                keywords_methods[method] = result
+
         # Combine and rank keywords
         combined_keywords = self._combine_keywords(
             keywords_methods,
@@ -633,6 +790,7 @@ class KeywordExtractor:
                 method: len(keywords) for method, keywords in keywords_methods.items()
             },
             "subject_confidence_threshold": config.subject_confidence_threshold,
+            "corpus_documents": self.models.get(tenant_id).documents,
         }
 
         logger.info(
@@ -658,114 +816,33 @@ class KeywordExtractor:
 
         return " ".join(words)
 
-    async def _extract_tfidf_keywords(
-        self,
-        text: str,
-        config: KeywordExtractionConfig,
-    ) -> list[str]:
-        """Extract keywords using TF-IDF."""
-        try:
-            # Fit TF-IDF on the text
-            tfidf_matrix = self.tfidf_vectorizer.fit_transform([text])
-
-            # Get feature names and scores
-            feature_names = self.tfidf_vectorizer.get_feature_names_out()
-            tfidf_scores = tfidf_matrix.toarray()[0]
-
-            # Create keyword-score pairs
-            keyword_scores = list(zip(feature_names, tfidf_scores, strict=False))
-
-            # Sort by score and filter
-            keyword_scores.sort(key=lambda x: x[1], reverse=True)
-
-            keywords = [
-                keyword
-                for keyword, score in keyword_scores
-                if score > 0 and len(keyword) >= config.min_keyword_length
-            ]
-
-            return keywords[: config.max_keywords * 2]  # Get more for combining
-
-        except Exception as e:
-            logger.error("TF-IDF keyword extraction failed: %s", e)
-            return []
-
-    async def _extract_yake_keywords(
+    def _rank_tfidf_keywords(
         self,
-        text: str,
+        term_counts: dict[str, int],
+        tenant_id: str,
         config: KeywordExtractionConfig,
     ) -> list[str]:
-        """Extract keywords using YAKE algorithm."""
-        try:
-            import yake
-
-            kw_extractor = yake.KeywordExtractor(
-                lan="en",
-                n=3,  # n-gram size
-                dedupLim=0.7,
-                top=config.max_keywords * 2,
+        """Add a document to the tenant's corpus and rank its terms by TF-IDF."""
+        model = self.models.get(tenant_id)
+        model.add_document(term_counts)
+
+        snapshot = self.models.record_document(tenant_id)
+        if snapshot is not None:
+            task = asyncio.create_task(
+                asyncio.to_thread(self.models.save, tenant_id, snapshot),
             )
+            task.add_done_callback(self._log_save_failure)
 
-            keywords_scores = kw_extractor.extract_keywords(text)
-
-            # YAKE returns (keyword, score) tuples with lower scores being better
-            keywords = [
-                keyword
-                for keyword, score in keywords_scores
-                if len(keyword) >= config.min_keyword_length
-            ]
-
-            return keywords
-
-        except ImportError:
-            logger.warning("YAKE not available, skipping YAKE extraction")
-            return []
-        except Exception as e:
-            logger.error("YAKE keyword extraction failed: %s", e)
-            return []
-
-    async def _extract_spacy_keywords(
-        self,
-        text: str,
-        config: KeywordExtractionConfig,
-    ) -> list[str]:
-        """Extract keywords using spaCy NLP."""
-        if not self.nlp:
-            return []
-
-        try:
-            doc = self.nlp(text)
-
-            # Extract noun phrases and named entities
-            keywords = set()
-
-            # Add noun phrases
-            for chunk in doc.noun_chunks:
-                phrase = chunk.text.strip().lower()
-                if len(phrase) >= config.min_keyword_length:
-                    keywords.add(phrase)
-
-            # Add named entities
-            for ent in doc.ents:
-                entity = ent.text.strip().lower()
-                if len(entity) >= config.min_keyword_length:
-                    keywords.add(entity)
-
-            # Add important single words (nouns, adjectives)
-            for token in doc:
-                if (
-                    token.pos_ in ["NOUN", "ADJ", "PROPN"]
-                    and not token.is_stop
-                    and not token.is_punct
-                    and len(token.text) >= config.min_keyword_length
-                ):
-                    keywords.add(token.text.lower())
-
-            return list(keywords)[: config.max_keywords * 2]
+        return model.top_terms(
+            term_counts,
+            config.max_keywords * 2,
+            config.min_keyword_length,
+        )
 
-        except Exception as e:
-            logger.error("spaCy keyword extraction failed: %s", e)
-            return []
+    @staticmethod
+    def _log_save_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Failed to save corpus model: %s", task.exception())
 
     def _combine_keywords(
         self,
@@ -796,39 +873,7 @@ class KeywordExtractor:
         confidence_threshold: float,
     ) -> list[str]:
         """Extract subject area tags based on keywords."""
-        subject_scores = {}
-
-        # Convert text to lowercase for matching
-        text_lower = original_text.lower()
-        keywords_lower = [kw.lower() for kw in keywords]
-
-        for subject, subject_keywords in SUBJECT_KEYWORD_MAPPINGS.items():
-            score = 0.0
-            matches = 0
-
-            # Check keyword matches
-            for keyword in keywords_lower:
-                for subject_keyword in subject_keywords:
-                    if (
-                        keyword == subject_keyword
-                        or keyword in subject_keyword
-                        or subject_keyword in keyword
-                    ):
-                        score += 1.0
-                        matches += 1
-                        break
-
-            # Check direct text matches
-            for subject_keyword in subject_keywords:
-                if subject_keyword in text_lower:
-                    score += 0.5
-                    matches += 1
-
-            # Normalize score
-            if matches > 0:
-                total_possible = len(subject_keywords)
-                normalized_score = min(score / total_possible, 1.0)
-                subject_scores[subject] = normalized_score
+        subject_scores = self.subject_matcher.scores(keywords, original_text)
 
         # Filter by confidence threshold
         confident_subjects = [
@@ -862,6 +907,7 @@ class KeywordExtractor:
             else:
                 SUBJECT_KEYWORD_MAPPINGS[subject] = keywords
 
+        self.subject_matcher = SubjectMatcher(SUBJECT_KEYWORD_MAPPINGS)
         logger.info("Updated subject mappings for %d subjects", len(new_mappings))
 
     async def get_subject_similarities(
@@ -0,0 +1,65 @@
+"""Subject area tagging with a precompiled Aho-Corasick automaton."""
+
+from collections import defaultdict
+
+import ahocorasick
+
+
+class SubjectMatcher:
+    """Scores subject areas against keywords and text in one pass each.
+
+    Every keyword of every subject goes into a single automaton, so finding
+    all the subject keywords in a text is one scan whatever the number of
+    subjects. A keyword also matches a subject when it is a substring of one
+    of that subject's keywords. Those matches come from a precomputed index
+    of every substring of every subject keyword.
+    """
+
+    def __init__(self, mappings: dict[str, set[str]]) -> None:
+        """Compile the automaton and substring index for the given mappings."""
+        self.sizes = {subject: len(words) for subject, words in mappings.items()}
+
+        owners: dict[str, list[str]] = defaultdict(list)
+        for subject, keywords in mappings.items():
+            for keyword in keywords:
+                owners[keyword.lower()].append(subject)
+
+        self._automaton = ahocorasick.Automaton()
+        for keyword, subjects in owners.items():
+            self._automaton.add_word(keyword, (keyword, tuple(subjects)))
+        self._automaton.make_automaton()
+
+        self._fragments: dict[str, set[str]] = defaultdict(set)
+        for keyword, subjects in owners.items():
+            for start in range(len(keyword)):
+                for end in range(start + 1, len(keyword) + 1):
+                    self._fragments[keyword[start:end]].update(subjects)
+
+    def scores(self, keywords: list[str], text: str) -> dict[str, float]:
+        """Normalized score of each subject with at least one match.
+
+        A keyword equal to, containing, or contained in a subject keyword adds
+        1.0 once per subject. Each distinct subject keyword found in the text
+        adds 0.5. The total is divided by the subject's keyword count.
+        """
+        totals: dict[str, float] = defaultdict(float)
+
+        for keyword in keywords:
+            keyword = keyword.lower()
+            subjects = set(self._fragments.get(keyword, ()))
+            for _, (_, keyword_owners) in self._automaton.iter(keyword):
+                subjects.update(keyword_owners)
+            for subject in subjects:
+                totals[subject] += 1.0
+
+        found = {match for _, match in self._automaton.iter(text.lower())}
+        for _, keyword_owners in found:
+            for subject in keyword_owners:
+                totals[subject] += 0.5
+
+        # Subject order follows the mappings, for stable tie-breaking
+        return {
+            subject: min(totals[subject] / size, 1.0)
+            for subject, size in self.sizes.items()
+            if subject in totals
+        }
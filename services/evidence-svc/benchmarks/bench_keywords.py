@@ -0,0 +1,114 @@
+"""Throughput of keyword extraction on the fixtures corpus.
+
+Runs every fixtures document through ``KeywordExtractor.extract_keywords``,
+first one at a time and then with many documents in flight, and reports
+documents per second for each. Subject tagging is also timed on its own,
+the Aho-Corasick matcher against a nested loop over the mappings. Run it
+from the service root:
+
+    python -m benchmarks.bench_keywords --repeat 5 --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from app.processors.keywords import SUBJECT_KEYWORD_MAPPINGS, KeywordExtractor
+from app.processors.subject_matcher import SubjectMatcher
+from app.schemas import KeywordExtractionConfig
+
+CORPUS = Path(__file__).parent / "fixtures" / "evidence_corpus.jsonl"
+
+
+def _load_corpus(repeat: int) -> list[dict]:
+    with open(CORPUS, encoding="utf-8") as f:
+        documents = [json.loads(line) for line in f if line.strip()]
+    return documents * repeat
+
+
+def _nested_loop_scores(keywords: list[str], text: str) -> dict[str, float]:
+    """Subject scoring as done before the automaton, for comparison."""
+    scores = {}
+    text_lower = text.lower()
+    for subject, subject_keywords in SUBJECT_KEYWORD_MAPPINGS.items():
+        score = 0.0
+        for keyword in keywords:
+            for subject_keyword in subject_keywords:
+                if keyword in subject_keyword or subject_keyword in keyword:
+                    score += 1.0
+                    break
+        for subject_keyword in subject_keywords:
+            if subject_keyword in text_lower:
+                score += 0.5
+        if score:
+            scores[subject] = min(score / len(subject_keywords), 1.0)
+    return scores
+
+
+async def _extract_all(
+    extractor: KeywordExtractor,
+    documents: list[dict],
+    config: KeywordExtractionConfig,
+    in_flight: int,
+) -> list[tuple[list[str], list[str], dict]]:
+    semaphore = asyncio.Semaphore(in_flight)
+
+    async def extract(document: dict) -> tuple[list[str], list[str], dict]:
+        async with semaphore:
+            return await extractor.extract_keywords(
+                document["text"],
+                config,
+                tenant_id=document["tenant_id"],
+            )
+
+    return await asyncio.gather(*(extract(document) for document in documents))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--in-flight", type=int, default=16)
+    args = parser.parse_args()
+
+    documents = _load_corpus(args.repeat)
+    config = KeywordExtractionConfig()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        extractor = KeywordExtractor(model_dir=model_dir, max_workers=args.workers)
+        # Start the workers (and load spaCy) outside the timings
+        await _extract_all(extractor, documents[:8], config, 8)
+
+        for label, in_flight in (("sequential", 1), ("concurrent", args.in_flight)):
+            started = time.perf_counter()
+            results = await _extract_all(extractor, documents, config, in_flight)
+            elapsed = time.perf_counter() - started
+            print(
+                f"{label:>10}: {len(documents)} docs in {elapsed:.2f}s "
+                f"({len(documents) / elapsed:,.1f} docs/s, "
+                f"methods {results[0][2]['extraction_methods']})"
+            )
+
+        await extractor.close()
+
+    matcher = SubjectMatcher(SUBJECT_KEYWORD_MAPPINGS)
+    pairs = [
+        (keywords, document["text"])
+        for (keywords, _, _), document in zip(results, documents, strict=True)
+    ]
+    for label, score in (
+        ("nested loop", _nested_loop_scores),
+        ("automaton", matcher.scores),
+    ):
+        started = time.perf_counter()
+        for keywords, text in pairs:
+            score(keywords, text)
+        elapsed = time.perf_counter() - started
+        print(f"subject tags ({label}): {len(pairs) / elapsed:,.0f} docs/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+"""Throughput of bulk IEP goal linkage on synthetic goals.
+
+Builds a learner with ``--goals`` synthetic goals and scores ``--artifacts``
+synthetic evidence extractions against them, as ``process_bulk_linkages``
+does. For comparison, a sample is also scored the old way: one TF-IDF fit
+per (extraction, goal) pair and a pairwise keyword comparison. Run it from
+the service root:
+
+    python -m benchmarks.bench_linkage --goals 40 --artifacts 5000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from types import SimpleNamespace
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from app.linkage.goal_index import EDUCATIONAL_PATTERNS
+from app.linkage.iep_goals import IEPGoalLinker
+from app.processors.keywords import SUBJECT_KEYWORD_MAPPINGS
+
+SUBJECTS = list(SUBJECT_KEYWORD_MAPPINGS)
+VOCABULARY = {
+    subject: sorted(keywords) for subject, keywords in SUBJECT_KEYWORD_MAPPINGS.items()
+}
+FILLER = (
+    "the student will demonstrate improved skills during classroom activities "
+    "with support from staff across settings over the school year"
+).split()
+
+
+def _text(rng: random.Random, subject: str, words: int) -> str:
+    terms = rng.choices(VOCABULARY[subject], k=words // 2)
+    return " ".join(terms + rng.choices(FILLER, k=words - len(terms)))
+
+
+def _goals(rng: random.Random, count: int) -> list[SimpleNamespace]:
+    goals = []
+    for _ in range(count):
+        subject = rng.choice(SUBJECTS)
+        goals.append(
+            SimpleNamespace(
+                id=uuid.uuid4(),
+                goal_text=_text(rng, subject, 30),
+                keywords=rng.sample(VOCABULARY[subject], 8),
+                subject_area=subject,
+                category=rng.choice(["academic", "functional", subject]),
+            )
+        )
+    return goals
+
+
+def _extractions(rng: random.Random, count: int) -> list[SimpleNamespace]:
+    extractions = []
+    for _ in range(count):
+        subject = rng.choice(SUBJECTS)
+        extractions.append(
+            SimpleNamespace(
+                id=uuid.uuid4(),
+                extracted_text=_text(rng, subject, 200),
+                keywords=rng.sample(VOCABULARY[subject], 10),
+                subject_tags=[subject],
+                extraction_metadata={"confidence_score": rng.random()},
+            )
+        )
+    return extractions
+
+
+def _pairwise_score(extraction: SimpleNamespace, goal: SimpleNamespace) -> float:
+    """The per-pair work of the old linker: keyword loops and a TF-IDF refit."""
+    extraction_keywords = {kw.lower() for kw in extraction.keywords}
+    goal_keywords = {kw.lower() for kw in goal.keywords}
+    partial = 0
+    for ext_kw in extraction_keywords:
+        for goal_kw in goal_keywords:
+            if (
+                ext_kw in goal_kw
+                or goal_kw in ext_kw
+                or (min(len(ext_kw), len(goal_kw)) >= 4 and ext_kw[:3] == goal_kw[:3])
+                or any(
+                    (a in ext_kw and b in goal_kw) or (b in ext_kw and a in goal_kw)
+                    for a, b in EDUCATIONAL_PATTERNS
+                )
+            ):
+                partial += 1
+                break
+    vectorizer = TfidfVectorizer(stop_words="english", ngram_range=(1, 2))
+    matrix = vectorizer.fit_transform([extraction.extracted_text, goal.goal_text])
+    return partial + float(cosine_similarity(matrix[0:1], matrix[1:2])[0][0])
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--goals", type=int, default=40)
+    parser.add_argument("--artifacts", type=int, default=5000)
+    parser.add_argument("--sample", type=int, default=25)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    goals = _goals(rng, args.goals)
+    extractions = _extractions(rng, args.artifacts)
+    linker = IEPGoalLinker()
+
+    started = time.perf_counter()
+    results = await linker._calculate_batch_linkage_strengths(extractions, goals)
+    elapsed = time.perf_counter() - started
+    linked = sum(len(linkages) for linkages in results)
+    print(
+        f"batched: {args.artifacts} artifacts x {args.goals} goals in {elapsed:.2f}s "
+        f"({args.artifacts / elapsed:,.0f} artifacts/s, {linked} linkages)"
+    )
+
+    started = time.perf_counter()
+    for extraction in extractions[: args.sample]:
+        for goal in goals:
+            _pairwise_score(extraction, goal)
+    per_artifact = (time.perf_counter() - started) / args.sample
+    print(
+        f"pairwise: {1 / per_artifact:,.1f} artifacts/s "
+        f"(~{per_artifact * args.artifacts:.0f}s for {args.artifacts})"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
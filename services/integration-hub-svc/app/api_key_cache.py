@@ -0,0 +1,436 @@
+"""API key verification cache and batched usage tracking.
+
+Verifying a key is a prefix lookup followed by a constant-time SHA-256 hash
+comparison. Key records are cached in-process and in Redis, keyed by
+``key_prefix``, so most requests never touch the database. Rotation and
+revocation publish the prefix on a Redis channel and every replica drops it
+from its local cache immediately.
+
+A lookup that read the database before a revocation committed must not cache
+what it read after the revocation's invalidation. Invalidating bumps a
+per-prefix version in Redis, and the cache write is a compare-and-set against
+the version read before the database; locally, an invalidation seen during a
+lookup keeps its result out of the in-process cache.
+
+The local cache is an LRU bounded by ``api_key_cache_local_max_entries``, so
+lookups of random unknown prefixes cannot grow it without limit. While the
+invalidation subscription is down, local entries only live for
+``api_key_cache_disconnected_ttl_seconds`` and the listener reconnects with
+backoff.
+
+Usage (``usage_count``/``last_used_at``) is accumulated in memory and flushed
+to the database in one UPDATE per key on a timer, instead of one write per
+request.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import hmac
+import json
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+import redis.asyncio as redis
+import structlog
+from fastapi import Depends, Header, HTTPException, status
+from sqlalchemy import and_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import get_db
+from app.models import ApiKey
+
+logger = structlog.get_logger(__name__)
+
+API_KEY_PREFIX_LENGTH = 12
+
+# KEYS: entry, version; ARGV: version read before the DB, entry JSON, TTL
+_SET_IF_VERSION_UNCHANGED = """
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+@dataclass(frozen=True)
+class CachedApiKey:
+    """Everything needed to authorize a request, without the ORM object."""
+
+    id: str
+    tenant_id: str
+    key_hash: str
+    key_prefix: str
+    scopes: tuple[str, ...]
+    rate_limit_per_minute: Optional[int]
+    expires_at: Optional[str]
+    is_active: bool
+
+    @classmethod
+    def from_model(cls, api_key: ApiKey) -> "CachedApiKey":
+        """Build a cache entry from an ApiKey row."""
+        return cls(
+            id=str(api_key.id),
+            tenant_id=str(api_key.tenant_id),
+            key_hash=api_key.key_hash,
+            key_prefix=api_key.key_prefix,
+            scopes=tuple(api_key.scopes or ()),
+            rate_limit_per_minute=api_key.rate_limit_per_minute,
+            expires_at=api_key.expires_at.isoformat() if api_key.expires_at else None,
+            is_active=api_key.is_active,
+        )
+
+    @property
+    def rate_limit_tier(self) -> int:
+        """Requests per minute allowed for this key."""
+        return self.rate_limit_per_minute or settings.rate_limit_requests_per_minute
+
+    @property
+    def is_expired(self) -> bool:
+        """Check if the API key is expired."""
+        if self.expires_at is None:
+            return False
+        expires_at = datetime.fromisoformat(self.expires_at)
+        now = datetime.now(expires_at.tzinfo) if expires_at.tzinfo else datetime.utcnow()
+        return now > expires_at
+
+    def matches(self, key_hash: str) -> bool:
+        """Constant-time comparison against a presented key's hash."""
+        return hmac.compare_digest(self.key_hash, key_hash)
+
+
+@dataclass
+class _LocalEntry:
+    """In-process cache slot for a key prefix (empty list caches a miss)."""
+
+    keys: list[CachedApiKey]
+    expires_at: float
+
+
+@dataclass
+class _UsageDelta:
+    """Usage accumulated for one key since the last flush."""
+
+    count: int = 0
+    last_used_at: datetime = field(default_factory=datetime.utcnow)
+
+
+def hash_api_key(raw_key: str) -> str:
+    """Hash a raw API key the same way it is stored."""
+    return hashlib.sha256(raw_key.encode()).hexdigest()
+
+
+class ApiKeyCache:
+    """Two-level (in-process + Redis) API key cache with pub/sub invalidation."""
+
+    def __init__(self) -> None:
+        self.redis_client: Optional[redis.Redis] = None
+        self._local: OrderedDict[str, _LocalEntry] = OrderedDict()
+        self._invalidations_connected = False
+        # Bumped on every invalidation seen by this process
+        self._invalidation_seq = 0
+        self._usage: dict[str, _UsageDelta] = {}
+        self._usage_lock = asyncio.Lock()
+        self._tasks: list[asyncio.Task[None]] = []
+        self.hits = 0
+        self.misses = 0
+
+    async def initialize(self) -> None:
+        """Connect to Redis and start the invalidation listener and usage flusher."""
+        try:
+            self.redis_client = redis.from_url(
+                str(settings.redis_url), encoding="utf-8", decode_responses=True
+            )
+            await self.redis_client.ping()
+            self._tasks.append(asyncio.create_task(self._listen_for_invalidations()))
+            logger.info("API key cache connected to Redis")
+        except Exception as e:
+            logger.error("API key cache running without Redis", error=str(e))
+            self.redis_client = None
+
+        self._tasks.append(asyncio.create_task(self._flush_usage_periodically()))
+
+    async def close(self) -> None:
+        """Stop background tasks and flush pending usage."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+        await self.flush_usage()
+
+        if self.redis_client:
+            await self.redis_client.close()
+
+    def _redis_key(self, key_prefix: str) -> str:
+        """Redis key for a prefix entry."""
+        return f"integration_hub:api_key:{key_prefix}"
+
+    def _version_key(self, key_prefix: str) -> str:
+        """Redis key counting invalidations of a prefix."""
+        return f"integration_hub:api_key_version:{key_prefix}"
+
+    async def lookup(self, key_prefix: str, db: AsyncSession) -> list[CachedApiKey]:
+        """Return the non-revoked keys sharing a prefix, from the fastest tier."""
+        now = time.monotonic()
+
+        entry = self._local.get(key_prefix)
+        if entry is not None:
+            if entry.expires_at > now:
+                self._local.move_to_end(key_prefix)
+                self.hits += 1
+                return entry.keys
+            del self._local[key_prefix]
+
+        seq = self._invalidation_seq
+        keys, version = await self._get_from_redis(key_prefix)
+        if keys is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            keys = await self._get_from_db(key_prefix, db)
+            await self._set_in_redis(key_prefix, keys, version)
+
+        if seq != self._invalidation_seq:
+            # Invalidated while we read; what we read may predate it
+            return keys
+
+        ttl = (
+            settings.api_key_cache_local_ttl_seconds
+            if keys
+            else settings.api_key_cache_negative_ttl_seconds
+        )
+        if not self._invalidations_connected:
+            # Revocations on other replicas cannot reach us, so keep entries briefly
+            ttl = min(ttl, settings.api_key_cache_disconnected_ttl_seconds)
+        self._store_local(key_prefix, _LocalEntry(keys=keys, expires_at=now + ttl))
+        return keys
+
+    def _store_local(self, key_prefix: str, entry: _LocalEntry) -> None:
+        """Cache an entry locally, evicting the least recently used beyond the limit."""
+        self._local[key_prefix] = entry
+        self._local.move_to_end(key_prefix)
+        while len(self._local) > settings.api_key_cache_local_max_entries:
+            self._local.popitem(last=False)
+
+    async def verify(self, raw_key: str, db: AsyncSession) -> Optional[CachedApiKey]:
+        """Verify a raw API key, returning its cache entry if it is valid."""
+        if not raw_key.startswith(settings.api_key_prefix):
+            return None
+
+        key_hash = hash_api_key(raw_key)
+        for cached in await self.lookup(raw_key[:API_KEY_PREFIX_LENGTH], db):
+            if cached.matches(key_hash):
+                if not cached.is_active or cached.is_expired:
+                    return None
+                return cached
+
+        return None
+
+    async def invalidate(self, key_prefix: str) -> None:
+        """Drop a prefix everywhere: locally, in Redis and on every other replica."""
+        self._evict_local(key_prefix)
+
+        if not self.redis_client:
+            return
+
+        version_key = self._version_key(key_prefix)
+        try:
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.incr(version_key)
+                # Outlives any lookup that could have read the old version
+                pipe.expire(version_key, settings.api_key_cache_ttl_seconds)
+                pipe.delete(self._redis_key(key_prefix))
+                pipe.publish(settings.api_key_cache_invalidation_channel, key_prefix)
+                await pipe.execute()
+        except Exception as e:
+            logger.error("API key cache invalidation error", key_prefix=key_prefix, error=str(e))
+
+    def _evict_local(self, key_prefix: str) -> None:
+        """Drop a prefix locally and keep in-flight lookups from re-adding it."""
+        self._invalidation_seq += 1
+        self._local.pop(key_prefix, None)
+
+    async def _get_from_redis(
+        self, key_prefix: str
+    ) -> tuple[Optional[list[CachedApiKey]], Optional[str]]:
+        """Read a prefix entry from Redis, with the prefix's invalidation version."""
+        if not self.redis_client:
+            return None, None
+
+        try:
+            cached_data, version = await self.redis_client.mget(
+                self._redis_key(key_prefix), self._version_key(key_prefix)
+            )
+        except Exception as e:
+            logger.error("API key cache get error", key_prefix=key_prefix, error=str(e))
+            return None, None
+
+        if cached_data is None:
+            return None, version or ""
+
+        keys = [
+            CachedApiKey(**{**item, "scopes": tuple(item["scopes"])})
+            for item in json.loads(cached_data)
+        ]
+        return keys, version or ""
+
+    async def _set_in_redis(
+        self, key_prefix: str, keys: list[CachedApiKey], version: Optional[str]
+    ) -> None:
+        """Write a prefix entry to Redis unless it was invalidated since ``version``."""
+        if not self.redis_client or version is None:
+            return
+
+        ttl = (
+            settings.api_key_cache_ttl_seconds
+            if keys
+            else settings.api_key_cache_negative_ttl_seconds
+        )
+        set_if_unchanged = self.redis_client.register_script(_SET_IF_VERSION_UNCHANGED)
+        try:
+            await set_if_unchanged(
+                keys=[self._redis_key(key_prefix), self._version_key(key_prefix)],
+                args=[version, json.dumps([asdict(key) for key in keys]), ttl],
+            )
+        except Exception as e:
+            logger.error("API key cache set error", key_prefix=key_prefix, error=str(e))
+
+    async def _get_from_db(self, key_prefix: str, db: AsyncSession) -> list[CachedApiKey]:
+        """Load the non-revoked keys for a prefix from the database."""
+        stmt = select(ApiKey).where(
+            and_(ApiKey.key_prefix == key_prefix, ApiKey.is_revoked == False)
+        )
+        result = await db.execute(stmt)
+        return [CachedApiKey.from_model(api_key) for api_key in result.scalars().all()]
+
+    async def _listen_for_invalidations(self) -> None:
+        """Evict prefixes invalidated by other replicas, reconnecting if Redis drops."""
+        assert self.redis_client is not None
+        channel = settings.api_key_cache_invalidation_channel
+        delay = 1.0
+
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(channel)
+                # Invalidations published while we were not subscribed are lost
+                self._invalidation_seq += 1
+                self._local.clear()
+                self._invalidations_connected = True
+                delay = 1.0
+
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._evict_local(message["data"])
+                raise ConnectionError("invalidation subscription closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    "API key invalidation listener disconnected",
+                    error=str(e),
+                    retry_in_seconds=delay,
+                )
+            finally:
+                self._invalidations_connected = False
+                with contextlib.suppress(Exception):
+                    await pubsub.unsubscribe(channel)
+                    await pubsub.close()
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    async def record_usage(self, api_key_id: str) -> None:
+        """Count a request against a key; persisted by the next flush."""
+        async with self._usage_lock:
+            delta = self._usage.get(api_key_id)
+            if delta is None:
+                delta = self._usage[api_key_id] = _UsageDelta()
+            delta.count += 1
+            delta.last_used_at = datetime.utcnow()
+
+    async def flush_usage(self) -> int:
+        """Persist accumulated usage counters, one UPDATE per key."""
+        async with self._usage_lock:
+            pending, self._usage = self._usage, {}
+
+        if not pending:
+            return 0
+
+        from app.database import AsyncSessionLocal
+
+        try:
+            async with AsyncSessionLocal() as db:
+                for api_key_id, delta in pending.items():
+                    await db.execute(
+                        update(ApiKey)
+                        .where(ApiKey.id == UUID(api_key_id))
+                        .values(
+                            usage_count=ApiKey.usage_count + delta.count,
+                            last_used_at=delta.last_used_at,
+                        )
+                    )
+                await db.commit()
+        except Exception as e:
+            logger.error("Error flushing API key usage", keys=len(pending), error=str(e))
+            # Put the counts back so the next flush retries them
+            async with self._usage_lock:
+                for api_key_id, delta in pending.items():
+                    current = self._usage.setdefault(api_key_id, _UsageDelta())
+                    current.count += delta.count
+                    current.last_used_at = max(current.last_used_at, delta.last_used_at)
+            return 0
+
+        logger.debug("Flushed API key usage", keys=len(pending))
+        return len(pending)
+
+    async def _flush_usage_periodically(self) -> None:
+        """Flush usage counters on a fixed interval."""
+        while True:
+            await asyncio.sleep(settings.api_key_usage_flush_interval_seconds)
+            await self.flush_usage()
+
+    def stats(self) -> dict[str, Any]:
+        """Cache statistics."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "local_entries": len(self._local),
+            "invalidations_connected": self._invalidations_connected,
+            "pending_usage_keys": len(self._usage),
+        }
+
+
+# Global cache instance
+api_key_cache = ApiKeyCache()
+
+
+async def authenticate_api_key(
+    x_api_key: Optional[str] = Header(None, alias="X-API-Key"),
+    db: AsyncSession = Depends(get_db),
+) -> CachedApiKey:
+    """FastAPI dependency that authenticates a request by API key."""
+    if not x_api_key:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="API key required"
+        )
+
+    cached = await api_key_cache.verify(x_api_key, db)
+    if cached is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired API key"
+        )
+
+    await api_key_cache.record_usage(cached.id)
+    return cached
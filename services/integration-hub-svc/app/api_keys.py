@@ -13,6 +13,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 import structlog
 
+from app.api_key_cache import api_key_cache
 from app.config import settings
 from app.database import get_db
 from app.models import ApiKey, Tenant
@@ -174,6 +175,9 @@ async def create_api_key(
     await db.commit()
     await db.refresh(api_key)
 
+    # Clear any cached miss for this prefix
+    await api_key_cache.invalidate(key_prefix)
+
     logger.info("API key created", api_key_id=str(api_key.id), tenant_id=str(tenant_id))
 
     # Return response with the actual key (only time it's shown)
@@ -306,6 +310,9 @@ async def rotate_api_key(
     await db.commit()
     await db.refresh(new_api_key)
 
+    await api_key_cache.invalidate(old_api_key.key_prefix)
+    await api_key_cache.invalidate(key_prefix)
+
     logger.info(
         "API key rotated",
         old_key_id=str(api_key_id),
@@ -353,6 +360,8 @@ async def delete_api_key(
 
     await db.commit()
 
+    await api_key_cache.invalidate(api_key.key_prefix)
+
     logger.info("API key deleted", api_key_id=str(api_key_id), tenant_id=str(tenant_id))
 
     return {"message": "API key revoked successfully"}
@@ -0,0 +1,239 @@
+"""Event batching for high-volume webhook subscriptions.
+
+Webhooks with ``batch_enabled`` set do not get one HTTP POST per event.
+Events are buffered in-process per webhook and flushed as a single
+``WebhookBatch`` delivery when the webhook's window elapses, when it reaches
+``batch_max_events``, or when the buffered payload reaches
+``settings.webhook_batch_max_bytes``.
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
+
+import structlog
+
+from app.config import settings
+from app.models import Webhook, WebhookBatch, WebhookDelivery, WebhookEvent
+
+logger = structlog.get_logger(__name__)
+
+DeliverFn = Callable[[UUID], Awaitable[None]]
+
+
+@dataclass
+class PendingBatch:
+    """Events buffered for one webhook within the current window."""
+
+    webhook_id: UUID
+    max_events: int
+    deadline: float
+    window_started_at: datetime = field(default_factory=datetime.utcnow)
+    event_ids: list[str] = field(default_factory=list)
+    size_bytes: int = 0
+
+    def add(self, event_id: UUID, size_bytes: int) -> None:
+        """Append an event to the batch."""
+        self.event_ids.append(str(event_id))
+        self.size_bytes += size_bytes
+
+    def is_full(self) -> bool:
+        """Whether the batch hit its event or byte limit."""
+        return (
+            len(self.event_ids) >= self.max_events
+            or self.size_bytes >= settings.webhook_batch_max_bytes
+        )
+
+    def is_due(self, now: float) -> bool:
+        """Whether the batch window has elapsed."""
+        return now >= self.deadline
+
+
+def batch_limits(webhook: Webhook) -> tuple[int, float]:
+    """Return the clamped (max_events, window_seconds) for a webhook."""
+    max_events = max(1, min(webhook.batch_max_events, settings.webhook_batch_max_events))
+    window_ms = max(
+        settings.webhook_batch_min_window_ms,
+        min(webhook.batch_window_ms, settings.webhook_batch_max_window_ms),
+    )
+    return max_events, window_ms / 1000
+
+
+class WebhookBatcher:
+    """Coalesces events per webhook into time/size bounded batch deliveries."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], object]] = None,
+        deliver: Optional[DeliverFn] = None,
+        tick_seconds: Optional[float] = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._deliver = deliver
+        self._tick_seconds = tick_seconds or settings.webhook_batch_tick_seconds
+        self._pending: dict[UUID, PendingBatch] = {}
+        self._lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task[None]] = None
+        self._in_flight: set[asyncio.Task[None]] = set()
+
+    async def start(self) -> None:
+        """Start the background window flusher."""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._run())
+            logger.info("Webhook batcher started", tick_seconds=self._tick_seconds)
+
+    async def stop(self) -> None:
+        """Stop the flusher and flush every open batch."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+
+        async with self._lock:
+            remaining = list(self._pending.values())
+            self._pending.clear()
+
+        for pending in remaining:
+            await self._flush(pending)
+
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+        logger.info("Webhook batcher stopped", flushed_batches=len(remaining))
+
+    async def add(self, webhook: Webhook, event: WebhookEvent) -> None:
+        """Buffer an event for a batching webhook, flushing if the batch is full."""
+        size_bytes = len(json.dumps(event.payload, separators=(",", ":"), default=str))
+
+        async with self._lock:
+            pending = self._pending.get(webhook.id)
+            if pending is None:
+                max_events, window_seconds = batch_limits(webhook)
+                pending = PendingBatch(
+                    webhook_id=webhook.id,
+                    max_events=max_events,
+                    deadline=time.monotonic() + window_seconds,
+                )
+                self._pending[webhook.id] = pending
+
+            pending.add(event.id, size_bytes)
+
+            ready = self._pending.pop(webhook.id) if pending.is_full() else None
+
+        if ready is not None:
+            await self._flush(ready)
+
+    @property
+    def pending_events(self) -> int:
+        """Number of events currently buffered across all webhooks."""
+        return sum(len(p.event_ids) for p in self._pending.values())
+
+    async def _run(self) -> None:
+        """Flush batches whose window has elapsed."""
+        while True:
+            await asyncio.sleep(self._tick_seconds)
+            now = time.monotonic()
+
+            async with self._lock:
+                due = [p for p in self._pending.values() if p.is_due(now)]
+                for pending in due:
+                    del self._pending[pending.webhook_id]
+
+            for pending in due:
+                await self._flush(pending)
+
+    async def _flush(self, pending: PendingBatch) -> None:
+        """Persist the batch and its delivery, then hand it to the delivery worker.
+
+        If the batch cannot be persisted its events go back into the buffer
+        and are retried on the next tick. Once persisted, the delivery row
+        carries the events through retries and replays.
+        """
+        if not pending.event_ids:
+            return
+
+        try:
+            delivery_id = await self._persist(pending)
+        except Exception as e:
+            logger.error(
+                "Error persisting webhook batch, requeueing events",
+                webhook_id=str(pending.webhook_id),
+                events=len(pending.event_ids),
+                error=str(e),
+            )
+            await self._requeue(pending)
+            return
+
+        deliver = self._deliver
+        if deliver is None:
+            from app.routes.webhooks import deliver_webhook
+
+            deliver = deliver_webhook
+
+        task = asyncio.create_task(deliver(delivery_id))
+        self._in_flight.add(task)
+        task.add_done_callback(self._delivery_done)
+
+    async def _persist(self, pending: PendingBatch) -> UUID:
+        """Store the batch and a pending delivery for it, returning the delivery ID."""
+        session_factory = self._session_factory
+        if session_factory is None:
+            from app.database import AsyncSessionLocal
+
+            session_factory = AsyncSessionLocal
+
+        async with session_factory() as db:  # type: ignore[attr-defined]
+            batch = WebhookBatch(
+                webhook_id=pending.webhook_id,
+                event_ids=pending.event_ids,
+                event_count=len(pending.event_ids),
+                payload_size_bytes=pending.size_bytes,
+                window_started_at=pending.window_started_at,
+                window_closed_at=datetime.utcnow(),
+            )
+            db.add(batch)
+            await db.flush()
+
+            delivery = WebhookDelivery(webhook_id=pending.webhook_id, batch_id=batch.id)
+            db.add(delivery)
+            await db.commit()
+            await db.refresh(delivery)
+
+        logger.info(
+            "Webhook batch flushed",
+            webhook_id=str(pending.webhook_id),
+            batch_id=str(batch.id),
+            events=batch.event_count,
+            payload_size_bytes=batch.payload_size_bytes,
+        )
+        return delivery.id
+
+    async def _requeue(self, pending: PendingBatch) -> None:
+        """Put a batch's events back in front of any events buffered since."""
+        async with self._lock:
+            current = self._pending.get(pending.webhook_id)
+            if current is not None:
+                pending.event_ids.extend(current.event_ids)
+                pending.size_bytes += current.size_bytes
+            self._pending[pending.webhook_id] = pending
+
+    def _delivery_done(self, task: asyncio.Task[None]) -> None:
+        """Forget a finished delivery task, logging any error it raised."""
+        self._in_flight.discard(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            # The delivery row stays pending, so it can still be replayed
+            logger.error("Error delivering webhook batch", error=str(error))
+
+
+# Global batcher instance
+webhook_batcher = WebhookBatcher()
@@ -99,6 +99,15 @@ class Settings(BaseSettings):
     api_key_prefix: str = "aivo_"
     api_key_ttl_days: int = 365
 
+    # API Key Cache Configuration
+    api_key_cache_ttl_seconds: int = 300
+    api_key_cache_local_ttl_seconds: int = 60
+    api_key_cache_negative_ttl_seconds: int = 30
+    api_key_cache_local_max_entries: int = 10000
+    api_key_cache_disconnected_ttl_seconds: int = 5
+    api_key_cache_invalidation_channel: str = "integration_hub:api_key_invalidations"
+    api_key_usage_flush_interval_seconds: float = 10.0
+
     # Webhook Configuration
     webhook_timeout_seconds: int = 30
     webhook_max_retries: int = 5
@@ -108,6 +117,16 @@ class Settings(BaseSettings):
     webhook_signature_header: str = "X-Aivo-Signature"
     webhook_signature_algorithm: str = "sha256"
 
+    # Webhook Batching Configuration
+    webhook_batch_max_events: int = 500
+    webhook_batch_max_bytes: int = 1024 * 1024  # 1 MiB uncompressed
+    webhook_batch_min_window_ms: int = 100
+    webhook_batch_max_window_ms: int = 60_000
+    webhook_batch_tick_seconds: float = 0.25
+    webhook_compression_min_bytes: int = 1024
+    webhook_gzip_level: int = 6
+    webhook_zstd_level: int = 3
+
     # CORS Configuration
     cors_origins: list[str] = ["http://localhost:3000", "http://localhost:3001"]
     cors_allow_credentials: bool = True
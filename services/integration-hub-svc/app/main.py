@@ -11,6 +11,8 @@ from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 from prometheus_client import make_asgi_app
 import structlog
 
+from app.api_key_cache import api_key_cache
+from app.batching import webhook_batcher
 from app.config import settings
 from app.database import init_db
 from app.routes import api_keys, health, integrations, webhooks
@@ -51,10 +53,17 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     await init_db()
     logger.info("Database initialized")
 
+    await api_key_cache.initialize()
+    await webhook_batcher.start()
+
     yield
 
     logger.info("Shutting down Integration Hub Service")
 
+    # Flush open webhook batches before exiting
+    await webhook_batcher.stop()
+    await api_key_cache.close()
+
 
 # Create FastAPI application
 app = FastAPI(
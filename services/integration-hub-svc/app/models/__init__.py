@@ -12,7 +12,13 @@ from .integration import (
     LogLevel,
 )
 from .tenant import Tenant
-from .webhook import Webhook, WebhookDelivery, WebhookEvent
+from .webhook import (
+    ContentEncoding,
+    Webhook,
+    WebhookBatch,
+    WebhookDelivery,
+    WebhookEvent,
+)
 
 __all__ = [
     "Base",
@@ -22,6 +28,8 @@ __all__ = [
     "Webhook",
     "WebhookDelivery",
     "WebhookEvent",
+    "WebhookBatch",
+    "ContentEncoding",
     "Integration",
     "ConnectionLog",
     "IntegrationTest",
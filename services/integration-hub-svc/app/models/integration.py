@@ -5,7 +5,7 @@ from enum import Enum
 from typing import TYPE_CHECKING, Any, Dict, Optional
 from uuid import UUID
 
-from sqlalchemy import String, Text, Boolean, JSON, DateTime, Enum as SQLEnum
+from sqlalchemy import ForeignKey, String, Text, Boolean, JSON, DateTime, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -122,6 +122,7 @@ class ConnectionLog(Base, TimestampMixin):
     # Relationships
     integration_id: Mapped[UUID] = mapped_column(
         PGUUID(as_uuid=True),
+        ForeignKey("integrations.id", ondelete="CASCADE"),
         nullable=False,
         index=True,
     )
@@ -162,6 +163,7 @@ class IntegrationTest(Base, TimestampMixin):
     # Relationships
     integration_id: Mapped[UUID] = mapped_column(
         PGUUID(as_uuid=True),
+        ForeignKey("integrations.id", ondelete="CASCADE"),
         nullable=False,
         index=True,
     )
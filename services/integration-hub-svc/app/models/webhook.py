@@ -32,6 +32,13 @@ class WebhookStatus(str, Enum):
     FAILED = "failed"
 
 
+class ContentEncoding(str, Enum):
+    """Webhook payload compression enumeration."""
+
+    GZIP = "gzip"
+    ZSTD = "zstd"
+
+
 class DeliveryStatus(str, Enum):
     """Webhook delivery status enumeration."""
 
@@ -80,6 +87,12 @@ class Webhook(Base, TimestampMixin):
     max_delay_seconds: Mapped[int] = mapped_column(Integer, default=300, nullable=False)
     backoff_multiplier: Mapped[float] = mapped_column(Float, default=2.0, nullable=False)
 
+    # Batching Configuration
+    batch_enabled: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    batch_max_events: Mapped[int] = mapped_column(Integer, default=100, nullable=False)
+    batch_window_ms: Mapped[int] = mapped_column(Integer, default=5000, nullable=False)
+    content_encoding: Mapped[ContentEncoding | None] = mapped_column(nullable=True)
+
     # Statistics
     total_deliveries: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     successful_deliveries: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
@@ -102,6 +115,10 @@ class Webhook(Base, TimestampMixin):
         back_populates="webhook",
         cascade="all, delete-orphan",
     )
+    batches: Mapped[list["WebhookBatch"]] = relationship(
+        back_populates="webhook",
+        cascade="all, delete-orphan",
+    )
 
     def __repr__(self) -> str:
         """String representation."""
@@ -126,9 +143,15 @@ class WebhookDelivery(Base, TimestampMixin):
         nullable=False,
         index=True,
     )
-    event_id: Mapped[UUID] = mapped_column(
+    # Exactly one of event_id / batch_id is set
+    event_id: Mapped[UUID | None] = mapped_column(
         ForeignKey("webhook_events.id", ondelete="CASCADE"),
-        nullable=False,
+        nullable=True,
+        index=True,
+    )
+    batch_id: Mapped[UUID | None] = mapped_column(
+        ForeignKey("webhook_batches.id", ondelete="CASCADE"),
+        nullable=True,
         index=True,
     )
 
@@ -161,7 +184,8 @@ class WebhookDelivery(Base, TimestampMixin):
 
     # Relationships
     webhook: Mapped["Webhook"] = relationship(back_populates="deliveries")
-    event: Mapped["WebhookEvent"] = relationship(back_populates="deliveries")
+    event: Mapped["WebhookEvent | None"] = relationship(back_populates="deliveries")
+    batch: Mapped["WebhookBatch | None"] = relationship(back_populates="deliveries")
 
     def __repr__(self) -> str:
         """String representation."""
@@ -204,3 +228,36 @@ class WebhookEvent(Base, TimestampMixin):
     def __repr__(self) -> str:
         """String representation."""
         return f"<WebhookEvent(id={self.id}, event_type='{self.event_type}', tenant_id={self.tenant_id})>"
+
+
+class WebhookBatch(Base, TimestampMixin):
+    """Group of events coalesced into a single webhook delivery."""
+
+    __tablename__ = "webhook_batches"
+
+    # Foreign Keys
+    webhook_id: Mapped[UUID] = mapped_column(
+        ForeignKey("webhooks.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    # Batch Contents (ordered as delivered)
+    event_ids: Mapped[list[str]] = mapped_column(JSON, nullable=False, default=list)
+    event_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    payload_size_bytes: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    # Window
+    window_started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    window_closed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+    # Relationships
+    webhook: Mapped["Webhook"] = relationship(back_populates="batches")
+    deliveries: Mapped[list["WebhookDelivery"]] = relationship(
+        back_populates="batch",
+        cascade="all, delete-orphan",
+    )
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return f"<WebhookBatch(id={self.id}, webhook_id={self.webhook_id}, events={self.event_count})>"
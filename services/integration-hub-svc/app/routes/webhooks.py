@@ -1,5 +1,6 @@
 """Webhooks management endpoints."""
 
+import gzip
 import hashlib
 import hmac
 import json
@@ -17,9 +18,24 @@ import structlog
 import httpx
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None  # Optional dependency for zstd webhook payloads
+    ZSTD_AVAILABLE = False
+
 from app.config import settings
 from app.database import get_db
-from app.models import Webhook, WebhookDelivery, WebhookEvent, Tenant
+from app.models import (
+    ContentEncoding,
+    Tenant,
+    Webhook,
+    WebhookBatch,
+    WebhookDelivery,
+    WebhookEvent,
+)
 
 logger = structlog.get_logger(__name__)
 router = APIRouter()
@@ -37,6 +53,10 @@ class WebhookCreate(BaseModel):
     timeout_seconds: int = Field(default=30, ge=1, le=120, description="Request timeout in seconds")
     max_retries: int = Field(default=5, ge=0, le=10, description="Maximum retry attempts")
     headers: Optional[Dict[str, str]] = Field(None, description="Additional HTTP headers")
+    batch_enabled: bool = Field(default=False, description="Coalesce events into batched deliveries")
+    batch_max_events: int = Field(default=100, ge=1, le=500, description="Maximum events per batch")
+    batch_window_ms: int = Field(default=5000, ge=100, le=60000, description="Batch window in milliseconds")
+    content_encoding: Optional[ContentEncoding] = Field(None, description="Payload compression (gzip or zstd)")
 
 
 class WebhookUpdate(BaseModel):
@@ -51,6 +71,10 @@ class WebhookUpdate(BaseModel):
     max_retries: Optional[int] = Field(None, ge=0, le=10, description="Maximum retry attempts")
     headers: Optional[Dict[str, str]] = Field(None, description="Additional HTTP headers")
     is_active: Optional[bool] = Field(None, description="Whether webhook is active")
+    batch_enabled: Optional[bool] = Field(None, description="Coalesce events into batched deliveries")
+    batch_max_events: Optional[int] = Field(None, ge=1, le=500, description="Maximum events per batch")
+    batch_window_ms: Optional[int] = Field(None, ge=100, le=60000, description="Batch window in milliseconds")
+    content_encoding: Optional[ContentEncoding] = Field(None, description="Payload compression (gzip or zstd)")
 
 
 class WebhookResponse(BaseModel):
@@ -77,6 +101,10 @@ class WebhookResponse(BaseModel):
     updated_at: datetime
     created_by: Optional[str]
     headers: Optional[Dict[str, str]]
+    batch_enabled: bool
+    batch_max_events: int
+    batch_window_ms: int
+    content_encoding: Optional[ContentEncoding]
 
     class Config:
         from_attributes = True
@@ -96,7 +124,8 @@ class WebhookDeliveryResponse(BaseModel):
 
     id: UUID
     webhook_id: UUID
-    event_id: UUID
+    event_id: Optional[UUID]
+    batch_id: Optional[UUID]
     status: str
     attempt_number: int
     response_status_code: Optional[int]
@@ -137,6 +166,24 @@ class WebhookTestResponse(BaseModel):
     error_message: Optional[str]
 
 
+class EventPublishRequest(BaseModel):
+    """Schema for publishing an event to a tenant's webhooks."""
+
+    event_type: str = Field(..., min_length=1, max_length=100, description="Event type")
+    event_version: str = Field(default="1.0", max_length=20, description="Event schema version")
+    payload: Dict[str, Any] = Field(default_factory=dict, description="Event payload")
+    source: str = Field(..., min_length=1, max_length=100, description="Publishing service")
+    idempotency_key: Optional[str] = Field(None, max_length=255, description="Deduplication key")
+
+
+class EventPublishResponse(BaseModel):
+    """Schema for event publish response."""
+
+    event_id: UUID
+    delivery_ids: List[UUID]
+    batched_webhook_ids: List[UUID]
+
+
 def generate_webhook_secret() -> str:
     """Generate a secure webhook secret."""
     return secrets.token_urlsafe(32)
@@ -152,6 +199,54 @@ def create_hmac_signature(payload: str, secret: str) -> str:
     return f"sha256={signature}"
 
 
+def build_event_payload(event: WebhookEvent) -> Dict[str, Any]:
+    """Build the JSON payload delivered for a single event."""
+    return {
+        "event_type": event.event_type,
+        "event_version": event.event_version,
+        "event_id": str(event.id),
+        "tenant_id": str(event.tenant_id),
+        "timestamp": event.created_at.isoformat(),
+        "data": event.payload,
+    }
+
+
+def encode_payload(
+    payload_json: str,
+    encoding: Optional[ContentEncoding],
+) -> tuple[bytes, Optional[str]]:
+    """Compress a payload for the wire.
+
+    Returns the request body and the Content-Encoding to send, if any. Small
+    payloads are sent uncompressed since compression would not pay for itself.
+    """
+    body = payload_json.encode("utf-8")
+
+    if encoding is None or len(body) < settings.webhook_compression_min_bytes:
+        return body, None
+
+    if encoding == ContentEncoding.GZIP:
+        return gzip.compress(body, compresslevel=settings.webhook_gzip_level), "gzip"
+
+    if encoding == ContentEncoding.ZSTD:
+        if not ZSTD_AVAILABLE:
+            logger.warning("zstandard not installed, sending webhook payload uncompressed")
+            return body, None
+        compressor = zstandard.ZstdCompressor(level=settings.webhook_zstd_level)
+        return compressor.compress(body), "zstd"
+
+    return body, None
+
+
+def ensure_encoding_supported(encoding: Optional[ContentEncoding]) -> None:
+    """Reject content encodings this deployment cannot produce."""
+    if encoding == ContentEncoding.ZSTD and not ZSTD_AVAILABLE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="zstd content encoding is not available on this server"
+        )
+
+
 async def get_tenant_by_id(tenant_id: UUID, db: AsyncSession) -> Tenant:
     """Get tenant by ID or raise 404."""
     stmt = select(Tenant).where(Tenant.id == tenant_id, Tenant.is_active == True)
@@ -191,6 +286,8 @@ async def create_webhook(
             detail=f"Maximum number of webhooks ({tenant.max_webhooks}) exceeded"
         )
 
+    ensure_encoding_supported(webhook_data.content_encoding)
+
     # Generate secret if not provided
     secret = webhook_data.secret or generate_webhook_secret()
 
@@ -205,6 +302,10 @@ async def create_webhook(
         timeout_seconds=webhook_data.timeout_seconds,
         max_retries=webhook_data.max_retries,
         headers=webhook_data.headers,
+        batch_enabled=webhook_data.batch_enabled,
+        batch_max_events=webhook_data.batch_max_events,
+        batch_window_ms=webhook_data.batch_window_ms,
+        content_encoding=webhook_data.content_encoding,
         created_by=current_user,
     )
 
@@ -307,6 +408,8 @@ async def update_webhook(
             detail="Webhook not found"
         )
 
+    ensure_encoding_supported(webhook_data.content_encoding)
+
     # Update fields
     update_data = webhook_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
@@ -503,10 +606,11 @@ async def replay_webhook_delivery(
             detail="Delivery not found"
         )
 
-    # Create new delivery for replay
+    # Create new delivery for replay (batch deliveries replay the whole batch)
     new_delivery = WebhookDelivery(
         webhook_id=webhook_id,
         event_id=delivery.event_id,
+        batch_id=delivery.batch_id,
     )
 
     db.add(new_delivery)
@@ -521,12 +625,126 @@ async def replay_webhook_delivery(
         original_delivery_id=str(delivery_id),
         new_delivery_id=str(new_delivery.id),
         webhook_id=str(webhook_id),
+        batch_id=str(delivery.batch_id) if delivery.batch_id else None,
     )
 
     return {"message": "Webhook delivery replayed successfully"}
 
 
+@router.post(
+    "/tenants/{tenant_id}/events",
+    response_model=EventPublishResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def publish_tenant_event(
+    tenant_id: UUID,
+    event_data: EventPublishRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+) -> EventPublishResponse:
+    """Record an event and fan it out to the tenant's subscribed webhooks."""
+    await get_tenant_by_id(tenant_id, db)
+
+    # Already published events are not delivered twice
+    if event_data.idempotency_key:
+        existing_stmt = select(WebhookEvent).where(
+            WebhookEvent.idempotency_key == event_data.idempotency_key
+        )
+        existing_result = await db.execute(existing_stmt)
+        existing = existing_result.scalar_one_or_none()
+        if existing:
+            return EventPublishResponse(event_id=existing.id, delivery_ids=[], batched_webhook_ids=[])
+
+    event = WebhookEvent(
+        event_type=event_data.event_type,
+        event_version=event_data.event_version,
+        payload=event_data.payload,
+        source=event_data.source,
+        tenant_id=tenant_id,
+        idempotency_key=event_data.idempotency_key,
+    )
+
+    db.add(event)
+    await db.commit()
+    await db.refresh(event)
+
+    stmt = select(Webhook).where(
+        and_(
+            Webhook.tenant_id == tenant_id,
+            Webhook.is_active == True,
+        )
+    )
+    result = await db.execute(stmt)
+    webhooks = [
+        webhook for webhook in result.scalars().all()
+        if event.event_type in webhook.events
+    ]
+
+    delivery_ids: List[UUID] = []
+    batched_webhook_ids: List[UUID] = []
+    for webhook in webhooks:
+        delivery_id = await publish_event(webhook, event, db, background_tasks)
+        if delivery_id is None:
+            batched_webhook_ids.append(webhook.id)
+        else:
+            delivery_ids.append(delivery_id)
+
+    logger.info(
+        "Event published",
+        event_id=str(event.id),
+        event_type=event.event_type,
+        tenant_id=str(tenant_id),
+        deliveries=len(delivery_ids),
+        batched=len(batched_webhook_ids),
+    )
+
+    return EventPublishResponse(
+        event_id=event.id,
+        delivery_ids=delivery_ids,
+        batched_webhook_ids=batched_webhook_ids,
+    )
+
+
 # Webhook delivery worker functions
+async def publish_event(
+    webhook: Webhook,
+    event: WebhookEvent,
+    db: AsyncSession,
+    background_tasks: Optional[BackgroundTasks] = None,
+) -> Optional[UUID]:
+    """Route an event to a webhook, batching it when the webhook opts in.
+
+    Returns the delivery ID for immediate deliveries, or None when the event
+    was buffered for a batch.
+    """
+    if webhook.batch_enabled:
+        from app.batching import webhook_batcher
+
+        await webhook_batcher.add(webhook, event)
+        return None
+
+    delivery = WebhookDelivery(webhook_id=webhook.id, event_id=event.id)
+    db.add(delivery)
+    await db.commit()
+    await db.refresh(delivery)
+
+    if background_tasks is not None:
+        background_tasks.add_task(deliver_webhook, delivery.id)
+    else:
+        await deliver_webhook(delivery.id)
+
+    return delivery.id
+
+
+async def load_batch_events(batch: WebhookBatch, db: AsyncSession) -> List[WebhookEvent]:
+    """Load a batch's events in their original order."""
+    event_ids = [UUID(event_id) for event_id in batch.event_ids]
+    stmt = select(WebhookEvent).where(WebhookEvent.id.in_(event_ids))
+    result = await db.execute(stmt)
+    events_by_id = {event.id: event for event in result.scalars().all()}
+    return [events_by_id[event_id] for event_id in event_ids if event_id in events_by_id]
+
+
 async def deliver_webhook(delivery_id: UUID) -> None:
     """Deliver a webhook with retries and exponential backoff."""
     from app.database import AsyncSessionLocal
@@ -538,7 +756,8 @@ async def deliver_webhook(delivery_id: UUID) -> None:
                 select(WebhookDelivery)
                 .options(
                     selectinload(WebhookDelivery.webhook),
-                    selectinload(WebhookDelivery.event)
+                    selectinload(WebhookDelivery.event),
+                    selectinload(WebhookDelivery.batch),
                 )
                 .where(WebhookDelivery.id == delivery_id)
             )
@@ -550,21 +769,21 @@ async def deliver_webhook(delivery_id: UUID) -> None:
                 return
 
             webhook = delivery.webhook
-            event = delivery.event
-
-            # Prepare payload
-            payload = {
-                "event_type": event.event_type,
-                "event_version": event.event_version,
-                "event_id": str(event.id),
-                "tenant_id": str(event.tenant_id),
-                "timestamp": event.created_at.isoformat(),
-                "data": event.payload,
-            }
+
+            # Prepare payload (a JSON array of events for batch deliveries)
+            if delivery.batch is not None:
+                events = await load_batch_events(delivery.batch, db)
+                if not events:
+                    logger.error("Batch has no events", delivery_id=str(delivery_id))
+                    return
+                payload: Any = [build_event_payload(event) for event in events]
+            else:
+                events = [delivery.event]
+                payload = build_event_payload(delivery.event)
 
             payload_json = json.dumps(payload, separators=(',', ':'))
 
-            # Create HMAC signature
+            # Create HMAC signature over the uncompressed JSON
             signature = create_hmac_signature(payload_json, webhook.secret)
 
             # Prepare headers
@@ -572,12 +791,21 @@ async def deliver_webhook(delivery_id: UUID) -> None:
                 "Content-Type": "application/json",
                 "User-Agent": webhook.user_agent or f"Aivo-Webhooks/{settings.version}",
                 settings.webhook_signature_header: signature,
-                "X-Aivo-Event-Type": event.event_type,
-                "X-Aivo-Event-ID": str(event.id),
                 "X-Aivo-Delivery-ID": str(delivery.id),
-                "X-Aivo-Tenant-ID": str(event.tenant_id),
+                "X-Aivo-Tenant-ID": str(webhook.tenant_id),
             }
 
+            if delivery.batch is not None:
+                headers["X-Aivo-Batch-ID"] = str(delivery.batch.id)
+                headers["X-Aivo-Batch-Size"] = str(len(events))
+            else:
+                headers["X-Aivo-Event-Type"] = delivery.event.event_type
+                headers["X-Aivo-Event-ID"] = str(delivery.event.id)
+
+            body, content_encoding = encode_payload(payload_json, webhook.content_encoding)
+            if content_encoding:
+                headers["Content-Encoding"] = content_encoding
+
             # Add custom headers
             if webhook.headers:
                 headers.update(webhook.headers)
@@ -597,7 +825,7 @@ async def deliver_webhook(delivery_id: UUID) -> None:
                 try:
                     response = await client.post(
                         webhook.url,
-                        content=payload_json,
+                        content=body,
                         headers=headers,
                     )
 
@@ -702,6 +930,7 @@ async def schedule_retry(
     new_delivery = WebhookDelivery(
         webhook_id=webhook.id,
         event_id=delivery.event_id,
+        batch_id=delivery.batch_id,
         attempt_number=delivery.attempt_number + 1,
         next_retry_at=next_retry_at,
     )
@@ -0,0 +1,77 @@
+"""Add webhook batching and payload compression
+
+Revision ID: webhook_batching
+Revises:
+Create Date: 2026-10-18 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'webhook_batching'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+content_encoding = sa.Enum('GZIP', 'ZSTD', name='contentencoding')
+
+
+def upgrade() -> None:
+    # Per-webhook batching configuration
+    content_encoding.create(op.get_bind(), checkfirst=True)
+    op.add_column('webhooks', sa.Column('batch_enabled', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.add_column('webhooks', sa.Column('batch_max_events', sa.Integer(), server_default='100', nullable=False))
+    op.add_column('webhooks', sa.Column('batch_window_ms', sa.Integer(), server_default='5000', nullable=False))
+    op.add_column('webhooks', sa.Column('content_encoding', content_encoding, nullable=True))
+
+    # Batches of coalesced events
+    op.create_table(
+        'webhook_batches',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('webhook_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('event_ids', sa.JSON(), nullable=False),
+        sa.Column('event_count', sa.Integer(), nullable=False),
+        sa.Column('payload_size_bytes', sa.Integer(), nullable=False),
+        sa.Column('window_started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('window_closed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['webhook_id'], ['webhooks.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_webhook_batches_id'), 'webhook_batches', ['id'], unique=False)
+    op.create_index(op.f('ix_webhook_batches_webhook_id'), 'webhook_batches', ['webhook_id'], unique=False)
+
+    # A delivery now targets either a single event or a batch
+    op.alter_column('webhook_deliveries', 'event_id', existing_type=postgresql.UUID(as_uuid=True), nullable=True)
+    op.add_column('webhook_deliveries', sa.Column('batch_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.create_foreign_key(
+        'webhook_deliveries_batch_id_fkey',
+        'webhook_deliveries',
+        'webhook_batches',
+        ['batch_id'],
+        ['id'],
+        ondelete='CASCADE',
+    )
+    op.create_index(op.f('ix_webhook_deliveries_batch_id'), 'webhook_deliveries', ['batch_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_webhook_deliveries_batch_id'), table_name='webhook_deliveries')
+    op.drop_constraint('webhook_deliveries_batch_id_fkey', 'webhook_deliveries', type_='foreignkey')
+    op.drop_column('webhook_deliveries', 'batch_id')
+    op.execute('DELETE FROM webhook_deliveries WHERE event_id IS NULL')
+    op.alter_column('webhook_deliveries', 'event_id', existing_type=postgresql.UUID(as_uuid=True), nullable=False)
+
+    op.drop_index(op.f('ix_webhook_batches_webhook_id'), table_name='webhook_batches')
+    op.drop_index(op.f('ix_webhook_batches_id'), table_name='webhook_batches')
+    op.drop_table('webhook_batches')
+
+    op.drop_column('webhooks', 'content_encoding')
+    op.drop_column('webhooks', 'batch_window_ms')
+    op.drop_column('webhooks', 'batch_max_events')
+    op.drop_column('webhooks', 'batch_enabled')
+    content_encoding.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,123 @@
+"""Tests for API key cache invalidation."""
+
+import asyncio
+
+import fakeredis
+import pytest
+
+from app.api_key_cache import ApiKeyCache, CachedApiKey
+
+PREFIX = "aivo_sk_test"
+
+
+def _key(is_active: bool = True) -> CachedApiKey:
+    return CachedApiKey(
+        id="5f0c3a4e-1d2b-4c6a-9e8f-7a6b5c4d3e2f",
+        tenant_id="0d9c8b7a-6f5e-4d3c-2b1a-0f9e8d7c6b5a",
+        key_hash="0" * 64,
+        key_prefix=PREFIX,
+        scopes=("read",),
+        rate_limit_per_minute=None,
+        expires_at=None,
+        is_active=is_active,
+    )
+
+
+class FakeApiKeyTable:
+    """Database side of a lookup, which can be held open to interleave a revoke."""
+
+    def __init__(self) -> None:
+        self.keys = [_key()]
+        self.reads = 0
+        self.reading = asyncio.Event()
+        self.release: asyncio.Event | None = None
+
+    async def read(self, key_prefix: str, db: object) -> list[CachedApiKey]:
+        self.reads += 1
+        keys = list(self.keys)
+        self.reading.set()
+        if self.release is not None:
+            await self.release.wait()
+        return keys
+
+
+@pytest.fixture
+def server() -> fakeredis.FakeServer:
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def make_cache(server, monkeypatch):
+    table = FakeApiKeyTable()
+
+    def make() -> ApiKeyCache:
+        cache = ApiKeyCache()
+        cache.redis_client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        monkeypatch.setattr(cache, "_get_from_db", table.read)
+        return cache
+
+    return make, table
+
+
+async def test_lookup_racing_a_revoke_is_not_cached(make_cache):
+    """Keys read before a revoke committed are not written back after its invalidation."""
+    make, table = make_cache
+    cache = make()
+    table.release = asyncio.Event()
+
+    lookup = asyncio.create_task(cache.lookup(PREFIX, db=None))
+    await table.reading.wait()
+
+    # The revoke commits and invalidates while the lookup holds the old row
+    table.keys = []
+    await cache.invalidate(PREFIX)
+    table.release.set()
+    assert await lookup == [_key()]
+
+    assert await cache.redis_client.get(cache._redis_key(PREFIX)) is None
+    assert PREFIX not in cache._local
+
+    table.release = None
+    assert await cache.lookup(PREFIX, db=None) == []
+    assert table.reads == 2
+
+
+async def test_lookup_without_invalidation_is_cached(make_cache):
+    """An undisturbed miss populates both tiers."""
+    make, table = make_cache
+    cache = make()
+
+    await cache.lookup(PREFIX, db=None)
+    cache._local.clear()
+    assert await cache.lookup(PREFIX, db=None) == [_key()]
+
+    assert table.reads == 1
+    assert await cache.redis_client.get(cache._redis_key(PREFIX)) is not None
+
+
+async def test_invalidation_reaches_other_replicas(make_cache):
+    """A revoke on one replica evicts the prefix from another's local cache."""
+    make, table = make_cache
+    replica_a, replica_b = make(), make()
+    listener = asyncio.create_task(replica_a._listen_for_invalidations())
+    try:
+        for _ in range(100):
+            if replica_a._invalidations_connected:
+                break
+            await asyncio.sleep(0.01)
+
+        await replica_a.lookup(PREFIX, db=None)
+        assert PREFIX in replica_a._local
+
+        table.keys = []
+        await replica_b.invalidate(PREFIX)
+        for _ in range(100):
+            if PREFIX not in replica_a._local:
+                break
+            await asyncio.sleep(0.01)
+
+        assert await replica_a.lookup(PREFIX, db=None) == []
+        assert table.reads == 2
+    finally:
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
@@ -0,0 +1,165 @@
+"""Tests for webhook event batching."""
+
+import asyncio
+from types import SimpleNamespace
+from uuid import UUID, uuid4
+
+import pytest
+
+from app import batching
+from app.batching import WebhookBatcher
+from app.models import WebhookBatch, WebhookDelivery
+from app.routes import webhooks
+
+
+class FakeDatabase:
+    """Session factory recording committed batches, optionally failing commits."""
+
+    def __init__(self) -> None:
+        self.batches: list[WebhookBatch] = []
+        self.deliveries: list[WebhookDelivery] = []
+        self.fail_commits = 0
+
+    def __call__(self) -> "FakeSession":
+        return FakeSession(self)
+
+
+class FakeSession:
+    def __init__(self, database: FakeDatabase) -> None:
+        self.database = database
+        self.added: list[object] = []
+
+    async def __aenter__(self) -> "FakeSession":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        return None
+
+    def add(self, obj: object) -> None:
+        obj.id = uuid4()
+        self.added.append(obj)
+
+    async def flush(self) -> None:
+        return None
+
+    async def commit(self) -> None:
+        if self.database.fail_commits:
+            self.database.fail_commits -= 1
+            raise ConnectionError("database unavailable")
+        for obj in self.added:
+            if isinstance(obj, WebhookBatch):
+                self.database.batches.append(obj)
+            else:
+                self.database.deliveries.append(obj)
+
+    async def refresh(self, obj: object) -> None:
+        return None
+
+
+def _webhook(max_events: int = 3) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid4(),
+        batch_enabled=True,
+        batch_max_events=max_events,
+        batch_window_ms=60_000,
+    )
+
+
+def _event() -> SimpleNamespace:
+    return SimpleNamespace(id=uuid4(), payload={"score": 1})
+
+
+@pytest.fixture
+def database() -> FakeDatabase:
+    return FakeDatabase()
+
+
+@pytest.fixture
+def delivered() -> list[UUID]:
+    return []
+
+
+@pytest.fixture
+def batcher(database, delivered) -> WebhookBatcher:
+    async def deliver(delivery_id: UUID) -> None:
+        delivered.append(delivery_id)
+
+    return WebhookBatcher(session_factory=database, deliver=deliver, tick_seconds=0.01)
+
+
+async def test_full_batch_is_persisted_then_delivered(batcher, database, delivered):
+    webhook = _webhook(max_events=3)
+    events = [_event() for _ in range(3)]
+
+    for event in events:
+        await batcher.add(webhook, event)
+    await asyncio.sleep(0)
+
+    [batch] = database.batches
+    assert batch.event_ids == [str(event.id) for event in events]
+    [delivery] = database.deliveries
+    assert delivery.batch_id == batch.id
+    assert delivered == [delivery.id]
+    assert batcher.pending_events == 0
+
+
+async def test_failed_persist_requeues_events_ahead_of_newer_ones(batcher, database, delivered):
+    webhook = _webhook(max_events=2)
+    events = [_event() for _ in range(3)]
+    database.fail_commits = 1
+
+    await batcher.add(webhook, events[0])
+    await batcher.add(webhook, events[1])
+
+    assert database.batches == []
+    assert batcher.pending_events == 2
+
+    # The requeued batch is already full, so the next event flushes everything
+    await batcher.add(webhook, events[2])
+    await asyncio.sleep(0)
+
+    [batch] = database.batches
+    assert batch.event_ids == [str(event.id) for event in events]
+    assert len(delivered) == 1
+
+
+async def test_requeued_events_are_retried_on_the_next_tick(batcher, database):
+    webhook = _webhook(max_events=2)
+    database.fail_commits = 1
+
+    await batcher.add(webhook, _event())
+    await batcher.add(webhook, _event())
+    assert batcher.pending_events == 2
+
+    await batcher.start()
+    try:
+        await asyncio.sleep(0.05)
+    finally:
+        await batcher.stop()
+
+    [batch] = database.batches
+    assert batch.event_count == 2
+    assert batcher.pending_events == 0
+
+
+async def test_failed_delivery_leaves_the_batch_persisted(database):
+    async def deliver(delivery_id: UUID) -> None:
+        raise ConnectionError("endpoint unreachable")
+
+    batcher = WebhookBatcher(session_factory=database, deliver=deliver)
+
+    await batcher.add(_webhook(max_events=1), _event())
+    await batcher.stop()
+
+    assert len(database.batches) == 1
+    assert len(database.deliveries) == 1
+
+
+async def test_publish_event_buffers_for_batching_webhooks(batcher, monkeypatch):
+    monkeypatch.setattr(batching, "webhook_batcher", batcher)
+    webhook = _webhook(max_events=10)
+
+    delivery_id = await webhooks.publish_event(webhook, _event(), db=None)
+
+    assert delivery_id is None
+    assert batcher.pending_events == 1
@@ -14,8 +14,10 @@ import boto3
 from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response as FastAPIResponse
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
 
 from .database import get_session
 from .lti.zoom_integration import ZoomLTIError, ZoomLTIHandler
@@ -42,6 +44,11 @@ S3_BUCKET = "media-service-bucket"
 S3_CDN_URL = "https://d1234567890abcdef.cloudfront.net"
 HLS_PROXY_SECRET = os.getenv("HLS_PROXY_SECRET", "your-secret-key-here")
 ZOOM_WEBHOOK_SECRET = os.getenv("ZOOM_WEBHOOK_SECRET", "zoom-webhook-secret")
+HLS_SEGMENT_URL_TTL = int(os.getenv("HLS_SEGMENT_URL_TTL", "3600"))
+HLS_PLAYLIST_CACHE_TTL = int(os.getenv("HLS_PLAYLIST_CACHE_TTL", "300"))
+HLS_UPSTREAM_MAX_CONNECTIONS = int(os.getenv("HLS_UPSTREAM_MAX_CONNECTIONS", "256"))
+HLS_SEGMENT_CACHE_DIR = os.getenv("HLS_SEGMENT_CACHE_DIR", "")
+HLS_SEGMENT_CACHE_MAX_BYTES = int(os.getenv("HLS_SEGMENT_CACHE_MAX_BYTES", str(1 << 30)))
 
 # Global objects
 zoom_lti_handler: ZoomLTIHandler | None = None
@@ -55,7 +62,15 @@ async def lifespan(app: FastAPI):
 
     # Initialize services
     zoom_lti_handler = ZoomLTIHandler()
-    hls_proxy = PlaylistWhitelistProxy(HLS_PROXY_SECRET, S3_CDN_URL)
+    hls_proxy = PlaylistWhitelistProxy(
+        HLS_PROXY_SECRET,
+        S3_CDN_URL,
+        segment_url_ttl=HLS_SEGMENT_URL_TTL,
+        playlist_cache_ttl=HLS_PLAYLIST_CACHE_TTL,
+        max_upstream_connections=HLS_UPSTREAM_MAX_CONNECTIONS,
+        segment_cache_dir=HLS_SEGMENT_CACHE_DIR or None,
+        segment_cache_max_bytes=HLS_SEGMENT_CACHE_MAX_BYTES,
+    )
 
     logger.info("Media service started")
     yield
@@ -320,19 +335,34 @@ async def get_variant_playlist(
 async def get_segment(
     video_id: uuid.UUID,
     segment_path: str,
-    token: str,
+    request: Request,
+    token: str | None = None,
+    expires: int | None = None,
+    sig: str | None = None,
 ) -> FastAPIResponse:
-    """Proxy HLS segment with access control."""
+    """Stream HLS segment authorized by a signed URL or an access token."""
     try:
         if not hls_proxy:
             raise HTTPException(status_code=500, detail="HLS proxy not initialized")
 
-        result = await hls_proxy.proxy_segment(video_id, segment_path, token)
+        result = await hls_proxy.proxy_segment(
+            video_id,
+            segment_path,
+            token,
+            expires=expires,
+            signature=sig,
+            request_headers=request.headers,
+        )
 
-        return FastAPIResponse(
-            content=result["content"],
-            media_type=result["content_type"],
-            headers={"Cache-Control": result["cache_control"]},
+        headers = {**result["headers"], "cache-control": result["cache_control"]}
+        if result["body"] is None:
+            return FastAPIResponse(status_code=result["status_code"], headers=headers)
+
+        return StreamingResponse(
+            result["body"],
+            status_code=result["status_code"],
+            headers=headers,
+            background=BackgroundTask(result["close"]),
         )
 
     except HLSProxyError as e:
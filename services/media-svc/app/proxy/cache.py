@@ -0,0 +1,113 @@
+"""Bounded expiring cache with coalesced loads for the HLS proxy."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, Generic, TypeVar
+
+V = TypeVar("V")
+
+
+class ExpiringCache(Generic[V]):
+    """LRU cache whose entries each carry their own expiry (epoch seconds).
+
+    ``get_or_load`` runs one load per key at a time: concurrent callers for a
+    missing key await the same load instead of repeating it.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[V, float]] = OrderedDict()
+        self._loading: dict[Hashable, asyncio.Future[V]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> V | None:
+        """Cached value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: V, expires_at: float) -> None:
+        """Store a value until ``expires_at``."""
+        if expires_at <= time.time():
+            return
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        load: Callable[[], Awaitable[tuple[V, float]]],
+    ) -> V:
+        """Cached value, or the result of ``load`` (value, expires_at).
+
+        Errors raised by ``load`` are not cached. If the caller running a
+        load is cancelled, the callers waiting on it start a new load rather
+        than being cancelled too.
+        """
+        while True:
+            value = self.get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+
+            pending = self._loading.get(key)
+            if pending is None:
+                break
+
+            self.hits += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # Only the loading caller went away (e.g. its client
+                # disconnected): retry instead of inheriting its cancellation
+                if not pending.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        self.misses += 1
+        future: asyncio.Future[V] = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value, expires_at = await load()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else is waiting
+            raise
+        else:
+            self.set(key, value, expires_at)
+            future.set_result(value)
+            return value
+        finally:
+            del self._loading[key]
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Size and hit counts."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -6,6 +6,7 @@ import logging
 import secrets
 import time
 import uuid
+from collections.abc import Mapping
 from datetime import datetime
 from typing import Any
 from urllib.parse import urlparse
@@ -17,6 +18,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import engine
 from ..models import HLSOutput, MediaUpload
+from .cache import ExpiringCache
+from .segment_relay import SegmentDiskCache, SegmentRelay
 
 logger = logging.getLogger(__name__)
 
@@ -30,16 +33,63 @@ class HLSProxyError(Exception):
 class PlaylistWhitelistProxy:
     """Proxy for HLS playlists with access control and token validation."""
 
-    def __init__(self, secret_key: str, cdn_base_url: str) -> None:
+    def __init__(
+        self,
+        secret_key: str,
+        cdn_base_url: str,
+        segment_url_ttl: int = 3600,
+        playlist_cache_ttl: int = 300,
+        denied_access_ttl: int = 10,
+        cache_size: int = 100_000,
+        http_client: httpx.AsyncClient | None = None,
+        max_upstream_connections: int = 256,
+        segment_cache_dir: str | None = None,
+        segment_cache_max_bytes: int = 1 << 30,
+    ) -> None:
         """Initialize HLS playlist proxy.
 
         Args:
             secret_key: Secret key for token generation/validation
             cdn_base_url: Base URL for CDN/S3 bucket
+            segment_url_ttl: Minimum validity of signed segment URLs in seconds
+            playlist_cache_ttl: Seconds to cache original and rewritten playlists
+            denied_access_ttl: Seconds to cache a denied access decision
+            cache_size: Maximum entries per cache
+            http_client: HTTP client for the CDN (default: a new pooled client)
+            max_upstream_connections: Connection pool size of the default client
+            segment_cache_dir: Directory for the local segment cache (default: off)
+            segment_cache_max_bytes: Size limit of the local segment cache
         """
         self.secret_key = secret_key.encode()
         self.cdn_base_url = cdn_base_url.rstrip("/")
-        self.http_client = httpx.AsyncClient(timeout=30.0)
+        self.http_client = http_client or httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(
+                max_connections=max_upstream_connections,
+                max_keepalive_connections=max_upstream_connections,
+            ),
+        )
+        self.segment_relay = SegmentRelay(
+            self.http_client,
+            disk_cache=(
+                SegmentDiskCache(segment_cache_dir, segment_cache_max_bytes)
+                if segment_cache_dir
+                else None
+            ),
+        )
+
+        self.segment_url_ttl = segment_url_ttl
+        self.segment_url_window = max(segment_url_ttl // 4, 1)
+        self.playlist_cache_ttl = playlist_cache_ttl
+        self.denied_access_ttl = denied_access_ttl
+
+        # (token, video_id) -> access granted
+        self.access_cache: ExpiringCache[bool] = ExpiringCache(cache_size)
+        # Master playlist URLs and original playlists from the CDN
+        self.source_cache: ExpiringCache[str] = ExpiringCache(cache_size)
+        # Rewritten master (per token) and variant (per signing window) playlists
+        self.playlist_cache: ExpiringCache[str] = ExpiringCache(cache_size)
+        self.upstream_fetches = 0
 
     def generate_access_token(
         self,
@@ -156,54 +206,153 @@ class PlaylistWhitelistProxy:
             logger.error("Failed to check video access: %s", e)
             return False
 
-    async def proxy_master_playlist(
-        self,
-        video_id: uuid.UUID,
-        token: str,
-        request: Request,
-    ) -> dict[str, Any]:
-        """Proxy master HLS playlist with token validation.
+    async def authorize(self, video_id: uuid.UUID, token: str) -> dict[str, Any]:
+        """Verify a token for a video, with the access decision cached.
+
+        Granted access is cached per (token, video) until the token expires;
+        denials are cached for ``denied_access_ttl`` seconds so that a video
+        finishing transcoding becomes playable quickly.
 
         Args:
             video_id: Video UUID
             token: Access token
-            request: FastAPI request object
 
         Returns:
-            Playlist response data
+            Decoded token data
+
+        Raises:
+            HLSProxyError: If the token is invalid or access is denied
         """
-        try:
-            # Verify access token
-            token_data = self.verify_access_token(token)
-            if token_data["video_id"] != video_id:
-                raise HLSProxyError("Token video ID mismatch")
+        token_data = self.verify_access_token(token)
+        if token_data["video_id"] != video_id:
+            raise HLSProxyError("Token video ID mismatch")
 
-            # Check video access
-            if not await self.check_video_access(video_id, token_data["user_id"]):
-                raise HLSProxyError("Access denied")
+        async def load() -> tuple[bool, float]:
+            allowed = await self.check_video_access(video_id, token_data["user_id"])
+            if allowed:
+                return True, token_data["expires_at"].timestamp()
+            return False, time.time() + self.denied_access_ttl
 
-            # Get HLS output details
+        if not await self.access_cache.get_or_load((token, video_id), load):
+            raise HLSProxyError("Access denied")
+
+        return token_data
+
+    def sign_segment(self, video_id: uuid.UUID, segment_path: str, expires: int) -> str:
+        """Sign a segment URL.
+
+        Args:
+            video_id: Video UUID
+            segment_path: Path to segment file
+            expires: Expiry of the signature (epoch seconds)
+
+        Returns:
+            Hex HMAC signature
+        """
+        payload = f"segment:{video_id}:{segment_path}:{expires}"
+        return hmac.new(self.secret_key, payload.encode(), hashlib.sha256).hexdigest()
+
+    def verify_segment_signature(
+        self,
+        video_id: uuid.UUID,
+        segment_path: str,
+        expires: int | None,
+        signature: str,
+    ) -> None:
+        """Verify a signed segment URL.
+
+        Raises:
+            HLSProxyError: If the signature is invalid or expired
+        """
+        if expires is None:
+            raise HLSProxyError("Missing segment expiry")
+        expected = self.sign_segment(video_id, segment_path, expires)
+        if not hmac.compare_digest(signature, expected):
+            raise HLSProxyError("Invalid segment signature")
+        if time.time() > expires:
+            raise HLSProxyError("Segment URL has expired")
+
+    def _segment_url_expiry(self) -> int:
+        """Expiry for segment URLs signed now.
+
+        Expiries are rounded up to a window, so every viewer of a variant in
+        the same window gets byte-identical playlists, and signatures always
+        stay valid for at least ``segment_url_ttl`` seconds.
+        """
+        window = self.segment_url_window
+        return (int(time.time()) // window + 1) * window + self.segment_url_ttl
+
+    async def _master_playlist_url(self, video_id: uuid.UUID) -> str:
+        """Master playlist URL of a video, cached for ``playlist_cache_ttl``."""
+
+        async def load() -> tuple[str, float]:
             async with AsyncSession(engine) as session:
                 result = await session.execute(
                     select(HLSOutput).where(HLSOutput.upload_id == video_id)
                 )
                 hls_output = result.scalar_one_or_none()
 
-                if not hls_output or not hls_output.master_playlist_url:
-                    raise HLSProxyError("HLS playlist not available")
+            if not hls_output or not hls_output.master_playlist_url:
+                raise HLSProxyError("HLS playlist not available")
+
+            return hls_output.master_playlist_url, time.time() + self.playlist_cache_ttl
 
-            # Fetch original playlist
-            response = await self.http_client.get(hls_output.master_playlist_url)
+        return await self.source_cache.get_or_load(("master_url", video_id), load)
+
+    async def _fetch_playlist(self, url: str) -> str:
+        """Original playlist from the CDN, cached for ``playlist_cache_ttl``."""
+
+        async def load() -> tuple[str, float]:
+            self.upstream_fetches += 1
+            response = await self.http_client.get(url)
             response.raise_for_status()
+            return response.text, time.time() + self.playlist_cache_ttl
+
+        return await self.source_cache.get_or_load(("playlist", url), load)
+
+    async def proxy_master_playlist(
+        self,
+        video_id: uuid.UUID,
+        token: str,
+        request: Request,
+    ) -> dict[str, Any]:
+        """Proxy master HLS playlist with token validation.
+
+        The rewritten playlist embeds the token, so it is cached per token.
+
+        Args:
+            video_id: Video UUID
+            token: Access token
+            request: FastAPI request object
 
-            original_playlist = response.text
+        Returns:
+            Playlist response data
+        """
+        try:
+            # Verify access token and video access
+            token_data = await self.authorize(video_id, token)
+            base_url = f"{request.url.scheme}://{request.url.netloc}"
+
+            async def load() -> tuple[str, float]:
+                playlist_url = await self._master_playlist_url(video_id)
+                original_playlist = await self._fetch_playlist(playlist_url)
+
+                # Rewrite playlist URLs to include proxy
+                proxied_playlist = self._rewrite_master_playlist(
+                    original_playlist,
+                    video_id,
+                    token,
+                    base_url,
+                )
+                expires_at = min(
+                    token_data["expires_at"].timestamp(),
+                    time.time() + self.playlist_cache_ttl,
+                )
+                return proxied_playlist, expires_at
 
-            # Rewrite playlist URLs to include proxy
-            proxied_playlist = self._rewrite_master_playlist(
-                original_playlist,
-                video_id,
-                token,
-                request,
+            proxied_playlist = await self.playlist_cache.get_or_load(
+                ("master", video_id, token, base_url),
+                load,
             )
 
             return {
@@ -228,6 +377,9 @@ class PlaylistWhitelistProxy:
     ) -> dict[str, Any]:
         """Proxy variant HLS playlist with token validation.
 
+        Segments are rewritten to signed URLs that do not carry the token, so
+        one rewritten playlist serves every viewer in a signing window.
+
         Args:
             video_id: Video UUID
             variant_path: Path to variant playlist
@@ -238,31 +390,30 @@ class PlaylistWhitelistProxy:
             Playlist response data
         """
         try:
-            # Verify access token
-            token_data = self.verify_access_token(token)
-            if token_data["video_id"] != video_id:
-                raise HLSProxyError("Token video ID mismatch")
-
-            # Check video access
-            if not await self.check_video_access(video_id, token_data["user_id"]):
-                raise HLSProxyError("Access denied")
-
-            # Construct full URL to variant playlist
-            playlist_url = f"{self.cdn_base_url}/{variant_path}"
-
-            # Fetch original playlist
-            response = await self.http_client.get(playlist_url)
-            response.raise_for_status()
-
-            original_playlist = response.text
+            # Verify access token and video access
+            await self.authorize(video_id, token)
+            base_url = f"{request.url.scheme}://{request.url.netloc}"
+            expires = self._segment_url_expiry()
+
+            async def load() -> tuple[str, float]:
+                # Construct full URL to variant playlist
+                playlist_url = f"{self.cdn_base_url}/{variant_path}"
+                original_playlist = await self._fetch_playlist(playlist_url)
+
+                # Rewrite segment URLs to signed proxy URLs
+                proxied_playlist = self._rewrite_variant_playlist(
+                    original_playlist,
+                    video_id,
+                    variant_path,
+                    expires,
+                    base_url,
+                )
+                # Until the next window starts signing with a later expiry
+                return proxied_playlist, expires - self.segment_url_ttl
 
-            # Rewrite segment URLs to include proxy
-            proxied_playlist = self._rewrite_variant_playlist(
-                original_playlist,
-                video_id,
-                variant_path,
-                token,
-                request,
+            proxied_playlist = await self.playlist_cache.get_or_load(
+                ("variant", video_id, variant_path, base_url, expires),
+                load,
             )
 
             return {
@@ -282,38 +433,49 @@ class PlaylistWhitelistProxy:
         self,
         video_id: uuid.UUID,
         segment_path: str,
-        token: str,
+        token: str | None = None,
+        expires: int | None = None,
+        signature: str | None = None,
+        request_headers: Mapping[str, str] | None = None,
     ) -> dict[str, Any]:
-        """Proxy HLS segment with token validation.
+        """Relay HLS segment with signed URL or token validation.
+
+        Signed URLs from rewritten variant playlists are checked with an HMAC
+        only. A bare access token is still accepted and goes through the
+        cached access check. The body streams from the origin (or the local
+        segment cache); Range and conditional headers pass through.
 
         Args:
             video_id: Video UUID
             segment_path: Path to segment file
             token: Access token
+            expires: Expiry of the segment signature
+            signature: Segment URL signature
+            request_headers: Client request headers
 
         Returns:
-            Segment response data
+            Segment response data; ``body`` must be iterated or closed
         """
         try:
-            # Verify access token
-            token_data = self.verify_access_token(token)
-            if token_data["video_id"] != video_id:
-                raise HLSProxyError("Token video ID mismatch")
-
-            # Check video access
-            if not await self.check_video_access(video_id, token_data["user_id"]):
-                raise HLSProxyError("Access denied")
+            if signature is not None:
+                self.verify_segment_signature(video_id, segment_path, expires, signature)
+            elif token is not None:
+                await self.authorize(video_id, token)
+            else:
+                raise HLSProxyError("Missing segment authorization")
 
             # Construct full URL to segment
             segment_url = f"{self.cdn_base_url}/{segment_path}"
 
-            # Fetch segment
-            response = await self.http_client.get(segment_url)
-            response.raise_for_status()
+            segment = await self.segment_relay.fetch(segment_url, request_headers or {})
+            segment.headers.setdefault("content-type", "video/mp2t")
 
             return {
-                "content": response.content,
-                "content_type": "video/mp2t",
+                "status_code": segment.status_code,
+                "headers": segment.headers,
+                "body": segment.body,
+                "close": segment.aclose,
+                "content_type": segment.headers["content-type"],
                 "cache_control": "public, max-age=31536000",  # Cache segments for 1 year
             }
 
@@ -329,7 +491,7 @@ class PlaylistWhitelistProxy:
         playlist: str,
         video_id: uuid.UUID,
         token: str,
-        request: Request,
+        base_url: str,
     ) -> str:
         """Rewrite master playlist URLs to proxy through our service.
 
@@ -337,13 +499,11 @@ class PlaylistWhitelistProxy:
             playlist: Original master playlist content
             video_id: Video UUID
             token: Access token
-            request: FastAPI request object
+            base_url: Scheme and host of this service
 
         Returns:
             Rewritten playlist content
         """
-        base_url = f"{request.url.scheme}://{request.url.netloc}"
-
         lines = playlist.split("\n")
         rewritten_lines = []
 
@@ -369,22 +529,21 @@ class PlaylistWhitelistProxy:
         playlist: str,
         video_id: uuid.UUID,
         variant_path: str,
-        token: str,
-        request: Request,
+        expires: int,
+        base_url: str,
     ) -> str:
-        """Rewrite variant playlist URLs to proxy through our service.
+        """Rewrite variant playlist segments to signed proxy URLs.
 
         Args:
             playlist: Original variant playlist content
             video_id: Video UUID
             variant_path: Path to variant playlist
-            token: Access token
-            request: FastAPI request object
+            expires: Expiry of the segment signatures
+            base_url: Scheme and host of this service
 
         Returns:
             Rewritten playlist content
         """
-        base_url = f"{request.url.scheme}://{request.url.netloc}"
         variant_dir = "/".join(variant_path.split("/")[:-1])
 
         lines = playlist.split("\n")
@@ -397,8 +556,10 @@ class PlaylistWhitelistProxy:
             elif line.endswith(".ts"):
                 # Rewrite segment URLs
                 segment_path = f"{variant_dir}/{line}" if variant_dir else line
+                signature = self.sign_segment(video_id, segment_path, expires)
                 proxied_url = (
-                    f"{base_url}/api/v1/media/hls/{video_id}/segment/{segment_path}?token={token}"
+                    f"{base_url}/api/v1/media/hls/{video_id}/segment/{segment_path}"
+                    f"?expires={expires}&sig={signature}"
                 )
                 rewritten_lines.append(proxied_url)
             else:
@@ -421,6 +582,16 @@ class PlaylistWhitelistProxy:
             return parsed.path.lstrip("/")
         return url
 
+    def get_metrics(self) -> dict[str, Any]:
+        """Cache and upstream fetch metrics."""
+        return {
+            "access_cache": self.access_cache.get_metrics(),
+            "source_cache": self.source_cache.get_metrics(),
+            "playlist_cache": self.playlist_cache.get_metrics(),
+            "upstream_playlist_fetches": self.upstream_fetches,
+            "segment_relay": self.segment_relay.get_metrics(),
+        }
+
     async def cleanup(self) -> None:
         """Clean up HTTP client resources."""
         await self.http_client.aclose()
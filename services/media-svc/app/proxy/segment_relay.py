@@ -0,0 +1,451 @@
+"""Streaming relay for HLS segments with an optional local disk cache."""
+
+import hashlib
+import json
+import logging
+import re
+import secrets
+from collections import OrderedDict
+from collections.abc import AsyncIterable, AsyncIterator, Mapping
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any
+
+import aiofiles
+import aiofiles.os
+import httpx
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Client request headers passed through to the origin
+FORWARDED_REQUEST_HEADERS = ("range", "if-range", "if-none-match", "if-modified-since")
+
+# Origin response headers passed back to the client
+FORWARDED_RESPONSE_HEADERS = (
+    "accept-ranges",
+    "content-length",
+    "content-range",
+    "content-type",
+    "etag",
+    "last-modified",
+)
+
+_BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+@dataclass
+class SegmentResponse:
+    """Status, headers and streamed body of a relayed segment."""
+
+    status_code: int
+    headers: dict[str, str]
+    body: AsyncIterable[bytes] | None = None  # None for 304 and 416
+
+    async def aclose(self) -> None:
+        """Release the origin connection, whether or not the body was read."""
+        close = getattr(self.body, "aclose", None)
+        if close is not None:
+            await close()
+
+
+@dataclass
+class CachedSegment:
+    """Metadata of a segment in the disk cache."""
+
+    size: int
+    content_type: str
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class SegmentDiskCache:
+    """LRU cache of whole segments on local disk, bounded by total size.
+
+    Each segment is a ``<key>.seg`` data file with a ``<key>.json`` metadata
+    file. Data is written to a temporary file and renamed into place once
+    the full body has been received, so readers never see partial segments.
+    The index is rebuilt from the directory on startup.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        """Initialize the cache and index any segments already on disk.
+
+        Args:
+            directory: Cache directory
+            max_bytes: Total size of cached segments before eviction
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, CachedSegment] = OrderedDict()
+        self._writing: set[str] = set()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self) -> None:
+        data_files = sorted(self.directory.glob("*.seg"), key=lambda p: p.stat().st_mtime)
+        for data_file in data_files:
+            try:
+                metadata = json.loads(data_file.with_suffix(".json").read_text())
+                segment = CachedSegment(**metadata)
+            except (OSError, ValueError, TypeError):
+                data_file.unlink(missing_ok=True)
+                continue
+            self._entries[data_file.stem] = segment
+            self.size += segment.size
+
+        for tmp_file in self.directory.glob("*.tmp"):
+            tmp_file.unlink(missing_ok=True)
+        for metadata_file in self.directory.glob("*.json"):
+            if metadata_file.stem not in self._entries:
+                metadata_file.unlink(missing_ok=True)
+
+        if self._entries:
+            logger.info(
+                "Indexed %d cached segments (%d bytes)", len(self._entries), self.size
+            )
+
+    @staticmethod
+    def key(url: str) -> str:
+        """Cache key of a segment URL."""
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.directory / f"{key}{suffix}"
+
+    def get(self, key: str) -> CachedSegment | None:
+        """Metadata of a cached segment, marking it recently used."""
+        segment = self._entries.get(key)
+        if segment is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return segment
+
+    async def read(self, key: str, start: int, length: int) -> AsyncIterator[bytes]:
+        """Stream ``length`` bytes of a cached segment from ``start``."""
+        async with aiofiles.open(self._path(key, ".seg"), "rb") as f:
+            await f.seek(start)
+            while length > 0:
+                chunk = await f.read(min(CHUNK_SIZE, length))
+                if not chunk:
+                    break
+                length -= len(chunk)
+                yield chunk
+
+    def start_write(self, key: str) -> Path | None:
+        """Reserve a temporary file for a segment, unless one is in progress."""
+        if key in self._writing or key in self._entries:
+            return None
+        self._writing.add(key)
+        return self._path(key, f".{secrets.token_hex(4)}.tmp")
+
+    async def finish_write(self, key: str, tmp_path: Path, segment: CachedSegment) -> None:
+        """Move a completely written segment into the cache."""
+        try:
+            async with aiofiles.open(self._path(key, ".json"), "w") as f:
+                await f.write(json.dumps(asdict(segment)))
+            await aiofiles.os.replace(tmp_path, self._path(key, ".seg"))
+        finally:
+            self._writing.discard(key)
+
+        self._entries[key] = segment
+        self.size += segment.size
+        await self._evict()
+
+    async def abort_write(self, key: str, tmp_path: Path) -> None:
+        """Discard a partially written segment."""
+        self._writing.discard(key)
+        try:
+            await aiofiles.os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+
+    async def _evict(self) -> None:
+        while self.size > self.max_bytes and self._entries:
+            key, segment = self._entries.popitem(last=False)
+            self.size -= segment.size
+            for suffix in (".seg", ".json"):
+                try:
+                    await aiofiles.os.remove(self._path(key, suffix))
+                except FileNotFoundError:
+                    pass
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Size and hit counts."""
+        lookups = self.hits + self.misses
+        return {
+            "segments": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class SegmentRelay:
+    """Streams segments from the origin to clients without buffering them.
+
+    Upstream bytes are relayed in ``chunk_size`` chunks as the client reads
+    them, so memory per stream stays at one chunk whatever the segment size.
+    Range and conditional request headers go to the origin, and its status
+    (200, 206, 304, 416) and validators come back to the client. With a disk
+    cache, full 200 responses are written to disk while they stream. Hot
+    segments are then served locally, including ranges and conditional requests.
+    """
+
+    def __init__(
+        self,
+        http_client: httpx.AsyncClient,
+        disk_cache: SegmentDiskCache | None = None,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> None:
+        """Initialize the relay.
+
+        Args:
+            http_client: Shared, pooled HTTP client for the origin
+            disk_cache: Optional local cache for hot segments
+            chunk_size: Bytes read from the origin per chunk
+        """
+        self.http_client = http_client
+        self.disk_cache = disk_cache
+        self.chunk_size = chunk_size
+        self.active_streams = 0
+        self.bytes_relayed = 0
+
+    async def fetch(self, url: str, request_headers: Mapping[str, str]) -> SegmentResponse:
+        """Start relaying a segment.
+
+        Args:
+            url: Origin URL of the segment
+            request_headers: Client request headers
+
+        Returns:
+            Response whose body streams from the disk cache or the origin
+
+        Raises:
+            httpx.HTTPStatusError: If the origin fails with a 4xx/5xx status
+            httpx.RequestError: If the origin cannot be reached
+        """
+        forwarded = {
+            name: request_headers[name]
+            for name in FORWARDED_REQUEST_HEADERS
+            if request_headers.get(name)
+        }
+
+        cache_key = None
+        if self.disk_cache is not None:
+            cache_key = self.disk_cache.key(url)
+            cached = self.disk_cache.get(cache_key)
+            if cached is not None:
+                return self._from_cache(cache_key, cached, forwarded)
+
+        request = self.http_client.build_request(
+            "GET",
+            url,
+            headers={**forwarded, "accept-encoding": "identity"},
+        )
+        response = await self.http_client.send(request, stream=True)
+
+        if response.status_code >= 400 and response.status_code != 416:
+            await response.aclose()
+            response.raise_for_status()
+
+        headers = {
+            name: response.headers[name]
+            for name in FORWARDED_RESPONSE_HEADERS
+            if name in response.headers
+        }
+
+        if response.status_code in (304, 416):
+            await response.aclose()
+            return SegmentResponse(response.status_code, headers)
+
+        tmp_path = None
+        if cache_key is not None and response.status_code == 200:
+            tmp_path = self.disk_cache.start_write(cache_key)
+
+        return SegmentResponse(
+            response.status_code,
+            headers,
+            _OriginStream(self, response, cache_key, tmp_path),
+        )
+
+    def _from_cache(
+        self,
+        key: str,
+        segment: CachedSegment,
+        request_headers: Mapping[str, str],
+    ) -> SegmentResponse:
+        """Serve a cached segment, honouring conditional and Range headers."""
+        headers = {"accept-ranges": "bytes", "content-type": segment.content_type}
+        if segment.etag:
+            headers["etag"] = segment.etag
+        if segment.last_modified:
+            headers["last-modified"] = segment.last_modified
+
+        # If-Modified-Since only applies without If-None-Match (RFC 9110)
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match:
+            tags = {tag.strip() for tag in if_none_match.split(",")}
+            if segment.etag and ("*" in tags or segment.etag in tags):
+                return SegmentResponse(304, headers)
+        elif self._not_modified_since(request_headers.get("if-modified-since"), segment):
+            return SegmentResponse(304, headers)
+
+        start, end = 0, segment.size - 1
+        byte_range = self._requested_range(request_headers, segment)
+        if byte_range == "unsatisfiable":
+            headers["content-range"] = f"bytes */{segment.size}"
+            return SegmentResponse(416, headers)
+
+        status_code = 200
+        if byte_range is not None:
+            start, end = byte_range
+            status_code = 206
+            headers["content-range"] = f"bytes {start}-{end}/{segment.size}"
+
+        length = end - start + 1
+        headers["content-length"] = str(length)
+        body = self._count(self.disk_cache.read(key, start, length))
+        return SegmentResponse(status_code, headers, body)
+
+    @staticmethod
+    def _not_modified_since(if_modified_since: str | None, segment: CachedSegment) -> bool:
+        """Whether a cached segment is unchanged since an If-Modified-Since date."""
+        if not if_modified_since or not segment.last_modified:
+            return False
+        try:
+            return parsedate_to_datetime(segment.last_modified) <= parsedate_to_datetime(
+                if_modified_since
+            )
+        except (TypeError, ValueError):
+            return False  # Unparseable or mixed naive/aware dates: serve the body
+
+    @staticmethod
+    def _requested_range(
+        request_headers: Mapping[str, str],
+        segment: CachedSegment,
+    ) -> tuple[int, int] | str | None:
+        """Single byte range requested, "unsatisfiable", or None for the whole body.
+
+        Multiple ranges, unknown units and stale If-Range validators fall back
+        to the whole body, as RFC 9110 allows.
+        """
+        header = request_headers.get("range")
+        if not header:
+            return None
+
+        if_range = request_headers.get("if-range")
+        if if_range and if_range not in (segment.etag, segment.last_modified):
+            return None
+
+        match = _BYTE_RANGE.match(header.strip())
+        if not match or not (match.group(1) or match.group(2)):
+            return None
+
+        first, last = match.groups()
+        if not first:
+            suffix = int(last)
+            if suffix == 0:
+                return "unsatisfiable"
+            return max(segment.size - suffix, 0), segment.size - 1
+
+        start = int(first)
+        if last and int(last) < start:
+            return None  # Invalid range: ignored
+        if start >= segment.size:
+            return "unsatisfiable"
+        end = min(int(last), segment.size - 1) if last else segment.size - 1
+        return start, end
+
+    async def _count(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        self.active_streams += 1
+        try:
+            async for chunk in chunks:
+                self.bytes_relayed += len(chunk)
+                yield chunk
+        finally:
+            self.active_streams -= 1
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Stream and disk cache metrics."""
+        return {
+            "active_streams": self.active_streams,
+            "bytes_relayed": self.bytes_relayed,
+            "disk_cache": self.disk_cache.get_metrics() if self.disk_cache else None,
+        }
+
+
+class _OriginStream:
+    """An origin response body, relayed chunk by chunk and closed exactly once.
+
+    Closing releases the pooled connection and discards a partial cache
+    write, even if the client went away before reading anything.
+    """
+
+    def __init__(
+        self,
+        relay: SegmentRelay,
+        response: httpx.Response,
+        cache_key: str | None,
+        tmp_path: Path | None,
+    ) -> None:
+        self.relay = relay
+        self.response = response
+        self.cache_key = cache_key
+        self.tmp_path = tmp_path
+        self._cache_file: Any = None
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        relay = self.relay
+        relay.active_streams += 1
+        size = 0
+        try:
+            if self.tmp_path is not None:
+                self._cache_file = await aiofiles.open(self.tmp_path, "wb")
+
+            async for chunk in self.response.aiter_raw(relay.chunk_size):
+                if self._cache_file is not None:
+                    await self._cache_file.write(chunk)
+                size += len(chunk)
+                relay.bytes_relayed += len(chunk)
+                yield chunk
+
+            if self._cache_file is not None:
+                await self._cache_file.close()
+                self._cache_file = None
+                tmp_path, self.tmp_path = self.tmp_path, None
+                await relay.disk_cache.finish_write(
+                    self.cache_key,
+                    tmp_path,
+                    CachedSegment(
+                        size=size,
+                        content_type=self.response.headers.get("content-type", "video/mp2t"),
+                        etag=self.response.headers.get("etag"),
+                        last_modified=self.response.headers.get("last-modified"),
+                    ),
+                )
+        finally:
+            relay.active_streams -= 1
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the origin response and drop any unfinished cache write."""
+        if self._closed:
+            return
+        self._closed = True
+        await self.response.aclose()
+        if self._cache_file is not None:
+            await self._cache_file.close()
+        if self.tmp_path is not None:
+            await self.relay.disk_cache.abort_write(self.cache_key, self.tmp_path)
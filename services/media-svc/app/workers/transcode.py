@@ -1,16 +1,20 @@
 """Video transcoding tasks using FFmpeg for HLS output."""
 
+import asyncio
 import logging
 import os
 import shutil
 import tempfile
+import threading
 import uuid
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 import boto3
 import ffmpeg
-from celery import current_task
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
@@ -26,6 +30,11 @@ s3_client = boto3.client("s3")
 # Database engine for workers
 engine = create_async_engine(DATABASE_URL)
 
+# CPU threads for one transcoding job, shared by all variants (0: FFmpeg default)
+TRANSCODE_THREADS = int(os.getenv("TRANSCODE_THREADS", "0"))
+# Concurrent S3 uploads per transcoding job
+HLS_UPLOAD_WORKERS = int(os.getenv("HLS_UPLOAD_WORKERS", "8"))
+
 
 class TranscodingError(Exception):
     """Custom exception for transcoding errors."""
@@ -36,13 +45,15 @@ class TranscodingError(Exception):
 class HLSTranscoder:
     """FFmpeg-based HLS transcoder."""
 
-    def __init__(self, temp_dir: str | None = None) -> None:
+    def __init__(self, temp_dir: str | None = None, threads: int = 0) -> None:
         """Initialize transcoder.
 
         Args:
             temp_dir: Temporary directory for processing
+            threads: CPU threads shared by all variants (0: FFmpeg default)
         """
         self.temp_dir = temp_dir or tempfile.gettempdir()
+        self.threads = threads
         self.supported_formats = {
             "video/mp4",
             "video/quicktime",
@@ -97,6 +108,9 @@ class HLSTranscoder:
                 "fps": fps,
                 "codec": video_stream.get("codec_name", "unknown"),
                 "format": probe["format"].get("format_name", "unknown"),
+                "has_audio": any(
+                    stream["codec_type"] == "audio" for stream in probe["streams"]
+                ),
             }
 
             logger.info("Video metadata: %s", metadata)
@@ -115,14 +129,21 @@ class HLSTranscoder:
         output_dir: str,
         variants: list[dict[str, any]],
         segment_duration: float = 10.0,
+        progress_callback: Callable[[float], None] | None = None,
+        segment_callback: Callable[[str], None] | None = None,
     ) -> dict[str, any]:
         """Create HLS variants with adaptive bitrate streaming.
 
+        The source is decoded once and split into every variant of the ladder
+        inside a single FFmpeg process.
+
         Args:
             input_path: Path to input video file
             output_dir: Directory for output files
             variants: List of quality variant configurations
             segment_duration: HLS segment duration in seconds
+            progress_callback: Called with the transcoded fraction (0-1)
+            segment_callback: Called with the path of each finished segment
 
         Returns:
             Dictionary with transcoding results
@@ -134,76 +155,16 @@ class HLSTranscoder:
             # Create output directory
             Path(output_dir).mkdir(parents=True, exist_ok=True)
 
-            # Build FFmpeg command for multi-variant HLS
-            input_stream = ffmpeg.input(input_path)
-
-            # Create video streams for each variant
-            video_streams = []
-            variant_playlists = []
-
-            for i, variant in enumerate(variants):
-                quality_label = variant["quality_label"]
-                width = variant["resolution_width"]
-                height = variant["resolution_height"]
-                bitrate = variant["bitrate"]
-
-                # Scale video to target resolution
-                video = input_stream.video.filter(
-                    "scale",
-                    width,
-                    height,
-                    force_original_aspect_ratio="decrease",
-                    force_divisible_by=2,
-                )
-
-                # Set video encoding parameters
-                video_encoded = video.output(
-                    f"{output_dir}/variant_{i}.m3u8",
-                    vcodec="libx264",
-                    acodec="aac",
-                    video_bitrate=bitrate,
-                    audio_bitrate="128k",
-                    format="hls",
-                    hls_time=segment_duration,
-                    hls_playlist_type="vod",
-                    hls_segment_filename=f"{output_dir}/variant_{i}_%03d.ts",
-                    preset="medium",
-                    crf=23,
-                    maxrate=int(bitrate * 1.2),
-                    bufsize=int(bitrate * 2),
-                    x264opts="keyint=48:min-keyint=48:scenecut=-1",
-                )
-
-                video_streams.append(video_encoded)
-                variant_playlists.append(
-                    {
-                        "quality_label": quality_label,
-                        "playlist_file": f"variant_{i}.m3u8",
-                        "resolution": f"{width}x{height}",
-                        "bitrate": bitrate,
-                    }
-                )
-
-            # Run FFmpeg transcoding
             logger.info("Starting FFmpeg transcoding for %d variants", len(variants))
-
-            # Execute all variants in parallel
-            for stream in video_streams:
-                ffmpeg.run(stream, overwrite_output=True, quiet=False)
-
-                # Update progress
-                if current_task:
-                    progress = (video_streams.index(stream) + 1) / len(video_streams) * 80
-                    current_task.update_state(
-                        state="PROGRESS",
-                        meta={
-                            "progress": progress,
-                            "stage": (
-                                f"Transcoding "
-                                f"{variant_playlists[video_streams.index(stream)]['quality_label']}"
-                            ),
-                        },
-                    )
+            variant_playlists = self._transcode(
+                input_path,
+                output_dir,
+                variants,
+                segment_duration,
+                input_metadata,
+                progress_callback,
+                segment_callback,
+            )
 
             # Create master playlist
             master_playlist_content = self._create_master_playlist(
@@ -233,12 +194,172 @@ class HLSTranscoder:
             }
 
         except ffmpeg.Error as e:
-            logger.error("FFmpeg transcoding failed: %s", e)
+            stderr = (e.stderr or b"").decode(errors="replace")
+            logger.error("FFmpeg transcoding failed: %s", stderr)
             raise TranscodingError(f"Transcoding failed: {e}") from e
         except Exception as e:
             logger.error("Unexpected error during transcoding: %s", e)
             raise TranscodingError(f"Unexpected error: {e}") from e
 
+    def _transcode(
+        self,
+        input_path: str,
+        output_dir: str,
+        variants: list[dict[str, any]],
+        segment_duration: float,
+        input_metadata: dict[str, any],
+        progress_callback: Callable[[float], None] | None = None,
+        segment_callback: Callable[[str], None] | None = None,
+    ) -> list[dict[str, any]]:
+        """Run the whole ladder in one FFmpeg process.
+
+        Returns:
+            Variant playlist descriptions, in ladder order
+
+        Raises:
+            ffmpeg.Error: If FFmpeg fails
+        """
+        input_stream = ffmpeg.input(input_path)
+
+        # Decode once, then split the frames into one branch per variant
+        video = input_stream.video.filter_multi_output("split", len(variants))
+        audio = (
+            input_stream.audio.filter_multi_output("asplit", len(variants))
+            if input_metadata.get("has_audio")
+            else None
+        )
+
+        # Split the CPU budget between the encoders
+        encoder_options = {}
+        if self.threads:
+            encoder_options["threads"] = max(1, self.threads // len(variants))
+
+        outputs = []
+        variant_playlists = []
+
+        for i, variant in enumerate(variants):
+            quality_label = variant["quality_label"]
+            width = variant["resolution_width"]
+            height = variant["resolution_height"]
+            bitrate = variant["bitrate"]
+
+            # Scale video to target resolution
+            scaled = video[i].filter(
+                "scale",
+                width,
+                height,
+                force_original_aspect_ratio="decrease",
+                force_divisible_by=2,
+            )
+            streams = [scaled] if audio is None else [scaled, audio[i]]
+
+            # Set encoding parameters; keyframes are aligned across variants
+            outputs.append(
+                ffmpeg.output(
+                    *streams,
+                    f"{output_dir}/variant_{i}.m3u8",
+                    vcodec="libx264",
+                    acodec="aac",
+                    video_bitrate=bitrate,
+                    audio_bitrate="128k",
+                    format="hls",
+                    hls_time=segment_duration,
+                    hls_playlist_type="vod",
+                    hls_segment_filename=f"{output_dir}/variant_{i}_%03d.ts",
+                    # Segments appear under their final name only when complete
+                    hls_flags="temp_file",
+                    preset="medium",
+                    crf=23,
+                    maxrate=int(bitrate * 1.2),
+                    bufsize=int(bitrate * 2),
+                    x264opts="keyint=48:min-keyint=48:scenecut=-1",
+                    **encoder_options,
+                )
+            )
+            variant_playlists.append(
+                {
+                    "quality_label": quality_label,
+                    "playlist_file": f"variant_{i}.m3u8",
+                    "resolution": f"{width}x{height}",
+                    "bitrate": bitrate,
+                }
+            )
+
+        command = (
+            ffmpeg.merge_outputs(*outputs)
+            .global_args("-progress", "pipe:1", "-nostats")
+            .overwrite_output()
+        )
+        self._run(
+            command,
+            output_dir,
+            input_metadata.get("duration", 0.0),
+            progress_callback,
+            segment_callback,
+        )
+        return variant_playlists
+
+    def _run(
+        self,
+        command: any,
+        output_dir: str,
+        duration: float,
+        progress_callback: Callable[[float], None] | None,
+        segment_callback: Callable[[str], None] | None,
+    ) -> None:
+        """Run FFmpeg, following its ``-progress`` output.
+
+        Each progress report (about every half second) updates the progress
+        and hands newly finished segments to ``segment_callback``.
+
+        Raises:
+            ffmpeg.Error: If FFmpeg exits with an error
+        """
+        process = command.run_async(pipe_stdout=True, pipe_stderr=True)
+
+        # Keep the end of stderr for errors without letting the pipe fill up
+        stderr_tail: deque[bytes] = deque(maxlen=50)
+        stderr_reader = threading.Thread(
+            target=stderr_tail.extend, args=(process.stderr,), daemon=True
+        )
+        stderr_reader.start()
+
+        published: set[str] = set()
+        try:
+            for line in process.stdout:
+                key, _, value = line.decode(errors="replace").strip().partition("=")
+                if key == "out_time_us" and value.isdigit():
+                    if progress_callback and duration > 0:
+                        progress_callback(min(int(value) / 1_000_000 / duration, 1.0))
+                elif key == "progress":
+                    self._publish_segments(output_dir, published, segment_callback)
+            process.wait()
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        finally:
+            stderr_reader.join()
+
+        if process.returncode != 0:
+            raise ffmpeg.Error("ffmpeg", None, b"".join(stderr_tail))
+
+        self._publish_segments(output_dir, published, segment_callback)
+
+    def _publish_segments(
+        self,
+        output_dir: str,
+        published: set[str],
+        segment_callback: Callable[[str], None] | None,
+    ) -> None:
+        """Hand segments finished since the last call to ``segment_callback``."""
+        if segment_callback is None:
+            return
+        for name in sorted(os.listdir(output_dir)):
+            if name.endswith(".ts") and name not in published:
+                published.add(name)
+                segment_callback(os.path.join(output_dir, name))
+
     def _create_master_playlist(
         self,
         variants: list[dict[str, any]],
@@ -330,8 +451,6 @@ def transcode_to_hls(
                     await session.commit()
 
         # Update status to processing
-        import asyncio
-
         asyncio.run(update_upload_status("processing"))
 
         self.update_state(
@@ -355,6 +474,9 @@ def transcode_to_hls(
         temp_input_dir = tempfile.mkdtemp(prefix="media_input_")
         temp_output_dir = tempfile.mkdtemp(prefix="media_output_")
 
+        # Segments are uploaded while the rest of the ladder is transcoding
+        uploader = HLSUploader(upload.s3_bucket, f"hls/{upload_id}")
+
         try:
             # Download source file from S3
             input_file_path = os.path.join(temp_input_dir, upload.original_filename)
@@ -372,7 +494,20 @@ def transcode_to_hls(
             )
 
             # Initialize transcoder
-            transcoder = HLSTranscoder(temp_output_dir)
+            transcoder = HLSTranscoder(temp_output_dir, threads=TRANSCODE_THREADS)
+            transcoding_stage = f"Transcoding {len(quality_variants)} variants"
+            reported_progress = 15
+
+            def report_progress(fraction: float) -> None:
+                nonlocal reported_progress
+                # Transcoding covers 15-85% of the task
+                progress = 15 + int(fraction * 70)
+                if progress > reported_progress:
+                    reported_progress = progress
+                    self.update_state(
+                        state="PROGRESS",
+                        meta={"progress": progress, "stage": transcoding_stage},
+                    )
 
             # Transcode to HLS
             transcoding_results = transcoder.create_hls_variants(
@@ -380,6 +515,8 @@ def transcode_to_hls(
                 temp_output_dir,
                 quality_variants,
                 segment_duration,
+                progress_callback=report_progress,
+                segment_callback=uploader.upload_segment,
             )
 
             self.update_state(
@@ -387,13 +524,14 @@ def transcode_to_hls(
                 meta={"progress": 85, "stage": "Uploading HLS files to S3"},
             )
 
-            # Upload HLS files to S3
+            # Upload the remaining HLS files to S3
             s3_upload_results = asyncio.run(
                 upload_hls_to_s3(
                     temp_output_dir,
                     upload.s3_bucket,
                     f"hls/{upload_id}",
                     transcoding_results,
+                    uploader,
                 )
             )
 
@@ -472,6 +610,8 @@ def transcode_to_hls(
             }
 
         finally:
+            uploader.close()
+
             # Schedule cleanup task
             cleanup_temp_files.delay([temp_input_dir, temp_output_dir])
 
@@ -492,23 +632,86 @@ def transcode_to_hls(
         raise TranscodingError(str(e)) from e
 
 
+class HLSUploader:
+    """Uploads HLS files to S3 from a thread pool.
+
+    Segments can be handed over as soon as FFmpeg finishes them, so uploads
+    overlap with transcoding. Each file is uploaded once.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        s3_prefix: str,
+        max_workers: int = HLS_UPLOAD_WORKERS,
+    ) -> None:
+        """Initialize uploader.
+
+        Args:
+            bucket: S3 bucket name
+            s3_prefix: S3 key prefix
+            max_workers: Concurrent uploads
+        """
+        self.bucket = bucket
+        self.s3_prefix = s3_prefix
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="hls-upload")
+        self.segments: dict[str, Future[str]] = {}
+
+    def upload_segment(self, path: str) -> None:
+        """Start uploading a finished segment, unless already started."""
+        key = f"{self.s3_prefix}/{os.path.basename(path)}"
+        if key not in self.segments:
+            self.segments[key] = self.upload(path, key, "video/MP2T")
+
+    def upload(self, path: str, key: str, content_type: str) -> Future[str]:
+        """Start uploading a file.
+
+        Returns:
+            Future resolving to the S3 key
+        """
+        return self.executor.submit(self._upload, path, key, content_type)
+
+    def _upload(self, path: str, key: str, content_type: str) -> str:
+        s3_client.upload_file(
+            path,
+            self.bucket,
+            key,
+            ExtraArgs={"ContentType": content_type},
+        )
+        return key
+
+    def close(self) -> None:
+        """Cancel queued uploads and wait for running ones."""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
 async def upload_hls_to_s3(
     local_dir: str,
     bucket: str,
     s3_prefix: str,
     transcoding_results: dict[str, any],
+    uploader: HLSUploader | None = None,
 ) -> dict[str, any]:
     """Upload HLS files to S3.
 
+    Segments not yet handed to ``uploader`` are uploaded concurrently. The
+    playlists are uploaded once every segment is in S3, so they never
+    reference a missing segment.
+
     Args:
         local_dir: Local directory containing HLS files
         bucket: S3 bucket name
         s3_prefix: S3 key prefix
         transcoding_results: Results from transcoding
+        uploader: Uploader that segments were handed to during transcoding
 
     Returns:
         Dictionary with S3 upload results
     """
+    owns_uploader = uploader is None
+    if uploader is None:
+        uploader = HLSUploader(bucket, s3_prefix)
+
     try:
         upload_results = {
             "master_playlist_key": f"{s3_prefix}/master.m3u8",
@@ -517,49 +720,48 @@ async def upload_hls_to_s3(
             "uploaded_files": [],
         }
 
-        # Upload master playlist
-        master_playlist_path = os.path.join(local_dir, "master.m3u8")
-        s3_client.upload_file(
-            master_playlist_path,
-            bucket,
-            upload_results["master_playlist_key"],
-            ExtraArgs={"ContentType": "application/vnd.apple.mpegurl"},
+        # Upload segments
+        variant_count = len(transcoding_results["variant_playlists"])
+        for segment_file in sorted(os.listdir(local_dir)):
+            if segment_file.endswith(".ts") and any(
+                segment_file.startswith(f"variant_{i}_") for i in range(variant_count)
+            ):
+                uploader.upload_segment(os.path.join(local_dir, segment_file))
+
+        segment_keys = await asyncio.gather(
+            *(asyncio.wrap_future(future) for future in uploader.segments.values())
         )
-        upload_results["uploaded_files"].append(upload_results["master_playlist_key"])
 
-        # Upload variant playlists and segments
-        for i, _variant in enumerate(transcoding_results["variant_playlists"]):
+        # Upload variant playlists, then the master playlist
+        playlists = {}
+        for i in range(variant_count):
             variant_key = f"{s3_prefix}/variant_{i}.m3u8"
             variant_path = os.path.join(local_dir, f"variant_{i}.m3u8")
-
-            # Upload variant playlist
-            s3_client.upload_file(
-                variant_path,
-                bucket,
-                variant_key,
-                ExtraArgs={"ContentType": "application/vnd.apple.mpegurl"},
-            )
+            playlists[variant_key] = variant_path
             upload_results["variant_keys"][f"variant_{i}"] = variant_key
-            upload_results["uploaded_files"].append(variant_key)
-
-            # Upload segments for this variant
-            segment_files = [
-                f
-                for f in os.listdir(local_dir)
-                if f.startswith(f"variant_{i}_") and f.endswith(".ts")
-            ]
-
-            for segment_file in segment_files:
-                segment_path = os.path.join(local_dir, segment_file)
-                segment_key = f"{s3_prefix}/{segment_file}"
-
-                s3_client.upload_file(
-                    segment_path,
-                    bucket,
-                    segment_key,
-                    ExtraArgs={"ContentType": "video/MP2T"},
+
+        variant_keys = await asyncio.gather(
+            *(
+                asyncio.wrap_future(
+                    uploader.upload(path, key, "application/vnd.apple.mpegurl")
                 )
-                upload_results["uploaded_files"].append(segment_key)
+                for key, path in playlists.items()
+            )
+        )
+
+        await asyncio.wrap_future(
+            uploader.upload(
+                os.path.join(local_dir, "master.m3u8"),
+                upload_results["master_playlist_key"],
+                "application/vnd.apple.mpegurl",
+            )
+        )
+
+        upload_results["uploaded_files"] = [
+            upload_results["master_playlist_key"],
+            *variant_keys,
+            *segment_keys,
+        ]
 
         logger.info(
             "Uploaded %d HLS files to S3 bucket %s",
@@ -572,6 +774,9 @@ async def upload_hls_to_s3(
     except Exception as e:
         logger.error("Failed to upload HLS files to S3: %s", e)
         raise TranscodingError(f"S3 upload failed: {e}") from e
+    finally:
+        if owns_uploader:
+            uploader.close()
 
 
 @celery_app.task
@@ -0,0 +1,172 @@
+"""Classroom load on the HLS proxy.
+
+Simulates ``--viewers`` concurrent viewers, each with their own access token,
+starting the same lesson at once. Each viewer loads the master playlist and
+a variant playlist, then plays ``--segments`` segments (270 is a 45-minute
+lesson at 10-second segments). The database and the CDN are simulated with
+fixed latencies and a small connection pool. The report counts database
+access checks and CDN playlist fetches, next to the one access check per
+request the uncached proxy made. Run it from the service root:
+
+    python -m benchmarks.bench_hls_proxy --viewers 500 --segments 270
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+from app.proxy.hls_proxy import PlaylistWhitelistProxy
+
+CDN = "https://cdn.test"
+VARIANTS = ("360p", "720p", "1080p")
+
+
+def _cdn(segments: int, latency: float) -> httpx.MockTransport:
+    master = "\n".join(
+        ["#EXTM3U"]
+        + [
+            line
+            for name in VARIANTS
+            for line in ("#EXT-X-STREAM-INF:BANDWIDTH=800000", f"{name}/playlist.m3u8")
+        ]
+    )
+    variant = "\n".join(
+        ["#EXTM3U", "#EXT-X-TARGETDURATION:10"]
+        + [line for i in range(segments) for line in ("#EXTINF:10.0,", f"segment_{i:05d}.ts")]
+        + ["#EXT-X-ENDLIST"]
+    )
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        path = request.url.path
+        if path.endswith("master.m3u8"):
+            return httpx.Response(200, text=master)
+        if path.endswith(".m3u8"):
+            return httpx.Response(200, text=variant)
+        return httpx.Response(200, content=b"\x47" * 188)
+
+    return httpx.MockTransport(handler)
+
+
+class SimulatedProxy(PlaylistWhitelistProxy):
+    """Proxy with the database replaced by a latency and a connection pool."""
+
+    def __init__(self, *args, db_latency: float, db_pool: int, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.db_latency = db_latency
+        self.db_pool = asyncio.Semaphore(db_pool)
+        self.db_queries = 0
+
+    async def _query(self) -> None:
+        async with self.db_pool:
+            self.db_queries += 1
+            await asyncio.sleep(self.db_latency)
+
+    async def check_video_access(self, video_id: uuid.UUID, user_id: uuid.UUID) -> bool:
+        await self._query()
+        return True
+
+    async def _master_playlist_url(self, video_id: uuid.UUID) -> str:
+        async def load() -> tuple[str, float]:
+            await self._query()
+            return f"{CDN}/{video_id}/master.m3u8", time.time() + self.playlist_cache_ttl
+
+        return await self.source_cache.get_or_load(("master_url", video_id), load)
+
+
+def _urls(playlist: str) -> list[str]:
+    return [line for line in playlist.split("\n") if line and not line.startswith("#")]
+
+
+async def _viewer(
+    proxy: SimulatedProxy,
+    video_id: uuid.UUID,
+    request: SimpleNamespace,
+    segments: int,
+    latencies: list[float],
+) -> None:
+    async def timed(call):
+        started = time.perf_counter()
+        result = await call
+        latencies.append(time.perf_counter() - started)
+        return result
+
+    token = proxy.generate_access_token(video_id, uuid.uuid4())
+    master = await timed(proxy.proxy_master_playlist(video_id, token, request))
+
+    variant_url = urlsplit(_urls(master["content"])[0])
+    variant_path = variant_url.path.split("/variant/", 1)[1]
+    variant = await timed(
+        proxy.proxy_variant_playlist(video_id, variant_path, token, request)
+    )
+
+    for segment_url in _urls(variant["content"])[:segments]:
+        url = urlsplit(segment_url)
+        query = parse_qs(url.query)
+        segment = await timed(
+            proxy.proxy_segment(
+                video_id,
+                url.path.split("/segment/", 1)[1],
+                expires=int(query["expires"][0]),
+                signature=query["sig"][0],
+            )
+        )
+        await segment["close"]()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--viewers", type=int, default=500)
+    parser.add_argument("--segments", type=int, default=270)
+    parser.add_argument("--db-latency", type=float, default=0.005)
+    parser.add_argument("--db-pool", type=int, default=10)
+    parser.add_argument("--cdn-latency", type=float, default=0.002)
+    args = parser.parse_args()
+
+    proxy = SimulatedProxy(
+        "bench-secret",
+        CDN,
+        db_latency=args.db_latency,
+        db_pool=args.db_pool,
+        http_client=httpx.AsyncClient(transport=_cdn(args.segments, args.cdn_latency)),
+    )
+    video_id = uuid.uuid4()
+    request = SimpleNamespace(url=SimpleNamespace(scheme="https", netloc="media.test"))
+    latencies: list[float] = []
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _viewer(proxy, video_id, request, args.segments, latencies)
+            for _ in range(args.viewers)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    await proxy.cleanup()
+
+    latencies.sort()
+    metrics = proxy.get_metrics()
+    print(
+        f"{args.viewers} viewers, {len(latencies)} requests in {elapsed:.2f}s "
+        f"({len(latencies) / elapsed:,.0f} req/s)"
+    )
+    print(
+        f"latency p50 {statistics.median(latencies) * 1000:.1f}ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms"
+    )
+    print(
+        f"database queries: {proxy.db_queries} "
+        f"(uncached proxy: {len(latencies) + args.viewers})"
+    )
+    print(f"CDN playlist fetches: {metrics['upstream_playlist_fetches']}")
+    print(f"rewritten playlist cache: {metrics['playlist_cache']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,222 @@
+"""Memory of the HLS segment relay under concurrent slow viewers.
+
+Starts a local static origin (uvicorn serving ``--segments`` segments of
+``--segment-mb`` MiB, with Range and ETag support), then measures one child
+process per mode with ``--viewers`` concurrent viewers, each reading
+segments at ``--viewer-kbps``:
+
+* ``buffered``: the previous proxy, which read each segment into memory
+  with ``client.get`` before responding
+* ``relay``: ``proxy_segment`` streaming through the pooled client
+* ``relay+cache``: the same with the local disk cache, after a warm-up pass
+
+The report shows peak and final RSS for each mode, plus the bytes served and
+the cache metrics. Run it from the service root:
+
+    python -m benchmarks.bench_segment_relay --viewers 200 --segment-mb 2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+
+from app.proxy.hls_proxy import PlaylistWhitelistProxy
+
+MODES = ("buffered", "relay", "relay+cache")
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _serve_origin(directory: str, port: int) -> None:
+    import uvicorn
+    from starlette.applications import Starlette
+    from starlette.routing import Mount
+    from starlette.staticfiles import StaticFiles
+
+    app = Starlette(routes=[Mount("/", StaticFiles(directory=directory))])
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", timeout_keep_alive=60)
+
+
+async def _drain(chunks, chunk_delay: float) -> int:
+    """Read a body like a viewer with limited bandwidth."""
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        await asyncio.sleep(chunk_delay * len(chunk) / 65536)
+    return received
+
+
+async def _buffered_chunks(client: httpx.AsyncClient, url: str):
+    content = (await client.get(url)).content
+    for start in range(0, len(content), 65536):
+        yield content[start : start + 65536]
+
+
+async def _measure(args: argparse.Namespace) -> dict:
+    cache_dir = tempfile.mkdtemp() if args.mode == "relay+cache" else None
+    proxy = PlaylistWhitelistProxy(
+        "bench-secret",
+        args.origin,
+        max_upstream_connections=args.connections,
+        segment_cache_dir=cache_dir,
+    )
+    video_id = uuid.uuid4()
+    expires = int(time.time()) + 3600
+    chunk_delay = 64 / args.viewer_kbps
+    peak = _rss_mb()
+    served = 0
+
+    async def sample() -> None:
+        nonlocal peak
+        while True:
+            peak = max(peak, _rss_mb())
+            await asyncio.sleep(0.05)
+
+    async def viewer(index: int) -> None:
+        nonlocal served
+        for i in range(args.segments_per_viewer):
+            path = f"segment_{(index + i) % args.segments:05d}.ts"
+            if args.mode == "buffered":
+                chunks = _buffered_chunks(proxy.http_client, f"{args.origin}/{path}")
+                received = await _drain(chunks, chunk_delay)
+                served += received
+                continue
+            segment = await proxy.proxy_segment(
+                video_id,
+                path,
+                expires=expires,
+                signature=proxy.sign_segment(video_id, path, expires),
+                request_headers={},
+            )
+            try:
+                received = await _drain(segment["body"], chunk_delay)
+            finally:
+                await segment["close"]()
+            served += received
+
+    if cache_dir:
+        for i in range(args.segments):
+            path = f"segment_{i:05d}.ts"
+            segment = await proxy.proxy_segment(
+                video_id,
+                path,
+                expires=expires,
+                signature=proxy.sign_segment(video_id, path, expires),
+                request_headers={},
+            )
+            await _drain(segment["body"], 0)
+            await segment["close"]()
+
+    baseline = _rss_mb()
+    sampler = asyncio.create_task(sample())
+    started = time.perf_counter()
+    await asyncio.gather(*(viewer(i) for i in range(args.viewers)))
+    elapsed = time.perf_counter() - started
+    sampler.cancel()
+    metrics = proxy.get_metrics()["segment_relay"]
+    await proxy.cleanup()
+    return {
+        "baseline_mb": baseline,
+        "peak_mb": peak,
+        "final_mb": _rss_mb(),
+        "served_mb": served / (1 << 20),
+        "elapsed": elapsed,
+        "disk_cache": metrics.get("disk_cache"),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--viewers", type=int, default=200)
+    parser.add_argument("--segments", type=int, default=20)
+    parser.add_argument("--segment-mb", type=float, default=2.0)
+    parser.add_argument("--segments-per-viewer", type=int, default=3)
+    parser.add_argument("--viewer-kbps", type=int, default=8192)
+    parser.add_argument("--connections", type=int, default=256)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--origin", help=argparse.SUPPRESS)
+    parser.add_argument("--serve", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        _serve_origin(args.serve, args.port)
+        return
+    if args.mode:
+        print(json.dumps(asyncio.run(_measure(args))))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        for i in range(args.segments):
+            with open(os.path.join(directory, f"segment_{i:05d}.ts"), "wb") as segment:
+                segment.write(os.urandom(int(args.segment_mb * (1 << 20))))
+
+        port = _free_port()
+        script = [sys.executable, "-m", "benchmarks.bench_segment_relay"]
+        origin = subprocess.Popen([*script, "--serve", directory, "--port", str(port)])
+        try:
+            for _ in range(100):
+                try:
+                    httpx.get(f"http://127.0.0.1:{port}/segment_00000.ts", timeout=1)
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.1)
+
+            passthrough = [
+                f"--{name.replace('_', '-')}={value}"
+                for name, value in vars(args).items()
+                if value is not None and name not in ("mode", "origin", "serve", "port")
+            ]
+            print(
+                f"{args.viewers} viewers x {args.segments_per_viewer} segments of "
+                f"{args.segment_mb} MiB at {args.viewer_kbps} KiB/s"
+            )
+            for mode in MODES:
+                output = subprocess.run(
+                    [
+                        *script,
+                        *passthrough,
+                        f"--mode={mode}",
+                        f"--origin=http://127.0.0.1:{port}",
+                    ],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+                result = json.loads(output.splitlines()[-1])
+                print(
+                    f"{mode:>12}: RSS peak {result['peak_mb']:7.1f} MiB "
+                    f"(baseline {result['baseline_mb']:.1f}, "
+                    f"final {result['final_mb']:.1f}), "
+                    f"served {result['served_mb']:,.0f} MiB in {result['elapsed']:.1f}s"
+                )
+                if result["disk_cache"]:
+                    print(f"{'':>12}  disk cache: {result['disk_cache']}")
+        finally:
+            origin.terminate()
+            origin.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""CPU-only ABR ladder transcoding of a short synthetic clip.
+
+Generates a ``--duration`` second 1080p H.264/AAC test clip with FFmpeg's
+lavfi sources, then transcodes it to the default four-variant ladder twice:
+
+* ``per-variant``: one FFmpeg run per variant, one after the other, each
+  decoding the source again (the previous ``create_hls_variants``)
+* ``single-decode``: ``HLSTranscoder``, which decodes once and splits the
+  frames into every variant inside one FFmpeg process
+
+The report shows wall time, FFmpeg CPU time and, for the single-decode run,
+when the first segment was handed to the uploader and how many progress updates
+were reported. Needs ``ffmpeg`` on the PATH. Run it from the service root:
+
+    python -m benchmarks.bench_transcode --duration 20
+"""
+
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+import ffmpeg
+
+from app.workers.transcode import HLSTranscoder
+
+LADDER = [
+    {
+        "quality_label": "360p",
+        "resolution_width": 640,
+        "resolution_height": 360,
+        "bitrate": 800_000,
+    },
+    {
+        "quality_label": "480p",
+        "resolution_width": 854,
+        "resolution_height": 480,
+        "bitrate": 1_400_000,
+    },
+    {
+        "quality_label": "720p",
+        "resolution_width": 1280,
+        "resolution_height": 720,
+        "bitrate": 2_800_000,
+    },
+    {
+        "quality_label": "1080p",
+        "resolution_width": 1920,
+        "resolution_height": 1080,
+        "bitrate": 5_000_000,
+    },
+]
+
+
+def _make_clip(path: str, duration: float) -> None:
+    video = ffmpeg.input(f"testsrc2=size=1920x1080:rate=24:duration={duration}", f="lavfi")
+    audio = ffmpeg.input(f"sine=frequency=440:duration={duration}", f="lavfi")
+    ffmpeg.output(
+        video, audio, path, vcodec="libx264", preset="veryfast", acodec="aac"
+    ).overwrite_output().run(quiet=True)
+
+
+def _child_cpu() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _per_variant(input_path: str, output_dir: str, segment_duration: float) -> None:
+    source = ffmpeg.input(input_path)
+    for i, variant in enumerate(LADDER):
+        video = source.video.filter(
+            "scale",
+            variant["resolution_width"],
+            variant["resolution_height"],
+            force_original_aspect_ratio="decrease",
+            force_divisible_by=2,
+        )
+        ffmpeg.output(
+            video,
+            source.audio,
+            f"{output_dir}/variant_{i}.m3u8",
+            vcodec="libx264",
+            acodec="aac",
+            video_bitrate=variant["bitrate"],
+            audio_bitrate="128k",
+            format="hls",
+            hls_time=segment_duration,
+            hls_playlist_type="vod",
+            hls_segment_filename=f"{output_dir}/variant_{i}_%03d.ts",
+            preset="medium",
+            crf=23,
+            maxrate=int(variant["bitrate"] * 1.2),
+            bufsize=int(variant["bitrate"] * 2),
+            x264opts="keyint=48:min-keyint=48:scenecut=-1",
+        ).overwrite_output().run(quiet=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--segment-duration", type=float, default=4.0)
+    parser.add_argument("--threads", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        clip = os.path.join(directory, "clip.mp4")
+        _make_clip(clip, args.duration)
+        print(f"{args.duration:.0f}s 1080p clip, {len(LADDER)} variants, {os.cpu_count()} CPUs")
+
+        output_dir = os.path.join(directory, "per_variant")
+        os.mkdir(output_dir)
+        cpu, started = _child_cpu(), time.perf_counter()
+        _per_variant(clip, output_dir, args.segment_duration)
+        print(
+            f"  per-variant: {time.perf_counter() - started:6.1f}s wall, "
+            f"{_child_cpu() - cpu:6.1f}s CPU, uploads start after the whole job"
+        )
+
+        output_dir = os.path.join(directory, "single_decode")
+        os.mkdir(output_dir)
+        segments: list[float] = []
+        progress: list[float] = []
+        transcoder = HLSTranscoder(output_dir, threads=args.threads)
+        cpu, started = _child_cpu(), time.perf_counter()
+        transcoder._transcode(
+            clip,
+            output_dir,
+            LADDER,
+            args.segment_duration,
+            {"duration": args.duration, "has_audio": True},
+            progress_callback=progress.append,
+            segment_callback=lambda path: segments.append(time.perf_counter() - started),
+        )
+        print(
+            f"single-decode: {time.perf_counter() - started:6.1f}s wall, "
+            f"{_child_cpu() - cpu:6.1f}s CPU, first segment after {segments[0]:.1f}s "
+            f"({len(segments)} segments, {len(progress)} progress updates)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Tests for the HLS proxy's expiring cache."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.proxy.cache import ExpiringCache
+
+
+async def test_concurrent_loads_are_coalesced():
+    """Callers for the same missing key share one load."""
+    cache: ExpiringCache[str] = ExpiringCache(10)
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value", time.time() + 60
+
+    results = await asyncio.gather(*(cache.get_or_load("key", load) for _ in range(5)))
+
+    assert results == ["value"] * 5
+    assert calls == 1
+
+
+async def test_waiters_reload_when_the_loading_caller_is_cancelled():
+    """A cancelled leader does not cancel the callers waiting on its load."""
+    cache: ExpiringCache[str] = ExpiringCache(10)
+    started = asyncio.Event()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        started.set()
+        await asyncio.sleep(0.01 if calls > 1 else 60)
+        return f"value_{calls}", time.time() + 60
+
+    leader = asyncio.create_task(cache.get_or_load("key", load))
+    await started.wait()
+    waiters = [asyncio.create_task(cache.get_or_load("key", load)) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+    assert await asyncio.gather(*waiters) == ["value_2"] * 3
+    assert calls == 2
+
+
+async def test_cancelled_waiter_does_not_cancel_the_load():
+    """A waiter that goes away leaves the shared load running for the others."""
+    cache: ExpiringCache[str] = ExpiringCache(10)
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        return "value", time.time() + 60
+
+    leader = asyncio.create_task(cache.get_or_load("key", load))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_load("key", load))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    release.set()
+    assert await leader == "value"
@@ -0,0 +1,210 @@
+"""Tests for the HLS segment relay and its disk cache."""
+
+import httpx
+import pytest
+
+from app.proxy.segment_relay import SegmentDiskCache, SegmentRelay
+
+SEGMENT_URL = "https://origin.example.com/live/segment_001.ts"
+SEGMENT = bytes(range(256)) * 40  # 10240 bytes
+ETAG = '"seg-1"'
+LAST_MODIFIED = "Wed, 01 May 2024 12:00:00 GMT"
+
+
+async def _stream(data: bytes):
+    """Streamed body, so the relay reads it chunk by chunk."""
+    for start in range(0, len(data), 4096):
+        yield data[start : start + 4096]
+
+
+class FakeOrigin:
+    """Serves one segment with ranges and validators, recording requests."""
+
+    def __init__(self) -> None:
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        headers = {
+            "accept-ranges": "bytes",
+            "content-type": "video/mp2t",
+            "etag": ETAG,
+            "last-modified": LAST_MODIFIED,
+        }
+
+        if request.headers.get("if-none-match") == ETAG:
+            return httpx.Response(304, headers=headers)
+
+        byte_range = request.headers.get("range")
+        if byte_range:
+            first, last = byte_range.removeprefix("bytes=").split("-")
+            start, end = int(first), int(last)
+            headers["content-range"] = f"bytes {start}-{end}/{len(SEGMENT)}"
+            body = SEGMENT[start : end + 1]
+            headers["content-length"] = str(len(body))
+            return httpx.Response(206, headers=headers, content=_stream(body))
+
+        headers["content-length"] = str(len(SEGMENT))
+        return httpx.Response(200, headers=headers, content=_stream(SEGMENT))
+
+
+@pytest.fixture
+def origin() -> FakeOrigin:
+    return FakeOrigin()
+
+
+@pytest.fixture
+async def http_client(origin):
+    async with httpx.AsyncClient(transport=httpx.MockTransport(origin)) as client:
+        yield client
+
+
+@pytest.fixture
+def disk_cache(tmp_path) -> SegmentDiskCache:
+    return SegmentDiskCache(str(tmp_path / "segments"), max_bytes=1024 * 1024)
+
+
+async def _read(response) -> bytes:
+    return b"".join([chunk async for chunk in response.body])
+
+
+async def _fetch(relay: SegmentRelay, **headers: str):
+    response = await relay.fetch(SEGMENT_URL, headers)
+    body = await _read(response) if response.body is not None else None
+    return response, body
+
+
+async def test_range_request_is_relayed_from_origin(http_client, origin):
+    relay = SegmentRelay(http_client, chunk_size=1000)
+
+    response, body = await _fetch(relay, range="bytes=100-2099")
+
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 100-2099/{len(SEGMENT)}"
+    assert body == SEGMENT[100:2100]
+    assert origin.requests[0].headers["range"] == "bytes=100-2099"
+    assert relay.bytes_relayed == 2000
+    assert relay.active_streams == 0
+
+
+async def test_conditional_request_is_relayed_from_origin(http_client, origin):
+    relay = SegmentRelay(http_client)
+
+    response, body = await _fetch(relay, **{"if-none-match": ETAG})
+
+    assert response.status_code == 304
+    assert body is None
+    assert response.headers["etag"] == ETAG
+
+
+async def test_full_response_is_cached_and_served_from_disk(http_client, origin, disk_cache):
+    relay = SegmentRelay(http_client, disk_cache, chunk_size=1000)
+
+    first, first_body = await _fetch(relay)
+    second, second_body = await _fetch(relay)
+
+    assert first.status_code == second.status_code == 200
+    assert first_body == second_body == SEGMENT
+    assert len(origin.requests) == 1
+    assert second.headers["content-length"] == str(len(SEGMENT))
+    assert second.headers["etag"] == ETAG
+    assert disk_cache.get_metrics()["segments"] == 1
+
+
+async def test_range_requests_are_served_from_disk(http_client, origin, disk_cache):
+    relay = SegmentRelay(http_client, disk_cache)
+    await _fetch(relay)
+
+    response, body = await _fetch(relay, range="bytes=1000-1999")
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 1000-1999/{len(SEGMENT)}"
+    assert body == SEGMENT[1000:2000]
+
+    response, body = await _fetch(relay, range="bytes=-240")
+    assert response.status_code == 206
+    assert body == SEGMENT[-240:]
+
+    response, body = await _fetch(relay, range=f"bytes={len(SEGMENT)}-")
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(SEGMENT)}"
+
+    # A stale If-Range validator gets the whole body
+    response, body = await _fetch(relay, range="bytes=0-9", **{"if-range": '"seg-0"'})
+    assert response.status_code == 200
+    assert body == SEGMENT
+
+    assert len(origin.requests) == 1
+
+
+@pytest.mark.parametrize(
+    ("headers", "status_code"),
+    [
+        ({"if-none-match": ETAG}, 304),
+        ({"if-none-match": '"seg-0", *'}, 304),
+        ({"if-none-match": '"seg-0"'}, 200),
+        ({"if-modified-since": LAST_MODIFIED}, 304),
+        ({"if-modified-since": "Thu, 02 May 2024 00:00:00 GMT"}, 304),
+        ({"if-modified-since": "Tue, 30 Apr 2024 00:00:00 GMT"}, 200),
+        ({"if-modified-since": "not a date"}, 200),
+        # If-None-Match takes precedence over If-Modified-Since
+        ({"if-none-match": '"seg-0"', "if-modified-since": LAST_MODIFIED}, 200),
+    ],
+)
+async def test_conditional_requests_are_answered_from_disk(
+    http_client, origin, disk_cache, headers, status_code
+):
+    relay = SegmentRelay(http_client, disk_cache)
+    await _fetch(relay)
+
+    response, body = await _fetch(relay, **headers)
+
+    assert response.status_code == status_code
+    assert body == (SEGMENT if status_code == 200 else None)
+    assert response.headers["etag"] == ETAG
+    assert len(origin.requests) == 1
+
+
+async def test_partial_responses_are_not_cached(http_client, origin, disk_cache):
+    relay = SegmentRelay(http_client, disk_cache)
+
+    await _fetch(relay, range="bytes=0-99")
+    await _fetch(relay)
+
+    assert len(origin.requests) == 2
+
+
+async def test_abandoned_stream_is_not_cached(http_client, origin, disk_cache, tmp_path):
+    relay = SegmentRelay(http_client, disk_cache, chunk_size=1000)
+
+    response = await relay.fetch(SEGMENT_URL, {})
+    chunks = response.body.__aiter__()
+    await chunks.__anext__()
+    await chunks.aclose()
+
+    assert disk_cache.get_metrics()["segments"] == 0
+    assert list((tmp_path / "segments").iterdir()) == []
+    assert relay.active_streams == 0
+
+
+async def test_disk_cache_index_survives_restart(http_client, origin, disk_cache, tmp_path):
+    await _fetch(SegmentRelay(http_client, disk_cache))
+
+    restarted = SegmentDiskCache(str(tmp_path / "segments"), max_bytes=1024 * 1024)
+    response, body = await _fetch(SegmentRelay(http_client, restarted))
+
+    assert body == SEGMENT
+    assert restarted.size == len(SEGMENT)
+    assert len(origin.requests) == 1
+
+
+async def test_disk_cache_evicts_least_recently_used(http_client, origin, tmp_path):
+    disk_cache = SegmentDiskCache(str(tmp_path / "segments"), max_bytes=len(SEGMENT) * 2)
+    relay = SegmentRelay(http_client, disk_cache)
+
+    for name in ("a", "b", "c"):
+        response = await relay.fetch(f"{SEGMENT_URL}?v={name}", {})
+        await _read(response)
+
+    assert disk_cache.get_metrics()["segments"] == 2
+    assert disk_cache.get(disk_cache.key(f"{SEGMENT_URL}?v=a")) is None
+    assert disk_cache.size == len(SEGMENT) * 2
@@ -0,0 +1,47 @@
+"""Tests for HMAC-signed segment URLs."""
+
+import time
+import uuid
+
+import pytest
+
+from app.proxy.hls_proxy import HLSProxyError, PlaylistWhitelistProxy
+
+VIDEO_ID = uuid.UUID("0b7c2b8e-6f1a-4d52-9a0e-3c1f5d2e8a41")
+SEGMENT = "720p/segment_00042.ts"
+
+
+@pytest.fixture
+def proxy():
+    return PlaylistWhitelistProxy(secret_key="test-secret", cdn_base_url="https://cdn.test")
+
+
+def test_valid_signature_is_accepted(proxy):
+    expires = int(time.time()) + 600
+    signature = proxy.sign_segment(VIDEO_ID, SEGMENT, expires)
+
+    proxy.verify_segment_signature(VIDEO_ID, SEGMENT, expires, signature)
+
+
+def test_tampered_segment_path_is_rejected(proxy):
+    expires = int(time.time()) + 600
+    signature = proxy.sign_segment(VIDEO_ID, SEGMENT, expires)
+
+    with pytest.raises(HLSProxyError, match="Invalid segment signature"):
+        proxy.verify_segment_signature(VIDEO_ID, "1080p/segment_00042.ts", expires, signature)
+
+
+def test_extended_expiry_is_rejected(proxy):
+    expires = int(time.time()) + 600
+    signature = proxy.sign_segment(VIDEO_ID, SEGMENT, expires)
+
+    with pytest.raises(HLSProxyError, match="Invalid segment signature"):
+        proxy.verify_segment_signature(VIDEO_ID, SEGMENT, expires + 3600, signature)
+
+
+def test_expired_url_is_rejected(proxy):
+    expires = int(time.time()) - 1
+    signature = proxy.sign_segment(VIDEO_ID, SEGMENT, expires)
+
+    with pytest.raises(HLSProxyError, match="expired"):
+        proxy.verify_segment_signature(VIDEO_ID, SEGMENT, expires, signature)
@@ -10,6 +10,14 @@ class Settings(BaseSettings):
     # WebSocket
     WEBSOCKET_HOST: str = "0.0.0.0"
     WEBSOCKET_PORT: int = 8000
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_HEARTBEAT_INTERVAL: float = 30.0
+    WS_HEARTBEAT_TIMEOUT: float = 90.0
+
+    # Notification streams (per-user replay history)
+    NOTIFY_STREAM_MAXLEN: int = 1000
+    NOTIFY_STREAM_TTL_SECONDS: int = 7 * 24 * 3600
+    NOTIFY_REPLAY_BATCH: int = 500
 
     # JWT
     JWT_SECRET: str = Field("dev-secret-key-change-in-production", env="JWT_SECRET")
@@ -22,6 +30,12 @@ class Settings(BaseSettings):
     VAPID_EMAIL: str = Field("admin@example.com", env="VAPID_EMAIL")
     VAPID_PUBLIC_KEY: str | None = Field(None, env="VAPID_PUBLIC_KEY")
     VAPID_PRIVATE_KEY: str | None = Field(None, env="VAPID_PRIVATE_KEY")
+    PUSH_ENCRYPT_WORKERS: int = 4
+    PUSH_MAX_IN_FLIGHT: int = 500
+    PUSH_SERVICE_CONCURRENCY: int = 100
+    PUSH_SERVICE_RATE_PER_SECOND: float = 1000.0
+    PUSH_MAX_RETRIES: int = 2
+    PUSH_MAX_RETRY_AFTER: float = 30.0
 
     # SMS
     SMS_PROVIDER: str = Field("twilio", env="SMS_PROVIDER")
@@ -32,6 +46,26 @@ class Settings(BaseSettings):
         env="TWILIO_PHONE_NUMBER",
     )
 
+    # Email (read by EmailService)
+    dev_mode: bool = False
+    dev_email_dump_path: str = "dev_emails"
+    from_email: str = "noreply@example.com"
+    from_name: str = "Notifications"
+    smtp_server: str | None = None
+    smtp_port: int = 587
+    smtp_use_tls: bool = True
+    smtp_username: str | None = None
+    smtp_password: str | None = None
+    smtp_timeout_seconds: float = 30.0
+    smtp_max_connections: int = 10
+    smtp_messages_per_connection: int = 100
+    smtp_max_retries: int = 3
+    smtp_retry_backoff_seconds: float = 2.0
+
+    # Email templates (read by TemplateService)
+    templates_path: str = "templates"
+    template_reload_interval_seconds: float = 2.0
+
     # CORS
     CORS_ORIGINS: list[str] = Field(
         ["http://localhost:3000"],
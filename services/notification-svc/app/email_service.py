@@ -6,14 +6,17 @@ import json
 import logging
 import smtplib
 from datetime import datetime
+from email import policy
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from email.utils import formatdate, make_msgid
 from pathlib import Path
 from typing import Any
 
 import aiofiles
 
 from .config import get_settings
+from .smtp_pool import BulkEmailSender, DeliveryStatus, SMTPConnectionPool, SMTPRelay
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +29,7 @@ class EmailService:
         self.settings = get_settings()
         self.dev_mode = self.settings.dev_mode
         self.dev_email_path = Path(self.settings.dev_email_dump_path)
+        self._bulk_sender: BulkEmailSender | None = None
 
         if self.dev_mode:
             # Ensure dev email directory exists
@@ -76,7 +80,19 @@ class EmailService:
         from_name: str | None = None,
         metadata: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
-        """Send bulk emails."""
+        """Send bulk emails.
+
+        In production every recipient gets its own message over pooled SMTP
+        sessions; the result includes a delivery report.
+        """
+        if not self.dev_mode:
+            return await self._send_smtp_bulk(
+                to_emails,
+                subject,
+                html_content,
+                from_email or self.settings.from_email,
+                from_name or self.settings.from_name,
+            )
 
         results = {"total_sent": 0, "successful": [], "failed": []}
 
@@ -108,6 +124,84 @@ class EmailService:
 
         return results
 
+    @property
+    def bulk_sender(self) -> BulkEmailSender:
+        """Pooled SMTP sender, created on first use."""
+        if self._bulk_sender is None:
+            if not self.settings.smtp_server:
+                raise ValueError("SMTP server not configured")
+            relay = SMTPRelay(
+                host=self.settings.smtp_server,
+                port=self.settings.smtp_port,
+                username=self.settings.smtp_username,
+                password=self.settings.smtp_password,
+                start_tls=self.settings.smtp_use_tls,
+                timeout=self.settings.smtp_timeout_seconds,
+                max_connections=self.settings.smtp_max_connections,
+                messages_per_connection=self.settings.smtp_messages_per_connection,
+            )
+            self._bulk_sender = BulkEmailSender(
+                SMTPConnectionPool(relay),
+                max_retries=self.settings.smtp_max_retries,
+                retry_backoff=self.settings.smtp_retry_backoff_seconds,
+            )
+        return self._bulk_sender
+
+    async def _send_smtp_bulk(
+        self,
+        to_emails: list[str],
+        subject: str,
+        html_content: str,
+        from_email: str,
+        from_name: str,
+    ) -> dict[str, Any]:
+        """Send one message per recipient over the SMTP connection pool."""
+        try:
+            sender = self.bulk_sender
+        except ValueError as e:
+            logger.error("Failed to send bulk email: %s", e)
+            return {
+                "total_sent": 0,
+                "successful": [],
+                "failed": [{"email": email, "error": str(e)} for email in to_emails],
+            }
+
+        # Render the shared part of the message once; only To and Message-ID vary
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = subject
+        msg["From"] = f"{from_name} <{from_email}>"
+        msg["Date"] = formatdate(localtime=False)
+        msg.attach(MIMEText(html_content, "html"))
+        body = msg.as_bytes(policy=policy.SMTP)
+        domain = from_email.rpartition("@")[2] or None
+
+        messages = (
+            (
+                email,
+                f"To: {email}\r\nMessage-ID: {make_msgid(domain=domain)}\r\n".encode() + body,
+            )
+            for email in to_emails
+        )
+        report = await sender.send(from_email, messages)
+
+        return {
+            "total_sent": report.count(DeliveryStatus.DELIVERED),
+            "successful": [
+                r.email for r in report.results if r.status == DeliveryStatus.DELIVERED
+            ],
+            "failed": [
+                {
+                    "email": r.email,
+                    "status": r.status.value,
+                    "code": r.code,
+                    "error": r.message or r.status.value,
+                }
+                for r in report.results
+                if r.status != DeliveryStatus.DELIVERED
+            ],
+            "report": report.summary(),
+        }
+
     async def _save_dev_email(self, email_data: dict[str, Any]) -> dict[str, Any]:
         """Save email to file system for development."""
         try:
@@ -188,6 +282,11 @@ class EmailService:
 
         return bool(self.settings.smtp_server and self.settings.from_email)
 
+    async def close(self) -> None:
+        """Close pooled SMTP sessions."""
+        if self._bulk_sender is not None:
+            await self._bulk_sender.pool.close()
+
     async def get_dev_emails(self, limit: int = 50) -> list[dict[str, Any]]:
         """Get recent development emails (for testing/debugging)."""
         if not self.dev_mode:
@@ -0,0 +1,380 @@
+"""WebSocket fan-out with Redis Streams replay.
+
+Every notification for a user is appended to that user's Redis Stream, and the
+entry ID becomes the message's ``replay_id``. A reconnecting client passes the
+last ``replay_id`` it saw, and the missed entries are read back with XRANGE.
+This works on any replica, because the history lives in Redis and not in
+process memory.
+
+Each payload is serialized once, and the same frame goes to all of the user's
+sockets. Every socket has a bounded send queue drained by its own writer task,
+so sends run concurrently and a slow client never blocks the others. If a
+queue overflows, the consumer is too slow and is disconnected. It can
+reconnect and replay from its last-seen ID.
+
+A single heartbeat scheduler serves every socket. It pings them all on each
+tick, and it drops sockets that have sent nothing, not even a pong, for longer
+than the heartbeat timeout. A timeout of 0 disables that check.
+"""
+
+import asyncio
+import contextlib
+import json
+from datetime import UTC, datetime
+from typing import Any
+from uuid import uuid4
+
+import structlog
+
+from .config import settings
+
+logger = structlog.get_logger(__name__)
+
+STREAM_KEY_PREFIX = "notify:stream"
+
+# Close codes: 1008 policy violation (stale heartbeat), 1013 try again later (slow)
+CLOSE_STALE = 1008
+CLOSE_SLOW_CONSUMER = 1013
+
+
+def stream_key(user_id: str) -> str:
+    """Redis key of a user's notification stream."""
+    return f"{STREAM_KEY_PREFIX}:{user_id}"
+
+
+def parse_stream_id(stream_id: str) -> tuple[int, int]:
+    """Order-preserving form of a Redis Stream entry ID (``ms-seq``)."""
+    ms, _, seq = stream_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+def with_replay_id(body: str, replay_id: str | None) -> str:
+    """Append ``replay_id`` to a serialized JSON object without re-encoding it."""
+    return f"{body[:-1]},\"replay_id\":{json.dumps(replay_id)}}}"
+
+
+def _text(value: Any) -> str:
+    """Decode a Redis reply that may be bytes."""
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class SocketChannel:
+    """One WebSocket with a bounded outbound queue and its writer task."""
+
+    def __init__(self, websocket: Any, user_id: str, queue_size: int) -> None:
+        self.websocket = websocket
+        self.user_id = user_id
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self.connected_at = datetime.now(UTC)
+        self.last_heartbeat = asyncio.get_running_loop().time()
+        self.replaying = True
+        self.last_replayed: tuple[int, int] | None = None
+        self.pending: list[tuple[tuple[int, int] | None, str]] = []
+        self.writer: asyncio.Task[None] | None = None
+        self.closed = False
+
+    def offer(self, frame: str) -> bool:
+        """Queue a frame without waiting; False if the queue is full."""
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def deliver(self, stream_id: str | None, frame: str) -> bool:
+        """Queue a live frame, holding it back while replay is in progress."""
+        if self.replaying:
+            self.pending.append((parse_stream_id(stream_id) if stream_id else None, frame))
+            return True
+        return self.offer(frame)
+
+    async def run_writer(self) -> None:
+        """Send queued frames in order until cancelled or the socket fails."""
+        while True:
+            frame = await self.queue.get()
+            await self.websocket.send_text(frame)
+
+
+class ConnectionManager:
+    """WebSocket connection manager with shared heartbeat and stream replay."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        redis_client: Any,
+        *,
+        queue_size: int | None = None,
+        heartbeat_interval: float | None = None,
+        heartbeat_timeout: float | None = None,
+        stream_maxlen: int | None = None,
+        stream_ttl: int | None = None,
+        replay_batch: int | None = None,
+    ) -> None:
+        self.redis = redis_client
+        self.queue_size = queue_size or settings.WS_SEND_QUEUE_SIZE
+        self.heartbeat_interval = heartbeat_interval or settings.WS_HEARTBEAT_INTERVAL
+        self.heartbeat_timeout = (
+            heartbeat_timeout if heartbeat_timeout is not None else settings.WS_HEARTBEAT_TIMEOUT
+        )
+        self.stream_maxlen = stream_maxlen or settings.NOTIFY_STREAM_MAXLEN
+        self.stream_ttl = stream_ttl or settings.NOTIFY_STREAM_TTL_SECONDS
+        self.replay_batch = replay_batch or settings.NOTIFY_REPLAY_BATCH
+
+        self.active_connections: dict[str, set[SocketChannel]] = {}
+        self.channels: dict[Any, SocketChannel] = {}
+        self.heartbeat_task: asyncio.Task[None] | None = None
+        self.messages_sent = 0
+        self.frames_queued = 0
+        self.messages_replayed = 0
+        self.slow_consumers_dropped = 0
+        self.stale_connections_dropped = 0
+        self.stream_errors = 0
+
+    def start(self) -> None:
+        """Start the shared heartbeat scheduler if it isn't running."""
+        if self.heartbeat_task is None or self.heartbeat_task.done():
+            self.heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+
+    async def close(self) -> None:
+        """Stop the heartbeat scheduler and every writer."""
+        if self.heartbeat_task is not None:
+            self.heartbeat_task.cancel()
+            await asyncio.gather(self.heartbeat_task, return_exceptions=True)
+            self.heartbeat_task = None
+        for websocket in list(self.channels):
+            await self.disconnect(websocket)
+
+    async def connect(
+        self, websocket: Any, user_id: str, replay_from: str | None = None
+    ) -> SocketChannel:
+        """Accept a WebSocket, replay missed messages, then go live."""
+        await websocket.accept()
+        self.start()
+
+        channel = SocketChannel(websocket, user_id, self.queue_size)
+        self.channels[websocket] = channel
+        # Register before reading the stream so nothing published meanwhile is lost;
+        # live frames are held back until the replayed ones are queued
+        self.active_connections.setdefault(user_id, set()).add(channel)
+        channel.writer = asyncio.create_task(self._write(channel))
+
+        replayed = 0
+        if replay_from:
+            replayed = await self._replay_messages(channel, replay_from)
+        await self._go_live(channel)
+
+        logger.info(
+            "WebSocket connected",
+            user_id=user_id,
+            total_connections=len(self.active_connections.get(user_id, ())),
+            replay_from=replay_from,
+            replayed=replayed,
+        )
+        return channel
+
+    async def disconnect(self, websocket: Any, code: int | None = None) -> None:
+        """Clean up a WebSocket, optionally closing it with ``code``."""
+        channel = self.channels.pop(websocket, None)
+        if channel is None or channel.closed:
+            return
+        channel.closed = True
+
+        connections = self.active_connections.get(channel.user_id)
+        if connections is not None:
+            connections.discard(channel)
+            if not connections:
+                del self.active_connections[channel.user_id]
+
+        if channel.writer is not None and channel.writer is not asyncio.current_task():
+            channel.writer.cancel()
+        # Unblock a replay waiting on queue space; it sees ``closed`` and stops
+        while not channel.queue.empty():
+            channel.queue.get_nowait()
+        if code is not None:
+            with contextlib.suppress(Exception):
+                await websocket.close(code=code)
+
+        logger.info(
+            "WebSocket disconnected",
+            user_id=channel.user_id,
+            close_code=code,
+            connection_duration=(datetime.now(UTC) - channel.connected_at).total_seconds(),
+        )
+
+    def touch(self, websocket: Any) -> None:
+        """Record a pong (or any client traffic) from a socket."""
+        channel = self.channels.get(websocket)
+        if channel is not None:
+            channel.last_heartbeat = asyncio.get_running_loop().time()
+
+    async def send_personal_message(
+        self, message: dict[str, Any], user_id: str, notification_type: str = "general"
+    ) -> dict[str, Any]:
+        """Append a message to the user's stream and fan it out to their sockets."""
+        enhanced_message = {
+            "id": str(uuid4()),
+            "type": notification_type,
+            "data": message,
+            "timestamp": datetime.now(UTC).isoformat(),
+            "user_id": user_id,
+        }
+        # Serialized once: the same body is stored for replay and sent to every socket
+        body = json.dumps(enhanced_message, default=str)
+
+        replay_id = await self._append(user_id, body)
+        frame = with_replay_id(body, replay_id)
+        self.messages_sent += 1
+
+        delivered_count = 0
+        slow: list[SocketChannel] = []
+        for channel in self.active_connections.get(user_id, ()):
+            if channel.deliver(replay_id, frame):
+                delivered_count += 1
+            else:
+                slow.append(channel)
+        self.frames_queued += delivered_count
+
+        for channel in slow:
+            self.slow_consumers_dropped += 1
+            logger.warning("Dropping slow WebSocket consumer", user_id=user_id)
+            await self.disconnect(channel.websocket, CLOSE_SLOW_CONSUMER)
+
+        logger.debug(
+            "Message sent",
+            user_id=user_id,
+            message_id=enhanced_message["id"],
+            replay_id=replay_id,
+            delivered_count=delivered_count,
+            notification_type=notification_type,
+        )
+
+        return {
+            "delivered": delivered_count > 0,
+            "connections": delivered_count,
+            "replay_id": replay_id,
+        }
+
+    async def _append(self, user_id: str, body: str) -> str | None:
+        """XADD a message to the user's stream; returns its entry ID."""
+        key = stream_key(user_id)
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.xadd(
+                key,
+                {"payload": body},
+                maxlen=self.stream_maxlen,
+                approximate=True,
+            )
+            pipe.expire(key, self.stream_ttl)
+            stream_id, _ = await pipe.execute()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # Live delivery still works; the message just can't be replayed
+            self.stream_errors += 1
+            logger.warning(
+                "Failed to append to notification stream", error=str(e), user_id=user_id
+            )
+            return None
+        return _text(stream_id)
+
+    async def _replay_messages(self, channel: SocketChannel, replay_from: str) -> int:
+        """Queue stream entries after ``replay_from`` ahead of any live frames."""
+        try:
+            parse_stream_id(replay_from)
+        except ValueError:
+            logger.warning("Invalid replay_from value", replay_from=replay_from)
+            return 0
+
+        key = stream_key(channel.user_id)
+        last_id = replay_from
+        replayed = 0
+        while True:
+            try:
+                entries = await self.redis.xrange(key, min=f"({last_id}", count=self.replay_batch)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                self.stream_errors += 1
+                logger.warning("Failed to read notification stream", error=str(e))
+                break
+
+            for entry_id, fields in entries:
+                last_id = _text(entry_id)
+                body = _text(fields.get(b"payload") or fields.get("payload"))
+                if channel.closed:
+                    return replayed
+                # Blocking put: the writer is already draining, so replay runs at socket speed
+                await channel.queue.put(with_replay_id(body, last_id))
+                self.messages_replayed += 1
+                channel.last_replayed = parse_stream_id(last_id)
+            replayed += len(entries)
+            if len(entries) < self.replay_batch:
+                break
+        return replayed
+
+    async def _go_live(self, channel: SocketChannel) -> None:
+        """Flush held-back live frames not already covered by replay."""
+        channel.replaying = False
+        pending, channel.pending = channel.pending, []
+        for stream_id, frame in pending:
+            replayed = channel.last_replayed
+            if stream_id is not None and replayed is not None and stream_id <= replayed:
+                continue
+            if not channel.offer(frame):
+                self.slow_consumers_dropped += 1
+                await self.disconnect(channel.websocket, CLOSE_SLOW_CONSUMER)
+                return
+
+    async def _write(self, channel: SocketChannel) -> None:
+        """Run a channel's writer and disconnect it when sending fails."""
+        try:
+            await channel.run_writer()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning("Failed to send message", error=str(e), user_id=channel.user_id)
+            await self.disconnect(channel.websocket)
+
+    async def _heartbeat_loop(self) -> None:
+        """Run a heartbeat tick every interval."""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            await self.heartbeat_tick()
+
+    async def heartbeat_tick(self) -> int:
+        """Ping every socket and drop ones that stopped answering; returns pings queued."""
+        frame = json.dumps(
+            {
+                "type": "heartbeat",
+                "timestamp": datetime.now(UTC).isoformat(),
+                "data": {"ping": "ping"},
+            }
+        )
+        cutoff = asyncio.get_running_loop().time() - self.heartbeat_timeout
+        pinged = 0
+        stale: list[SocketChannel] = []
+        for channel in list(self.channels.values()):
+            if self.heartbeat_timeout and channel.last_heartbeat < cutoff:
+                stale.append(channel)
+            elif channel.offer(frame):
+                pinged += 1
+            # A full queue means frames are already flowing; skip the ping
+
+        for channel in stale:
+            self.stale_connections_dropped += 1
+            await self.disconnect(channel.websocket, CLOSE_STALE)
+        if stale:
+            logger.info("Dropped stale WebSocket connections", count=len(stale))
+        return pinged
+
+    def get_connection_stats(self) -> dict[str, Any]:
+        """Get connection and fan-out statistics."""
+        now = datetime.now(UTC)
+        durations = [(now - c.connected_at).total_seconds() for c in self.channels.values()]
+        return {
+            "total_connections": len(self.channels),
+            "active_users": len(self.active_connections),
+            "average_duration_seconds": sum(durations) / len(durations) if durations else 0,
+            "messages_sent": self.messages_sent,
+            "frames_queued": self.frames_queued,
+            "messages_replayed": self.messages_replayed,
+            "slow_consumers_dropped": self.slow_consumers_dropped,
+            "stale_connections_dropped": self.stale_connections_dropped,
+            "stream_errors": self.stream_errors,
+        }
@@ -1,6 +1,5 @@
 """Real-time notification service with WebSocket, Push, and SMS for IEP reminders."""
 
-import asyncio
 import json
 from datetime import UTC, datetime, timedelta
 from typing import Any
@@ -25,6 +24,7 @@ from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 from opentelemetry.instrumentation.redis import RedisInstrumentor
 
 from .config import settings
+from .fanout import ConnectionManager
 from .message_queue import MessageQueue
 from .models import (
     NotificationChannel,
@@ -80,203 +80,9 @@ FastAPIInstrumentor.instrument_app(app)
 RedisInstrumentor().instrument()
 
 
-class ConnectionManager:
-    """Enhanced WebSocket connection manager with heartbeat and replay support."""
-
-    def __init__(self) -> None:
-        self.active_connections: dict[str, set[WebSocket]] = {}
-        self.connection_metadata: dict[WebSocket, dict[str, Any]] = {}
-        self.message_history: dict[str, list[dict[str, Any]]] = {}
-        self.replay_sequence: int = 0
-        self.heartbeat_interval: int = 30  # seconds
-        self.heartbeat_tasks: dict[WebSocket, asyncio.Task] = {}
-
-    async def connect(
-        self, websocket: WebSocket, user_id: str, replay_from: str | None = None
-    ) -> None:
-        """Accept WebSocket connection and set up heartbeat."""
-        await websocket.accept()
-
-        if user_id not in self.active_connections:
-            self.active_connections[user_id] = set()
-        self.active_connections[user_id].add(websocket)
-
-        self.connection_metadata[websocket] = {
-            "user_id": user_id,
-            "connected_at": datetime.now(UTC),
-            "last_heartbeat": datetime.now(UTC),
-            "replay_from": replay_from,
-        }
-
-        # Start heartbeat task
-        heartbeat_task = asyncio.create_task(self._heartbeat_loop(websocket))
-        self.heartbeat_tasks[websocket] = heartbeat_task
-
-        # Send missed messages if replay requested
-        if replay_from:
-            await self._replay_messages(websocket, user_id, replay_from)
-
-        logger.info(
-            "WebSocket connected",
-            user_id=user_id,
-            total_connections=len(self.active_connections.get(user_id, set())),
-            replay_from=replay_from,
-        )
-
-    async def disconnect(self, websocket: WebSocket) -> None:
-        """Clean up WebSocket connection."""
-        metadata = self.connection_metadata.get(websocket, {})
-        user_id = metadata.get("user_id")
-
-        if user_id and user_id in self.active_connections:
-            self.active_connections[user_id].discard(websocket)
-            if not self.active_connections[user_id]:
-                del self.active_connections[user_id]
-
-        # Cancel heartbeat task
-        if websocket in self.heartbeat_tasks:
-            self.heartbeat_tasks[websocket].cancel()
-            del self.heartbeat_tasks[websocket]
-
-        if websocket in self.connection_metadata:
-            del self.connection_metadata[websocket]
-
-        logger.info(
-            "WebSocket disconnected",
-            user_id=user_id,
-            connection_duration=(
-                datetime.now(UTC) - metadata.get("connected_at", datetime.now(UTC))
-            ).total_seconds(),
-        )
-
-    async def send_personal_message(
-        self, message: dict[str, Any], user_id: str, notification_type: str = "general"
-    ) -> dict[str, Any]:
-        """Send message to specific user with replay support."""
-        self.replay_sequence += 1
-
-        enhanced_message = {
-            "id": str(uuid4()),
-            "type": notification_type,
-            "data": message,
-            "timestamp": datetime.now(UTC).isoformat(),
-            "replay_id": str(self.replay_sequence),
-            "user_id": user_id,
-        }
-
-        # Store message for replay
-        if user_id not in self.message_history:
-            self.message_history[user_id] = []
-        self.message_history[user_id].append(enhanced_message)
-
-        # Keep only last 100 messages per user
-        if len(self.message_history[user_id]) > 100:
-            self.message_history[user_id] = self.message_history[user_id][-100:]
-
-        # Send to active connections
-        delivered_count = 0
-        if user_id in self.active_connections:
-            dead_connections = set()
-            for websocket in self.active_connections[user_id]:
-                try:
-                    await websocket.send_text(json.dumps(enhanced_message))
-                    delivered_count += 1
-                except Exception as e:
-                    logger.warning("Failed to send message", error=str(e), user_id=user_id)
-                    dead_connections.add(websocket)
-
-            # Clean up dead connections
-            for websocket in dead_connections:
-                await self.disconnect(websocket)
-
-        logger.info(
-            "Message sent",
-            user_id=user_id,
-            message_id=enhanced_message["id"],
-            replay_id=enhanced_message["replay_id"],
-            delivered_count=delivered_count,
-            notification_type=notification_type,
-        )
-
-        return {
-            "delivered": delivered_count > 0,
-            "connections": delivered_count,
-            "replay_id": enhanced_message["replay_id"],
-        }
-
-    async def _heartbeat_loop(self, websocket: WebSocket) -> None:
-        """Send periodic heartbeat pings."""
-        try:
-            while True:
-                await asyncio.sleep(self.heartbeat_interval)
-                heartbeat_msg = {
-                    "type": "heartbeat",
-                    "timestamp": datetime.now(UTC).isoformat(),
-                    "data": {"ping": "ping"},
-                }
-                await websocket.send_text(json.dumps(heartbeat_msg))
-
-                # Update last heartbeat time
-                if websocket in self.connection_metadata:
-                    self.connection_metadata[websocket]["last_heartbeat"] = datetime.now(UTC)
-
-        except asyncio.CancelledError:
-            pass
-        except Exception as e:
-            logger.warning("Heartbeat failed", error=str(e))
-            await self.disconnect(websocket)
-
-    async def _replay_messages(self, websocket: WebSocket, user_id: str, replay_from: str) -> None:
-        """Replay missed messages from specific replay_id."""
-        if user_id not in self.message_history:
-            return
-
-        try:
-            replay_from_int = int(replay_from)
-            messages_to_replay = [
-                msg
-                for msg in self.message_history[user_id]
-                if int(msg["replay_id"]) > replay_from_int
-            ]
-
-            for message in messages_to_replay:
-                await websocket.send_text(json.dumps(message))
-                await asyncio.sleep(0.1)  # Small delay to prevent overwhelming
-
-            logger.info(
-                "Messages replayed",
-                user_id=user_id,
-                replay_from=replay_from,
-                messages_count=len(messages_to_replay),
-            )
-
-        except (ValueError, TypeError) as e:
-            logger.warning("Invalid replay_from value", error=str(e), replay_from=replay_from)
-
-    def get_connection_stats(self) -> dict[str, Any]:
-        """Get connection statistics."""
-        total_connections = sum(len(conns) for conns in self.active_connections.values())
-        active_users = len(self.active_connections)
-
-        # Calculate average connection duration
-        now = datetime.now(UTC)
-        durations = [
-            (now - metadata["connected_at"]).total_seconds()
-            for metadata in self.connection_metadata.values()
-        ]
-        avg_duration = sum(durations) / len(durations) if durations else 0
-
-        return {
-            "total_connections": total_connections,
-            "active_users": active_users,
-            "average_duration_seconds": avg_duration,
-            "replay_sequence": self.replay_sequence,
-        }
-
-
 # Global instances
-manager = ConnectionManager()
 redis_client = redis.from_url(settings.REDIS_URL)
+manager = ConnectionManager(redis_client)
 message_queue = MessageQueue(redis_client)
 push_service = PushService()
 sms_service = SMSService()
@@ -325,15 +131,11 @@ async def websocket_endpoint(
                 while True:
                     # Wait for client messages (heartbeat responses, acks, etc.)
                     data = await websocket.receive_text()
+                    # Any client traffic, pongs included, keeps the socket alive
+                    manager.touch(websocket)
                     try:
                         message = json.loads(data)
-                        if message.get("type") == "pong":
-                            # Handle heartbeat response
-                            if websocket in manager.connection_metadata:
-                                manager.connection_metadata[websocket]["last_heartbeat"] = (
-                                    datetime.now(UTC)
-                                )
-                        elif message.get("type") == "ack":
+                        if message.get("type") == "ack":
                             # Handle message acknowledgment
                             logger.debug(
                                 "Message acknowledged", message_id=message.get("message_id")
@@ -644,6 +446,7 @@ async def startup_event() -> None:
         await template_engine.initialize()
         await push_service.initialize()
         await sms_service.initialize()
+        manager.start()
 
         logger.info("Notification service started successfully")
     except Exception as e:
@@ -656,9 +459,8 @@ async def shutdown_event() -> None:
     """Clean up resources on shutdown."""
     logger.info("Shutting down notification service")
 
-    # Cancel all heartbeat tasks
-    for task in manager.heartbeat_tasks.values():
-        task.cancel()
+    # Stop the heartbeat scheduler and socket writers
+    await manager.close()
 
     # Close Redis connections
     await redis_client.close()
@@ -0,0 +1,318 @@
+"""Concurrent Web Push delivery.
+
+Each subscription needs its own encrypted body (ECDH plus AES-GCM against the
+subscription's keys) and a VAPID JWT for the push service's origin. Both are
+CPU work, so they run in a thread pool and the event loop only does I/O.
+Signed VAPID headers are cached per audience and reused until shortly before
+the JWT expires, instead of being re-signed for every message.
+
+Requests are posted concurrently over one aiohttp session. A semaphore bounds
+the total in flight. Each push service (endpoint origin) also gets its own
+concurrency cap and token-bucket rate limit, so a large broadcast doesn't trip
+a provider's throttling. A 429 pauses that service for its Retry-After (capped
+at ``PUSH_MAX_RETRY_AFTER``), and 429/5xx responses are retried. Requests
+waiting to retry do not hold any of the global in-flight slots. 404/410 mean the subscription is gone; those
+outcomes are flagged ``pruned`` so the caller can drop the subscription.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlparse
+
+import aiohttp
+from py_vapid import Vapid
+from pywebpush import WebPusher
+
+from .config import settings
+from .models import PushSubscription
+
+logger = logging.getLogger(__name__)
+
+PRUNE_STATUSES = frozenset({404, 410})
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+CONTENT_ENCODING = "aes128gcm"
+
+# (endpoint, body, headers) -> (status, Retry-After header or None)
+PostFunc = Callable[[str, bytes, dict[str, str]], Awaitable[tuple[int, str | None]]]
+
+
+def push_service_origin(endpoint: str) -> str:
+    """Origin of a push endpoint, which is also its VAPID audience."""
+    url = urlparse(endpoint)
+    return f"{url.scheme}://{url.netloc}"
+
+
+class VapidSigner:
+    """Signs VAPID JWTs per audience and reuses them until close to expiry."""
+
+    def __init__(
+        self,
+        private_key: str | None,
+        subject: str,
+        lifetime: int = 12 * 3600,
+        refresh_margin: int = 3600,
+    ) -> None:
+        """Load the key (or generate an ephemeral one when none is configured)."""
+        if private_key:
+            self.vapid = Vapid.from_string(private_key=private_key)
+        else:
+            self.vapid = Vapid()
+            self.vapid.generate_keys()
+        self.subject = subject
+        self.lifetime = lifetime
+        self.refresh_margin = refresh_margin
+        self.signed = 0
+        self._cache: dict[str, tuple[dict[str, str], float]] = {}
+        self._lock = threading.Lock()
+
+    def headers(self, audience: str) -> dict[str, str]:
+        """VAPID Authorization headers for ``audience``; thread-safe."""
+        now = time.time()
+        cached = self._cache.get(audience)
+        if cached and cached[1] > now:
+            return cached[0]
+        with self._lock:
+            cached = self._cache.get(audience)
+            if cached and cached[1] > now:
+                return cached[0]
+            expires = int(now) + self.lifetime
+            headers = self.vapid.sign({"sub": self.subject, "aud": audience, "exp": expires})
+            self._cache[audience] = (headers, expires - self.refresh_margin)
+            self.signed += 1
+            return headers
+
+
+class RateLimiter:
+    """Token bucket with a pause for Retry-After."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """Allow ``rate`` requests per second with bursts of up to ``burst``."""
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait for a token."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for ``seconds``."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+@dataclass
+class PushOutcome:
+    """Result of pushing to one subscription."""
+
+    user_id: str
+    endpoint: str
+    status: int | None = None
+    error: str | None = None
+    attempts: int = 0
+
+    @property
+    def delivered(self) -> bool:
+        """Whether the push service accepted the message."""
+        return self.status is not None and 200 <= self.status < 300
+
+    @property
+    def pruned(self) -> bool:
+        """Whether the subscription no longer exists."""
+        return self.status in PRUNE_STATUSES
+
+
+@dataclass
+class BroadcastReport:
+    """Outcomes and totals for one delivery run."""
+
+    outcomes: list[PushOutcome] = field(default_factory=list)
+    retries: int = 0
+    elapsed_seconds: float = 0.0
+
+    def summary(self) -> dict[str, Any]:
+        """Aggregate counts, overall and per push service."""
+        by_service: dict[str, dict[str, int]] = {}
+        delivered = pruned = 0
+        for outcome in self.outcomes:
+            key = "delivered" if outcome.delivered else "pruned" if outcome.pruned else "failed"
+            counts = by_service.setdefault(
+                push_service_origin(outcome.endpoint), {"delivered": 0, "pruned": 0, "failed": 0}
+            )
+            counts[key] += 1
+            delivered += outcome.delivered
+            pruned += outcome.pruned
+        total = len(self.outcomes)
+        return {
+            "total": total,
+            "delivered": delivered,
+            "pruned": pruned,
+            "failed": total - delivered - pruned,
+            "retries": self.retries,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "by_service": by_service,
+        }
+
+
+class PushBroadcaster:
+    """Encrypts in a worker pool and posts concurrently with per-service limits."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        signer: VapidSigner,
+        *,
+        post: PostFunc | None = None,
+        encrypt_workers: int | None = None,
+        max_in_flight: int | None = None,
+        per_service_concurrency: int | None = None,
+        per_service_rate: float | None = None,
+        max_retries: int | None = None,
+        max_retry_after: float | None = None,
+        ttl: int = 86400,
+    ) -> None:
+        """Initialize; limits default to settings. ``post`` overrides HTTP for tests."""
+        self.signer = signer
+        self.ttl = ttl
+        self.max_in_flight = max_in_flight or settings.PUSH_MAX_IN_FLIGHT
+        self.per_service_concurrency = (
+            per_service_concurrency or settings.PUSH_SERVICE_CONCURRENCY
+        )
+        self.per_service_rate = per_service_rate or settings.PUSH_SERVICE_RATE_PER_SECOND
+        self.max_retries = max_retries if max_retries is not None else settings.PUSH_MAX_RETRIES
+        self.max_retry_after = (
+            max_retry_after if max_retry_after is not None else settings.PUSH_MAX_RETRY_AFTER
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=encrypt_workers or settings.PUSH_ENCRYPT_WORKERS,
+            thread_name_prefix="push-encrypt",
+        )
+        self._post = post or self._aiohttp_post
+        self._session: Any = None
+        self._services: dict[str, tuple[asyncio.Semaphore, RateLimiter]] = {}
+
+    def _service(self, origin: str) -> tuple[asyncio.Semaphore, RateLimiter]:
+        """Concurrency cap and rate limiter for one push service."""
+        if origin not in self._services:
+            self._services[origin] = (
+                asyncio.Semaphore(self.per_service_concurrency),
+                RateLimiter(self.per_service_rate, burst=self.per_service_concurrency),
+            )
+        return self._services[origin]
+
+    def _prepare(
+        self, subscription: PushSubscription, data: bytes
+    ) -> tuple[bytes, dict[str, str]]:
+        """Encrypt the payload and build headers (runs in the worker pool)."""
+        pusher = WebPusher({"endpoint": subscription.endpoint, "keys": subscription.keys})
+        encoded = pusher.encode(data, CONTENT_ENCODING)
+        headers = {
+            "content-encoding": CONTENT_ENCODING,
+            "ttl": str(self.ttl),
+            **self.signer.headers(push_service_origin(subscription.endpoint)),
+        }
+        return encoded["body"], headers
+
+    async def _aiohttp_post(
+        self, endpoint: str, body: bytes, headers: dict[str, str]
+    ) -> tuple[int, str | None]:
+        """POST over a shared aiohttp session."""
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_in_flight),
+                timeout=aiohttp.ClientTimeout(total=30),
+            )
+        async with self._session.post(endpoint, data=body, headers=headers) as response:
+            await response.read()
+            return response.status, response.headers.get("Retry-After")
+
+    async def deliver(
+        self, targets: Iterable[tuple[str, PushSubscription]], notification: dict[str, Any]
+    ) -> BroadcastReport:
+        """Push one notification to every ``(user_id, subscription)`` target."""
+        started = time.perf_counter()
+        data = json.dumps(notification, default=str).encode()
+        report = BroadcastReport()
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        loop = asyncio.get_running_loop()
+
+        async def push(user_id: str, subscription: PushSubscription) -> PushOutcome:
+            outcome = PushOutcome(user_id=user_id, endpoint=subscription.endpoint)
+            concurrency, limiter = self._service(push_service_origin(subscription.endpoint))
+            async with in_flight:
+                try:
+                    body, headers = await loop.run_in_executor(
+                        self.executor, self._prepare, subscription, data
+                    )
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    outcome.error = f"encryption failed: {e}"
+                    return outcome
+
+            # Global slots are held only while a request is actually out, never
+            # while waiting on one service's rate limit or backoff, so a throttled
+            # service cannot starve the others
+            while True:
+                outcome.attempts += 1
+                await limiter.acquire()
+                async with concurrency, in_flight:
+                    try:
+                        status, retry_after = await self._post(
+                            subscription.endpoint, body, headers
+                        )
+                    except Exception as e:  # pylint: disable=broad-exception-caught
+                        status, retry_after = None, None
+                        outcome.error = str(e) or type(e).__name__
+                outcome.status = status
+
+                retryable = status is None or status in RETRY_STATUSES
+                if not retryable or outcome.attempts > self.max_retries:
+                    return outcome
+                report.retries += 1
+                delay = _retry_delay(retry_after, outcome.attempts, self.max_retry_after)
+                if status == 429:
+                    limiter.pause(delay)
+                await asyncio.sleep(delay)
+
+        tasks = [push(user_id, subscription) for user_id, subscription in targets]
+        report.outcomes = list(await asyncio.gather(*tasks))
+        report.elapsed_seconds = time.perf_counter() - started
+        return report
+
+    async def close(self) -> None:
+        """Close the HTTP session and the worker pool."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self.executor.shutdown(wait=False)
+
+
+def _retry_delay(retry_after: str | None, attempt: int, max_delay: float) -> float:
+    """Seconds to wait before a retry: Retry-After if numeric, else backoff.
+
+    Either way the wait is capped at ``max_delay``.
+    """
+    if retry_after:
+        try:
+            return min(max_delay, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    return min(max_delay, 0.5 * (2 ** (attempt - 1)))
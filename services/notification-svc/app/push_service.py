@@ -1,13 +1,10 @@
 """Web Push notification service."""
 
-import json
 import logging
 
-from py_vapid import Vapid
-from pywebpush import WebPushException, webpush
-
 from .config import settings
 from .models import PushSubscription
+from .push_broadcaster import BroadcastReport, PushBroadcaster, VapidSigner
 
 logger = logging.getLogger(__name__)
 
@@ -20,16 +17,22 @@ class PushService:
             "sub": f"mailto:{settings.VAPID_EMAIL}",
         }
         self.subscriptions: dict[str, list[PushSubscription]] = {}
+        self.broadcaster: PushBroadcaster | None = None
 
     async def init(self) -> None:
         """Initialize push service."""
         # Load or generate VAPID keys
+        signer = VapidSigner(settings.VAPID_PRIVATE_KEY, self.vapid_claims["sub"])
         if not settings.VAPID_PRIVATE_KEY:
-            vapid = Vapid()
-            vapid.generate_keys()
-            logger.warning("Generated VAPID keys. Public key: %s", vapid.public_key)
+            logger.warning("Generated VAPID keys. Public key: %s", signer.vapid.public_key)
         else:
             logger.info("Using configured VAPID keys")
+        self.broadcaster = PushBroadcaster(signer)
+
+    async def close(self) -> None:
+        """Release the HTTP session and encryption workers."""
+        if self.broadcaster is not None:
+            await self.broadcaster.close()
 
     async def subscribe(
         self,
@@ -83,66 +86,24 @@ class PushService:
         notification: dict,
     ) -> dict[str, any]:
         """Send push notification to user's subscriptions."""
-        if user_id not in self.subscriptions:
+        if not self.subscriptions.get(user_id):
             return {"status": "no_subscriptions"}
 
-        results = {
+        report = await self._deliver([user_id], notification)
+
+        errors = [
+            {"endpoint": o.endpoint, "status": o.status, "error": o.error}
+            for o in report.outcomes
+            if not o.delivered
+        ]
+        return {
             "status": "sent",
-            "successful": 0,
-            "failed": 0,
-            "errors": [],
+            "successful": len(report.outcomes) - len(errors),
+            "failed": len(errors),
+            "pruned": sum(o.pruned for o in report.outcomes),
+            "errors": errors,
         }
 
-        invalid_subscriptions = []
-
-        for subscription in self.subscriptions[user_id]:
-            try:
-                response = webpush(
-                    subscription_info={
-                        "endpoint": subscription.endpoint,
-                        "keys": subscription.keys,
-                    },
-                    data=json.dumps(notification),
-                    vapid_private_key=settings.VAPID_PRIVATE_KEY,
-                    vapid_claims=self.vapid_claims,
-                    ttl=86400,  # 24 hours
-                )
-
-                if response.status_code in [200, 201, 204]:
-                    results["successful"] += 1
-                else:
-                    results["failed"] += 1
-                    results["errors"].append(
-                        {
-                            "endpoint": subscription.endpoint,
-                            "status": response.status_code,
-                        }
-                    )
-
-                    # Mark invalid subscriptions for removal
-                    if response.status_code == 410:  # Gone
-                        invalid_subscriptions.append(subscription.endpoint)
-
-            except WebPushException as e:
-                logger.error("Push failed for %s: %s", user_id, e)
-                results["failed"] += 1
-                results["errors"].append(
-                    {
-                        "endpoint": subscription.endpoint,
-                        "error": str(e),
-                    }
-                )
-
-                # Handle invalid subscription
-                if e.response and e.response.status_code == 410:
-                    invalid_subscriptions.append(subscription.endpoint)
-
-        # Clean up invalid subscriptions
-        for endpoint in invalid_subscriptions:
-            await self.unsubscribe(user_id, endpoint)
-
-        return results
-
     async def broadcast(
         self,
         notification: dict,
@@ -152,20 +113,38 @@ class PushService:
         if user_ids is None:
             user_ids = list(self.subscriptions.keys())
 
-        results = {
+        report = await self._deliver(user_ids, notification)
+
+        reached = {o.user_id for o in report.outcomes if o.delivered}
+        return {
             "total_users": len(user_ids),
-            "successful_users": 0,
-            "failed_users": 0,
+            "successful_users": len(reached),
+            "failed_users": len(user_ids) - len(reached),
+            "report": report.summary(),
         }
 
-        for user_id in user_ids:
-            user_result = await self.send(user_id, notification)
-            if user_result.get("successful", 0) > 0:
-                results["successful_users"] += 1
-            else:
-                results["failed_users"] += 1
+    async def _deliver(self, user_ids: list[str], notification: dict) -> BroadcastReport:
+        """Push to every subscription of ``user_ids`` and prune dead ones."""
+        if self.broadcaster is None:
+            await self.init()
+
+        targets = [
+            (user_id, subscription)
+            for user_id in user_ids
+            for subscription in self.subscriptions.get(user_id, [])
+        ]
+        report = await self.broadcaster.deliver(targets, notification)
+
+        for outcome in report.outcomes:
+            if outcome.pruned:
+                await self.unsubscribe(outcome.user_id, outcome.endpoint)
+            elif not outcome.delivered:
+                logger.error(
+                    "Push failed for %s: %s %s", outcome.user_id, outcome.status, outcome.error
+                )
 
-        return results
+        logger.info("Push delivery finished: %s", report.summary())
+        return report
 
     async def _persist_subscription(
         self,
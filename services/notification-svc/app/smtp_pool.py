@@ -0,0 +1,358 @@
+"""
+Pooled async SMTP delivery for bulk email.
+
+A pool per relay keeps authenticated SMTP sessions open and hands them out to
+at most ``max_connections`` concurrent senders, so TLS and AUTH happen once per
+session rather than once per message. Sessions are recycled after
+``messages_per_connection`` messages and dropped on transport errors.
+
+``BulkEmailSender`` runs one worker per pooled connection over a shared queue of
+per-recipient messages:
+
+- 2xx: delivered.
+- 4xx (or a dropped connection): retried with exponential backoff up to
+  ``max_retries`` times, then reported as deferred.
+- 5xx: bounced; the address is added to the suppression list and skipped by
+  later sends from the same sender.
+
+Every bulk send returns a ``DeliveryReport``.
+"""
+
+import asyncio
+import contextlib
+import logging
+import random
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any
+
+try:
+    import aiosmtplib
+
+    AIOSMTPLIB_AVAILABLE = True
+except ImportError:
+    AIOSMTPLIB_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPReplyError(Exception):
+    """A 4xx/5xx reply to one recipient's mail transaction."""
+
+    def __init__(self, code: int, message: str) -> None:
+        """Initialize with the SMTP reply code and text."""
+        super().__init__(f"{code} {message}")
+        self.code = code
+        self.message = message
+
+    @property
+    def transient(self) -> bool:
+        """Whether the relay asked us to try again later."""
+        return 400 <= self.code < 500
+
+
+@dataclass(frozen=True)
+class SMTPRelay:
+    """Connection settings and limits for one SMTP relay."""
+
+    host: str
+    port: int = 587
+    username: str | None = None
+    password: str | None = None
+    start_tls: bool | None = None
+    timeout: float = 30.0
+    max_connections: int = 10
+    messages_per_connection: int = 100
+
+
+class AioSMTPConnection:
+    """One authenticated aiosmtplib session."""
+
+    def __init__(self, relay: SMTPRelay) -> None:
+        """Initialize an unopened session for ``relay``."""
+        if not AIOSMTPLIB_AVAILABLE:
+            raise RuntimeError("aiosmtplib is required for SMTP delivery")
+        self.client = aiosmtplib.SMTP(
+            hostname=relay.host,
+            port=relay.port,
+            username=relay.username,
+            password=relay.password,
+            start_tls=relay.start_tls,
+            timeout=relay.timeout,
+        )
+
+    @property
+    def connected(self) -> bool:
+        """Whether the session can carry another message."""
+        return self.client.is_connected
+
+    async def open(self) -> None:
+        """Connect, STARTTLS and authenticate; raises ``SMTPReplyError`` if the relay refuses."""
+        try:
+            await self.client.connect()
+        except aiosmtplib.SMTPResponseException as e:
+            raise SMTPReplyError(e.code, e.message) from e
+
+    async def send(self, sender: str, recipient: str, message: bytes) -> str:
+        """Send one message; raises ``SMTPReplyError`` on a 4xx/5xx reply."""
+        try:
+            _, response = await self.client.sendmail(sender, [recipient], message)
+        except aiosmtplib.SMTPRecipientsRefused as e:
+            refused = e.recipients[0]
+            raise SMTPReplyError(refused.code, refused.message) from e
+        except aiosmtplib.SMTPResponseException as e:
+            raise SMTPReplyError(e.code, e.message) from e
+        return response
+
+    async def close(self) -> None:
+        """QUIT, ignoring a session that is already gone."""
+        with contextlib.suppress(Exception):
+            await self.client.quit()
+
+
+ConnectionFactory = Callable[[SMTPRelay], Any]
+
+
+@dataclass
+class _Lease:
+    connection: Any
+    messages: int = 0
+
+
+class SMTPConnectionPool:
+    """Reusable SMTP sessions for one relay, capped at ``max_connections``."""
+
+    def __init__(
+        self, relay: SMTPRelay, connection_factory: ConnectionFactory | None = None
+    ) -> None:
+        """Initialize an empty pool; sessions are opened on demand."""
+        self.relay = relay
+        self.connection_factory = connection_factory or AioSMTPConnection
+        self._slots = asyncio.Semaphore(relay.max_connections)
+        self._idle: list[_Lease] = []
+        self.opened = 0
+        self.reused = 0
+
+    async def acquire(self) -> _Lease:
+        """Take an idle session or open a new one, waiting for a free slot."""
+        await self._slots.acquire()
+        while self._idle:
+            lease = self._idle.pop()
+            if lease.connection.connected:
+                self.reused += 1
+                return lease
+            await lease.connection.close()
+        try:
+            connection = self.connection_factory(self.relay)
+            await connection.open()
+        except BaseException:
+            self._slots.release()
+            raise
+        self.opened += 1
+        return _Lease(connection)
+
+    async def release(self, lease: _Lease, reusable: bool = True) -> None:
+        """Return a session to the pool, or close it if spent or broken."""
+        try:
+            if (
+                reusable
+                and lease.connection.connected
+                and lease.messages < self.relay.messages_per_connection
+            ):
+                self._idle.append(lease)
+            else:
+                await lease.connection.close()
+        finally:
+            self._slots.release()
+
+    async def close(self) -> None:
+        """Close every idle session."""
+        idle, self._idle = self._idle, []
+        for lease in idle:
+            await lease.connection.close()
+
+
+class DeliveryStatus(str, Enum):
+    """Final outcome for one recipient."""
+
+    DELIVERED = "delivered"
+    DEFERRED = "deferred"
+    BOUNCED = "bounced"
+    SUPPRESSED = "suppressed"
+
+
+@dataclass
+class RecipientResult:
+    """Outcome of delivering to one recipient."""
+
+    email: str
+    status: DeliveryStatus
+    code: int | None = None
+    message: str | None = None
+    attempts: int = 0
+
+
+@dataclass
+class DeliveryReport:
+    """Per-recipient results and totals for one bulk send."""
+
+    results: list[RecipientResult] = field(default_factory=list)
+    retries: int = 0
+    connections_opened: int = 0
+    connections_reused: int = 0
+    elapsed_seconds: float = 0.0
+
+    def count(self, status: DeliveryStatus) -> int:
+        """Number of recipients that ended with ``status``."""
+        return sum(1 for result in self.results if result.status == status)
+
+    def summary(self) -> dict[str, Any]:
+        """Totals and throughput, for logs and API responses."""
+        delivered = self.count(DeliveryStatus.DELIVERED)
+        return {
+            "total": len(self.results),
+            "delivered": delivered,
+            "deferred": self.count(DeliveryStatus.DEFERRED),
+            "bounced": self.count(DeliveryStatus.BOUNCED),
+            "suppressed": self.count(DeliveryStatus.SUPPRESSED),
+            "retries": self.retries,
+            "connections_opened": self.connections_opened,
+            "connections_reused": self.connections_reused,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "messages_per_second": (
+                round(delivered / self.elapsed_seconds, 1) if self.elapsed_seconds else 0.0
+            ),
+        }
+
+
+@dataclass
+class _Job:
+    result: RecipientResult
+    message: bytes
+
+
+class BulkEmailSender:
+    """Delivers per-recipient messages over a connection pool with retries."""
+
+    def __init__(
+        self,
+        pool: SMTPConnectionPool,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+    ) -> None:
+        """Initialize with a pool and the 4xx retry policy."""
+        self.pool = pool
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.suppressed: set[str] = set()
+
+    async def send(self, sender: str, messages: Iterable[tuple[str, bytes]]) -> DeliveryReport:
+        """Deliver ``(recipient, message bytes)`` pairs and report per recipient."""
+        started = time.perf_counter()
+        opened, reused = self.pool.opened, self.pool.reused
+        report = DeliveryReport()
+        queue: asyncio.Queue[_Job] = asyncio.Queue()
+
+        for recipient, message in messages:
+            result = RecipientResult(email=recipient, status=DeliveryStatus.DEFERRED)
+            report.results.append(result)
+            if recipient.lower() in self.suppressed:
+                result.status = DeliveryStatus.SUPPRESSED
+                continue
+            queue.put_nowait(_Job(result, message))
+
+        outstanding = queue.qsize()
+        finished = asyncio.Event()
+        if not outstanding:
+            finished.set()
+        timers: set[asyncio.Task[None]] = set()
+
+        def settle() -> None:
+            nonlocal outstanding
+            outstanding -= 1
+            if outstanding == 0:
+                finished.set()
+
+        async def requeue(job: _Job, delay: float) -> None:
+            await asyncio.sleep(delay)
+            queue.put_nowait(job)
+
+        def retry_or_defer(job: _Job, code: int | None, message: str) -> None:
+            job.result.code, job.result.message = code, message
+            if job.result.attempts > self.max_retries:
+                job.result.status = DeliveryStatus.DEFERRED
+                settle()
+                return
+            report.retries += 1
+            delay = self.retry_backoff * (2 ** (job.result.attempts - 1))
+            task = asyncio.create_task(requeue(job, delay * random.uniform(0.5, 1.5)))  # nosec B311
+            timers.add(task)
+            task.add_done_callback(timers.discard)
+
+        async def worker() -> None:
+            lease = None
+            try:
+                while True:
+                    job = await queue.get()
+                    if lease is None:
+                        try:
+                            lease = await self.pool.acquire()
+                        except Exception as e:  # pylint: disable=broad-exception-caught
+                            # Any failure to connect must settle or requeue the job,
+                            # otherwise the send never finishes
+                            job.result.attempts += 1
+                            code = e.code if isinstance(e, SMTPReplyError) else None
+                            retry_or_defer(job, code, f"connect failed: {e}")
+                            continue
+
+                    job.result.attempts += 1
+                    try:
+                        response = await lease.connection.send(
+                            sender, job.result.email, job.message
+                        )
+                    except SMTPReplyError as e:
+                        lease.messages += 1
+                        if e.transient:
+                            retry_or_defer(job, e.code, e.message)
+                        else:
+                            job.result.status = DeliveryStatus.BOUNCED
+                            job.result.code, job.result.message = e.code, e.message
+                            self.suppressed.add(job.result.email.lower())
+                            settle()
+                    except Exception as e:  # pylint: disable=broad-exception-caught
+                        # Dropped, timed-out or broken session: discard it and retry elsewhere
+                        await self.pool.release(lease, reusable=False)
+                        lease = None
+                        retry_or_defer(job, None, str(e) or type(e).__name__)
+                        continue
+                    else:
+                        lease.messages += 1
+                        job.result.status = DeliveryStatus.DELIVERED
+                        job.result.code, job.result.message = 250, response
+                        settle()
+
+                    if lease.messages >= self.pool.relay.messages_per_connection:
+                        await self.pool.release(lease)
+                        lease = None
+            finally:
+                if lease is not None:
+                    await self.pool.release(lease)
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(min(self.pool.relay.max_connections, max(outstanding, 1)))
+        ]
+        try:
+            await finished.wait()
+        finally:
+            for task in [*workers, *timers]:
+                task.cancel()
+            await asyncio.gather(*workers, *timers, return_exceptions=True)
+
+        report.connections_opened = self.pool.opened - opened
+        report.connections_reused = self.pool.reused - reused
+        report.elapsed_seconds = time.perf_counter() - started
+        logger.info("Bulk email delivery finished: %s", report.summary())
+        return report
@@ -2,17 +2,19 @@
 Template service for managing and rendering MJML email templates.
 """
 
+import asyncio
 import json
 import logging
+import time
 from pathlib import Path
 from typing import Any
 
 import aiofiles
-from jinja2 import Environment, FileSystemLoader, Template
-from mjml import mjml_to_html
+from jinja2 import Environment, FileSystemLoader
 
 from .config import get_settings
 from .schemas import TemplateId, TemplateInfo
+from .template_cache import CompiledTemplate, source_checksum
 
 logger = logging.getLogger(__name__)
 
@@ -28,18 +30,47 @@ class TemplateService:
         self._template_configs: dict[TemplateId, dict[str, Any]] = {}
         self._loaded = False
 
+        # Compiled templates by (id, locale, checksum), and the current one per (id, locale)
+        self.reload_interval = self.settings.template_reload_interval_seconds
+        self._compiled: dict[tuple[str, str | None, str], CompiledTemplate] = {}
+        self._current: dict[tuple[str, str | None], CompiledTemplate] = {}
+        self._compile_locks: dict[tuple[str, str | None], asyncio.Lock] = {}
+        self.renders = 0
+        self.compilations = 0
+        self.reloads = 0
+
     async def initialize(self) -> None:
-        """Initialize template service and load configurations."""
+        """Initialize template service, load configurations and warm the cache."""
         if self._loaded:
             return
 
         await self._load_template_configs()
         self._loaded = True
+        await self.warm_up()
         logger.info(
             "Template service initialized with %s templates",
             len(self._template_configs),
         )
 
+    async def warm_up(
+        self,
+        template_ids: list[TemplateId] | None = None,
+        locales: list[str | None] | None = None,
+    ) -> dict[str, str]:
+        """Precompile templates so the first send doesn't pay for MJML conversion."""
+        results = {}
+        for template_id in template_ids or list(self._template_configs):
+            for locale in locales or [None]:
+                name = f"{template_id.value}:{locale or 'default'}"
+                try:
+                    compiled = await self._get_compiled(template_id, locale)
+                except (FileNotFoundError, ValueError) as e:
+                    results[name] = f"unavailable: {e}"
+                    continue
+                results[name] = "precompiled" if compiled.html is not None else "fallback"
+        logger.info("Template cache warmed: %s", results)
+        return results
+
     async def _load_template_configs(self) -> None:
         """Load template configurations from JSON files."""
         # Load all template configurations
@@ -54,16 +85,17 @@ class TemplateService:
                 logger.warning("No config found for template: %s", template_id.value)
 
     async def render_template(
-        self, template_id: TemplateId, data: dict[str, Any]
+        self, template_id: TemplateId, data: dict[str, Any], locale: str | None = None
     ) -> dict[str, str]:
         """Render email template with provided data."""
         if not self._loaded:
             await self.initialize()
 
         # Get template configuration
-        config = self._template_configs.get(template_id)
-        if not config:
+        if template_id not in self._template_configs:
             raise ValueError(f"Template configuration not found: {template_id.value}")
+        compiled = await self._get_compiled(template_id, locale)
+        config = compiled.config
 
         # Validate required data
         required_fields = config.get("required_data", [])
@@ -79,28 +111,113 @@ class TemplateService:
             "support_email": self.settings.from_email,
         }
 
-        # Render subject
-        subject_template = Template(config.get("subject", "Notification"))
-        subject = subject_template.render(**template_data)
+        # Only Jinja substitution happens per render; MJML was compiled up front
+        subject, html = compiled.render(template_data)
+        self.renders += 1
+
+        return {"html": html, "subject": subject}
 
-        # Load and render MJML template
-        mjml_path = self.templates_path / f"{template_id.value}.mjml"
-        if not mjml_path.exists():
-            raise FileNotFoundError(f"MJML template not found: {mjml_path}")
+    def _template_files(self, template_id: TemplateId, locale: str | None) -> tuple[Path, Path]:
+        """MJML and JSON files for a locale, falling back to language, then default."""
+        candidates = []
+        if locale:
+            candidates.append(locale)
+            if "-" in locale:
+                candidates.append(locale.split("-", 1)[0])
+        for candidate in candidates:
+            mjml_path = self.templates_path / f"{template_id.value}.{candidate}.mjml"
+            if mjml_path.exists():
+                config_path = self.templates_dir / f"{template_id.value}.{candidate}.json"
+                if not config_path.exists():
+                    config_path = self.templates_dir / f"{template_id.value}.json"
+                return mjml_path, config_path
+        return (
+            self.templates_path / f"{template_id.value}.mjml",
+            self.templates_dir / f"{template_id.value}.json",
+        )
 
-        async with aiofiles.open(mjml_path) as f:
-            mjml_content = await f.read()
+    async def _get_compiled(
+        self, template_id: TemplateId, locale: str | None
+    ) -> CompiledTemplate:
+        """Return the compiled template, recompiling if its files changed."""
+        current_key = (template_id.value, locale)
+        current = self._current.get(current_key)
+        now = time.monotonic()
+        if current is not None and now - current.checked_at < self.reload_interval:
+            return current
 
-        # Render Jinja2 variables in MJML
-        mjml_template = Template(mjml_content)
-        rendered_mjml = mjml_template.render(**template_data)
+        lock = self._compile_locks.setdefault(current_key, asyncio.Lock())
+        async with lock:
+            current = self._current.get(current_key)
+            if current is not None and now - current.checked_at < self.reload_interval:
+                return current
 
-        # Convert MJML to HTML
-        html_result = mjml_to_html(rendered_mjml)
-        if html_result.get("errors"):
-            logger.error("MJML compilation errors: %s", html_result["errors"])
+            mjml_path, config_path = self._template_files(template_id, locale)
+            if not mjml_path.exists():
+                raise FileNotFoundError(f"MJML template not found: {mjml_path}")
+            signature = tuple(
+                (str(path), stat.st_mtime_ns, stat.st_size)
+                for path in (mjml_path, config_path)
+                if path.exists()
+                for stat in (path.stat(),)
+            )
+            if current is not None and current.signature == signature:
+                current.checked_at = now
+                return current
 
-        return {"html": html_result.get("html", ""), "subject": subject}
+            async with aiofiles.open(mjml_path) as f:
+                mjml_content = await f.read()
+            config_content = "{}"
+            if config_path.exists():
+                async with aiofiles.open(config_path) as f:
+                    config_content = await f.read()
+
+            checksum = source_checksum(mjml_content, config_content)
+            compiled = self._compiled.get((template_id.value, locale, checksum))
+            if compiled is None:
+                compiled = await asyncio.to_thread(
+                    CompiledTemplate.compile,
+                    self.jinja_env,
+                    template_id.value,
+                    locale,
+                    checksum,
+                    signature,
+                    mjml_content,
+                    json.loads(config_content),
+                )
+                self._compiled[compiled.key] = compiled
+                self.compilations += 1
+                if compiled.errors:
+                    logger.error("MJML compilation errors: %s", compiled.errors)
+                if compiled.html is None:
+                    logger.warning(
+                        "Template %s could not be precompiled; rendering MJML per send",
+                        template_id.value,
+                    )
+            if current is not None:
+                self.reloads += 1
+                logger.info("Reloaded template %s (%s)", template_id.value, locale or "default")
+                if locale is None:
+                    self._template_configs[template_id] = compiled.config
+
+            compiled.signature = signature
+            compiled.checked_at = now
+            self._current[current_key] = compiled
+            return compiled
+
+    def cache_stats(self) -> dict[str, Any]:
+        """Compiled template cache counters."""
+        return {
+            "compiled_templates": len(self._compiled),
+            "compilations": self.compilations,
+            "reloads": self.reloads,
+            "renders": self.renders,
+            "fallback_templates": sorted(
+                f"{c.template_id}:{c.locale or 'default'}"
+                for c in self._current.values()
+                if c.html is None
+            ),
+        }
 
     def get_template_info(self, template_id: TemplateId) -> TemplateInfo | None:
         """Get information about a template."""
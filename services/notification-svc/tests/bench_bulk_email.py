@@ -0,0 +1,96 @@
+"""Throughput benchmark for pooled bulk email against a local aiosmtpd sink.
+
+Starts an aiosmtpd server that accepts and discards every message (with an
+optional per-message latency), then sends a district-wide announcement
+through the pooled sender. It also sends a small sample the old way, one
+blocking smtplib connection per message, for comparison. Not collected by
+pytest; run it directly (requires aiosmtplib and aiosmtpd):
+
+    python -m tests.bench_bulk_email --recipients 100000
+"""
+
+import argparse
+import asyncio
+import smtplib
+import time
+
+from aiosmtpd.controller import Controller
+
+from app.smtp_pool import BulkEmailSender, SMTPConnectionPool, SMTPRelay
+
+MESSAGE = (
+    b"From: District Office <noreply@district.org>\r\n"
+    b"Subject: Early dismissal on Friday\r\n"
+    b"Content-Type: text/html; charset=utf-8\r\n\r\n"
+    + b"<p>All schools will dismiss two hours early on Friday.</p>\r\n" * 20
+)
+
+
+class SinkHandler:
+    """Accepts every message after an optional delay."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.received = 0
+
+    async def handle_DATA(self, _server, _session, _envelope):  # noqa: N802
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.received += 1
+        return "250 Message accepted for delivery"
+
+
+def _messages(count: int):
+    for i in range(count):
+        yield f"guardian{i}@example.com", f"To: guardian{i}@example.com\r\n".encode() + MESSAGE
+
+
+def _sequential(port: int, count: int) -> float:
+    """Old path: one connection (and handshake) per message."""
+    started = time.perf_counter()
+    for recipient, message in _messages(count):
+        with smtplib.SMTP("127.0.0.1", port) as server:
+            server.sendmail("noreply@district.org", [recipient], message)
+    return time.perf_counter() - started
+
+
+async def run(recipients: int, connections: int, latency: float, sample: int) -> None:
+    """Run both paths and print throughput."""
+    handler = SinkHandler(latency)
+    controller = Controller(handler, hostname="127.0.0.1", port=8025)
+    controller.start()
+    try:
+        elapsed = await asyncio.to_thread(_sequential, controller.port, sample)
+        print(f"sequential smtplib:  {sample / elapsed:,.0f} msg/s ({sample} messages)")
+
+        relay = SMTPRelay(
+            host="127.0.0.1",
+            port=controller.port,
+            start_tls=False,
+            max_connections=connections,
+            messages_per_connection=1000,
+        )
+        sender = BulkEmailSender(SMTPConnectionPool(relay))
+        report = await sender.send("noreply@district.org", _messages(recipients))
+        await sender.pool.close()
+        summary = report.summary()
+        print(f"pooled aiosmtplib:   {summary['messages_per_second']:,.0f} msg/s")
+        print(f"report:              {summary}")
+        print(f"sink received:       {handler.received}")
+    finally:
+        controller.stop()
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipients", type=int, default=100_000)
+    parser.add_argument("--connections", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--sample", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.recipients, args.connections, args.latency_ms / 1000, args.sample))
+
+
+if __name__ == "__main__":
+    main()
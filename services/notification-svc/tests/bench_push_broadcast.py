@@ -0,0 +1,125 @@
+"""Throughput benchmark for Web Push broadcasts against a local fake push service.
+
+Starts an aiohttp server that plays three push services (one port each) with
+a fixed latency, answering 410 for a share of the subscriptions. A broadcast
+then goes through PushService. A small sample is also sent the old way, with
+sequential blocking ``webpush`` calls, for comparison. Not collected by pytest;
+run it directly:
+
+    python -m tests.bench_push_broadcast --subscriptions 20000
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import time
+
+from aiohttp import web
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from pywebpush import WebPushException, webpush
+
+from app.models import PushSubscription
+from app.push_broadcaster import PushBroadcaster, VapidSigner
+from app.push_service import PushService
+
+SERVICES = 3
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _subscription(base_urls: list[str], i: int, gone_every: int) -> PushSubscription:
+    key = ec.generate_private_key(ec.SECP256R1())
+    public = key.public_key().public_bytes(
+        serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint
+    )
+    state = "gone" if gone_every and i % gone_every == 0 else "ok"
+    return PushSubscription(
+        endpoint=f"{base_urls[i % len(base_urls)]}/{state}/{i}",
+        keys={"p256dh": _b64(public), "auth": _b64(os.urandom(16))},
+    )
+
+
+async def _start_server(latency: float) -> tuple[web.AppRunner, list[str]]:
+    async def handle(request: web.Request) -> web.Response:
+        await request.read()
+        await asyncio.sleep(latency)
+        return web.Response(status=410 if request.match_info["state"] == "gone" else 201)
+
+    app = web.Application()
+    app.router.add_post("/{state}/{id}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    base_urls = []
+    for _ in range(SERVICES):
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # pylint: disable=protected-access
+        base_urls.append(f"http://127.0.0.1:{port}")
+    return runner, base_urls
+
+
+def _sequential(subscriptions: list[PushSubscription], private_key: str) -> float:
+    """Old path: blocking webpush() per subscription, one after another."""
+    started = time.perf_counter()
+    for subscription in subscriptions:
+        try:
+            webpush(
+                subscription_info={"endpoint": subscription.endpoint, "keys": subscription.keys},
+                data='{"title": "Early dismissal"}',
+                vapid_private_key=private_key,
+                vapid_claims={"sub": "mailto:admin@example.com"},
+                ttl=86400,
+            )
+        except WebPushException:
+            pass
+    return time.perf_counter() - started
+
+
+async def run(subscriptions: int, latency: float, gone_every: int, sample: int) -> None:
+    """Run both paths and print throughput."""
+    runner, base_urls = await _start_server(latency)
+    try:
+        signer = VapidSigner(None, "mailto:admin@example.com")
+        private_key = _b64(
+            signer.vapid.private_key.private_numbers().private_value.to_bytes(32, "big")
+        )
+
+        subs = [_subscription(base_urls, i, gone_every) for i in range(subscriptions)]
+        elapsed = await asyncio.to_thread(_sequential, subs[:sample], private_key)
+        print(f"sequential webpush:  {sample / elapsed:,.0f} pushes/s ({sample} pushes)")
+
+        service = PushService()
+        service.broadcaster = PushBroadcaster(signer)
+        for i, subscription in enumerate(subs):
+            service.subscriptions.setdefault(f"guardian{i}", []).append(subscription)
+
+        started = time.perf_counter()
+        result = await service.broadcast({"title": "Early dismissal"})
+        elapsed = time.perf_counter() - started
+        remaining = sum(len(s) for s in service.subscriptions.values())
+        print(f"broadcaster:         {subscriptions / elapsed:,.0f} pushes/s")
+        print(f"result:              {result}")
+        print(f"vapid signatures:    {signer.signed}")
+        print(f"subscriptions left:  {remaining} of {subscriptions}")
+        await service.close()
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscriptions", type=int, default=20_000)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--gone-every", type=int, default=20)
+    parser.add_argument("--sample", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.subscriptions, args.latency_ms / 1000, args.gone_every, args.sample))
+
+
+if __name__ == "__main__":
+    main()
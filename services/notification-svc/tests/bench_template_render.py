@@ -0,0 +1,75 @@
+"""Render throughput: per-send MJML conversion vs the compiled template cache.
+
+Renders the shipped templates with sample data, first the old way (Jinja over
+the MJML source, then MJML→HTML on every send) and then through
+``TemplateService``, which only does a Jinja pass per send. Not collected by
+pytest; run it directly:
+
+    python -m tests.bench_template_render --renders 2000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from jinja2 import Template
+
+from app.schemas import TemplateId
+from app.template_cache import render_mjml
+from app.template_service import TemplateService
+from tests.test_template_cache import SAMPLE_DATA
+
+TEMPLATES = Path(__file__).resolve().parent.parent / "templates"
+TEMPLATE_IDS = [
+    TemplateId.TEACHER_INVITE,
+    TemplateId.APPROVAL_REQUEST,
+    TemplateId.ENROLLMENT_DECISION,
+]
+
+
+def uncached(renders: int) -> float:
+    """Renders/sec with MJML conversion on every render."""
+    sources = {}
+    for template_id in TEMPLATE_IDS:
+        config = json.loads((TEMPLATES / f"{template_id.value}.json").read_text())
+        sources[template_id] = (
+            (TEMPLATES / f"{template_id.value}.mjml").read_text(),
+            {**config.get("defaults", {}), **SAMPLE_DATA},
+        )
+    started = time.perf_counter()
+    for i in range(renders):
+        source, data = sources[TEMPLATE_IDS[i % len(TEMPLATE_IDS)]]
+        render_mjml(Template(source).render(**data))
+    return renders / (time.perf_counter() - started)
+
+
+async def cached(renders: int) -> tuple[float, dict]:
+    """Renders/sec through the compiled template cache."""
+    service = TemplateService()
+    service.templates_dir = service.templates_path = TEMPLATES
+    await service.initialize()
+    started = time.perf_counter()
+    for i in range(renders):
+        await service.render_template(TEMPLATE_IDS[i % len(TEMPLATE_IDS)], SAMPLE_DATA)
+    return renders / (time.perf_counter() - started), service.cache_stats()
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--renders", type=int, default=2000)
+    args = parser.parse_args()
+
+    before = uncached(args.renders)
+    after, stats = asyncio.run(cached(args.renders))
+    print(f"renders:          {args.renders}")
+    print(f"per-send MJML:    {before:,.0f} renders/s")
+    print(f"compiled cache:   {after:,.0f} renders/s")
+    print(f"speedup:          {after / before:.1f}x")
+    print(f"cache stats:      {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""In-memory stand-in for the Redis Stream commands used by the fan-out layer.
+
+Replies are bytes, as from a client created without ``decode_responses``.
+Instances can be shared to simulate several replicas talking to one Redis.
+"""
+
+import time
+
+
+def _parse(stream_id):
+    ms, _, seq = stream_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+class FakeRedis:
+    """Streams with XADD (MAXLEN trimming), XRANGE and EXPIRE."""
+
+    def __init__(self):
+        self.streams = {}
+        self.last_id = (0, 0)
+        self.fail = False
+
+    async def xadd(self, key, fields, maxlen=None, approximate=True):  # noqa: ARG002
+        if self.fail:
+            raise ConnectionError("redis unavailable")
+        ms = int(time.time() * 1000)
+        entry_id = (ms, 0) if ms > self.last_id[0] else (self.last_id[0], self.last_id[1] + 1)
+        self.last_id = entry_id
+        entries = self.streams.setdefault(key, [])
+        encoded = {k.encode(): v.encode() for k, v in fields.items()}
+        entries.append((f"{entry_id[0]}-{entry_id[1]}".encode(), encoded))
+        if maxlen is not None and len(entries) > maxlen:
+            del entries[: len(entries) - maxlen]
+        return entries[-1][0]
+
+    async def expire(self, key, _seconds):
+        return key in self.streams
+
+    async def xrange(self, key, min="-", max="+", count=None):  # noqa: A002 ARG002
+        if self.fail:
+            raise ConnectionError("redis unavailable")
+        exclusive = min.startswith("(")
+        lower = None if min == "-" else _parse(min.lstrip("("))
+        result = []
+        for entry_id, fields in self.streams.get(key, []):
+            parsed = _parse(entry_id.decode())
+            if lower is not None and (parsed < lower or (exclusive and parsed == lower)):
+                continue
+            result.append((entry_id, fields))
+            if count is not None and len(result) >= count:
+                break
+        return result
+
+    def pipeline(self, transaction=True):  # noqa: ARG002
+        return _Pipeline(self)
+
+
+class _Pipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def xadd(self, *args, **kwargs):
+        self.calls.append((self.redis.xadd, args, kwargs))
+
+    def expire(self, *args):
+        self.calls.append((self.redis.expire, args, {}))
+
+    async def execute(self):
+        return [await command(*args, **kwargs) for command, args, kwargs in self.calls]
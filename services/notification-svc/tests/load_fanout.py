@@ -0,0 +1,118 @@
+"""Load test for WebSocket fan-out against a local fake Redis.
+
+Opens many simulated sockets, spread over guardians with one to three devices
+each. It pushes notifications to every guardian, ticks the shared heartbeat,
+then reconnects a share of the sockets with replay. A few sockets are slow, to
+show that they get dropped instead of stalling everyone else. Not collected by
+pytest; run it directly:
+
+    python -m tests.load_fanout --sockets 50000
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+import structlog
+
+from app.fanout import ConnectionManager
+
+from .fake_redis import FakeRedis
+
+
+class CountingSocket:
+    """Counts frames; slow sockets never finish a send."""
+
+    def __init__(self, slow=False):
+        self.slow = slow
+        self.frames = 0
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, _frame):
+        if self.slow:
+            await asyncio.Event().wait()
+        self.frames += 1
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+
+async def _settle(manager):
+    """Wait until every writer has emptied its queue."""
+    while any(not channel.queue.empty() for channel in manager.channels.values()):
+        await asyncio.sleep(0.01)
+
+
+async def run(sockets: int, messages: int, slow_every: int, reconnect_share: float) -> None:
+    """Run the scenario and print timings."""
+    redis = FakeRedis()
+    manager = ConnectionManager(redis, queue_size=8, heartbeat_interval=3600)
+    users = [f"guardian{i}" for i in range(sockets * 10 // 19)]
+    clients = []
+
+    started = time.perf_counter()
+    for i in range(sockets):
+        socket = CountingSocket(slow=slow_every > 0 and i % slow_every == 0)
+        user = users[i % len(users)]
+        await manager.connect(socket, user)
+        clients.append((user, socket))
+    connect_time = time.perf_counter() - started
+
+    last_seen = {}
+    started = time.perf_counter()
+    for n in range(messages):
+        for user in users:
+            result = await manager.send_personal_message({"n": n}, user, "iep_meeting_reminder")
+            last_seen.setdefault(user, result["replay_id"])
+        await asyncio.sleep(0)
+    await _settle(manager)
+    fanout_time = time.perf_counter() - started
+    frames = sum(socket.frames for _, socket in clients)
+
+    started = time.perf_counter()
+    pinged = await manager.heartbeat_tick()
+    await _settle(manager)
+    heartbeat_time = time.perf_counter() - started
+
+    replica = ConnectionManager(redis, queue_size=max(64, messages + 1), heartbeat_interval=3600)
+    reconnects = int(len(clients) * reconnect_share)
+    started = time.perf_counter()
+    for user, _ in clients[:reconnects]:
+        await replica.connect(CountingSocket(), user, replay_from=last_seen[user])
+    await _settle(replica)
+    replay_time = time.perf_counter() - started
+
+    stats = manager.get_connection_stats()
+    print(f"sockets:             {sockets} ({len(users)} guardians)")
+    print(f"connect:             {connect_time:.2f}s")
+    print(f"messages:            {messages * len(users)}")
+    print(f"frames delivered:    {frames}")
+    print(f"fan-out:             {fanout_time:.2f}s ({frames / fanout_time:,.0f} frames/s)")
+    print(f"slow consumers:      {stats['slow_consumers_dropped']} dropped")
+    print(f"heartbeat tick:      {pinged} pings in {heartbeat_time * 1000:.0f}ms")
+    print(f"reconnect + replay:  {reconnects} sockets in {replay_time:.2f}s")
+    print(f"replayed frames:     {replica.get_connection_stats()['messages_replayed']}")
+
+    await manager.close()
+    await replica.close()
+
+
+def main() -> None:
+    """Parse arguments and run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sockets", type=int, default=50_000)
+    parser.add_argument("--messages", type=int, default=10)
+    parser.add_argument("--slow-every", type=int, default=1000)
+    parser.add_argument("--reconnect-share", type=float, default=0.2)
+    args = parser.parse_args()
+    # Per-connection info logs would dominate the timings
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    asyncio.run(run(args.sockets, args.messages, args.slow_every, args.reconnect_share))
+
+
+if __name__ == "__main__":
+    main()
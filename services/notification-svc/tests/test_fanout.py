@@ -0,0 +1,126 @@
+"""Tests for WebSocket fan-out and Redis Streams replay."""
+
+import asyncio
+import json
+
+from app.fanout import CLOSE_SLOW_CONSUMER, CLOSE_STALE, ConnectionManager
+
+from .fake_redis import FakeRedis
+
+
+class FakeWebSocket:
+    """Records frames; ``delay`` simulates a slow client."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.frames = []
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.frames.append(frame)
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+    def messages(self, kind=None):
+        decoded = [json.loads(frame) for frame in self.frames]
+        return [m for m in decoded if kind is None or m["type"] == kind]
+
+
+async def _drain():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_payload_serialized_once_per_fanout():
+    """Every socket of a user receives the same frame object."""
+    manager = ConnectionManager(FakeRedis(), heartbeat_interval=60)
+    sockets = [FakeWebSocket() for _ in range(3)]
+    for socket in sockets:
+        await manager.connect(socket, "guardian1")
+
+    result = await manager.send_personal_message({"title": "IEP meeting"}, "guardian1")
+    await _drain()
+
+    assert result["delivered"] and result["connections"] == 3
+    frames = [socket.frames[0] for socket in sockets]
+    assert all(frame is frames[0] for frame in frames)
+    assert json.loads(frames[0])["replay_id"] == result["replay_id"]
+    await manager.close()
+
+
+async def test_reconnect_to_other_replica_replays_missed_messages():
+    """Missed messages come from the shared stream, in order, without duplicates."""
+    redis = FakeRedis()
+    replica_a = ConnectionManager(redis, heartbeat_interval=60)
+    replica_b = ConnectionManager(redis, heartbeat_interval=60)
+
+    first = FakeWebSocket()
+    await replica_a.connect(first, "guardian1")
+    seen = await replica_a.send_personal_message({"n": 0}, "guardian1")
+    await replica_a.disconnect(first)
+    for n in range(1, 4):
+        await replica_a.send_personal_message({"n": n}, "guardian1")
+
+    second = FakeWebSocket()
+    await replica_b.connect(second, "guardian1", replay_from=seen["replay_id"])
+    await replica_b.send_personal_message({"n": 4}, "guardian1")
+    await _drain()
+
+    assert [m["data"]["n"] for m in second.messages()] == [1, 2, 3, 4]
+    await replica_a.close()
+    await replica_b.close()
+
+
+async def test_slow_consumer_is_dropped_without_blocking_others():
+    """A client that can't keep up is disconnected; the others still get everything."""
+    manager = ConnectionManager(FakeRedis(), queue_size=4, heartbeat_interval=60)
+    fast, slow = FakeWebSocket(), FakeWebSocket(delay=10)
+    await manager.connect(fast, "guardian1")
+    await manager.connect(slow, "guardian1")
+
+    for n in range(10):
+        await manager.send_personal_message({"n": n}, "guardian1")
+        await _drain()
+
+    assert slow.close_code == CLOSE_SLOW_CONSUMER
+    assert [m["data"]["n"] for m in fast.messages()] == list(range(10))
+    assert manager.get_connection_stats()["slow_consumers_dropped"] == 1
+    await manager.close()
+
+
+async def test_shared_heartbeat_pings_and_drops_stale_sockets():
+    """One scheduler pings every socket and closes those that stop answering."""
+    manager = ConnectionManager(FakeRedis(), heartbeat_interval=0.01, heartbeat_timeout=0.05)
+    alive, silent = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(alive, "guardian1")
+    await manager.connect(silent, "guardian2")
+
+    for _ in range(10):
+        await asyncio.sleep(0.01)
+        manager.touch(alive)
+
+    assert alive.messages("heartbeat") and alive.close_code is None
+    assert silent.close_code == CLOSE_STALE
+    await manager.close()
+
+
+async def test_live_delivery_survives_stream_outage():
+    """If Redis is down the message is still delivered, just not replayable."""
+    redis = FakeRedis()
+    manager = ConnectionManager(redis, heartbeat_interval=60)
+    socket = FakeWebSocket()
+    await manager.connect(socket, "guardian1")
+
+    redis.fail = True
+    result = await manager.send_personal_message({"n": 1}, "guardian1")
+    await _drain()
+
+    assert result["delivered"] and result["replay_id"] is None
+    assert socket.messages()[0]["data"] == {"n": 1}
+    await manager.close()
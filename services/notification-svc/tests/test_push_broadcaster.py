@@ -0,0 +1,136 @@
+"""Tests for concurrent Web Push delivery."""
+
+import asyncio
+import base64
+import os
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from app.models import PushSubscription
+from app.push_broadcaster import PushBroadcaster, VapidSigner
+from app.push_service import PushService
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _subscription(endpoint):
+    key = ec.generate_private_key(ec.SECP256R1())
+    public = key.public_key().public_bytes(
+        serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint
+    )
+    keys = {"p256dh": _b64(public), "auth": _b64(os.urandom(16))}
+    return PushSubscription(endpoint=endpoint, keys=keys)
+
+
+class FakePushEndpoint:
+    """Records requests; ``statuses`` maps an endpoint to replies for successive attempts."""
+
+    def __init__(self, statuses=None, delay=0.0):
+        self.statuses = statuses or {}
+        self.delay = delay
+        self.requests = []
+        self.active = {}
+        self.peak = {}
+
+    async def __call__(self, endpoint, body, headers):
+        origin = endpoint.split("/")[2]
+        self.active[origin] = self.active.get(origin, 0) + 1
+        self.peak[origin] = max(self.peak.get(origin, 0), self.active[origin])
+        try:
+            await asyncio.sleep(self.delay)
+            self.requests.append((endpoint, body, headers))
+            replies = self.statuses.get(endpoint)
+            status = replies.pop(0) if replies else 201
+            return status, "0" if status == 429 else None
+        finally:
+            self.active[origin] -= 1
+
+
+def _broadcaster(endpoint, **kwargs):
+    signer = VapidSigner(None, "mailto:admin@example.com")
+    return PushBroadcaster(signer, post=endpoint, **kwargs)
+
+
+async def test_vapid_jwt_signed_once_per_push_service():
+    """Headers are reused across subscriptions on the same service."""
+    endpoint = FakePushEndpoint()
+    broadcaster = _broadcaster(endpoint)
+    targets = [
+        (f"user{i}", _subscription(f"https://{host}/push/{i}"))
+        for i in range(20)
+        for host in ("fcm.googleapis.com", "updates.push.services.mozilla.com")
+    ]
+
+    report = await broadcaster.deliver(targets, {"title": "IEP meeting tomorrow"})
+
+    assert report.summary()["delivered"] == 40
+    assert broadcaster.signer.signed == 2
+    _, body, headers = endpoint.requests[0]
+    assert headers["content-encoding"] == "aes128gcm"
+    assert headers["Authorization"].startswith("vapid t=")
+    assert b"IEP meeting" not in body
+    await broadcaster.close()
+
+
+async def test_per_service_concurrency_is_capped():
+    """A single push service never sees more than its concurrency limit."""
+    endpoint = FakePushEndpoint(delay=0.005)
+    broadcaster = _broadcaster(endpoint, per_service_concurrency=3, max_in_flight=50)
+    targets = [
+        (f"user{i}", _subscription(f"https://fcm.googleapis.com/push/{i}")) for i in range(30)
+    ]
+
+    await broadcaster.deliver(targets, {"title": "Reminder"})
+
+    assert endpoint.peak["fcm.googleapis.com"] <= 3
+    await broadcaster.close()
+
+
+async def test_dead_subscriptions_are_pruned_and_throttling_retried():
+    """404/410 remove the subscription; 429 is retried after Retry-After."""
+    gone = "https://fcm.googleapis.com/push/gone"
+    missing = "https://fcm.googleapis.com/push/missing"
+    throttled = "https://fcm.googleapis.com/push/throttled"
+    endpoint = FakePushEndpoint(statuses={gone: [410], missing: [404], throttled: [429]})
+
+    service = PushService()
+    service.broadcaster = _broadcaster(endpoint)
+    for user_id, url in (("guardian1", gone), ("guardian1", throttled), ("guardian2", missing)):
+        await service.subscribe(user_id, _subscription(url))
+
+    result = await service.broadcast({"title": "Early dismissal"})
+
+    assert result["successful_users"] == 1
+    assert result["report"]["pruned"] == 2 and result["report"]["retries"] == 1
+    assert [s.endpoint for s in service.subscriptions["guardian1"]] == [throttled]
+    assert service.subscriptions["guardian2"] == []
+    await service.close()
+
+
+async def test_throttled_service_does_not_hold_global_slots():
+    """Backing off from one service's 429 leaves in-flight slots free for the others."""
+    throttled = [f"https://fcm.googleapis.com/push/{i}" for i in range(2)]
+    healthy = [f"https://updates.push.services.mozilla.com/push/{i}" for i in range(10)]
+    finished = {}
+
+    async def post(endpoint, _body, _headers):
+        if endpoint in throttled and endpoint not in finished:
+            finished[endpoint] = None
+            return 429, "3600"
+        finished[endpoint] = asyncio.get_running_loop().time()
+        return 201, None
+
+    broadcaster = _broadcaster(post, max_in_flight=2, max_retry_after=0.3)
+    targets = [(f"user{i}", _subscription(url)) for i, url in enumerate(throttled + healthy)]
+
+    started = asyncio.get_running_loop().time()
+    report = await asyncio.wait_for(broadcaster.deliver(targets, {"title": "Snow day"}), 2)
+
+    assert report.summary()["delivered"] == 12
+    # Healthy pushes finish well before the capped 0.3 s Retry-After elapses
+    assert max(finished[url] for url in healthy) - started < 0.2
+    assert min(finished[url] for url in throttled) - started >= 0.3
+    await broadcaster.close()
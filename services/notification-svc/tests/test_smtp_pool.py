@@ -0,0 +1,155 @@
+"""Tests for pooled bulk SMTP delivery."""
+
+import asyncio
+
+from app.smtp_pool import (
+    BulkEmailSender,
+    DeliveryStatus,
+    SMTPConnectionPool,
+    SMTPRelay,
+    SMTPReplyError,
+)
+
+
+class FakeRelay:
+    """Scripted SMTP relay: ``replies`` maps a recipient to codes for successive attempts."""
+
+    def __init__(self, replies=None, delay=0.0):
+        self.replies = replies or {}
+        self.delay = delay
+        self.sessions = 0
+        self.active = 0
+        self.peak = 0
+        self.accepted = []
+
+    def __call__(self, _relay):
+        return FakeConnection(self)
+
+
+class FakeConnection:
+    def __init__(self, relay):
+        self.relay = relay
+        self.connected = False
+
+    async def open(self):
+        self.relay.sessions += 1
+        self.connected = True
+
+    async def send(self, _sender, recipient, message):
+        self.relay.active += 1
+        self.relay.peak = max(self.relay.peak, self.relay.active)
+        try:
+            await asyncio.sleep(self.relay.delay)
+            codes = self.relay.replies.get(recipient)
+            code = codes.pop(0) if codes else 250
+            if code == 0:
+                self.connected = False
+                raise ConnectionResetError("connection dropped")
+            if code >= 400:
+                raise SMTPReplyError(code, "rejected")
+            self.relay.accepted.append((recipient, message))
+            return "2.0.0 Ok"
+        finally:
+            self.relay.active -= 1
+
+    async def close(self):
+        self.connected = False
+
+
+def _sender(fake, max_connections=4, messages_per_connection=100, max_retries=3):
+    relay = SMTPRelay(
+        host="relay.test",
+        max_connections=max_connections,
+        messages_per_connection=messages_per_connection,
+    )
+    pool = SMTPConnectionPool(relay, connection_factory=fake)
+    return BulkEmailSender(pool, max_retries=max_retries, retry_backoff=0.001)
+
+
+def _messages(count):
+    return [(f"guardian{i}@example.com", b"Subject: hi\r\n\r\nhello") for i in range(count)]
+
+
+async def test_sessions_are_reused_and_capped_per_relay():
+    """Many messages ride on a few sessions, never more than max_connections at once."""
+    fake = FakeRelay(delay=0.001)
+    sender = _sender(fake, max_connections=4, messages_per_connection=50)
+
+    report = await sender.send("noreply@district.org", _messages(400))
+
+    assert report.count(DeliveryStatus.DELIVERED) == 400
+    assert fake.peak <= 4
+    assert fake.sessions == 8  # 400 messages / 50 per session
+    assert len(fake.accepted) == 400
+
+
+async def test_transient_failures_are_retried_and_hard_bounces_suppressed():
+    """4xx is retried with backoff, 5xx bounces once and is suppressed afterwards."""
+    fake = FakeRelay(
+        replies={
+            "guardian0@example.com": [421, 451],
+            "guardian1@example.com": [550],
+            "guardian2@example.com": [0],
+            "guardian3@example.com": [452, 452, 452, 452],
+        }
+    )
+    sender = _sender(fake, max_retries=3)
+
+    report = await sender.send("noreply@district.org", _messages(5))
+    by_email = {r.email: r for r in report.results}
+
+    assert by_email["guardian0@example.com"].status == DeliveryStatus.DELIVERED
+    assert by_email["guardian0@example.com"].attempts == 3
+    assert by_email["guardian1@example.com"].status == DeliveryStatus.BOUNCED
+    assert by_email["guardian2@example.com"].status == DeliveryStatus.DELIVERED
+    assert by_email["guardian3@example.com"].status == DeliveryStatus.DEFERRED
+    assert by_email["guardian3@example.com"].code == 452
+    assert report.summary()["retries"] == 6
+
+    again = await sender.send("noreply@district.org", _messages(2))
+    assert again.results[1].status == DeliveryStatus.SUPPRESSED
+    assert again.count(DeliveryStatus.DELIVERED) == 1
+
+
+async def test_idle_sessions_are_reused_across_sends():
+    """A second bulk send reuses the sessions the first one left open."""
+    fake = FakeRelay()
+    sender = _sender(fake, max_connections=2)
+
+    await sender.send("noreply@district.org", _messages(10))
+    report = await sender.send("noreply@district.org", _messages(10))
+
+    assert fake.sessions == 2
+    assert report.connections_opened == 0 and report.connections_reused >= 1
+    await sender.pool.close()
+
+
+class FailingOpenRelay(FakeRelay):
+    """Relay whose sessions cannot be opened."""
+
+    def __init__(self, error):
+        super().__init__()
+        self.error = error
+
+    def __call__(self, _relay):
+        connection = FakeConnection(self)
+
+        async def open_fails():
+            self.sessions += 1
+            raise self.error
+
+        connection.open = open_fails
+        return connection
+
+
+async def test_connect_failures_defer_instead_of_hanging():
+    """Any error opening a session is retried and then deferred, never left unsettled."""
+    for error in (SMTPReplyError(535, "authentication failed"), RuntimeError("unexpected")):
+        fake = FailingOpenRelay(error)
+        sender = _sender(fake, max_connections=2, max_retries=2)
+
+        report = await asyncio.wait_for(sender.send("noreply@district.org", _messages(3)), 2)
+
+        assert report.count(DeliveryStatus.DEFERRED) == 3
+        assert all(result.attempts == 3 for result in report.results)
+        assert fake.sessions == 9
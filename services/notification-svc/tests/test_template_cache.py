@@ -0,0 +1,118 @@
+"""Tests for the compiled MJML template cache."""
+
+import asyncio
+import json
+import os
+import re
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from jinja2 import Template
+
+from app.schemas import TemplateId
+from app.template_cache import precompile, render_mjml
+from app.template_service import TemplateService
+
+TEMPLATES = Path(__file__).resolve().parent.parent / "templates"
+
+SAMPLE_DATA = {
+    "teacher_name": "Sarah Johnson",
+    "school_name": "Lincoln Elementary School",
+    "invite_url": "https://platform.edu/invite/abc123",
+    "expires_at": datetime(2026, 9, 1, 9, 30),
+    "inviter_name": "Principal Smith",
+    "approver_name": "Dr. Williams",
+    "requester_name": "Ms. Anderson",
+    "student_name": "Emma Davis",
+    "student_id": "RHS-2024-0156",
+    "document_type": "IEP Modification",
+    "document_description": "Updated accommodations for mathematics courses",
+    "approval_url": "https://platform.edu/approve/xyz789",
+    "due_date": datetime(2026, 9, 4, 17, 0),
+    "priority_level": "urgent",
+    "parent_name": "Jennifer Martinez",
+    "decision": "approved",
+    "decision_date": datetime(2026, 8, 1),
+    "enrollment_date": datetime(2026, 9, 1),
+    "contact_person": "Maria Rodriguez",
+    "contact_email": "registrar@oakvalley.edu",
+    "portal_url": "https://portal.oakvalley.edu",
+    "app_name": "EduPlatform",
+    "support_email": "support@platform.edu",
+}
+
+
+def _normalize(html):
+    """Collapse whitespace, which MJML lays out differently around Jinja output."""
+    return re.sub(r"\s*(<|>)\s*", r"\1", re.sub(r"\s+", " ", html)).strip()
+
+
+@pytest.fixture
+def service(tmp_path):
+    """Template service over a writable copy of the shipped templates."""
+    for path in TEMPLATES.iterdir():
+        shutil.copy(path, tmp_path / path.name)
+    service = TemplateService()
+    service.templates_dir = service.templates_path = tmp_path
+    service.reload_interval = 0
+    return service
+
+
+@pytest.mark.parametrize(
+    "template_id", ["teacher_invite", "approval_request", "enrollment_decision"]
+)
+def test_precompiled_html_matches_per_render_mjml(template_id):
+    """Jinja over the precompiled HTML gives the same email as MJML over rendered Jinja."""
+    source = (TEMPLATES / f"{template_id}.mjml").read_text()
+    defaults = json.loads((TEMPLATES / f"{template_id}.json").read_text()).get("defaults", {})
+    data = {**defaults, **SAMPLE_DATA}
+
+    html, _ = precompile(source)
+    assert html is not None
+
+    expected, _ = render_mjml(Template(source).render(**data))
+    assert _normalize(Template(html).render(**data)) == _normalize(expected)
+
+
+def test_compiles_once_and_reloads_on_edit(service):
+    """Renders reuse the compiled template until the file changes."""
+
+    async def scenario():
+        await service.initialize()
+        compilations = service.compilations
+        for _ in range(5):
+            await service.render_template(TemplateId.TEACHER_INVITE, SAMPLE_DATA)
+        assert service.compilations == compilations
+
+        mjml_path = service.templates_dir / "teacher_invite.mjml"
+        source = mjml_path.read_text()
+        mjml_path.write_text(source.replace("{{ teacher_name }}", "{{ teacher_name }}!!"))
+        stat = mjml_path.stat()
+        os.utime(mjml_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        rendered = await service.render_template(TemplateId.TEACHER_INVITE, SAMPLE_DATA)
+        assert "Sarah Johnson!!" in rendered["html"]
+        assert service.compilations == compilations + 1
+        assert service.reloads == 1
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_first_renders_compile_once(service):
+    """Concurrent cold renders share one compilation."""
+
+    async def scenario():
+        await service._load_template_configs()  # pylint: disable=protected-access
+        service._loaded = True  # pylint: disable=protected-access
+        await asyncio.gather(
+            *(
+                service.render_template(TemplateId.APPROVAL_REQUEST, SAMPLE_DATA)
+                for _ in range(20)
+            )
+        )
+        assert service.compilations == 1
+        assert service.cache_stats()["renders"] == 20
+
+    asyncio.run(scenario())
@@ -35,6 +35,7 @@ class Settings(BaseSettings):
     redis_port: int = Field(default=6379, description="Redis port")
     redis_db: int = Field(default=0, description="Redis database")
     redis_password: str = Field(default="", description="Redis password")
+    cache_ttl_seconds: int = Field(default=300, description="Search result cache TTL")
 
     # RBAC settings
     enable_rbac: bool = Field(default=True, description="Enable RBAC filtering")
@@ -53,6 +54,15 @@ class Settings(BaseSettings):
     search_timeout_seconds: int = Field(default=30, description="Search timeout in seconds")
     suggestion_size: int = Field(default=5, description="Number of suggestions to return")
 
+    # Bulk indexing pipeline
+    indexing_queue_size: int = Field(default=10000, description="Indexing queue size")
+    indexing_batch_max_docs: int = Field(default=1000, description="Max docs per bulk")
+    indexing_batch_max_bytes: int = Field(default=5 * 1024 * 1024, description="Max bytes per bulk")
+    indexing_flush_interval_ms: int = Field(default=100, description="Bulk flush interval")
+    indexing_concurrency: int = Field(default=2, description="Bulk requests in flight")
+    indexing_max_retries: int = Field(default=5, description="Retries for rejected documents")
+    indexing_retry_backoff_ms: int = Field(default=200, description="Initial retry backoff")
+
     class Config:
         """Pydantic config."""
 
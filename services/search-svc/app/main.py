@@ -118,6 +118,22 @@ async def health_check(
         ) from e
 
 
+@app.get("/cache/stats", response_model=dict[str, Any])
+async def cache_stats(
+    service: SearchService = Depends(get_search_service),
+) -> dict[str, Any]:
+    """Search cache hit-rate and staleness metrics."""
+    return service.get_cache_stats()
+
+
+@app.get("/indexing/stats", response_model=dict[str, Any])
+async def indexing_stats(
+    service: SearchService = Depends(get_search_service),
+) -> dict[str, Any]:
+    """Bulk indexing pipeline throughput and failure counters."""
+    return service.get_indexing_stats()
+
+
 @app.get("/search", response_model=SearchResponse)
 async def search(
     q: str = Query(..., description="Search query", min_length=1),
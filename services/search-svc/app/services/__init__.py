@@ -3,11 +3,13 @@
 from .opensearch_service import OpenSearchService
 from .pii_masking_service import PIIMaskingService
 from .rbac_service import RBACService
+from .search_cache import SearchCache
 from .search_service import SearchService
 
 __all__ = [
     "OpenSearchService",
     "PIIMaskingService",
     "RBACService",
+    "SearchCache",
     "SearchService",
 ]
@@ -0,0 +1,327 @@
+"""Async bulk indexing pipeline.
+
+Producers submit documents to a bounded in-process queue and await a future
+for the per-document result. A single batcher coalesces queued documents into
+bulk requests bounded by document count and payload bytes, flushing early when
+the flush interval elapses. At most ``concurrency`` bulk requests are in flight;
+when they are all busy the batcher stops draining, the queue fills, and
+``submit`` blocks producers until there is room again.
+
+Items rejected with a retryable status (429/5xx), or every item of a bulk
+request that failed outright, are re-queued with exponential backoff up to
+``max_retries`` times. Successful writes are reported once per bulk request
+and index through ``on_indexed`` so callers can invalidate caches per batch
+instead of per document. A bulk request carrying any document submitted with
+``refresh`` asks OpenSearch to refresh once it is written.
+"""
+
+import asyncio
+import json
+import logging
+import random
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, Self
+
+from app.config import settings
+from app.models import IndexDocument
+from app.services.search_cache import document_tenant
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+
+BulkSender = Callable[..., Awaitable[dict[str, Any]]]  # (body, refresh=...)
+IndexedCallback = Callable[[str, set[str | None]], Awaitable[None]]
+
+
+class BulkItemError(Exception):
+    """A document the bulk API rejected, after any retries."""
+
+    def __init__(self: Self, doc_id: str, status: int, error: Any) -> None:
+        """Initialize with the failing item's id, status and error body."""
+        super().__init__(f"Indexing document {doc_id} failed with status {status}: {error}")
+        self.doc_id = doc_id
+        self.status = status
+        self.error = error
+
+
+@dataclass
+class IndexOperation:
+    """One queued document, pre-serialized as its bulk action and source lines."""
+
+    index: str
+    doc_id: str
+    tenant: str | None
+    payload: str
+    future: asyncio.Future
+    refresh: bool = False
+    attempts: int = 0
+
+    @classmethod
+    def for_document(
+        cls,
+        index: str,
+        document: IndexDocument,
+        future: asyncio.Future,
+        refresh: bool = False,
+    ) -> "IndexOperation":
+        """Serialize a document once, up front."""
+        action = json.dumps({"index": {"_index": index, "_id": document.id}})
+        source = json.dumps(document.model_dump(mode="json"), separators=(",", ":"))
+        return cls(
+            index=index,
+            doc_id=document.id,
+            tenant=document_tenant(document),
+            payload=f"{action}\n{source}\n",
+            future=future,
+            refresh=refresh,
+        )
+
+    @property
+    def size_bytes(self: Self) -> int:
+        """Approximate bytes this operation adds to a bulk body."""
+        return len(self.payload)
+
+
+@dataclass
+class PipelineStats:
+    """Counters for indexing throughput and failures."""
+
+    submitted: int = 0
+    indexed: int = 0
+    failed: int = 0
+    retried: int = 0
+    bulk_requests: int = 0
+    bulk_bytes: int = 0
+    flush_reasons: dict[str, int] = field(default_factory=dict)
+
+
+class IndexingPipeline:
+    """Coalesces document writes into bounded, concurrent bulk requests."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self: Self,
+        send_bulk: BulkSender,
+        on_indexed: IndexedCallback | None = None,
+        *,
+        queue_size: int | None = None,
+        max_docs: int | None = None,
+        max_bytes: int | None = None,
+        flush_interval_ms: int | None = None,
+        concurrency: int | None = None,
+        max_retries: int | None = None,
+        retry_backoff_ms: int | None = None,
+    ) -> None:
+        """Initialize the pipeline; defaults come from settings."""
+        self.send_bulk = send_bulk
+        self.on_indexed = on_indexed
+        self.queue_size = queue_size or settings.indexing_queue_size
+        self.max_docs = max_docs or settings.indexing_batch_max_docs
+        self.max_bytes = max_bytes or settings.indexing_batch_max_bytes
+        self.flush_interval = (flush_interval_ms or settings.indexing_flush_interval_ms) / 1000
+        self.concurrency = concurrency or settings.indexing_concurrency
+        self.max_retries = (
+            max_retries if max_retries is not None else settings.indexing_max_retries
+        )
+        self.retry_backoff = (retry_backoff_ms or settings.indexing_retry_backoff_ms) / 1000
+        self.stats = PipelineStats()
+
+        self._queue: asyncio.Queue[IndexOperation] | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._idle: asyncio.Event | None = None
+        self._outstanding = 0
+        self._batcher: asyncio.Task[None] | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @property
+    def running(self: Self) -> bool:
+        """Whether the batcher is running."""
+        return self._batcher is not None
+
+    @property
+    def queued(self: Self) -> int:
+        """Documents waiting to be batched."""
+        return self._queue.qsize() if self._queue else 0
+
+    async def start(self: Self) -> None:
+        """Start the batcher."""
+        if self._batcher is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._batcher = asyncio.create_task(self._run())
+        logger.info(
+            "Indexing pipeline started: max_docs=%d max_bytes=%d concurrency=%d",
+            self.max_docs,
+            self.max_bytes,
+            self.concurrency,
+        )
+
+    async def stop(self: Self) -> None:
+        """Wait for every submitted document to finish, then stop the batcher."""
+        if self._batcher is None:
+            return
+        await self.flush()
+        self._batcher.cancel()
+        await asyncio.gather(self._batcher, return_exceptions=True)
+        self._batcher = None
+        logger.info("Indexing pipeline stopped: %s", self.stats)
+
+    async def flush(self: Self) -> None:
+        """Wait until every submitted document has succeeded or failed for good."""
+        if self._idle is not None:
+            await self._idle.wait()
+
+    async def submit(
+        self: Self, index: str, document: IndexDocument, refresh: bool = False
+    ) -> asyncio.Future:
+        """Queue a document, blocking while the queue is full; returns its result future."""
+        if self._queue is None:
+            raise RuntimeError("Indexing pipeline is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        operation = IndexOperation.for_document(index, document, future, refresh)
+        self._outstanding += 1
+        self._idle.clear()
+        try:
+            await self._queue.put(operation)
+        except asyncio.CancelledError:
+            # Never queued; don't leave flush() waiting for it
+            self._done()
+            raise
+        self.stats.submitted += 1
+        return future
+
+    async def index(
+        self: Self, index: str, document: IndexDocument, refresh: bool = False
+    ) -> dict[str, Any]:
+        """Index one document and wait for its bulk item result."""
+        return await (await self.submit(index, document, refresh))
+
+    async def index_many(
+        self: Self, index: str, documents: list[IndexDocument], refresh: bool = False
+    ) -> list[dict[str, Any] | BaseException]:
+        """Index documents, returning each item result or its exception."""
+        futures = [await self.submit(index, document, refresh) for document in documents]
+        return await asyncio.gather(*futures, return_exceptions=True)
+
+    async def _run(self: Self) -> None:
+        """Coalesce queued operations into bulk requests."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            size = batch[0].size_bytes
+            deadline = loop.time() + self.flush_interval
+            reason = "interval"
+
+            while True:
+                if len(batch) >= self.max_docs:
+                    reason = "docs"
+                    break
+                if size >= self.max_bytes:
+                    reason = "bytes"
+                    break
+                try:
+                    operation = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        operation = await asyncio.wait_for(self._queue.get(), timeout)
+                    except TimeoutError:
+                        break
+                batch.append(operation)
+                size += operation.size_bytes
+
+            self.stats.flush_reasons[reason] = self.stats.flush_reasons.get(reason, 0) + 1
+
+            # Backpressure: stop draining the queue while every slot is busy
+            await self._slots.acquire()
+            self._spawn(self._send(batch, size))
+
+    async def _send(self: Self, batch: list[IndexOperation], size: int) -> None:
+        """Send one bulk request and settle or retry each item."""
+        try:
+            self.stats.bulk_requests += 1
+            self.stats.bulk_bytes += size
+            try:
+                response = await self.send_bulk(
+                    "".join(op.payload for op in batch),
+                    refresh=any(op.refresh for op in batch),
+                )
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.warning("Bulk request of %d documents failed: %s", len(batch), str(e))
+                for operation in batch:
+                    self._retry_or_fail(operation, 503, str(e))
+                return
+
+            items = response.get("items", [])
+            indexed: dict[str, set[str | None]] = {}
+            for position, operation in enumerate(batch):
+                if position >= len(items):
+                    self._retry_or_fail(operation, 503, "missing from bulk response")
+                    continue
+                result = items[position].get("index", items[position])
+                status = result.get("status", 500)
+                if "error" not in result and status < 300:
+                    self._settle(operation, result)
+                    indexed.setdefault(operation.index, set()).add(operation.tenant)
+                elif status in RETRYABLE_STATUSES:
+                    self._retry_or_fail(operation, status, result.get("error"))
+                else:
+                    self._fail(operation, status, result.get("error"))
+
+            if self.on_indexed:
+                for index, tenants in indexed.items():
+                    try:
+                        await self.on_indexed(index, tenants)
+                    except Exception as e:  # pylint: disable=broad-exception-caught
+                        logger.warning("Indexed callback failed for %s: %s", index, str(e))
+        finally:
+            self._slots.release()
+
+    def _retry_or_fail(self: Self, operation: IndexOperation, status: int, error: Any) -> None:
+        """Re-queue a failed operation with backoff, or fail it once retries are spent."""
+        if operation.attempts >= self.max_retries:
+            self._fail(operation, status, error)
+            return
+        operation.attempts += 1
+        self.stats.retried += 1
+        delay = self.retry_backoff * (2 ** (operation.attempts - 1))
+        self._spawn(self._requeue(operation, delay * random.uniform(0.5, 1.5)))  # nosec B311
+
+    async def _requeue(self: Self, operation: IndexOperation, delay: float) -> None:
+        """Put an operation back on the queue after its backoff delay."""
+        await asyncio.sleep(delay)
+        await self._queue.put(operation)
+
+    def _settle(self: Self, operation: IndexOperation, result: dict[str, Any]) -> None:
+        """Resolve a successful operation."""
+        self.stats.indexed += 1
+        if not operation.future.done():
+            operation.future.set_result(result)
+        self._done()
+
+    def _fail(self: Self, operation: IndexOperation, status: int, error: Any) -> None:
+        """Resolve an operation with its final error."""
+        self.stats.failed += 1
+        logger.warning("Indexing document %s failed: %s %s", operation.doc_id, status, error)
+        if not operation.future.done():
+            operation.future.set_exception(BulkItemError(operation.doc_id, status, error))
+        self._done()
+
+    def _done(self: Self) -> None:
+        """Account for a finished operation."""
+        self._outstanding -= 1
+        if self._outstanding == 0:
+            self._idle.set()
+
+    def _spawn(self: Self, coro: Awaitable[None]) -> None:
+        """Run a background task and keep a reference until it finishes."""
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
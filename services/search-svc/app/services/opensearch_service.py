@@ -1,5 +1,7 @@
 """OpenSearch service for index management and search operations."""
 
+import asyncio
+import json
 import logging
 from typing import Any
 
@@ -123,7 +125,9 @@ class OpenSearchService:
             if request.refresh:
                 params["refresh"] = "true"
 
-            response = self.client.index(
+            # The client is synchronous; keep the round trip off the event loop
+            response = await asyncio.to_thread(
+                self.client.index,
                 index=request.index,
                 id=request.document.id,
                 body=doc_dict,
@@ -139,23 +143,20 @@ class OpenSearchService:
             )
             raise
 
+    async def bulk(self, body: str, refresh: bool = False) -> dict[str, Any]:
+        """Send a pre-serialized NDJSON bulk body without blocking the event loop."""
+        params = {"refresh": "true"} if refresh else {}
+        return await asyncio.to_thread(self.client.bulk, body=body, params=params)
+
     async def bulk_index_documents(self, request: BulkIndexRequest) -> dict[str, Any]:
         """Bulk index multiple documents."""
         try:
-            actions = []
+            lines = []
             for doc in request.documents:
-                action = {
-                    "_index": request.index,
-                    "_id": doc.id,
-                    "_source": doc.model_dump(),
-                }
-                actions.append(action)
-
-            params = {}
-            if request.refresh:
-                params["refresh"] = "true"
+                lines.append(json.dumps({"index": {"_index": request.index, "_id": doc.id}}))
+                lines.append(json.dumps(doc.model_dump(mode="json")))
 
-            response = self.client.bulk(body=actions, params=params)
+            response = await self.bulk("\n".join(lines) + "\n", refresh=request.refresh)
 
             # Check for errors
             errors = []
@@ -169,7 +170,7 @@ class OpenSearchService:
                 logger.warning("Bulk index errors: %s", errors)
 
             return {
-                "indexed": len(request.documents),
+                "indexed": len(request.documents) - len(errors),
                 "errors": errors,
                 "took": response.get("took", 0),
             }
@@ -3,36 +3,195 @@
 import hashlib
 import logging
 import re
+from functools import lru_cache
 from typing import Any
 
 from app.config import settings
-from app.models import UserContext, UserRole
+from app.models import SearchHit, SearchResponse, UserContext, UserRole
 
 logger = logging.getLogger(__name__)
 
+# Common PII patterns, in priority order: where matches overlap, the leftmost
+# wins and ties go to the earlier pattern
+PII_PATTERNS = {
+    "email": r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\." r"[A-Z|a-z]{2,}\b",
+    "phone": r"\b(?:\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?" r"([0-9]{3})[-.\s]?([0-9]{4})\b",
+    "ssn": r"\b(?!000|666|9\d{2})\d{3}[-.]?" r"(?!00)\d{2}[-.]?(?!0000)\d{4}\b",
+    "credit_card": (
+        r"\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|"
+        r"3[47][0-9]{13}|3[0-9]{13}|"
+        r"6(?:011|5[0-9]{2})[0-9]{12})\b"
+    ),
+    "student_id": r"(?i:\b(?:student|learner|id)[-\s:]?([A-Z0-9]{6,12})\b)",
+}
+
+# Simple name pattern - this could be more sophisticated
+NAME_PATTERN = r"\b[A-Z][a-z]+ [A-Z][a-z]+\b"  # First Last name pattern
+
+SENSITIVE_FIELDS = frozenset(
+    {
+        "name",
+        "full_name",
+        "first_name",
+        "last_name",
+        "email",
+        "phone",
+        "address",
+        "ssn",
+        "student_id",
+        "parent_name",
+        "guardian_name",
+        "emergency_contact",
+    }
+)
+
+NON_DIGITS = re.compile(r"[^\d]")
+
+# Tags OpenSearch wraps around matched terms in highlight fragments
+HIGHLIGHT_TAGS = re.compile(r"</?em>")
+
+# Learner fields replaced wholesale by a masked name rather than pattern-masked
+LEARNER_NAME_FIELDS = ("title", "masked_name")
+
+
+def generate_masked_name(original_name: str, salt: str) -> str:
+    """Generate a consistent masked name based on hash."""
+    if not original_name:
+        return original_name
+
+    # Create a hash of the name for consistency
+    name_hash = hashlib.md5((original_name + salt).encode()).hexdigest()[:8]  # nosec B324
+
+    # Generate a masked name based on length
+    if len(original_name.split()) > 1:
+        return f"Learner {name_hash}"
+    return f"User{name_hash}"
+
+
+def mask_match(
+    match_text: str, pattern_name: str, mask_char: str, partial_mask_threshold: int
+) -> str:
+    """Mask a matched PII pattern."""
+    if pattern_name == "email":
+        # Mask email: show first char and domain
+        if "@" in match_text:
+            username, domain = match_text.split("@", 1)
+            masked_username = username[0] + mask_char * (len(username) - 1)
+            return f"{masked_username}@{domain}"
+
+    elif pattern_name == "phone":
+        # Mask phone: show area code, mask middle digits
+        digits = NON_DIGITS.sub("", match_text)
+        if len(digits) >= 10:
+            return f"({digits[:3]}) {mask_char * 3}-{digits[-4:]}"
+
+    elif pattern_name == "ssn":
+        # Mask SSN: show last 4 digits
+        digits = NON_DIGITS.sub("", match_text)
+        if len(digits) == 9:
+            return f"{mask_char * 3}-{mask_char * 2}-{digits[-4:]}"
+
+    elif pattern_name == "credit_card":
+        # Mask credit card: show last 4 digits
+        digits = NON_DIGITS.sub("", match_text)
+        return mask_char * (len(digits) - 4) + digits[-4:]
+
+    # Default masking: partial mask
+    if len(match_text) <= partial_mask_threshold:
+        return mask_char * len(match_text)
+    # Show first and last character, mask middle
+    return match_text[0] + mask_char * (len(match_text) - 2) + match_text[-1]
+
+
+class CompiledMasker:
+    """
+    All enabled PII patterns compiled into one alternation with named groups.
+
+    Each string is scanned once; the matching group name selects how the match
+    is masked. Masked strings are memoized, since the same snippets, names and
+    metadata values repeat across the hits of a results page.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        pattern_names: frozenset[str],
+        mask_names: bool,
+        mask_char: str,
+        partial_mask_threshold: int,
+        salt: str,
+        cache_size: int = 8192,
+    ) -> None:
+        """Compile the combined pattern for one masking configuration."""
+        alternatives = [
+            f"(?P<{name}>{source})"
+            for name, source in PII_PATTERNS.items()
+            if name in pattern_names
+        ]
+        if mask_names:
+            alternatives.append(f"(?P<name>{NAME_PATTERN})")
+
+        self.pattern = re.compile("|".join(alternatives)) if alternatives else None
+        self.mask_char = mask_char
+        self.partial_mask_threshold = partial_mask_threshold
+        self.salt = salt
+        self.mask_text = lru_cache(maxsize=cache_size)(self._mask_text)
+
+    def _mask_text(self, content: str) -> str:
+        """Mask every PII match in a single pass."""
+        if self.pattern is None:
+            return content
+        return self.pattern.sub(self._replace, content)
+
+    def _replace(self, match: re.Match[str]) -> str:
+        """Mask one match according to the pattern that produced it."""
+        if match.lastgroup == "name":
+            return generate_masked_name(match.group(), self.salt)
+        return mask_match(
+            match.group(), match.lastgroup, self.mask_char, self.partial_mask_threshold
+        )
+
+    def mask_value(self, value: Any) -> Any:
+        """Mask a string value; other values pass through."""
+        if not value or not isinstance(value, str):
+            return value
+        return self.mask_text(value)
+
+    def mask_fragment(self, fragment: str) -> str:
+        """Mask a highlight fragment.
+
+        Highlight tags can split a match (``<em>Jane</em> Doe``), so the
+        fragment is masked without them; if anything was masked the tags are
+        dropped, otherwise the fragment is returned as it was.
+        """
+        plain = HIGHLIGHT_TAGS.sub("", fragment)
+        masked = self.mask_value(plain)
+        return fragment if masked == plain else masked
+
+    def mask_metadata(self, metadata: dict[str, Any]) -> dict[str, Any]:
+        """Mask PII in sensitive metadata fields, recursing into nested dicts."""
+        masked_metadata = {}
+
+        for key, value in metadata.items():
+            sensitive = key.lower() in SENSITIVE_FIELDS
+            if isinstance(value, str):
+                masked_metadata[key] = self.mask_value(value) if sensitive else value
+            elif isinstance(value, dict):
+                masked_metadata[key] = self.mask_metadata(value)
+            elif isinstance(value, list) and sensitive:
+                masked_metadata[key] = [self.mask_value(item) for item in value]
+            else:
+                masked_metadata[key] = value
+
+        return masked_metadata
+
 
 class PIIMaskingService:
     """Service for masking Personally Identifiable Information."""
 
     def __init__(self) -> None:
         """Initialize PII masking service."""
-        # Common PII patterns
-        self.patterns = {
-            "email": re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\." r"[A-Z|a-z]{2,}\b"),
-            "phone": re.compile(
-                r"\b(?:\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?" r"([0-9]{3})[-.\s]?([0-9]{4})\b"
-            ),
-            "ssn": re.compile(r"\b(?!000|666|9\d{2})\d{3}[-.]?" r"(?!00)\d{2}[-.]?(?!0000)\d{4}\b"),
-            "credit_card": re.compile(
-                r"\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|"
-                r"3[47][0-9]{13}|3[0-9]{13}|"
-                r"6(?:011|5[0-9]{2})[0-9]{12})\b"
-            ),
-            "student_id": re.compile(
-                r"\b(?:student|learner|id)[-\s:]?([A-Z0-9]{6,12})\b",
-                re.IGNORECASE,
-            ),
-        }
+        self.patterns = {name: re.compile(source) for name, source in PII_PATTERNS.items()}
+        self._maskers: dict[tuple[Any, ...], CompiledMasker] = {}
 
         # Masking characters
         self.mask_char = settings.pii_masking.mask_character
@@ -63,8 +222,23 @@ class PIIMaskingService:
             # Generic masking for unknown types
             masked_doc = await self._mask_generic_document(masked_doc, user_context)
 
+        if masked_doc.get("highlighted"):
+            masked_doc["highlighted"] = await self._mask_highlights(masked_doc, user_context)
+
         return masked_doc
 
+    async def mask_response(
+        self, response: SearchResponse, user_context: UserContext
+    ) -> SearchResponse:
+        """Mask PII in every hit of a search response."""
+        if not settings.pii_masking.enabled:
+            return response
+
+        hits = await self.mask_search_results(
+            [hit.model_dump() for hit in response.hits], user_context
+        )
+        return response.model_copy(update={"hits": [SearchHit(**hit) for hit in hits]})
+
     async def mask_search_results(
         self, results: list[dict[str, Any]], user_context: UserContext
     ) -> list[dict[str, Any]]:
@@ -131,139 +305,65 @@ class PIIMaskingService:
 
         return document
 
-    async def _mask_text_content(self, content: str, user_context: UserContext) -> str:
-        """Mask PII patterns in text content."""
-        if not content or not isinstance(content, str):
-            return content
-
-        masked_content = content
-
-        # Apply pattern-based masking
-        for pattern_name, pattern in self.patterns.items():
-            if pattern_name in settings.pii_masking.patterns_to_mask:
-                masked_content = pattern.sub(
-                    lambda m, pn=pattern_name: self._mask_match(m.group(), pn),
-                    masked_content,
-                )
-
-        # Mask names if enabled
-        if settings.pii_masking.mask_names:
-            masked_content = await self._mask_names_in_text(masked_content, user_context)
-
-        return masked_content
-
-    async def _mask_metadata(
-        self, metadata: dict[str, Any], user_context: UserContext
-    ) -> dict[str, Any]:
-        """Mask PII in metadata fields."""
-        masked_metadata = {}
-
-        for key, value in metadata.items():
-            if isinstance(value, str):
-                # Check if this field should be masked
-                if self._should_mask_field(key):
-                    masked_metadata[key] = await self._mask_text_content(value, user_context)
-                else:
-                    masked_metadata[key] = value
-            elif isinstance(value, dict):
-                masked_metadata[key] = await self._mask_metadata(value, user_context)
-            elif isinstance(value, list):
-                masked_list = []
-                for item in value:
-                    if isinstance(item, str) and self._should_mask_field(key):
-                        masked_list.append(await self._mask_text_content(item, user_context))
-                    else:
-                        masked_list.append(item)
-                masked_metadata[key] = masked_list
+    async def _mask_highlights(
+        self,
+        document: dict[str, Any],
+        user_context: UserContext,  # pylint: disable=unused-argument
+    ) -> dict[str, list[str]]:
+        """Mask highlight fragments the same way as the fields they come from."""
+        masker = self._masker()
+        highlighted = {}
+
+        for field, fragments in document["highlighted"].items():
+            if document.get("type") == "learner" and field in LEARNER_NAME_FIELDS:
+                # The field itself was replaced, so none of its text may show
+                highlighted[field] = [document[field]] if field in document else []
             else:
-                masked_metadata[key] = value
-
-        return masked_metadata
+                highlighted[field] = [masker.mask_fragment(fragment) for fragment in fragments]
+
+        return highlighted
+
+    def _masker(self) -> CompiledMasker:
+        """Compiled masker for the current masking configuration, built once."""
+        key = (
+            frozenset(settings.pii_masking.patterns_to_mask),
+            bool(settings.pii_masking.mask_names),
+            self.mask_char,
+            self.partial_mask_threshold,
+            settings.pii_masking.salt,
+        )
+        masker = self._maskers.get(key)
+        if masker is None:
+            masker = self._maskers[key] = CompiledMasker(*key)
+        return masker
 
-    async def _mask_names_in_text(
+    async def _mask_text_content(
         self,
         content: str,
         user_context: UserContext,  # pylint: disable=unused-argument
     ) -> str:
-        """Mask names in text content."""
-        # Simple name pattern - this could be more sophisticated
-        name_pattern = re.compile(
-            r"\b[A-Z][a-z]+ [A-Z][a-z]+\b"  # First Last name pattern
-        )
+        """Mask PII patterns and names in text content in a single pass."""
+        return self._masker().mask_value(content)
 
-        def mask_name(match: re.Match[str]) -> str:
-            name = match.group()
-            return self._generate_masked_name(name)
-
-        return name_pattern.sub(mask_name, content)
+    async def _mask_metadata(
+        self,
+        metadata: dict[str, Any],
+        user_context: UserContext,  # pylint: disable=unused-argument
+    ) -> dict[str, Any]:
+        """Mask PII in metadata fields."""
+        return self._masker().mask_metadata(metadata)
 
     def _generate_masked_name(self, original_name: str) -> str:
         """Generate a consistent masked name based on hash."""
-        if not original_name:
-            return original_name
-
-        # Create a hash of the name for consistency
-        name_hash = hashlib.md5((original_name + settings.pii_masking.salt).encode()).hexdigest()[
-            :8
-        ]
-
-        # Generate a masked name based on length
-        if len(original_name.split()) > 1:
-            return f"Learner {name_hash}"
-        else:
-            return f"User{name_hash}"
+        return generate_masked_name(original_name, settings.pii_masking.salt)
 
     def _mask_match(self, match_text: str, pattern_name: str) -> str:
         """Mask a matched PII pattern."""
-        if pattern_name == "email":
-            # Mask email: show first char and domain
-            if "@" in match_text:
-                username, domain = match_text.split("@", 1)
-                masked_username = username[0] + self.mask_char * (len(username) - 1)
-                return f"{masked_username}@{domain}"
-
-        elif pattern_name == "phone":
-            # Mask phone: show area code, mask middle digits
-            digits = re.sub(r"[^\d]", "", match_text)
-            if len(digits) >= 10:
-                return f"({digits[:3]}) {self.mask_char * 3}-{digits[-4:]}"
-
-        elif pattern_name == "ssn":
-            # Mask SSN: show last 4 digits
-            digits = re.sub(r"[^\d]", "", match_text)
-            if len(digits) == 9:
-                return f"{self.mask_char * 3}-{self.mask_char * 2}-{digits[-4:]}"
-
-        elif pattern_name == "credit_card":
-            # Mask credit card: show last 4 digits
-            digits = re.sub(r"[^\d]", "", match_text)
-            return self.mask_char * (len(digits) - 4) + digits[-4:]
-
-        # Default masking: partial mask
-        if len(match_text) <= self.partial_mask_threshold:
-            return self.mask_char * len(match_text)
-        else:
-            # Show first and last character, mask middle
-            return match_text[0] + self.mask_char * (len(match_text) - 2) + match_text[-1]
+        return mask_match(match_text, pattern_name, self.mask_char, self.partial_mask_threshold)
 
     def _should_mask_field(self, field_name: str) -> bool:
         """Check if a field should be masked based on its name."""
-        sensitive_fields = {
-            "name",
-            "full_name",
-            "first_name",
-            "last_name",
-            "email",
-            "phone",
-            "address",
-            "ssn",
-            "student_id",
-            "parent_name",
-            "guardian_name",
-            "emergency_contact",
-        }
-
-        return field_name.lower() in sensitive_fields
+        return field_name.lower() in SENSITIVE_FIELDS
 
     def _can_see_unmasked_data(self, user_context: UserContext, document: dict[str, Any]) -> bool:
         """Check if user can see unmasked data."""
@@ -1,6 +1,8 @@
 """RBAC service for access control and filtering."""
 
 import logging
+from collections import OrderedDict
+from collections.abc import Callable
 from typing import Any, TYPE_CHECKING
 
 from app.config import settings
@@ -11,6 +13,98 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+DocumentPredicate = Callable[[dict[str, Any]], bool]
+
+# Compiled predicates kept per distinct user context
+PREDICATE_CACHE_SIZE = 1024
+
+
+def _match_all(_document: dict[str, Any]) -> bool:
+    return True
+
+
+def _match_none(_document: dict[str, Any]) -> bool:
+    return False
+
+
+def _term_predicate(field: str, value: Any) -> DocumentPredicate:
+    """Field equals value; array fields match if any element does."""
+
+    def predicate(document: dict[str, Any]) -> bool:
+        doc_value = document.get(field)
+        if isinstance(doc_value, list):
+            return value in doc_value
+        return doc_value == value
+
+    return predicate
+
+
+def _terms_predicate(field: str, values: list[Any]) -> DocumentPredicate:
+    """Field is one of values; array fields match if any element is."""
+    allowed = frozenset(values)
+
+    def predicate(document: dict[str, Any]) -> bool:
+        doc_value = document.get(field)
+        if isinstance(doc_value, list):
+            return not allowed.isdisjoint(doc_value)
+        try:
+            return doc_value in allowed
+        except TypeError:
+            return False
+
+    return predicate
+
+
+def _as_clauses(clauses: Any) -> list[dict[str, Any]]:
+    return clauses if isinstance(clauses, list) else [clauses]
+
+
+def compile_filter(filter_dict: dict[str, Any]) -> DocumentPredicate:
+    """
+    Compile an OpenSearch-style filter into a document predicate.
+
+    Supports the clauses RBAC filters are built from: match_all, bool
+    (must/must_not/should with minimum_should_match), term and terms. terms
+    values become frozensets so each check is a set lookup.
+    """
+    if "match_all" in filter_dict:
+        return _match_all
+
+    checks: list[DocumentPredicate] = []
+
+    if "bool" in filter_dict:
+        bool_query = filter_dict["bool"]
+
+        if "must_not" in bool_query:
+            excluded = [compile_filter(c) for c in _as_clauses(bool_query["must_not"])]
+            if any(predicate is _match_all for predicate in excluded):
+                return _match_none
+            checks.append(lambda d, ex=tuple(excluded): not any(p(d) for p in ex))
+
+        if "must" in bool_query:
+            checks.extend(compile_filter(c) for c in _as_clauses(bool_query["must"]))
+
+        if "should" in bool_query:
+            options = tuple(compile_filter(c) for c in bool_query["should"])
+            minimum = bool_query.get("minimum_should_match", 1)
+            if minimum <= 1:
+                checks.append(lambda d: any(p(d) for p in options))
+            else:
+                checks.append(lambda d: sum(1 for p in options if p(d)) >= minimum)
+
+    for field, value in filter_dict.get("term", {}).items():
+        checks.append(_term_predicate(field, value))
+
+    for field, values in filter_dict.get("terms", {}).items():
+        checks.append(_terms_predicate(field, values))
+
+    if not checks:
+        return _match_all
+    if len(checks) == 1:
+        return checks[0]
+    all_checks = tuple(checks)
+    return lambda d: all(p(d) for p in all_checks)
+
 
 class RBACService:
     """Service for Role-Based Access Control filtering."""
@@ -24,11 +118,18 @@ class RBACService:
             UserRole.GUARDIAN: 2,
             UserRole.LEARNER: 1,
         }
+        self._predicates: OrderedDict[tuple[Any, ...], DocumentPredicate] = OrderedDict()
 
     async def build_rbac_filter(
         self, user_context: UserContext, document_type: str | None = None
     ) -> dict[str, Any]:
         """Build OpenSearch filter based on user context and role."""
+        return self._rbac_filter(user_context, document_type)
+
+    def _rbac_filter(
+        self, user_context: UserContext, document_type: str | None = None
+    ) -> dict[str, Any]:
+        """Build the RBAC filter dict for a user context."""
         filters = []
 
         # System admin has access to everything
@@ -144,87 +245,48 @@ class RBACService:
 
         return {"bool": {"should": should_clauses, "minimum_should_match": 1}}
 
+    def get_document_predicate(
+        self, user_context: UserContext, document_type: str | None = None
+    ) -> DocumentPredicate:
+        """Compiled RBAC predicate for a user, built once per distinct context."""
+        key = (
+            user_context.role,
+            user_context.user_id,
+            user_context.district_id,
+            user_context.school_id,
+            tuple(sorted(user_context.class_ids)),
+            tuple(sorted(user_context.learner_ids)),
+            document_type,
+        )
+        predicate = self._predicates.get(key)
+        if predicate is not None:
+            self._predicates.move_to_end(key)
+            return predicate
+
+        predicate = compile_filter(self._rbac_filter(user_context, document_type))
+        self._predicates[key] = predicate
+        if len(self._predicates) > PREDICATE_CACHE_SIZE:
+            self._predicates.popitem(last=False)
+        return predicate
+
     async def can_access_document(
         self, user_context: UserContext, document: dict[str, Any]
     ) -> bool:
         """Check if user can access a specific document."""
-        # Build filter and check if document would match
-        rbac_filter = await self.build_rbac_filter(user_context)
-
-        # Simple implementation - in production this would be more
-        # sophisticated
-        return self._document_matches_filter(document, rbac_filter)
+        return self.get_document_predicate(user_context)(document)
 
     def _document_matches_filter(
         self, document: dict[str, Any], filter_dict: dict[str, Any]
     ) -> bool:
-        """Check if a document matches the RBAC filter."""
-        # Simplified filter matching - in production this would be more
-        # complete
-
-        if "match_all" in filter_dict:
-            return True
-
-        if "bool" in filter_dict:
-            bool_query = filter_dict["bool"]
-
-            # Handle must_not
-            if "must_not" in bool_query:
-                must_not_clause = bool_query["must_not"]
-                if self._document_matches_filter(document, must_not_clause):
-                    return False
-
-            # Handle must
-            if "must" in bool_query:
-                must_clauses = bool_query["must"]
-                if isinstance(must_clauses, list):
-                    for clause in must_clauses:
-                        matches_clause = self._document_matches_filter(document, clause)
-                        if not matches_clause:
-                            return False
-                else:
-                    matches_clause = self._document_matches_filter(document, must_clauses)
-                    if not matches_clause:
-                        return False
-
-            # Handle should
-            if "should" in bool_query:
-                should_clauses = bool_query["should"]
-                min_should_match = bool_query.get("minimum_should_match", 1)
-                matches = 0
-
-                for clause in should_clauses:
-                    if self._document_matches_filter(document, clause):
-                        matches += 1
-
-                return matches >= min_should_match
-
-        # Handle term queries
-        if "term" in filter_dict:
-            for field, value in filter_dict["term"].items():
-                if document.get(field) != value:
-                    return False
-
-        # Handle terms queries
-        if "terms" in filter_dict:
-            for field, values in filter_dict["terms"].items():
-                doc_value = document.get(field)
-                if doc_value not in values:
-                    return False
-
-        return True
+        """Check if a document matches an RBAC filter."""
+        return compile_filter(filter_dict)(document)
 
     async def filter_search_results(
         self, user_context: UserContext, results: list[dict[str, Any]]
     ) -> list[dict[str, Any]]:
         """Additional filtering of search results if needed."""
-        filtered_results = []
-
-        for result in results:
-            if await self.can_access_document(user_context, result):
-                filtered_results.append(result)
-
-        return filtered_results
+        predicate = self.get_document_predicate(user_context)
+        return [result for result in results if predicate(result)]
 
     async def get_user_accessible_indices(self, user_context: UserContext) -> list[str]:
         """Get list of indices the user can access."""
@@ -0,0 +1,193 @@
+"""Generation-versioned search result cache.
+
+Cache keys are a SHA-256 of the canonical JSON of the request, the parts of the
+user context that affect RBAC filtering and PII masking, and the current
+generation of every (index, tenant) scope the search reads. Keys are therefore
+identical across processes and restarts, so replicas share entries.
+
+Indexing a document increments the generation counters for its index and
+tenant. Searches over that scope compute new keys from then on, and the old
+entries are never read again and age out by TTL. Invalidation is a couple of
+INCRs, with no key scans.
+
+Tenants are districts. A user with a district only sees documents from that
+district, or documents with no district, so their searches depend on those two
+scopes. System admins and users without a district depend on the index-wide
+scope, which every write to the index bumps.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Self
+
+from app.config import settings
+from app.models import (
+    IndexDocument,
+    SearchRequest,
+    SearchResponse,
+    SearchScope,
+    UserContext,
+    UserRole,
+)
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "search:v2"
+GENERATION_KEY_PREFIX = "search:gen"
+
+GLOBAL_TENANT = "_global"
+ALL_TENANTS = "_all"
+ALL_INDICES = "*"
+
+
+def document_tenant(document: IndexDocument) -> str | None:
+    """District a document belongs to, if any."""
+    district_id = getattr(document, "district_id", None)
+    if district_id is None:
+        district_id = document.metadata.get("district_id")
+    return district_id
+
+
+def scope_indices(scope: SearchScope) -> list[str]:
+    """Indices read by a search scope (ADMIN_ALL reads every index)."""
+    if scope == SearchScope.LESSONS:
+        return [settings.lessons_index]
+    if scope == SearchScope.COURSEWORK:
+        return [settings.coursework_index]
+    if scope == SearchScope.LEARNERS:
+        return [settings.learners_index]
+    if scope == SearchScope.ALL:
+        return [settings.lessons_index, settings.coursework_index, settings.learners_index]
+    return [ALL_INDICES]
+
+
+def generation_key(index: str, tenant: str) -> str:
+    """Redis key of the generation counter for an (index, tenant) scope."""
+    return f"{GENERATION_KEY_PREFIX}:{index}:{tenant}"
+
+
+class SearchCache:
+    """Redis-backed search result cache namespaced by generation counters."""
+
+    def __init__(self: Self, redis_client: Any, ttl_seconds: int | None = None) -> None:
+        """Initialize the cache over an async Redis client."""
+        self.redis_client = redis_client
+        self.ttl_seconds = ttl_seconds or settings.cache_ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.invalidations = 0
+        self._hit_age_total = 0.0
+        self._hit_age_max = 0.0
+
+    def dependencies(self: Self, scope: SearchScope, user_context: UserContext) -> list[str]:
+        """Generation keys a search by this user over this scope depends on."""
+        indices = scope_indices(scope)
+        if indices == [ALL_INDICES]:
+            return [generation_key(ALL_INDICES, ALL_TENANTS)]
+        if user_context.district_id and user_context.role != UserRole.SYSTEM_ADMIN:
+            return [
+                generation_key(index, tenant)
+                for index in indices
+                for tenant in (user_context.district_id, GLOBAL_TENANT)
+            ]
+        return [generation_key(index, ALL_TENANTS) for index in indices]
+
+    @staticmethod
+    def build_key(
+        request: SearchRequest, user_context: UserContext, generations: dict[str, int]
+    ) -> str:
+        """Stable content-hash key for a search at the given generations."""
+        key_data = {
+            "request": {
+                "q": request.q,
+                "scope": request.scope.value,
+                "size": request.size,
+                "from": request.from_,
+                "filters": request.filters,
+            },
+            "user": {
+                "user_id": user_context.user_id,
+                "role": user_context.role.value,
+                "district_id": user_context.district_id,
+                "school_id": user_context.school_id,
+                "class_ids": sorted(user_context.class_ids),
+                "learner_ids": sorted(user_context.learner_ids),
+            },
+            "generations": generations,
+        }
+        canonical = json.dumps(key_data, sort_keys=True, separators=(",", ":"), default=str)
+        return f"{CACHE_KEY_PREFIX}:{hashlib.sha256(canonical.encode()).hexdigest()}"
+
+    async def key_for(self: Self, request: SearchRequest, user_context: UserContext) -> str:
+        """Resolve current generations and build the cache key (one MGET)."""
+        dependencies = self.dependencies(request.scope, user_context)
+        values = await self.redis_client.mget(dependencies)
+        generations = {key: int(value or 0) for key, value in zip(dependencies, values)}
+        return self.build_key(request, user_context, generations)
+
+    async def get(self: Self, cache_key: str) -> SearchResponse | None:
+        """Return a cached response, recording hit/miss and entry age."""
+        try:
+            cached_data = await self.redis_client.get(cache_key)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self.errors += 1
+            logger.warning("Failed to get cached result: %s", str(e))
+            return None
+
+        if not cached_data:
+            self.misses += 1
+            return None
+
+        entry = json.loads(cached_data)
+        age = max(0.0, time.time() - entry["cached_at"])
+        self.hits += 1
+        self._hit_age_total += age
+        self._hit_age_max = max(self._hit_age_max, age)
+        return SearchResponse(**entry["result"])
+
+    async def put(self: Self, cache_key: str, result: SearchResponse) -> None:
+        """Cache a search response."""
+        entry = {"cached_at": time.time(), "result": result.model_dump(mode="json")}
+        try:
+            await self.redis_client.setex(cache_key, self.ttl_seconds, json.dumps(entry))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self.errors += 1
+            logger.warning("Failed to cache result: %s", str(e))
+
+    async def invalidate(self: Self, index: str, tenants: set[str | None]) -> None:
+        """Bump the generations of the scopes touched by a write."""
+        keys = {generation_key(index, ALL_TENANTS), generation_key(ALL_INDICES, ALL_TENANTS)}
+        for tenant in tenants:
+            keys.add(generation_key(index, tenant or GLOBAL_TENANT))
+
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key in sorted(keys):
+                pipe.incr(key)
+            await pipe.execute()
+            self.invalidations += 1
+            logger.debug("Invalidated search cache scopes: %s", sorted(keys))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self.errors += 1
+            logger.warning("Failed to invalidate search cache: %s", str(e))
+
+    async def invalidate_documents(self: Self, index: str, documents: list[IndexDocument]) -> None:
+        """Invalidate the scopes of every tenant present in a batch of documents."""
+        await self.invalidate(index, {document_tenant(document) for document in documents})
+
+    def stats(self: Self) -> dict[str, Any]:
+        """Hit-rate and staleness metrics."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "avg_hit_age_seconds": self._hit_age_total / self.hits if self.hits else 0.0,
+            "max_hit_age_seconds": self._hit_age_max,
+            "ttl_seconds": self.ttl_seconds,
+        }
@@ -1,7 +1,7 @@
 """Main search service that orchestrates all search functionality."""
 
-import json
 import logging
+from dataclasses import asdict
 from typing import Any, Self
 
 import redis.asyncio as redis
@@ -18,9 +18,11 @@ from app.models import (
     SuggestionResponse,
     UserContext,
 )
+from app.services.indexing_pipeline import BulkItemError, IndexingPipeline
 from app.services.opensearch_service import OpenSearchService
 from app.services.pii_masking_service import PIIMaskingService
 from app.services.rbac_service import RBACService
+from app.services.search_cache import SearchCache, document_tenant
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +36,10 @@ class SearchService:
         self.rbac_service = RBACService()
         self.pii_masking_service = PIIMaskingService()
         self.redis_client = None
+        self.search_cache: SearchCache | None = None
+        self.indexing_pipeline = IndexingPipeline(
+            self.opensearch_service.bulk, on_indexed=self._on_documents_indexed
+        )
         logger.info("SearchService initialized")
 
     async def initialize(self: Self) -> None:
@@ -45,6 +51,8 @@ class SearchService:
                 self.redis_client = redis.from_url(
                     settings.REDIS_URL, encoding="utf-8", decode_responses=True
                 )
+                self.search_cache = SearchCache(self.redis_client)
+            await self.indexing_pipeline.start()
             logger.info("SearchService dependencies initialized successfully")
         except Exception as e:  # pylint: disable=broad-exception-caught
             logger.error("Failed to initialize SearchService: %s", str(e))
@@ -90,12 +98,12 @@ class SearchService:
         try:
             # Check cache first
             cache_key = None
-            if self.redis_client:
-                cache_key = self._generate_cache_key(request, user_context)
-                cached_result = await self._get_cached_result(cache_key)
+            if self.search_cache:
+                cache_key = await self._generate_cache_key(request, user_context)
+                cached_result = await self.search_cache.get(cache_key) if cache_key else None
                 if cached_result:
                     logger.debug("Cache hit for user %s", user_context.user_id)
-                    return SearchResponse(**cached_result)
+                    return cached_result
 
             # Apply RBAC filtering
             # pylint: disable=no-member
@@ -112,8 +120,8 @@ class SearchService:
             )
 
             # Cache the result
-            if self.redis_client and cache_key:
-                await self._cache_result(cache_key, masked_response)
+            if self.search_cache and cache_key:
+                await self.search_cache.put(cache_key, masked_response)
 
             logger.debug(
                 "Search completed: %d results for user %s",
@@ -180,16 +188,20 @@ class SearchService:
             masked_request = IndexRequest(
                 index=request.index,
                 document=masked_document,
-                document_id=request.document_id,
+                refresh=request.refresh,
             )
 
-            # Index the document
-            # pylint: disable=no-member
-            result = await self.opensearch_service.index_document(masked_request)
-
-            # Invalidate relevant caches
-            if self.redis_client:
-                await self._invalidate_search_cache()
+            # Index the document. Writes that ask for a refresh go straight to
+            # OpenSearch; everything else is coalesced into bulk requests by the
+            # pipeline, which also invalidates the cache once per batch.
+            if masked_request.refresh:
+                # pylint: disable=no-member
+                result = await self.opensearch_service.index_document(masked_request)
+                await self._on_documents_indexed(
+                    request.index, {document_tenant(request.document)}
+                )
+            else:
+                result = await self.indexing_pipeline.index(request.index, masked_document)
 
             logger.info(
                 "Document indexed successfully for user %s: %s",
@@ -223,16 +235,19 @@ class SearchService:
                 masked_doc = await self.pii_masking_service.mask_document(doc, user_context)
                 masked_documents.append(masked_doc)
 
-            # Create masked request
-            masked_request = BulkIndexRequest(index=request.index, documents=masked_documents)
-
-            # Bulk index the documents
-            # pylint: disable=no-member
-            result = await self.opensearch_service.bulk_index(masked_request)
-
-            # Invalidate relevant caches
-            if self.redis_client:
-                await self._invalidate_search_cache()
+            # Queue the documents; the pipeline coalesces them into bounded bulk
+            # requests and blocks here while its queue is full
+            results = await self.indexing_pipeline.index_many(
+                request.index, masked_documents, refresh=request.refresh
+            )
+            errors = [
+                {"id": item.doc_id, "status": item.status, "error": item.error}
+                if isinstance(item, BulkItemError)
+                else {"error": str(item)}
+                for item in results
+                if isinstance(item, BaseException)
+            ]
+            result = {"indexed": len(results) - len(errors), "errors": errors}
 
             logger.info(
                 "Bulk indexing completed for user %s: %d documents",
@@ -249,61 +264,35 @@ class SearchService:
             )
             raise
 
-    def _generate_cache_key(self: Self, request: SearchRequest, user_context: UserContext) -> str:
-        """Generate a cache key for the search request."""
-        key_data = {
-            "query": request.query,
-            "filters": request.filters,
-            "user_id": user_context.user_id,
-            "user_roles": sorted(user_context.roles),
-        }
-        return f"search:{hash(str(sorted(key_data.items())))}"
-
-    async def _get_cached_result(self: Self, cache_key: str) -> dict | None:
-        """Get cached search result."""
+    async def _generate_cache_key(
+        self: Self, request: SearchRequest, user_context: UserContext
+    ) -> str | None:
+        """Generate a stable, generation-versioned cache key for the search request."""
         try:
-            if not self.redis_client:
-                return None
-
-            cached_data = await self.redis_client.get(cache_key)
-            if cached_data:
-                return json.loads(cached_data)
-            return None
+            return await self.search_cache.key_for(request, user_context)
         except Exception as e:  # pylint: disable=broad-exception-caught
-            logger.warning("Failed to get cached result: %s", str(e))
+            logger.warning("Failed to resolve search cache key: %s", str(e))
             return None
 
-    async def _cache_result(self: Self, cache_key: str, result: SearchResponse) -> None:
-        """Cache search result."""
-        try:
-            if not self.redis_client:
-                return
+    async def _on_documents_indexed(self: Self, index: str, tenants: set[str | None]) -> None:
+        """Invalidate cached searches over the scopes a batch of writes touched."""
+        if self.search_cache:
+            await self.search_cache.invalidate(index, tenants)
 
-            # Convert to dict for caching
-            result_dict = result.dict()
-            await self.redis_client.setex(
-                cache_key, settings.CACHE_TTL_SECONDS, json.dumps(result_dict)
-            )
-        except Exception as e:  # pylint: disable=broad-exception-caught
-            logger.warning("Failed to cache result: %s", str(e))
+    def get_indexing_stats(self: Self) -> dict[str, Any]:
+        """Bulk indexing pipeline counters."""
+        return {"queued": self.indexing_pipeline.queued, **asdict(self.indexing_pipeline.stats)}
 
-    async def _invalidate_search_cache(self: Self) -> None:
-        """Invalidate all search cache entries."""
-        try:
-            if not self.redis_client:
-                return
-
-            # Find all search cache keys
-            keys = await self.redis_client.keys("search:*")
-            if keys:
-                await self.redis_client.delete(*keys)
-                logger.debug("Invalidated %d search cache entries", len(keys))
-        except Exception as e:  # pylint: disable=broad-exception-caught
-            logger.warning("Failed to invalidate search cache: %s", str(e))
+    def get_cache_stats(self: Self) -> dict[str, Any]:
+        """Search cache hit-rate and staleness metrics."""
+        if not self.search_cache:
+            return {"enabled": False}
+        return {"enabled": True, **self.search_cache.stats()}
 
     async def close(self: Self) -> None:
         """Close all service connections."""
         try:
+            await self.indexing_pipeline.stop()
             await self.opensearch_service.close()  # pylint: disable=no-member
             if self.redis_client:
                 await self.redis_client.close()
@@ -0,0 +1,92 @@
+"""Throughput benchmark for the bulk indexing pipeline against a local stub.
+
+Simulates reindexing lesson and coursework documents through the pipeline into
+a stub bulk endpoint with a fixed per-request latency. Not collected by pytest;
+run it directly:
+
+    python -m tests.bench_indexing_pipeline --docs 1000000
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from app.models import CourseworkDocument, LessonDocument
+from app.services.indexing_pipeline import IndexingPipeline
+
+
+class LatencyStub:
+    """Bulk endpoint that acknowledges every item after a fixed latency."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.requests = 0
+
+    async def __call__(self, body: str, refresh: bool = False) -> dict:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        count = body.count("\n") // 2
+        return {"took": 1, "errors": False, "items": [{"index": {"status": 201}}] * count}
+
+
+def _document(i: int, now: datetime) -> LessonDocument | CourseworkDocument:
+    common = {
+        "id": f"doc{i}",
+        "title": f"Document {i}",
+        "content": "Adding and subtracting fractions with unlike denominators. " * 4,
+        "created_at": now,
+        "updated_at": now,
+        "subject": "Mathematics",
+        "grade_level": 5,
+        "district_id": f"district{i % 50}",
+        "teacher_id": f"teacher{i % 500}",
+    }
+    if i % 2:
+        return CourseworkDocument(assignment_type="homework", class_id=f"class{i % 2000}", **common)
+    return LessonDocument(**common)
+
+
+async def run(docs: int, latency: float, max_docs: int, concurrency: int) -> None:
+    """Reindex ``docs`` documents and report throughput."""
+    stub = LatencyStub(latency)
+    invalidations = 0
+
+    async def on_indexed(_index: str, _tenants: set) -> None:
+        nonlocal invalidations
+        invalidations += 1
+
+    pipeline = IndexingPipeline(
+        stub, on_indexed, max_docs=max_docs, concurrency=concurrency, flush_interval_ms=50
+    )
+    await pipeline.start()
+
+    now = datetime.utcnow()
+    started = time.perf_counter()
+    for i in range(docs):
+        index = "coursework" if i % 2 else "lessons"
+        await pipeline.submit(index, _document(i, now))
+    await pipeline.stop()
+    elapsed = time.perf_counter() - started
+
+    print(f"documents:           {docs}")
+    print(f"bulk requests:       {stub.requests}")
+    print(f"cache invalidations: {invalidations}")
+    print(f"elapsed:             {elapsed:.1f}s")
+    print(f"throughput:          {docs / elapsed:,.0f} docs/s")
+    print(f"stats:               {pipeline.stats}")
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=1_000_000)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--max-docs", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run(args.docs, args.latency_ms / 1000, args.max_docs, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Microbenchmark: masking a 100-hit results page, sequential vs compiled.
+
+The sequential baseline applies each PII pattern over the full text in turn
+and compiles the name pattern on every call, as the masking service used to.
+Not collected by pytest; run it directly:
+
+    python -m tests.bench_pii_masking
+"""
+
+import argparse
+import re
+import time
+
+from app.services.pii_masking_service import (
+    NAME_PATTERN,
+    PII_PATTERNS,
+    SENSITIVE_FIELDS,
+    CompiledMasker,
+    generate_masked_name,
+    mask_match,
+)
+
+MASK_CHAR = "*"
+THRESHOLD = 4
+SALT = "bench-salt"
+
+SEQUENTIAL_PATTERNS = {name: re.compile(source) for name, source in PII_PATTERNS.items()}
+
+
+def sequential_mask(content: str) -> str:
+    """Mask text one pattern at a time (the previous approach)."""
+    for name, pattern in SEQUENTIAL_PATTERNS.items():
+        content = pattern.sub(
+            lambda m, pn=name: mask_match(m.group(), pn, MASK_CHAR, THRESHOLD), content
+        )
+    name_pattern = re.compile(NAME_PATTERN)
+    return name_pattern.sub(lambda m: generate_masked_name(m.group(), SALT), content)
+
+
+def sequential_metadata(metadata: dict) -> dict:
+    """Recursive metadata masking with the sequential text masker."""
+    masked = {}
+    for key, value in metadata.items():
+        sensitive = key.lower() in SENSITIVE_FIELDS
+        if isinstance(value, str):
+            masked[key] = sequential_mask(value) if sensitive else value
+        elif isinstance(value, dict):
+            masked[key] = sequential_metadata(value)
+        elif isinstance(value, list) and sensitive:
+            masked[key] = [sequential_mask(v) if isinstance(v, str) else v for v in value]
+        else:
+            masked[key] = value
+    return masked
+
+
+def results_page(hits: int) -> list[dict]:
+    """A results page where snippets and metadata repeat across hits."""
+    snippets = [
+        "Ask Maria Lopez (maria.lopez@school.org, 555-201-7788) about the fractions unit.",
+        "Student ID: AB12CD34 submitted late; guardian Sam Carter called 555-998-1212.",
+        "Review long division with the class before the quiz on Friday.",
+    ]
+    return [
+        {
+            "id": f"doc{i}",
+            "type": "coursework",
+            "title": f"Assignment {i % 10}",
+            "content": snippets[i % len(snippets)] * 4,
+            "metadata": {
+                "subject": "Mathematics",
+                "teacher": {"name": "Maria Lopez", "email": "maria.lopez@school.org"},
+                "guardian_name": "Sam Carter",
+            },
+        }
+        for i in range(hits)
+    ]
+
+
+def time_page(mask_text, mask_metadata, page: list[dict], rounds: int) -> float:
+    """Average milliseconds to mask one page."""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for hit in page:
+            mask_text(hit["title"])
+            mask_text(hit["content"])
+            mask_metadata(hit["metadata"])
+    return (time.perf_counter() - started) / rounds * 1000
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hits", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    page = results_page(args.hits)
+    masker = CompiledMasker(frozenset(PII_PATTERNS), True, MASK_CHAR, THRESHOLD, SALT)
+
+    before = time_page(sequential_mask, sequential_metadata, page, args.rounds)
+    cold = CompiledMasker(frozenset(PII_PATTERNS), True, MASK_CHAR, THRESHOLD, SALT, cache_size=0)
+    single_pass = time_page(cold.mask_value, cold.mask_metadata, page, args.rounds)
+    after = time_page(masker.mask_value, masker.mask_metadata, page, args.rounds)
+
+    print(f"page of {args.hits} hits, {args.rounds} rounds")
+    print(f"sequential patterns:          {before:.3f} ms/page")
+    print(f"single pass, no memoization:  {single_pass:.3f} ms/page")
+    print(f"single pass, memoized:        {after:.3f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark: RBAC post-filtering of a large results page, interpreted vs compiled.
+
+The interpreted baseline rebuilds the role filter for every hit and walks the
+filter dict clause by clause, as the RBAC service used to. Not collected by
+pytest; run it directly:
+
+    python -m tests.bench_rbac_filter --hits 10000
+"""
+
+import argparse
+import time
+from typing import Any
+
+from app.models import UserContext, UserRole
+from app.services.rbac_service import RBACService
+
+
+def interpreted_match(document: dict[str, Any], filter_dict: dict[str, Any]) -> bool:
+    """Walk the filter dict for one document (the previous approach)."""
+    if "match_all" in filter_dict:
+        return True
+    if "bool" in filter_dict:
+        bool_query = filter_dict["bool"]
+        if "must_not" in bool_query and interpreted_match(document, bool_query["must_not"]):
+            return False
+        if "must" in bool_query:
+            must = bool_query["must"]
+            for clause in must if isinstance(must, list) else [must]:
+                if not interpreted_match(document, clause):
+                    return False
+        if "should" in bool_query:
+            matches = sum(1 for c in bool_query["should"] if interpreted_match(document, c))
+            return matches >= bool_query.get("minimum_should_match", 1)
+    for field, value in filter_dict.get("term", {}).items():
+        if document.get(field) != value:
+            return False
+    for field, values in filter_dict.get("terms", {}).items():
+        if document.get(field) not in values:
+            return False
+    return True
+
+
+def results_page(hits: int) -> list[dict[str, Any]]:
+    """Hits spread over many classes, schools and teachers."""
+    return [
+        {
+            "id": f"doc{i}",
+            "type": "coursework",
+            "teacher_id": f"teacher{i % 300}",
+            "class_id": f"class{i % 400}",
+            "school_id": f"school{i % 40}",
+            "district_id": f"district{i % 7}",
+        }
+        for i in range(hits)
+    ]
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hits", type=int, default=10_000)
+    parser.add_argument("--classes", type=int, default=60)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    service = RBACService()
+    user = UserContext(
+        user_id="teacher1",
+        role=UserRole.TEACHER,
+        school_id="school3",
+        class_ids=[f"class{i * 5}" for i in range(args.classes)],
+    )
+    page = results_page(args.hits)
+
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        before = [
+            hit for hit in page
+            if interpreted_match(hit, service._rbac_filter(user))  # pylint: disable=protected-access
+        ]
+    interpreted = (time.perf_counter() - started) / args.rounds * 1000
+
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        predicate = service.get_document_predicate(user)
+        after = [hit for hit in page if predicate(hit)]
+    compiled = (time.perf_counter() - started) / args.rounds * 1000
+
+    assert before == after
+    print(f"{args.hits} hits, teacher with {args.classes} classes, {len(after)} visible")
+    print(f"interpreted filter: {interpreted:.2f} ms/page")
+    print(f"compiled predicate: {compiled:.2f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
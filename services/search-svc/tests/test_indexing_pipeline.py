@@ -0,0 +1,135 @@
+"""Tests for the bulk indexing pipeline."""
+
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+from app.models import LessonDocument
+from app.services.indexing_pipeline import BulkItemError, IndexingPipeline
+
+
+class StubBulkEndpoint:
+    """Answers bulk requests locally, optionally rejecting some attempts."""
+
+    def __init__(self, delay=0.0, reject=None):
+        self.delay = delay
+        self.reject = reject or {}
+        self.requests = []
+        self.refreshes = []
+
+    async def __call__(self, body, refresh=False):
+        lines = body.splitlines()
+        actions = [json.loads(line)["index"] for line in lines[::2]]
+        self.requests.append(len(actions))
+        self.refreshes.append(refresh)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+
+        items = []
+        for action in actions:
+            status = 201
+            rejections = self.reject.get(action["_id"])
+            if rejections:
+                status = rejections.pop(0)
+            item = {"_id": action["_id"], "status": status}
+            if status >= 300:
+                item["error"] = {"type": "rejected"}
+            items.append({"index": item})
+        return {"took": 1, "errors": any("error" in i["index"] for i in items), "items": items}
+
+
+def _lesson(i, district_id="district1"):
+    now = datetime.utcnow()
+    return LessonDocument(
+        id=f"lesson{i}",
+        title=f"Lesson {i}",
+        content="Learning about fractions",
+        created_at=now,
+        updated_at=now,
+        subject="Mathematics",
+        district_id=district_id,
+        teacher_id="teacher1",
+    )
+
+
+def test_documents_are_coalesced_into_bounded_bulks():
+    """Documents are grouped up to max_docs and invalidation runs per batch."""
+
+    async def scenario():
+        endpoint = StubBulkEndpoint()
+        invalidations = []
+
+        async def on_indexed(index, tenants):
+            invalidations.append((index, tenants))
+
+        pipeline = IndexingPipeline(
+            endpoint, on_indexed, max_docs=25, flush_interval_ms=20, concurrency=2
+        )
+        await pipeline.start()
+        results = await pipeline.index_many("lessons", [_lesson(i) for i in range(100)])
+        await pipeline.stop()
+
+        assert all(result["status"] == 201 for result in results)
+        assert endpoint.requests == [25, 25, 25, 25]
+        assert invalidations == [("lessons", {"district1"})] * 4
+
+    asyncio.run(scenario())
+
+
+def test_rejected_items_are_retried_with_backoff():
+    """429s are retried; permanent rejections fail only their own document."""
+
+    async def scenario():
+        endpoint = StubBulkEndpoint(reject={"lesson1": [429, 429], "lesson2": [400]})
+        pipeline = IndexingPipeline(endpoint, flush_interval_ms=5, retry_backoff_ms=1)
+        await pipeline.start()
+        results = await pipeline.index_many("lessons", [_lesson(i) for i in range(3)])
+        await pipeline.stop()
+
+        assert results[0]["status"] == 201
+        assert results[1]["status"] == 201
+        assert isinstance(results[2], BulkItemError) and results[2].status == 400
+        assert pipeline.stats.retried == 2
+        assert pipeline.stats.failed == 1
+
+    asyncio.run(scenario())
+
+
+def test_producers_block_when_queue_is_full():
+    """A slow endpoint pushes back on submit instead of buffering without bound."""
+
+    async def scenario():
+        endpoint = StubBulkEndpoint(delay=0.2)
+        pipeline = IndexingPipeline(
+            endpoint, queue_size=5, max_docs=5, flush_interval_ms=1, concurrency=1
+        )
+        await pipeline.start()
+
+        for i in range(15):
+            await pipeline.submit("lessons", _lesson(i))
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(pipeline.submit("lessons", _lesson(99)), 0.05)
+
+        await pipeline.stop()
+        assert pipeline.queued == 0
+
+    asyncio.run(scenario())
+
+
+def test_refresh_is_passed_to_the_bulk_request():
+    """Documents submitted with refresh make their bulk request refresh the index."""
+
+    async def scenario():
+        endpoint = StubBulkEndpoint()
+        pipeline = IndexingPipeline(endpoint, max_docs=10, flush_interval_ms=20)
+        await pipeline.start()
+
+        await pipeline.index_many("lessons", [_lesson(i) for i in range(5)])
+        await pipeline.index_many("lessons", [_lesson(i) for i in range(5, 10)], refresh=True)
+        await pipeline.stop()
+
+        assert endpoint.requests == [5, 5]
+        assert endpoint.refreshes == [False, True]
+
+    asyncio.run(scenario())
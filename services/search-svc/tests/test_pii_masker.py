@@ -0,0 +1,126 @@
+"""Tests for the compiled single-pass PII masker."""
+
+import asyncio
+from types import SimpleNamespace
+
+from app.models import SearchHit, SearchResponse, UserContext, UserRole
+from app.services import pii_masking_service
+from app.services.pii_masking_service import PII_PATTERNS, CompiledMasker, PIIMaskingService
+
+
+def _masker(**overrides):
+    options = {
+        "pattern_names": frozenset(PII_PATTERNS),
+        "mask_names": True,
+        "mask_char": "*",
+        "partial_mask_threshold": 4,
+        "salt": "test-salt",
+    }
+    options.update(overrides)
+    return CompiledMasker(**options)
+
+
+def test_masks_every_pattern_in_one_pass():
+    """Each match is masked according to the pattern that produced it."""
+    masker = _masker()
+    text = (
+        "Contact Jane Doe at jane.doe@example.com or 555-123-4567, "
+        "SSN 123-45-6789, card 4111111111111111."
+    )
+
+    masked = masker.mask_text(text)
+
+    assert "Jane Doe" not in masked and "Learner " in masked
+    assert "j*******@example.com" in masked
+    assert "(555) ***-4567" in masked
+    assert "***-**-6789" in masked
+    assert "************1111" in masked
+
+
+def test_disabled_patterns_are_left_alone():
+    """Only the configured patterns take part in the combined expression."""
+    masker = _masker(pattern_names=frozenset({"email"}), mask_names=False)
+
+    masked = masker.mask_text("Jane Doe, jane@example.com, 555-123-4567")
+
+    assert masked == "Jane Doe, j***@example.com, 555-123-4567"
+
+
+def test_repeated_values_are_memoized():
+    """Identical snippets across hits are masked once."""
+    masker = _masker()
+    for _ in range(100):
+        masker.mask_value("Reach Jane Doe at jane@example.com")
+
+    info = masker.mask_text.cache_info()
+    assert info.misses == 1
+    assert info.hits == 99
+
+
+def test_metadata_masks_only_sensitive_fields():
+    """Sensitive keys are masked at any depth; other values pass through."""
+    masker = _masker()
+    metadata = {
+        "email": "jane@example.com",
+        "subject": "Contact jane@example.com",
+        "guardian": {"guardian_name": "John Smith", "visits": 3},
+        "phone": ["555-123-4567", 7],
+    }
+
+    masked = masker.mask_metadata(metadata)
+
+    assert masked["email"] == "j***@example.com"
+    assert masked["subject"] == "Contact jane@example.com"
+    assert masked["guardian"]["guardian_name"].startswith("Learner ")
+    assert masked["guardian"]["visits"] == 3
+    assert masked["phone"] == ["(555) ***-4567", 7]
+
+
+def test_highlight_fragments_are_masked(monkeypatch):
+    """Highlights get the same masking as the fields they were cut from."""
+    monkeypatch.setattr(
+        pii_masking_service,
+        "settings",
+        SimpleNamespace(
+            pii_masking=SimpleNamespace(
+                enabled=True,
+                mask_character="*",
+                partial_mask_threshold=4,
+                patterns_to_mask=list(PII_PATTERNS),
+                mask_names=True,
+                salt="test-salt",
+            )
+        ),
+    )
+    response = SearchResponse(
+        hits=[
+            SearchHit(
+                id="learner-1",
+                type="learner",
+                title="Jane Doe",
+                content="Reach jane@example.com about reading",
+                score=1.0,
+                highlighted={
+                    "title": ["<em>Jane</em> Doe"],
+                    "content": [
+                        "Reach <em>jane@example.com</em> about reading",
+                        "met <em>John</em> Smith today",
+                        "about <em>reading</em>",
+                    ],
+                },
+            )
+        ],
+        total=1,
+        took=3,
+    )
+    teacher = UserContext(user_id="teacher-1", role=UserRole.TEACHER)
+
+    masked = asyncio.run(PIIMaskingService().mask_response(response, teacher))
+
+    [hit] = masked.hits
+    assert hit.title.startswith("Learner ")
+    assert hit.highlighted["title"] == [hit.title]
+    reach, met, reading = hit.highlighted["content"]
+    assert reach == "Reach j***@example.com about reading"
+    assert "John" not in met and met.startswith("met Learner ")
+    assert reading == "about <em>reading</em>"
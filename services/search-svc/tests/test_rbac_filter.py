@@ -0,0 +1,71 @@
+"""Tests for compiled RBAC result filtering."""
+
+import asyncio
+
+from app.models import UserContext, UserRole
+from app.services.rbac_service import RBACService, compile_filter
+
+
+def _teacher(**overrides):
+    context = {
+        "user_id": "teacher1",
+        "role": UserRole.TEACHER,
+        "school_id": "school1",
+        "class_ids": ["class1", "class2"],
+    }
+    context.update(overrides)
+    return UserContext(**context)
+
+
+def test_compiled_filter_handles_bool_term_and_terms():
+    """The compiled predicate follows bool/should/must_not semantics."""
+    predicate = compile_filter(
+        {
+            "bool": {
+                "must": [{"term": {"type": "lesson"}}],
+                "should": [
+                    {"term": {"teacher_id": "teacher1"}},
+                    {"terms": {"class_id": ["class1", "class2"]}},
+                ],
+                "must_not": {"term": {"archived": True}},
+                "minimum_should_match": 1,
+            }
+        }
+    )
+
+    assert predicate({"type": "lesson", "class_id": "class2"})
+    assert not predicate({"type": "lesson", "class_id": "class9"})
+    assert not predicate({"type": "coursework", "teacher_id": "teacher1"})
+    assert not predicate({"type": "lesson", "teacher_id": "teacher1", "archived": True})
+    assert not compile_filter({"bool": {"must_not": {"match_all": {}}}})({"type": "lesson"})
+
+
+def test_array_fields_match_any_element():
+    """terms/term on an array field match if any element matches, as in OpenSearch."""
+    predicate = compile_filter({"terms": {"class_ids": ["class1"]}})
+
+    assert predicate({"class_ids": ["class7", "class1"]})
+    assert not predicate({"class_ids": ["class7"]})
+    assert compile_filter({"term": {"guardian_ids": "g1"}})({"guardian_ids": ["g1", "g2"]})
+
+
+def test_filter_search_results_uses_cached_predicate():
+    """Results are post-filtered with one compiled predicate per user context."""
+
+    async def scenario():
+        service = RBACService()
+        results = [
+            {"id": "1", "teacher_id": "teacher1"},
+            {"id": "2", "class_id": "class2"},
+            {"id": "3", "school_id": "school1"},
+            {"id": "4", "school_id": "school9", "class_id": "class9"},
+        ]
+
+        filtered = await service.filter_search_results(_teacher(), results)
+        again = await service.filter_search_results(_teacher(class_ids=["class2", "class1"]), [])
+
+        assert [r["id"] for r in filtered] == ["1", "2", "3"]
+        assert again == []
+        assert len(service._predicates) == 1  # pylint: disable=protected-access
+
+    asyncio.run(scenario())
@@ -0,0 +1,147 @@
+"""Tests for the generation-versioned search cache."""
+
+import asyncio
+from datetime import datetime
+
+from app.models import (
+    LessonDocument,
+    SearchRequest,
+    SearchResponse,
+    SearchScope,
+    UserContext,
+    UserRole,
+)
+from app.services.search_cache import SearchCache
+
+
+class InMemoryRedis:
+    """Minimal async Redis stand-in shared between cache instances."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def setex(self, key, _ttl, value):
+        self.data[key] = value
+
+    def pipeline(self, transaction=True):  # noqa: ARG002
+        return _Pipeline(self)
+
+
+class _Pipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.keys = []
+
+    def incr(self, key):
+        self.keys.append(key)
+
+    async def execute(self):
+        for key in self.keys:
+            self.redis.data[key] = str(int(self.redis.data.get(key, 0)) + 1)
+
+
+def _teacher(district_id="district1", class_ids=None):
+    return UserContext(
+        user_id="teacher1",
+        role=UserRole.TEACHER,
+        district_id=district_id,
+        class_ids=class_ids or ["class1", "class2"],
+    )
+
+
+def _lesson(district_id):
+    now = datetime.utcnow()
+    return LessonDocument(
+        id="lesson1",
+        title="Fractions",
+        content="Learning about fractions",
+        created_at=now,
+        updated_at=now,
+        subject="Mathematics",
+        district_id=district_id,
+        teacher_id="teacher1",
+    )
+
+
+def _response():
+    return SearchResponse(hits=[], total=0, took=1)
+
+
+def test_cache_key_is_stable_content_hash():
+    """Keys depend only on content, not on ordering or process hash seeds."""
+    request = SearchRequest(q="fractions", scope=SearchScope.LESSONS)
+    generations = {"search:gen:lessons:district1": 3}
+
+    key = SearchCache.build_key(request, _teacher(class_ids=["a", "b"]), generations)
+    same = SearchCache.build_key(request, _teacher(class_ids=["b", "a"]), generations)
+    newer = SearchCache.build_key(request, _teacher(), {"search:gen:lessons:district1": 4})
+
+    assert key == same
+    assert key.startswith("search:v2:") and len(key) == len("search:v2:") + 64
+    assert key != newer
+
+
+def test_indexing_invalidates_only_its_tenant_scope():
+    """Indexing a lesson in one district leaves other districts cached."""
+
+    async def scenario():
+        cache = SearchCache(InMemoryRedis(), ttl_seconds=60)
+        request = SearchRequest(q="fractions", scope=SearchScope.LESSONS)
+
+        keys = {}
+        for district in ("district1", "district2"):
+            keys[district] = await cache.key_for(request, _teacher(district))
+            await cache.put(keys[district], _response())
+
+        await cache.invalidate_documents("lessons", [_lesson("district1")])
+
+        assert await cache.key_for(request, _teacher("district1")) != keys["district1"]
+        assert await cache.key_for(request, _teacher("district2")) == keys["district2"]
+
+    asyncio.run(scenario())
+
+
+def test_admin_scope_invalidated_by_any_write():
+    """Searches over every index depend on every write."""
+
+    async def scenario():
+        cache = SearchCache(InMemoryRedis(), ttl_seconds=60)
+        admin = UserContext(user_id="admin", role=UserRole.SYSTEM_ADMIN)
+        request = SearchRequest(q="fractions", scope=SearchScope.ADMIN_ALL)
+
+        before = await cache.key_for(request, admin)
+        await cache.invalidate("coursework", {"district9"})
+
+        assert await cache.key_for(request, admin) != before
+
+    asyncio.run(scenario())
+
+
+def test_replicas_share_entries():
+    """A second replica serves entries cached by the first."""
+
+    async def scenario():
+        shared = InMemoryRedis()
+        replica_a = SearchCache(shared, ttl_seconds=60)
+        replica_b = SearchCache(shared, ttl_seconds=60)
+        queries = [SearchRequest(q=f"topic {i}", scope=SearchScope.ALL) for i in range(50)]
+
+        for request in queries:
+            key = await replica_a.key_for(request, _teacher())
+            assert await replica_a.get(key) is None
+            await replica_a.put(key, _response())
+
+        for request in queries:
+            key = await replica_b.key_for(request, _teacher())
+            assert await replica_b.get(key) is not None
+
+        assert replica_a.stats()["hit_rate"] == 0.0
+        assert replica_b.stats()["hit_rate"] == 1.0
+
+    asyncio.run(scenario())